@@ -3,13 +3,18 @@ from datetime import timedelta
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from django.utils.http import parse_etags
 from rest_framework import generics, permissions, status, throttling, views
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
 
+from readings.aggregates import GLOBAL_SCOPE, dashboard_totals
+from readings.dashboard_cache import dashboard_etag, get_cached_dashboard, realtime_marker, set_cached_dashboard
 from readings.models import Reading, ReadingStatus
+from readings.scoring import accuracy_pct, insights_count, reading_predictions, reading_type_of
 
 from .serializers import LoginSerializer, RegisterSerializer, UserSerializer
 
@@ -230,33 +235,49 @@ class UserDashboardView(views.APIView):
 
     Returns personalized dashboard metrics for the authenticated user.
     Shape matches the Frontend DashboardData type.
+
+    Totals, averages and weekly activity come from the aggregates kept up to
+    date on reading writes (readings.aggregates); only the 20 most recent
+    readings are loaded.
+
+    The payload is cached until the next reading write and carries an ETag
+    (readings.dashboard_cache); a request with a current If-None-Match gets
+    304 without a database query. Tokens are checked without loading the
+    user for the same reason.
     """
 
+    authentication_classes = [JWTStatelessUserAuthentication]
     permission_classes = [permissions.AllowAny]
 
     def get(self, request, *args, **kwargs):
-        # Authentication removed - get all readings without user filter
+        # Authentication removed - dashboard covers all readings without user filter
+        scope = GLOBAL_SCOPE
         now = timezone.now()
-        week_ago = now - timedelta(days=7)
-        month_ago = now - timedelta(days=30)
+        etag = dashboard_etag(scope, now.date())
+        if etag is not None and {etag, "*"}.intersection(parse_etags(request.headers.get("If-None-Match", ""))):
+            return self._revalidate(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+        payload = get_cached_dashboard(etag)
+        if payload is None:
+            payload = self._payload(scope, now)
+            set_cached_dashboard(etag, payload)
+        return self._revalidate(Response(payload, status=status.HTTP_200_OK), etag)
+
+    @staticmethod
+    def _revalidate(response, etag):
+        if etag is not None:
+            response["ETag"] = etag
+            response["Cache-Control"] = "private, no-cache"
+        return response
 
-        # Get all readings (no user filter)
-        readings_qs = Reading.objects.all().order_by("-created_at").select_related("palm_reference")
+    def _payload(self, scope, now):
+        totals = dashboard_totals(scope, now)
+        average_accuracy = totals["average_accuracy"]
 
-        total_readings = readings_qs.count()
-        # Use optimized queries with date filters
-        readings_this_month = Reading.objects.filter(
-            created_at__gte=month_ago
-        ).count()
-        readings_this_week = Reading.objects.filter(
-            created_at__gte=week_ago
-        ).count()
+        readings_qs = Reading.objects.all().order_by("-created_at").select_related("palm_reference")
 
         recent_readings = []
         upcoming_predictions: list[dict] = []
-        accuracies: list[int] = []
-        favorite_type_counts: dict[str, int] = {}
-        total_insights_generated = 0
         last_reading_date = None
 
         def map_status(status: str) -> str:
@@ -269,243 +290,44 @@ class UserDashboardView(views.APIView):
             return "analyzing"
 
         for reading in readings_qs[:20]:
-            result = reading.result or {}
-
-            # Use reading_type field from model, fallback to result dict
-            reading_type = reading.reading_type
-            if not reading_type and isinstance(result, dict):
-                # Fallback for old readings without reading_type field
-                reading_type = (
-                    result.get("type")
-                    or result.get("reading_type")
-                    or result.get("readingType")
-                    or "palm_analysis"
-                )
-            # Ensure reading_type is set (default to palm_analysis if still None)
-            if not reading_type:
-                reading_type = "palm_analysis"
-
-            # Derive accuracy percentage if available
-            accuracy_pct = 0
-            if isinstance(result, dict):
-                # Check for accuracy in result dict (palm analysis format)
-                accuracy_block = result.get("accuracy")
-                if isinstance(accuracy_block, dict):
-                    overall = accuracy_block.get("overall")
-                    if isinstance(overall, (int, float)) and overall > 0:
-                        # Support either 0–1 or 0–100 ranges
-                        accuracy_pct = int(round(overall * 100)) if overall <= 1 else int(round(overall))
-                
-                # Check for direct accuracy field (numerology/astrology format)
-                if accuracy_pct == 0:
-                    direct_accuracy = result.get("accuracy")
-                    if isinstance(direct_accuracy, (int, float)) and direct_accuracy > 0:
-                        accuracy_pct = int(round(direct_accuracy)) if direct_accuracy <= 100 else int(round(direct_accuracy))
-                
-                # For palm analysis, calculate from overallScore if available
-                if accuracy_pct == 0 and reading_type == "palm_analysis":
-                    overall_score = result.get("overallScore")
-                    if isinstance(overall_score, (int, float)) and overall_score > 0:
-                        # Support either 0–1 or 0–100 ranges
-                        accuracy_pct = int(round(overall_score * 100)) if overall_score <= 1 else int(round(overall_score))
-                    
-                    # If still 0, calculate from line scores average
-                    if accuracy_pct == 0 and "lines" in result:
-                        lines = result.get("lines", {})
-                        line_scores = []
-                        for line_key in ["lifeLine", "headLine", "heartLine", "fateLine"]:
-                            if line_key in lines:
-                                line_data = lines[line_key]
-                                line_score = line_data.get("score", 0)
-                                # Skip absent fate line
-                                if line_key == "fateLine" and line_data.get("quality", "").lower() == "absent":
-                                    continue
-                                if line_score > 0:
-                                    line_scores.append(line_score)
-                        
-                        if line_scores:
-                            accuracy_pct = int(round(sum(line_scores) / len(line_scores)))
-
-            # Fallback accuracy based on reading type and status (only if truly 0)
-            if accuracy_pct == 0 and reading.status == ReadingStatus.DONE:
-                if reading_type == "numerology":
-                    accuracy_pct = 95  # Numerology calculations are deterministic
-                elif reading_type == "astrology_reading":
-                    accuracy_pct = 91  # Astrology readings have high accuracy
-                else:
-                    accuracy_pct = 90  # Palm analysis default
-
-            if accuracy_pct:
-                accuracies.append(accuracy_pct)
-
-            favorite_type_counts[reading_type] = favorite_type_counts.get(reading_type, 0) + 1
-
-            # Calculate insights count based on reading type
-            insights = 0
-            if isinstance(result, dict):
-                # Palm Analysis insights - comprehensive count
-                if reading_type == "palm_analysis":
-                    # Count palm lines (Life, Head, Heart, Fate)
-                    lines = result.get("lines", {})
-                    if isinstance(lines, dict):
-                        for line_key in ["lifeLine", "headLine", "heartLine", "fateLine"]:
-                            if line_key in lines:
-                                line_data = lines[line_key]
-                                # Only count if line is present (not absent)
-                                if line_data.get("quality", "").lower() != "absent":
-                                    insights += 1
-                    
-                    # Count personality traits
-                    personality = result.get("personality", {})
-                    if isinstance(personality, dict):
-                        traits = personality.get("traits", [])
-                        if isinstance(traits, list):
-                            insights += len(traits)
-                        # Count physical characteristics
-                        if personality.get("dominantHand"): insights += 1
-                        if personality.get("palmShape"): insights += 1
-                        if personality.get("fingerLength"): insights += 1
-                        if personality.get("handType"): insights += 1
-                    
-                    # Collect prediction summaries for upcoming_predictions
-                    preds = result.get("predictions")
-                    if isinstance(preds, list):
-                        for p in preds:
-                            if not isinstance(p, dict):
-                                continue
-                            area = p.get("area") or p.get("type") or "General"
-                            timeframe = p.get("timeframe") or p.get("window") or ""
-                            text = p.get("prediction") or p.get("summary") or ""
-                            confidence = p.get("confidence")
-                            if isinstance(confidence, (int, float)):
-                                confidence_pct = int(round(confidence))
-                            else:
-                                confidence_pct = 80
-                            upcoming_predictions.append(
-                                {
-                                    "area": str(area),
-                                    "timeframe": str(timeframe),
-                                    "prediction": str(text),
-                                    "confidence": confidence_pct,
-                                }
-                            )
-                            insights += 1
-
-                    # Count special marks
-                    for key in ("specialMarks", "special_marks"):
-                        items = result.get(key)
-                        if isinstance(items, list):
-                            insights += len(items)
-                    
-                    # Count compatibility entries
-                    if isinstance(result.get("compatibility"), list):
-                        insights += len(result.get("compatibility"))
-                    
-                    # Overall score counts as 1 insight
-                    if result.get("overallScore") is not None:
-                        insights += 1
-                
-                # Numerology insights
-                elif reading_type == "numerology":
-                    if result.get("lifePathNumber"):
-                        insights += 1
-                    if result.get("destinyNumber"):
-                        insights += 1
-                    if result.get("soulNumber"):
-                        insights += 1
-                    if result.get("personalityNumber"):
-                        insights += 1
-                    if result.get("interpretation"):
-                        insights += 1
-                    if isinstance(result.get("compatibility"), list):
-                        insights += len(result.get("compatibility"))
-                    if isinstance(result.get("luckyNumbers"), list):
-                        insights += len(result.get("luckyNumbers"))
-                
-                # Astrology insights
-                elif reading_type == "astrology_reading":
-                    if result.get("sunSign") or result.get("moonSign") or result.get("risingSign"):
-                        insights += 3
-                    if isinstance(result.get("personalityTraits"), list):
-                        insights += len(result.get("personalityTraits"))
-                    if isinstance(result.get("lifePredictions"), list):
-                        for pred in result.get("lifePredictions", []):
-                            if isinstance(pred, dict):
-                                area = pred.get("area") or "General"
-                                text = pred.get("prediction") or pred.get("description") or ""
-                                if text:
-                                    upcoming_predictions.append({
-                                        "area": str(area),
-                                        "timeframe": pred.get("timeframe", "Upcoming"),
-                                        "prediction": str(text),
-                                        "confidence": pred.get("confidence", 85),
-                                    })
-                                    insights += 1
-                    if isinstance(result.get("strengths"), list):
-                        insights += len(result.get("strengths"))
-                    if isinstance(result.get("challenges"), list):
-                        insights += len(result.get("challenges"))
-            
-            total_insights_generated += insights
+            reading_type = reading_type_of(reading)
+            upcoming_predictions.extend(reading_predictions(reading, reading_type))
 
             if last_reading_date is None:
                 last_reading_date = reading.created_at
 
-            # Ensure minimum insights count
-            if insights == 0:
-                insights = 1  # At least one insight for any reading
-            
+            if reading.accuracy_pct is None:  # scores not backfilled yet
+                accuracy, insights = accuracy_pct(reading, reading_type), insights_count(reading, reading_type)
+            else:
+                accuracy, insights = reading.accuracy_pct, reading.insights_count
+
             recent_readings.append(
                 {
                     "id": str(reading.id),
                     "user": None,  # Authentication removed - no user required
                     "type": reading_type,
                     "status": map_status(reading.status),
-                    "accuracy": accuracy_pct,
-                    "insights": insights,  # Include insights count
+                    "accuracy": accuracy,
+                    # At least one insight for any reading
+                    "insights": insights or 1,
                     "created_at": reading.created_at.isoformat(),
                     "updated_at": reading.updated_at.isoformat(),
-                    "results": result,
+                    "results": reading.result or {},
                 }
             )
 
-        average_accuracy = int(round(sum(accuracies) / len(accuracies))) if accuracies else 0
-        favorite_reading_type = (
-            max(favorite_type_counts, key=favorite_type_counts.get) if favorite_type_counts else "Palm Analysis"
-        )
-
-        # Build weekly activity (last 7 days, including today)
+        # Weekly activity (last 7 days, including today) from the daily totals
         weekly_activity = []
         for i in range(6, -1, -1):
-            day = now - timedelta(days=i)
-            day_start = day.replace(hour=0, minute=0, second=0, microsecond=0)
-            day_end = day_start + timedelta(days=1)
-
-            day_qs = readings_qs.filter(created_at__gte=day_start, created_at__lt=day_end)
-            count = day_qs.count()
-
-            day_accuracies: list[int] = []
-            for r in day_qs:
-                res = r.result or {}
-                if isinstance(res, dict):
-                    acc_block = res.get("accuracy")
-                    if isinstance(acc_block, dict):
-                        overall = acc_block.get("overall")
-                        if isinstance(overall, (int, float)):
-                            val = int(round(overall * 100)) if overall <= 1 else int(round(overall))
-                            day_accuracies.append(val)
-
-            day_avg_accuracy = (
-                int(round(sum(day_accuracies) / len(day_accuracies)))
-                if day_accuracies
-                else average_accuracy
-            )
-
+            day_start = (now - timedelta(days=i)).replace(hour=0, minute=0, second=0, microsecond=0)
+            count, accuracy_sum, accuracy_count = totals["daily"].get(day_start.date(), (0, 0, 0))
             weekly_activity.append(
                 {
                     "day": day_start.strftime("%a"),
                     "readings": count,
-                    "accuracy": day_avg_accuracy,
+                    "accuracy": (
+                        int(round(accuracy_sum / accuracy_count)) if accuracy_count > 0 else average_accuracy
+                    ),
                 }
             )
 
@@ -519,16 +341,16 @@ class UserDashboardView(views.APIView):
         ]
 
         user_stats = {
-            "total_readings": total_readings,
-            "readings_this_month": readings_this_month,
-            "readings_this_week": readings_this_week,
+            "total_readings": totals["total_readings"],
+            "readings_this_month": totals["readings_this_month"],
+            "readings_this_week": totals["readings_this_week"],
             "average_accuracy": average_accuracy,
-            "favorite_reading_type": favorite_reading_type,
+            "favorite_reading_type": totals["favorite_reading_type"] or "Palm Analysis",
             "member_since": "",  # Authentication removed - no user date
             # Placeholder subscription logic – can be wired to a real billing system later
             "subscription_days_left": 0,
             "last_reading_date": last_reading_date.isoformat() if last_reading_date else "",
-            "total_insights_generated": total_insights_generated,
+            "total_insights_generated": totals["total_insights"],
         }
 
         # Sort upcoming_predictions by confidence and keep top 6
@@ -542,8 +364,7 @@ class UserDashboardView(views.APIView):
             "user_stats": user_stats,
             "upcoming_predictions": upcoming_predictions,
         }
-
-        return Response(payload, status=status.HTTP_200_OK)
+        return payload
 
 
 class UpgradePlanView(views.APIView):
@@ -598,26 +419,44 @@ class UpgradePlanView(views.APIView):
 class DashboardRealtimeView(views.APIView):
     """
     GET /api/v1/auth/dashboard/realtime/
-    
+
     Returns real-time dashboard update information.
     This endpoint can be polled to check for updates without fetching full dashboard data.
     Returns: { "last_update": "ISO timestamp", "has_updates": bool, "readings_count": int }
+
+    Answers from a marker cached until the next reading write
+    (readings.dashboard_cache.realtime_marker), so a poll costs the same
+    whatever the number of readings. The ETag is made of the count and the
+    last update, so deletes change it too; a current If-None-Match gets 304.
     """
+
+    authentication_classes = [JWTStatelessUserAuthentication]
     permission_classes = [permissions.AllowAny]
-    
+
     def get(self, request, *args, **kwargs):
-        from readings.models import Reading
-        
-        # Authentication removed - get all readings
-        readings_count = Reading.objects.all().count()
-        
-        # Get the most recent reading timestamp
-        last_reading = Reading.objects.all().order_by("-updated_at").first()
-        last_update = last_reading.updated_at if last_reading else timezone.now()
-        
-        return Response({
-            "last_update": last_update.isoformat(),
-            "has_updates": readings_count > 0,
-            "readings_count": readings_count,
-            "timestamp": timezone.now().isoformat(),
-        }, status=status.HTTP_200_OK)
+        # Authentication removed - covers all readings
+        marker = realtime_marker()
+        last_update = marker["last_update"]
+        etag = (
+            None
+            if last_update is None
+            else f'"{marker["readings_count"]}.{int(last_update.timestamp() * 1_000_000)}"'
+        )
+
+        if etag is not None and {etag, "*"}.intersection(parse_etags(request.headers.get("If-None-Match", ""))):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            now = timezone.now()
+            response = Response(
+                {
+                    "last_update": (last_update or now).isoformat(),
+                    "has_updates": marker["readings_count"] > 0,
+                    "readings_count": marker["readings_count"],
+                    "timestamp": now.isoformat(),
+                },
+                status=status.HTTP_200_OK,
+            )
+        if etag is not None:
+            response["ETag"] = etag
+            response["Cache-Control"] = "private, no-cache"
+        return response
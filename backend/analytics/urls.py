@@ -1,11 +1,12 @@
 from django.urls import path
 
-from .views import AnalyticsSummaryView
+from .views import AnalyticsSummaryView, MetricsView
 
 app_name = "analytics"
 
 urlpatterns = [
     path("summary/", AnalyticsSummaryView.as_view(), name="summary"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 ]
 
 
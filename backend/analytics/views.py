@@ -4,6 +4,12 @@ from django.utils import timezone
 from rest_framework import permissions, views
 from rest_framework.response import Response
 
+from palmastro_backend.celery import get_task_message_stats
+from palmastro_backend.model_guard import get_model_guard_stats
+from palmastro_backend.openai_client import get_connection_stats
+from palmastro_backend.singleflight import get_single_flight_stats
+from readings.cache import get_palm_cache_stats
+from readings.imaging import get_preprocessing_stats
 from readings.models import Reading
 
 
@@ -37,3 +43,23 @@ class AnalyticsSummaryView(views.APIView):
         )
 
 
+class MetricsView(views.APIView):
+    """
+    GET /api/v1/analytics/metrics/
+
+    Deployment-wide performance counters (shared cache backed).
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs):
+        return Response(
+            {
+                "palm_result_cache": get_palm_cache_stats(),
+                "palm_image_preprocessing": get_preprocessing_stats(),
+                "openai_connections": get_connection_stats(),
+                "single_flight": get_single_flight_stats(),
+                "celery_messages": get_task_message_stats(),
+                "model_guard": get_model_guard_stats(),
+            }
+        )
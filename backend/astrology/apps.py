@@ -6,4 +6,5 @@ class AstrologyConfig(AppConfig):
     name = "astrology"
     verbose_name = "Astrology"
 
-
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('astrology', '0002_increase_gender_field_length'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='astrologysession',
+            name='retry_count',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Times generation was re-queued after hitting the OpenAI rate limit.'),
+        ),
+    ]
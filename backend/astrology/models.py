@@ -42,6 +42,10 @@ class AstrologySession(models.Model):
         max_length=16, choices=AstrologyStatus.choices, default=AstrologyStatus.PENDING
     )
     consent_to_store = models.BooleanField(default=False)
+    retry_count = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Times generation was re-queued after hitting the OpenAI rate limit.",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     expires_at = models.DateTimeField(default=default_expires_at)
 
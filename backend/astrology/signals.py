@@ -0,0 +1,46 @@
+"""
+Publish astrology session status changes for `AstrologyEventsView`.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from palmastro_backend import events
+
+from .models import AstrologySession, AstrologyStatus
+
+TERMINAL_STATUSES = {AstrologyStatus.COMPLETED, AstrologyStatus.FAILED}
+
+
+def astrology_channel(session_id: Any) -> str:
+    return f"astrology:{session_id}"
+
+
+def astrology_event(session: AstrologySession) -> Dict[str, Any]:
+    """Status payload; carries the result once the session is completed."""
+    data: Dict[str, Any] = {
+        "session_id": str(session.session_id),
+        "status": session.status,
+    }
+    if session.status == AstrologyStatus.COMPLETED:
+        data["result"] = session.openai_result
+    return data
+
+
+def is_terminal(event: Dict[str, Any]) -> bool:
+    return event.get("status") in TERMINAL_STATUSES
+
+
+@receiver(post_save, sender=AstrologySession, dispatch_uid="astrology.publish_status")
+def publish_astrology_status(sender, instance: AstrologySession, created: bool, update_fields=None, **kwargs) -> None:
+    # The wizard steps save the session repeatedly while it is still PENDING;
+    # only status changes matter to subscribers.
+    if created or (update_fields is not None and "status" not in update_fields):
+        return
+    event = astrology_event(instance)
+    transaction.on_commit(lambda: events.publish(astrology_channel(instance.pk), event))
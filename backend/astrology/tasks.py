@@ -3,23 +3,38 @@ from __future__ import annotations
 import json
 import logging
 import os
-import re
-import time
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Callable, Dict, TypeVar
+from typing import Any, Dict
 
+from asgiref.sync import sync_to_async
 from celery import shared_task
 from django.conf import settings
+from django.core.management import call_command
 from django.utils import timezone
-from openai import OpenAI, RateLimitError
+from openai import RateLimitError
+
+from palmastro_backend.celery import (
+    RescheduleTask,
+    can_reschedule,
+    is_rate_limited,
+    retry_rate_limited,
+)
+from palmastro_backend.model_guard import aguarded_create, guarded_create
+from palmastro_backend.openai_client import (
+    async_retry_on_rate_limit,
+    get_async_openai_client,
+    deferred_rate_limits,
+    get_openai_client,
+    openai_model,
+    retry_on_rate_limit,
+)
+from palmastro_backend.singleflight import asingle_flight, request_key, single_flight
 
 from .crypto import decrypt_value
 from .models import AstrologySession, AstrologyStatus
 from .utils import compute_basic_chart
 
-T = TypeVar("T")
-
 log = logging.getLogger(__name__)
 
 
@@ -172,64 +187,6 @@ def _generate_mock_astrology_result(session: AstrologySession) -> Dict[str, Any]
         }
 
 
-def retry_on_rate_limit(
-    func: Callable[[], T],
-    max_retries: int = 3,
-    base_delay: float = 2.0,
-) -> T:
-    """
-    Retry a function call with exponential backoff on RateLimitError.
-    
-    Args:
-        func: The function to call
-        max_retries: Maximum number of retry attempts
-        base_delay: Base delay in seconds (will be doubled each retry)
-    
-    Returns:
-        The result of the function call
-    
-    Raises:
-        RateLimitError: If all retries are exhausted
-        Any other exception raised by func
-    """
-    last_exception = None
-    for attempt in range(max_retries + 1):
-        try:
-            return func()
-        except RateLimitError as e:
-            last_exception = e
-            if attempt < max_retries:
-                # Extract retry-after from error if available, otherwise use exponential backoff
-                delay = base_delay * (2 ** attempt)
-                error_msg = str(e)
-                if "try again in" in error_msg.lower():
-                    # Try to extract seconds from message like "Please try again in 20s"
-                    try:
-                        match = re.search(r"try again in (\d+)s?", error_msg, re.IGNORECASE)
-                        if match:
-                            delay = float(match.group(1)) + 1  # Add 1 second buffer
-                    except Exception:
-                        pass  # Use exponential backoff if parsing fails
-                
-                log.warning(
-                    "Rate limit hit (attempt %d/%d), retrying in %.1f seconds...",
-                    attempt + 1,
-                    max_retries + 1,
-                    delay,
-                )
-                time.sleep(delay)
-            else:
-                log.error("Rate limit retries exhausted after %d attempts", max_retries + 1)
-                raise
-        except Exception as e:
-            # Don't retry on non-rate-limit errors
-            raise
-    # This should never be reached, but type checker needs it
-    if last_exception:
-        raise last_exception
-    raise RuntimeError("Unexpected error in retry logic")
-
-
 def _build_prompt(session: AstrologySession, language: str = "en") -> str:
     try:
         full_name = decrypt_value(session.full_name) or ""
@@ -302,44 +259,33 @@ def _build_prompt(session: AstrologySession, language: str = "en") -> str:
         raise RuntimeError(f"Failed to build prompt: {str(e)}") from e
 
 
-def _call_openai(prompt: str) -> Dict[str, Any]:
-    api_key = os.getenv("OPENAI_API_KEY")
-    if not api_key:
-        raise RuntimeError("OPENAI_API_KEY is not set")
+QUOTA_KEYWORDS = ["insufficient_quota", "billing", "quota", "payment", "subscription"]
 
-    # Fix Windows issue: httpx/OpenAI sometimes fail when SSL_CERT_FILE is set
-    # to an invalid path. For this app we simply ignore any user-provided
-    # SSL_CERT_FILE and let the default cert store be used.
-    os.environ.pop("SSL_CERT_FILE", None)
 
-    client = OpenAI(api_key=api_key)
+def _build_request(prompt: str) -> Dict[str, Any]:
+    return dict(
+        model=openai_model("astrology"),
+        messages=[
+            {
+                "role": "system",
+                "content": "You are a master astrologer. Return ONLY valid JSON. No explanations, no markdown, just pure JSON starting with { and ending with }.",
+            },
+            {"role": "user", "content": prompt},
+        ],
+        temperature=0.3,  # Slightly higher for uniqueness while maintaining accuracy
+        max_tokens=2000,  # Limit tokens for faster response (<3 seconds)
+        response_format={"type": "json_object"},  # Force JSON mode for faster parsing
+    )
 
-    def _make_request():
-        return client.chat.completions.create(
-            model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
-            messages=[
-                {
-                    "role": "system",
-                    "content": "You are a master astrologer. Return ONLY valid JSON. No explanations, no markdown, just pure JSON starting with { and ending with }.",
-                },
-                {"role": "user", "content": prompt},
-            ],
-            temperature=0.3,  # Slightly higher for uniqueness while maintaining accuracy
-            max_tokens=2000,  # Limit tokens for faster response (<3 seconds)
-            response_format={"type": "json_object"},  # Force JSON mode for faster parsing
-        )
 
-    try:
-        response = retry_on_rate_limit(_make_request, max_retries=3, base_delay=2.0)
-    except Exception as e:
-        error_msg = str(e).lower()
-        # Check for quota/billing errors and re-raise with a specific exception type
-        if any(keyword in error_msg for keyword in ["insufficient_quota", "billing", "quota", "payment", "subscription"]):
-            raise RuntimeError(f"OpenAI API quota/billing issue: {str(e)}") from e
-        raise
-    
-    content = response.choices[0].message.content or ""
-    
+def _raise_for_quota(e: Exception) -> None:
+    error_msg = str(e).lower()
+    # Check for quota/billing errors and re-raise with a specific exception type
+    if any(keyword in error_msg for keyword in QUOTA_KEYWORDS):
+        raise RuntimeError(f"OpenAI API quota/billing issue: {str(e)}") from e
+
+
+def _parse_content(content: str) -> Dict[str, Any]:
     # With response_format={"type": "json_object"}, OpenAI should return pure JSON
     # But we still handle cases where there might be extra text
     try:
@@ -358,77 +304,215 @@ def _call_openai(prompt: str) -> Dict[str, Any]:
             raise RuntimeError(f"Invalid JSON response from OpenAI: {str(e)}") from e
 
 
-@shared_task
-def generate_astrology_reading(session_id: str, language: str = "en") -> None:
+def _flight_key(session: AstrologySession, prompt: str) -> str:
+    # Identical birth data submitted concurrently shares one model call.
+    return request_key(
+        "astrology", _build_request(prompt), exclude=[str(session.session_id)]
+    )
+
+
+def _call_openai(prompt: str) -> Dict[str, Any]:
+    client = get_openai_client()
+    request = _build_request(prompt)
+
+    try:
+        response = retry_on_rate_limit(
+            lambda: guarded_create(client.chat.completions.create, request),
+            max_retries=3,
+            base_delay=2.0,
+        )
+    except Exception as e:
+        _raise_for_quota(e)
+        raise
+
+    return _parse_content(response.choices[0].message.content or "")
+
+
+async def _acall_openai(prompt: str) -> Dict[str, Any]:
+    client = get_async_openai_client()
+    request = _build_request(prompt)
+
+    try:
+        response = await async_retry_on_rate_limit(
+            lambda: aguarded_create(client.chat.completions.create, request),
+            max_retries=3,
+            base_delay=2.0,
+        )
+    except Exception as e:
+        _raise_for_quota(e)
+        raise
+
+    return _parse_content(response.choices[0].message.content or "")
+
+
+def _start_generation(session_id: str) -> AstrologySession | None:
+    session = AstrologySession.objects.get(session_id=session_id)
+    if session.status not in {AstrologyStatus.PENDING, AstrologyStatus.IN_PROGRESS}:
+        return None
+
+    session.status = AstrologyStatus.IN_PROGRESS
+    session.save(update_fields=["status"])
+    return session
+
+
+def _use_mock_data() -> bool:
+    # Check if we should use mock data (for development/testing)
+    return os.getenv("USE_MOCK_ASTROLOGY", "false").lower() == "true"
+
+
+def _fallback_result(session: AstrologySession, exc: Exception) -> Dict[str, Any] | None:
+    """
+    Decide what to do when the OpenAI call failed: a mock result for
+    quota/billing problems, None (session marked FAILED) for plain rate
+    limits, otherwise re-raise.
+    """
+    session_id = session.session_id
+    error_msg = str(exc).lower()
+    if isinstance(exc, (RateLimitError, RuntimeError)):
+        # Check for quota/billing/subscription errors
+        if any(keyword in error_msg for keyword in QUOTA_KEYWORDS):
+            # Use mock data if no subscription/quota available
+            log.warning("OpenAI quota/billing issue for session %s, using mock data: %s", session_id, str(exc))
+            return _generate_mock_astrology_result(session)
+        if isinstance(exc, RateLimitError):
+            # Regular rate limit (not quota) - return error
+            session.openai_result = {
+                "error": f"Rate limit exceeded. Please wait a moment and try again. Details: {str(exc)[:200]}"
+            }
+            session.status = AstrologyStatus.FAILED
+            session.save(update_fields=["openai_result", "status"])
+            log.error("Rate limit error for astrology session %s: %s", session_id, str(exc))
+            return None
+        # Other RuntimeError - might be quota related, try mock
+        log.warning("OpenAI API error for session %s, attempting mock data: %s", session_id, str(exc))
+        return _generate_mock_astrology_result(session)
+
+    # If it's a quota/billing error, use mock data
+    if any(keyword in error_msg for keyword in QUOTA_KEYWORDS):
+        log.warning("OpenAI quota/billing issue for session %s, using mock data: %s", session_id, str(exc))
+        return _generate_mock_astrology_result(session)
+    # Re-raise other exceptions
+    raise exc
+
+
+def _complete_generation(session: AstrologySession, result: Dict[str, Any]) -> None:
+    session.openai_result = result
+    session.status = AstrologyStatus.COMPLETED
+
+    # Respect consent_to_store: if false, shorten TTL and purge PII quickly.
+    if not session.consent_to_store:
+        hours = int(getattr(settings, "ASTROLOGY_NO_CONSENT_TTL_HOURS", 0))
+        session.expires_at = timezone.now() + timezone.timedelta(
+            hours=hours or 1
+        )
+
+    session.save(update_fields=["openai_result", "status", "expires_at"])
+
+
+def _fail_generation(session_id: str, exc: Exception) -> None:
+    log.error("Failed to generate astrology reading for %s", session_id, exc_info=exc)
     try:
         session = AstrologySession.objects.get(session_id=session_id)
-        if session.status not in {AstrologyStatus.PENDING, AstrologyStatus.IN_PROGRESS}:
-            return
+        session.status = AstrologyStatus.FAILED
+        session.openai_result = {
+            "error": f"Failed to generate reading: {str(exc)[:200]}"
+        }
+        session.save(update_fields=["status", "openai_result"])
+    except Exception:  # noqa: BLE001
+        log.exception("Failed to update astrology session after error")
 
-        session.status = AstrologyStatus.IN_PROGRESS
-        session.save(update_fields=["status"])
 
-        # Check if we should use mock data (for development/testing)
-        use_mock_data = os.getenv("USE_MOCK_ASTROLOGY", "false").lower() == "true"
-        
-        if use_mock_data:
+def _requeue_generation(session: AstrologySession, exc: Exception) -> RescheduleTask:
+    session.status = AstrologyStatus.PENDING
+    session.retry_count += 1
+    session.save(update_fields=["status", "retry_count"])
+    log.warning(
+        "Rate limited generating astrology session %s; re-queued (retry %d)",
+        session.session_id,
+        session.retry_count,
+    )
+    return RescheduleTask(exc)
+
+
+@shared_task(bind=True)
+def generate_astrology_reading(self, session_id: str, language: str = "en") -> None:
+    """
+    Rate limits are not slept through in the worker: the session goes back
+    to PENDING and the task is re-enqueued with a countdown.
+    """
+    if not can_reschedule(self):
+        _generate_astrology_reading(session_id, language)
+        return
+    try:
+        with deferred_rate_limits():
+            _generate_astrology_reading(session_id, language, reschedule=True)
+    except RescheduleTask as exc:
+        raise retry_rate_limited(self, exc)
+
+
+def _generate_astrology_reading(session_id: str, language: str, reschedule: bool = False) -> None:
+    try:
+        session = _start_generation(session_id)
+        if session is None:
+            return
+
+        if _use_mock_data():
             log.info("Using mock astrology data for session %s (USE_MOCK_ASTROLOGY=true)", session_id)
             result = _generate_mock_astrology_result(session)
         else:
             prompt = _build_prompt(session, language=language)
             try:
-                result = _call_openai(prompt)
-            except (RateLimitError, RuntimeError) as exc:
-                error_msg = str(exc).lower()
-                # Check for quota/billing/subscription errors
-                if any(keyword in error_msg for keyword in ["insufficient_quota", "billing", "quota", "payment", "subscription"]):
-                    # Use mock data if no subscription/quota available
-                    log.warning("OpenAI quota/billing issue for session %s, using mock data: %s", session_id, str(exc))
-                    result = _generate_mock_astrology_result(session)
-                elif isinstance(exc, RateLimitError):
-                    # Regular rate limit (not quota) - return error
-                    session.openai_result = {
-                        "error": f"Rate limit exceeded. Please wait a moment and try again. Details: {str(exc)[:200]}"
-                    }
-                    session.status = AstrologyStatus.FAILED
-                    session.save(update_fields=["openai_result", "status"])
-                    log.error("Rate limit error for astrology session %s: %s", session_id, str(exc))
+                result = single_flight(
+                    _flight_key(session, prompt),
+                    lambda: _call_openai(prompt),
+                    kind="astrology",
+                )
+            except Exception as exc:
+                if reschedule and is_rate_limited(exc):
+                    raise _requeue_generation(session, exc) from exc
+                result = _fallback_result(session, exc)
+                if result is None:
                     return
-                else:
-                    # Other RuntimeError - might be quota related, try mock
-                    log.warning("OpenAI API error for session %s, attempting mock data: %s", session_id, str(exc))
-                    result = _generate_mock_astrology_result(session)
+
+        _complete_generation(session, result)
+    except RescheduleTask:
+        raise
+    except Exception as exc:  # noqa: BLE001
+        _fail_generation(session_id, exc)
+
+
+async def agenerate_astrology_reading(session_id: str, language: str = "en") -> None:
+    """
+    Async counterpart of `generate_astrology_reading` used by the ASGI view:
+    database work runs in a thread, the model call awaits the async client.
+    """
+    try:
+        session = await sync_to_async(_start_generation)(session_id)
+        if session is None:
+            return
+
+        if _use_mock_data():
+            log.info("Using mock astrology data for session %s (USE_MOCK_ASTROLOGY=true)", session_id)
+            result = await sync_to_async(_generate_mock_astrology_result)(session)
+        else:
+            prompt = await sync_to_async(_build_prompt)(session, language=language)
+            try:
+                result = await asingle_flight(
+                    _flight_key(session, prompt),
+                    lambda: _acall_openai(prompt),
+                    kind="astrology",
+                )
             except Exception as exc:
-                error_msg = str(exc).lower()
-                # If it's a quota/billing error, use mock data
-                if any(keyword in error_msg for keyword in ["insufficient_quota", "billing", "quota", "payment", "subscription"]):
-                    log.warning("OpenAI quota/billing issue for session %s, using mock data: %s", session_id, str(exc))
-                    result = _generate_mock_astrology_result(session)
-                else:
-                    # Re-raise other exceptions
-                    raise
-
-        session.openai_result = result
-        session.status = AstrologyStatus.COMPLETED
-
-        # Respect consent_to_store: if false, shorten TTL and purge PII quickly.
-        if not session.consent_to_store:
-            hours = int(getattr(settings, "ASTROLOGY_NO_CONSENT_TTL_HOURS", 0))
-            session.expires_at = timezone.now() + timezone.timedelta(
-                hours=hours or 1
-            )
-
-        session.save(update_fields=["openai_result", "status", "expires_at"])
+                result = await sync_to_async(_fallback_result)(session, exc)
+                if result is None:
+                    return
+
+        await sync_to_async(_complete_generation)(session, result)
     except Exception as exc:  # noqa: BLE001
-        log.exception("Failed to generate astrology reading for %s", session_id)
-        try:
-            session = AstrologySession.objects.get(session_id=session_id)
-            session.status = AstrologyStatus.FAILED
-            session.openai_result = {
-                "error": f"Failed to generate reading: {str(exc)[:200]}"
-            }
-            session.save(update_fields=["status", "openai_result"])
-        except Exception:  # noqa: BLE001
-            log.exception("Failed to update astrology session after error")
+        await sync_to_async(_fail_generation)(session_id, exc)
 
 
+@shared_task
+def cleanup_astrology() -> None:
+    """Periodic (Celery beat) run of `manage.py cleanup_astrology`, on the maintenance queue."""
+    call_command("cleanup_astrology")
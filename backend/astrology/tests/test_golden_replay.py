@@ -0,0 +1,31 @@
+from __future__ import annotations
+
+from django.test import TestCase
+
+from astrology.models import AstrologyStatus
+from palmastro_backend.replay import Replayer, load_corpus
+
+
+class AstrologyGoldenReplayTests(TestCase):
+    """Recorded model answers replayed through `_generate_astrology_reading`."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.cases = load_corpus("astrology")
+
+    def test_outcomes_match_golden_corpus(self):
+        self.assertTrue(self.cases)
+        with self.assertLogs("astrology.tasks", level="WARNING"), Replayer() as replayer:
+            for case in self.cases:
+                with self.subTest(case=case["name"]):
+                    self.assertEqual(replayer.replay("astrology", case).as_dict(), case["expected"])
+
+    def test_unparseable_answers_fall_back_to_mock_reading(self):
+        fallbacks = [case for case in self.cases if "mock" in case["name"]]
+
+        self.assertTrue(fallbacks)
+        for case in fallbacks:
+            with self.subTest(case=case["name"]):
+                self.assertEqual(case["expected"]["status"], AstrologyStatus.COMPLETED)
+                self.assertEqual(case["expected"]["result"]["model_version"], "mock-1.0")
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from django.conf import settings
 from django.urls import path
 
 from .views import (
+    AstrologyEventsView,
     AstrologyResultView,
     AstrologyStatusView,
+    AsyncGenerateReadingView,
     BirthDetailsView,
     GenerateReadingView,
     PersonalInfoView,
@@ -13,13 +16,16 @@ from .views import (
 
 app_name = "astrology"
 
+GenerateView = AsyncGenerateReadingView if settings.OPENAI_ASYNC_VIEWS else GenerateReadingView
+
 urlpatterns = [
     path("personal-info/", PersonalInfoView.as_view(), name="personal-info"),
     path("birth-details/", BirthDetailsView.as_view(), name="birth-details"),
     path("preferences/", PreferencesView.as_view(), name="preferences"),
-    path("generate-reading/", GenerateReadingView.as_view(), name="generate-reading"),
+    path("generate-reading/", GenerateView.as_view(), name="generate-reading"),
     path("<uuid:pk>/status/", AstrologyStatusView.as_view(), name="status"),
     path("<uuid:pk>/result/", AstrologyResultView.as_view(), name="result"),
+    path("<uuid:pk>/events/", AstrologyEventsView.as_view(), name="events"),
 ]
 
 
@@ -4,12 +4,17 @@ import json
 from datetime import datetime
 from typing import Any
 
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from rest_framework import permissions, status, views
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from palmastro_backend.async_views import AsyncAPIView, ModelCallMixin
+from palmastro_backend.events import EventStreamAPIView, event_stream_response
+from palmastro_backend.model_guard import ensure_model_available
+
 from .crypto import encrypt_value
 from .models import AstrologySession, AstrologyStatus
 from .serializers import (
@@ -18,7 +23,8 @@ from .serializers import (
     PersonalInfoSerializer,
     PreferencesSerializer,
 )
-from .tasks import generate_astrology_reading
+from .signals import astrology_channel, astrology_event, is_terminal
+from .tasks import agenerate_astrology_reading, generate_astrology_reading
 from .throttling import AstrologyRateThrottle
 
 
@@ -117,7 +123,7 @@ class PreferencesView(views.APIView):
         )
 
 
-class GenerateReadingView(views.APIView):
+class GenerateReadingView(ModelCallMixin, views.APIView):
     """
     Final step – POST /api/v1/astrology/generate-reading/
     """
@@ -125,7 +131,7 @@ class GenerateReadingView(views.APIView):
     permission_classes = [permissions.AllowAny]
     throttle_classes = [AstrologyRateThrottle]
 
-    def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+    def begin_post(self, request: Request, *args: Any, **kwargs: Any) -> Response | tuple:
         serializer = GenerateReadingSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         session_id = serializer.validated_data["session_id"]
@@ -139,16 +145,35 @@ class GenerateReadingView(views.APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        try:
-            # In eager mode (development), this runs synchronously
-            # In production with Celery workers, this is queued
-            language = request.data.get("language", "en")
-            generate_astrology_reading.delay(str(session.session_id), language)
-        except Exception as exc:
+        ensure_model_available()
+        language = request.data.get("language", "en")
+        return session, language
+
+    def call_model(self, state: tuple) -> None:
+        # In eager mode (development), this runs synchronously
+        # In production with Celery workers, this is queued
+        session, language = state
+        generate_astrology_reading.delay(str(session.session_id), language)
+
+    async def acall_model(self, state: tuple) -> None:
+        if not getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+            return await super().acall_model(state)
+        session, language = state
+        await agenerate_astrology_reading(str(session.session_id), language)
+
+    def finish_post(self, state: tuple, outcome: Any) -> Response:
+        session, _ = state
+        request = self.request
+        if isinstance(outcome, Exception):
+            exc = outcome
             # If task fails immediately (e.g., in eager mode), log and return error
             import logging
             log = logging.getLogger(__name__)
-            log.exception("Failed to queue astrology reading task for session %s", session.session_id)
+            log.error(
+                "Failed to queue astrology reading task for session %s",
+                session.session_id,
+                exc_info=exc,
+            )
             return Response(
                 {
                     "detail": f"Failed to start astrology reading generation: {str(exc)[:200]}"
@@ -183,6 +208,7 @@ class AstrologyStatusView(views.APIView):
             {
                 "session_id": str(session.session_id),
                 "status": session.status,
+                "retry_count": session.retry_count,
                 "created_at": session.created_at,
                 "expires_at": session.expires_at,
             }
@@ -208,3 +234,23 @@ class AstrologyResultView(views.APIView):
         )
 
 
+class AstrologyEventsView(EventStreamAPIView):
+    """
+    Server-Sent Events: the current status, then each status change until
+    the session is COMPLETED (the event carries the result) or FAILED.
+    """
+
+    def get(self, request: Request, pk: str, *args: Any, **kwargs: Any):
+        session = get_object_or_404(AstrologySession, session_id=pk)
+        return event_stream_response(
+            request, astrology_channel(session.pk), astrology_event(session), is_terminal
+        )
+
+
+class AsyncGenerateReadingView(AsyncAPIView):
+    """
+    ASGI variant of GenerateReadingView: in eager mode the OpenAI call is
+    awaited with the async client instead of blocking a worker.
+    """
+
+    api_view_class = GenerateReadingView
@@ -6,4 +6,5 @@ class NumerologyConfig(AppConfig):
     name = "numerology"
     verbose_name = "Numerology"
 
-
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,43 @@
+"""
+Publish numerology request status changes for `NumerologyEventsView`.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from palmastro_backend import events
+
+from .models import NumerologyRequest, NumerologyStatus
+from .serializers import NumerologyStatusSerializer
+
+TERMINAL_STATUSES = {NumerologyStatus.COMPLETED, NumerologyStatus.FAILED}
+
+
+def numerology_channel(request_id: Any) -> str:
+  return f"numerology:{request_id}"
+
+
+def numerology_event(nreq: NumerologyRequest) -> Dict[str, Any]:
+  """Status payload; carries the result once the request is completed."""
+  data = dict(NumerologyStatusSerializer(nreq).data)
+  if nreq.status == NumerologyStatus.COMPLETED:
+    data["computed_numbers"] = nreq.computed_numbers
+    data["result"] = nreq.openai_result
+  return data
+
+
+def is_terminal(event: Dict[str, Any]) -> bool:
+  return event.get("status") in TERMINAL_STATUSES
+
+
+@receiver(post_save, sender=NumerologyRequest, dispatch_uid="numerology.publish_status")
+def publish_numerology_status(sender, instance: NumerologyRequest, created: bool, update_fields=None, **kwargs) -> None:
+  if update_fields is not None and "status" not in update_fields:
+    return
+  event = numerology_event(instance)
+  transaction.on_commit(lambda: events.publish(numerology_channel(instance.pk), event))
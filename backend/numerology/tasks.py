@@ -2,14 +2,30 @@ from __future__ import annotations
 
 import json
 import logging
-import os
 from pathlib import Path
 from typing import Any, Dict
 
+from asgiref.sync import sync_to_async
 from celery import shared_task
 from django.conf import settings
+from django.core.management import call_command
 from django.utils import timezone
-from openai import OpenAI, RateLimitError
+from openai import RateLimitError
+
+from palmastro_backend.celery import (
+    RescheduleTask,
+    can_reschedule,
+    is_rate_limited,
+    retry_rate_limited,
+)
+from palmastro_backend.model_guard import aguarded_create, guarded_create
+from palmastro_backend.openai_client import (
+    deferred_rate_limits,
+    get_async_openai_client,
+    get_openai_client,
+    openai_model,
+)
+from palmastro_backend.singleflight import asingle_flight, request_key, single_flight
 
 from .models import NumerologyRequest, NumerologyStatus
 
@@ -48,15 +64,9 @@ def _build_prompt(nreq: NumerologyRequest) -> str:
   return prompt
 
 
-def _call_openai(prompt: str) -> Dict[str, Any]:
-  api_key = os.getenv("OPENAI_API_KEY")
-  if not api_key:
-    raise RuntimeError("OPENAI_API_KEY is not set")
-
-  client = OpenAI(api_key=api_key)
-
-  response = client.chat.completions.create(
-      model=os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+def _build_request(prompt: str) -> Dict[str, Any]:
+  return dict(
+      model=openai_model("numerology"),
       messages=[
           {
               "role": "system",
@@ -72,8 +82,8 @@ def _call_openai(prompt: str) -> Dict[str, Any]:
       response_format={"type": "json_object"},  # Force JSON mode for faster parsing
   )
 
-  content = response.choices[0].message.content or ""
-  
+
+def _parse_content(content: str) -> Dict[str, Any]:
   # With response_format={"type": "json_object"}, OpenAI should return pure JSON
   # But we still handle cases where there might be extra text
   try:
@@ -92,38 +102,124 @@ def _call_openai(prompt: str) -> Dict[str, Any]:
       raise RuntimeError(f"Invalid JSON response from OpenAI: {str(e)}") from e
 
 
-@shared_task
-def process_numerology_request(request_id: str) -> None:
+def _flight_key(nreq: NumerologyRequest, prompt: str) -> str:
+  # Identical names/birth dates submitted concurrently share one model call.
+  return request_key("numerology", _build_request(prompt), exclude=[str(nreq.id)])
+
+
+def _call_openai(prompt: str) -> Dict[str, Any]:
+  client = get_openai_client()
+  response = guarded_create(client.chat.completions.create, _build_request(prompt))
+  return _parse_content(response.choices[0].message.content or "")
+
+
+async def _acall_openai(prompt: str) -> Dict[str, Any]:
+  client = get_async_openai_client()
+  response = await aguarded_create(client.chat.completions.create, _build_request(prompt))
+  return _parse_content(response.choices[0].message.content or "")
+
+
+def _start_request(request_id: str) -> NumerologyRequest | None:
+  nreq = NumerologyRequest.objects.get(id=request_id)
+  if nreq.status != NumerologyStatus.PENDING:
+    return None
+  return nreq
+
+
+def _complete_request(nreq: NumerologyRequest, result: Dict[str, Any]) -> None:
+  nreq.openai_result = result
+  nreq.status = NumerologyStatus.COMPLETED
+
+  # Respect consent_to_store: if false, shorten TTL and avoid storing PII long-term.
+  if not nreq.consent_to_store:
+    ttl_days = getattr(settings, "NUMEROLOGY_NO_CONSENT_TTL_DAYS", 0)
+    hours = max(ttl_days * 24, 0)
+    nreq.expires_at = timezone.now() + timezone.timedelta(hours=hours or 1)
+
+  nreq.save(update_fields=["openai_result", "status", "expires_at"])
+
+
+def _fail_request(request_id: str, exc: Exception) -> None:
+  log.error("Failed to process numerology request %s", request_id, exc_info=exc)
   try:
     nreq = NumerologyRequest.objects.get(id=request_id)
-    if nreq.status != NumerologyStatus.PENDING:
+    nreq.status = NumerologyStatus.FAILED
+    nreq.error_message = str(exc)[:2000]
+    nreq.save(update_fields=["status", "error_message"])
+  except Exception:  # noqa: BLE001
+    log.exception("Failed to update numerology request after error")
+
+
+@shared_task(bind=True)
+def process_numerology_request(self, request_id: str) -> None:
+  """
+  Rate-limited requests stay PENDING and the task is re-enqueued with a
+  countdown instead of failing. (This app has no migrations, so the number
+  of attempts is tracked by Celery only, not on the row.)
+  """
+  if not can_reschedule(self):
+    _process_numerology_request(request_id)
+    return
+  try:
+    with deferred_rate_limits():
+      _process_numerology_request(request_id, reschedule=True)
+  except RescheduleTask as exc:
+    log.warning(
+        "Rate limited processing numerology request %s; re-queued (retry %d)",
+        request_id,
+        self.request.retries + 1,
+    )
+    raise retry_rate_limited(self, exc)
+
+
+def _process_numerology_request(request_id: str, reschedule: bool = False) -> None:
+  try:
+    nreq = _start_request(request_id)
+    if nreq is None:
       return
 
     prompt = _build_prompt(nreq)
     try:
-      result = _call_openai(prompt)
+      result = single_flight(
+          _flight_key(nreq, prompt), lambda: _call_openai(prompt), kind="numerology"
+      )
     except Exception as exc:  # noqa: BLE001
+      if reschedule and is_rate_limited(exc):
+        raise RescheduleTask(exc) from exc
       log.exception("OpenAI numerology call failed for %s", request_id)
       raise
 
-    nreq.openai_result = result
-    nreq.status = NumerologyStatus.COMPLETED
+    _complete_request(nreq, result)
+  except RescheduleTask:
+    raise
+  except Exception as exc:  # noqa: BLE001
+    _fail_request(request_id, exc)
 
-    # Respect consent_to_store: if false, shorten TTL and avoid storing PII long-term.
-    if not nreq.consent_to_store:
-      ttl_days = getattr(settings, "NUMEROLOGY_NO_CONSENT_TTL_DAYS", 0)
-      hours = max(ttl_days * 24, 0)
-      nreq.expires_at = timezone.now() + timezone.timedelta(hours=hours or 1)
 
-    nreq.save(update_fields=["openai_result", "status", "expires_at"])
-  except Exception as exc:  # noqa: BLE001
-    log.exception("Failed to process numerology request %s", request_id)
+async def aprocess_numerology_request(request_id: str) -> None:
+  """
+  Async counterpart of `process_numerology_request` used by the ASGI view.
+  """
+  try:
+    nreq = await sync_to_async(_start_request)(request_id)
+    if nreq is None:
+      return
+
+    prompt = _build_prompt(nreq)
     try:
-      nreq = NumerologyRequest.objects.get(id=request_id)
-      nreq.status = NumerologyStatus.FAILED
-      nreq.error_message = str(exc)[:2000]
-      nreq.save(update_fields=["status", "error_message"])
+      result = await asingle_flight(
+          _flight_key(nreq, prompt), lambda: _acall_openai(prompt), kind="numerology"
+      )
     except Exception:  # noqa: BLE001
-      log.exception("Failed to update numerology request after error")
+      log.exception("OpenAI numerology call failed for %s", request_id)
+      raise
+
+    await sync_to_async(_complete_request)(nreq, result)
+  except Exception as exc:  # noqa: BLE001
+    await sync_to_async(_fail_request)(request_id, exc)
 
 
+@shared_task
+def cleanup_numerology() -> None:
+  """Periodic (Celery beat) run of `manage.py cleanup_numerology`, on the maintenance queue."""
+  call_command("cleanup_numerology")
@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from django.test import TestCase
+
+from numerology.models import NumerologyStatus
+from palmastro_backend.replay import Replayer, load_corpus
+
+
+class NumerologyGoldenReplayTests(TestCase):
+  """Recorded model answers replayed through `_process_numerology_request`."""
+
+  @classmethod
+  def setUpClass(cls):
+    super().setUpClass()
+    cls.cases = load_corpus("numerology")
+
+  def test_outcomes_match_golden_corpus(self):
+    self.assertTrue(self.cases)
+    with self.assertLogs("numerology.tasks", level="WARNING"), Replayer() as replayer:
+      for case in self.cases:
+        with self.subTest(case=case["name"]):
+          self.assertEqual(replayer.replay("numerology", case).as_dict(), case["expected"])
+
+  def test_corpus_covers_successes_and_failures(self):
+    statuses = {case["expected"]["status"] for case in self.cases}
+
+    self.assertEqual(statuses, {NumerologyStatus.COMPLETED, NumerologyStatus.FAILED})
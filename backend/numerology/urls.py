@@ -1,15 +1,25 @@
 from __future__ import annotations
 
+from django.conf import settings
 from django.urls import path
 
-from .views import NumerologyCreateView, NumerologyResultView, NumerologyStatusView
+from .views import (
+  AsyncNumerologyCreateView,
+  NumerologyCreateView,
+  NumerologyEventsView,
+  NumerologyResultView,
+  NumerologyStatusView,
+)
 
 app_name = "numerology"
 
+CreateView = AsyncNumerologyCreateView if settings.OPENAI_ASYNC_VIEWS else NumerologyCreateView
+
 urlpatterns = [
-  path("", NumerologyCreateView.as_view(), name="create"),
+  path("", CreateView.as_view(), name="create"),
   path("<uuid:pk>/status/", NumerologyStatusView.as_view(), name="status"),
   path("<uuid:pk>/result/", NumerologyResultView.as_view(), name="result"),
+  path("<uuid:pk>/events/", NumerologyEventsView.as_view(), name="events"),
 ]
 
 
@@ -2,19 +2,25 @@ from __future__ import annotations
 
 from typing import Any
 
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from rest_framework import permissions, status, views
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from palmastro_backend.async_views import AsyncAPIView, ModelCallMixin
+from palmastro_backend.events import EventStreamAPIView, event_stream_response
+from palmastro_backend.model_guard import ensure_model_available
+
 from .models import ApiKey, NumerologyRequest
 from .serializers import (
   NumerologyCreateSerializer,
   NumerologyResultSerializer,
   NumerologyStatusSerializer,
 )
-from .tasks import process_numerology_request
+from .signals import is_terminal, numerology_channel, numerology_event
+from .tasks import aprocess_numerology_request, process_numerology_request
 from .throttling import NumerologyRateThrottle
 
 
@@ -32,7 +38,7 @@ def attach_api_key(request: Request) -> None:
   setattr(request, "numerology_api_key", apikey)
 
 
-class NumerologyCreateView(views.APIView):
+class NumerologyCreateView(ModelCallMixin, views.APIView):
   """
   POST /api/v1/numerology/
   """
@@ -41,17 +47,28 @@ class NumerologyCreateView(views.APIView):
   permission_classes = [permissions.AllowAny]
   throttle_classes = [NumerologyRateThrottle]
 
-  def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+  def begin_post(self, request: Request, *args: Any, **kwargs: Any) -> Response | NumerologyRequest:
     attach_api_key(request)
     serializer = NumerologyCreateSerializer(
         data=request.data,
         context={"request": request},
     )
     serializer.is_valid(raise_exception=True)
-    nreq = serializer.save()
+    ensure_model_available()
+    return serializer.save()
 
+  def call_model(self, nreq: NumerologyRequest) -> None:
     process_numerology_request.delay(str(nreq.id))
 
+  async def acall_model(self, nreq: NumerologyRequest) -> None:
+    if not getattr(settings, "CELERY_TASK_ALWAYS_EAGER", False):
+      return await super().acall_model(nreq)
+    await aprocess_numerology_request(str(nreq.id))
+
+  def finish_post(self, nreq: NumerologyRequest, outcome: Any) -> Response:
+    if isinstance(outcome, Exception):
+      raise outcome
+    request = self.request
     status_url = request.build_absolute_uri(
         reverse("numerology:status", kwargs={"pk": nreq.id})
     )
@@ -97,3 +114,21 @@ class NumerologyResultView(views.APIView):
     return Response(data)
 
 
+class NumerologyEventsView(EventStreamAPIView):
+  """
+  Server-Sent Events: the current status, then each status change until the
+  request is COMPLETED (the event carries the result) or FAILED.
+  """
+
+  def get(self, request: Request, pk: str, *args: Any, **kwargs: Any):
+    nreq = get_object_or_404(NumerologyRequest, pk=pk)
+    return event_stream_response(request, numerology_channel(nreq.pk), numerology_event(nreq), is_terminal)
+
+
+class AsyncNumerologyCreateView(AsyncAPIView):
+  """
+  ASGI variant of NumerologyCreateView: in eager mode the OpenAI call is
+  awaited with the async client instead of blocking a worker.
+  """
+
+  api_view_class = NumerologyCreateView
@@ -0,0 +1,105 @@
+"""
+Async (ASGI) fronts for the DRF views that wait on an OpenAI call.
+
+DRF views are sync-only, so the endpoints that call the model are split into
+three steps on the DRF view (see `ModelCallMixin`):
+
+    begin_post(request)   -> Response (early exit) or state
+    call_model(state)     -> outcome        (sync; `acall_model` is async)
+    finish_post(state, outcome) -> Response
+
+The sync view runs them in order. `AsyncAPIView` runs `begin_post` and
+`finish_post` (authentication, throttling, validation, ORM work) in a worker
+thread and awaits `acall_model` on the event loop, so a uvicorn worker holds
+many in-flight model calls instead of one per sync gunicorn worker.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from asgiref.sync import sync_to_async
+from django.http import HttpRequest, HttpResponseBase
+from django.utils.decorators import classonlymethod
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class ModelCallMixin:
+    """POST handler made of begin / model call / finish steps."""
+
+    def begin_post(self, request, *args: Any, **kwargs: Any) -> Any:
+        raise NotImplementedError
+
+    def call_model(self, state: Any) -> Any:
+        raise NotImplementedError
+
+    async def acall_model(self, state: Any) -> Any:
+        return await sync_to_async(self.call_model)(state)
+
+    def finish_post(self, state: Any, outcome: Any) -> Response:
+        """`outcome` is the model call's return value or the exception it raised."""
+        raise NotImplementedError
+
+    def post(self, request, *args: Any, **kwargs: Any) -> Response:
+        state = self.begin_post(request, *args, **kwargs)
+        if isinstance(state, Response):
+            return state
+        try:
+            outcome = self.call_model(state)
+        except Exception as exc:  # noqa: BLE001
+            outcome = exc
+        return self.finish_post(state, outcome)
+
+
+class AsyncAPIView(View):
+    """
+    Async view running the POST of `api_view_class` (an APIView using
+    `ModelCallMixin`) with the model call awaited on the event loop.
+    """
+
+    api_view_class: type[APIView]
+    http_method_names = ["post", "options"]
+
+    @classonlymethod
+    def as_view(cls, **initkwargs):
+        # Same as DRF: authentication classes handle CSRF themselves.
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def post(self, request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponseBase:
+        view = self.api_view_class()
+        state = await sync_to_async(self._begin)(view, request, args, kwargs)
+        if isinstance(state, HttpResponseBase):
+            return state
+        try:
+            outcome = await view.acall_model(state)
+        except Exception as exc:  # noqa: BLE001
+            outcome = exc
+        return await sync_to_async(self._finish)(view, state, outcome)
+
+    def _begin(self, view: APIView, request: HttpRequest, args: tuple, kwargs: dict) -> Any:
+        # Mirrors APIView.dispatch up to the handler call.
+        view.args, view.kwargs = args, kwargs
+        drf_request = view.initialize_request(request, *args, **kwargs)
+        view.request = drf_request
+        view.headers = view.default_response_headers
+        try:
+            view.initial(drf_request, *args, **kwargs)
+            state = view.begin_post(drf_request, *args, **kwargs)
+        except Exception as exc:  # noqa: BLE001
+            state = view.handle_exception(exc)
+        if isinstance(state, Response):
+            return self._finalize(view, state)
+        return state
+
+    def _finish(self, view: APIView, state: Any, outcome: Any) -> HttpResponseBase:
+        try:
+            response = view.finish_post(state, outcome)
+        except Exception as exc:  # noqa: BLE001
+            response = view.handle_exception(exc)
+        return self._finalize(view, response)
+
+    def _finalize(self, view: APIView, response: Response) -> HttpResponseBase:
+        return view.finalize_response(view.request, response).render()
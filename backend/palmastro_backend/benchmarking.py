@@ -0,0 +1,342 @@
+"""
+Helpers shared by the benchmark management commands.
+
+`FakeOpenAI` mimics the small part of the OpenAI client used by the task
+modules (`client.chat.completions.create`, with or without `stream=True`)
+and sleeps for a configurable latency instead of calling the API, so
+end-to-end code paths can be timed without spending money. `FakeAsyncOpenAI` does the same for `AsyncOpenAI`.
+Both record how many calls were in flight at once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import statistics
+import threading
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+PALM_VALIDATION_SYSTEM_HINT = "indicating if the image is a palm"
+
+CANNED_PALM_RESPONSE: Dict = {
+    "palm_lines": {
+        "life_line": {
+            "strength": "Strong",
+            "quality_score": "82%",
+            "interpretation": "A long, deep life line suggests steady vitality.",
+            "metrics": {
+                "clarity": "Deep",
+                "length": "Full",
+                "depth": "Deep",
+                "breaks": "None",
+                "calculated_score": "82%",
+            },
+        },
+        "heart_line": {
+            "strength": "Moderate",
+            "quality_score": "68%",
+            "interpretation": "A gently curved heart line shows warmth balanced with caution.",
+            "metrics": {
+                "clarity": "Moderate",
+                "depth": "Moderate",
+                "continuity": "Minor breaks",
+                "calculated_score": "68%",
+            },
+        },
+        "head_line": {
+            "strength": "Strong",
+            "quality_score": "77%",
+            "interpretation": "A clear head line with a slight slope indicates practical creativity.",
+            "metrics": {
+                "clarity": "Deep",
+                "depth": "Moderate",
+                "continuity": "Unbroken",
+                "curvature": "Curved",
+                "calculated_score": "77%",
+            },
+        },
+        "fate_line": {
+            "strength": "Faint",
+            "quality_score": "45%",
+            "interpretation": "A faint fate line points to a self-directed career.",
+            "metrics": {
+                "present": "Yes",
+                "clarity": "Faint",
+                "depth": "Shallow",
+                "calculated_score": "45%",
+            },
+        },
+    },
+    "personality_traits": {
+        "creative": {"percentage": "74%", "calculation": "Head line curvature=70, Moon mount=80, flexibility=72"},
+        "analytical": {"percentage": "69%", "calculation": "Head line clarity=77, palm shape=65, finger length=66"},
+        "emotional": {"percentage": "63%", "calculation": "Heart line depth=60, Venus mount=70, texture=59"},
+        "leadership": {"percentage": "71%", "calculation": "Jupiter mount=75, thumb=70, palm size=68"},
+        "practical": {"percentage": "66%", "calculation": "Palm shape=70, line clarity=64, Saturn mount=64"},
+        "intuitive": {"percentage": "72%", "calculation": "Moon mount=80, heart line=68, sensitivity=68"},
+    },
+    "physical_characteristics": {
+        "dominant_hand": "Right",
+        "palm_shape": "Square",
+        "finger_length": "Medium",
+        "hand_type": "Square hand with medium fingers",
+        "mounts": {
+            "venus": "High",
+            "jupiter": "Medium",
+            "saturn": "Medium",
+            "apollo": "Low",
+            "mercury": "Medium",
+            "moon": "High",
+        },
+    },
+    "hand_type_analysis": {
+        "overall_score": "71%",
+        "summary": "Balanced lines and prominent Venus and Moon mounts describe a grounded but imaginative nature.",
+    },
+    "predictions": {
+        "career": {"period": "Next 1-2 Years", "prediction": "Steady growth through self-made opportunities.", "advice": "Commit to one long-term project.", "confidence": "64%"},
+        "relationships": {"period": "Next 6 Months", "prediction": "Existing bonds deepen.", "advice": "Say what you feel sooner.", "confidence": "70%"},
+        "health": {"period": "Next 12 Months", "prediction": "Good energy with seasonal dips.", "advice": "Protect your sleep.", "confidence": "78%"},
+        "finances": {"period": "Next 1 Year", "prediction": "Gradual improvement.", "advice": "Automate savings.", "confidence": "61%"},
+    },
+    "special_marks": [
+        {"type": "Triangle", "location": "Jupiter mount", "meaning": "Talent for organizing people."},
+        {"type": "Island", "location": "Heart line", "meaning": "A past emotional strain."},
+    ],
+}
+
+# The astrology and numerology answers follow the schemas in the apps'
+# prompt_template.txt files.
+CANNED_ASTROLOGY_RESPONSE: Dict = {
+    "sun_sign": "Leo",
+    "moon_sign": "Cancer",
+    "rising_sign": "Virgo",
+    "overview": {
+        "summary": "A warm, expressive chart with a careful streak.",
+        "key_themes": ["Leadership", "Loyalty", "Craft", "Home"],
+        "confidence": 0.8,
+    },
+    "personality": {
+        "summary": "Leo warmth, Cancer sensitivity and Virgo precision.",
+        "traits": ["Generous", "Loyal", "Detail-minded", "Protective", "Expressive"],
+        "confidence": 0.8,
+    },
+    "planetary_positions": [
+        {"planet": "Sun", "sign": "Leo", "house": "1st House", "aspect": "Core identity and life force."},
+        {"planet": "Moon", "sign": "Cancer", "house": "12th House", "aspect": "A private emotional world."},
+        {"planet": "Ascendant", "sign": "Virgo", "house": "1st House", "aspect": "Seen as capable and precise."},
+    ],
+    "strengths": {
+        "summary": "Natural presence backed by care for details.",
+        "items": ["Leadership", "Loyalty", "Diligence", "Warmth"],
+        "confidence": 0.8,
+    },
+    "challenges": {
+        "summary": "High standards that can turn inward.",
+        "items": ["Perfectionism", "Pride", "Worry"],
+        "confidence": 0.7,
+    },
+    "life_predictions": [
+        {"area": "Career", "timeframe": "Next 6 months", "prediction": "Recognition for steady work.", "confidence": 0.7},
+        {"area": "Love & Relationships", "timeframe": "Next 12 months", "prediction": "A bond deepens.", "confidence": 0.6},
+    ],
+    "relationship_insights": {
+        "text": "Loyal and protective in love; needs appreciation.",
+        "compatibility_factors": ["Shared values", "Open praise", "Quiet time"],
+        "confidence": 0.7,
+    },
+    "career_path": {
+        "text": "Roles that combine visibility with craft.",
+        "suitable_fields": ["Design", "Teaching", "Management"],
+        "confidence": 0.7,
+    },
+    "spiritual_message": {"text": "Let your light be steady rather than perfect.", "confidence": 0.7},
+    "model_version": "canned-1.0",
+}
+
+CANNED_NUMEROLOGY_RESPONSE: Dict = {
+    "life_path": {
+        "value": 7,
+        "title": "The Seeker",
+        "keywords": ["Analysis", "Intuition", "Solitude"],
+        "core_description": "A seeker of truth who trusts study and reflection.",
+        "career_path": "Research, writing and specialist work.",
+        "love_relationships": "Needs a partner who respects quiet time.",
+        "strengths": ["Insight", "Focus"],
+        "challenges": ["Aloofness", "Skepticism"],
+        "lucky_color": "Violet",
+        "element": "Water",
+        "compatible_numbers": [3, 5],
+        "lucky_numbers": [7, 16, 25],
+        "confidence": 0.8,
+    },
+    "destiny": {
+        "value": 3,
+        "purpose": "To express ideas and inspire others.",
+        "strengths": ["Creativity", "Communication"],
+        "challenges": ["Scattered energy"],
+        "confidence": 0.8,
+    },
+    "soul": {
+        "value": 5,
+        "inner_desires": "Freedom and variety.",
+        "emotional_nature": "Curious and restless.",
+        "hidden_traits": ["Adventurous", "Adaptable"],
+        "confidence": 0.7,
+    },
+    "personality": {
+        "value": 7,
+        "how_others_perceive": "Reserved and thoughtful.",
+        "social_energy": "Selective and calm.",
+        "life_expression": "Depth over breadth.",
+        "confidence": 0.7,
+    },
+    "spiritual_insights": {
+        "text": "An analytical mind with a creative outlet.",
+        "ancient_wisdom": ["Know thyself."],
+        "confidence": 0.7,
+    },
+    "model_version": "canned-1.0",
+}
+
+
+def _completion(content: str, prompt_tokens: int = 1200, completion_tokens: int = 600):
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=content), finish_reason="stop")],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        ),
+    )
+
+
+def _stream_chunks(content: str, pieces: int, prompt_tokens: int = 1200, completion_tokens: int = 600):
+    size = max(1, -(-len(content) // pieces))
+    for start in range(0, len(content), size):
+        yield SimpleNamespace(
+            choices=[SimpleNamespace(delta=SimpleNamespace(content=content[start:start + size]), finish_reason=None)],
+            usage=None,
+        )
+    # Final usage-only chunk, as with stream_options={"include_usage": True}.
+    yield SimpleNamespace(
+        choices=[],
+        usage=SimpleNamespace(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+        ),
+    )
+
+
+def canned_content_for(messages: List[Dict]) -> str:
+    """Pick a canned JSON answer based on the system prompt of a request."""
+    system = str(messages[0].get("content", "")) if messages else ""
+    if PALM_VALIDATION_SYSTEM_HINT in system:
+        return json.dumps({"is_palm": True})
+    if "palm" in system.lower():
+        return json.dumps(CANNED_PALM_RESPONSE)
+    if "astrolog" in system.lower():
+        return json.dumps(CANNED_ASTROLOGY_RESPONSE)
+    return json.dumps(CANNED_NUMEROLOGY_RESPONSE)
+
+
+class FakeOpenAI:
+    """
+    Drop-in stand-in for `openai.OpenAI` with simulated latency. Answers with
+    `content` when set (recorded responses), otherwise the canned answer for
+    the request's system prompt.
+    """
+
+    def __init__(
+        self, latency_ms: float = 1500.0, stream_chunks: int = 40, content: str | None = None, **_: object
+    ) -> None:
+        self.latency_ms = latency_ms
+        self.stream_chunks = stream_chunks
+        self.content = content
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def __call__(self, *args: object, **kwargs: object) -> "FakeOpenAI":
+        # Allows patching the `OpenAI` class itself with an instance.
+        return self
+
+    def with_options(self, **_: object) -> "FakeOpenAI":
+        return self
+
+    def close(self) -> None:
+        pass
+
+    def _enter(self) -> None:
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _exit(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+    def _content(self, messages: List[Dict]) -> str:
+        return canned_content_for(messages) if self.content is None else self.content
+
+    def _create(self, *, messages: List[Dict], stream: bool = False, **_: object):
+        if stream:
+            return self._stream(self._content(messages))
+        self._enter()
+        try:
+            time.sleep(self.latency_ms / 1000)
+        finally:
+            self._exit()
+        return _completion(self._content(messages))
+
+    def _stream(self, content: str):
+        # The latency is spread evenly over the chunks, like token generation.
+        self._enter()
+        try:
+            pieces = max(1, self.stream_chunks)
+            for chunk in _stream_chunks(content, pieces):
+                if chunk.choices:
+                    time.sleep(self.latency_ms / 1000 / pieces)
+                yield chunk
+        finally:
+            self._exit()
+
+
+class FakeAsyncOpenAI(FakeOpenAI):
+    """Drop-in stand-in for `openai.AsyncOpenAI`; waits with asyncio.sleep."""
+
+    async def _create(self, *, messages: List[Dict], **_: object):
+        self._enter()
+        try:
+            await asyncio.sleep(self.latency_ms / 1000)
+        finally:
+            self._exit()
+        return _completion(self._content(messages))
+
+    async def close(self) -> None:
+        pass
+
+
+def summarize_latencies(samples_ms: List[float]) -> Dict[str, float]:
+    if not samples_ms:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples_ms)
+
+    def pct(p: float) -> float:
+        idx = min(len(ordered) - 1, max(0, int(round(p / 100 * len(ordered) + 0.5)) - 1))
+        return round(ordered[idx], 1)
+
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 1),
+        "p50": pct(50),
+        "p95": pct(95),
+        "p99": pct(99),
+        "max": round(ordered[-1], 1),
+    }
@@ -1,11 +1,124 @@
 import os
+import random
 
-from celery import Celery
+from celery import Celery, Task
+from kombu.serialization import dumps
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "palmastro_backend.settings")
 
-app = Celery("palmastro_backend")
-app.config_from_object("django.conf:settings", namespace="CELERY")
-app.autodiscover_tasks()
+TASK_MESSAGES = "celery.task_messages"
+TASK_MESSAGE_BYTES = "celery.task_message_bytes"
+TASK_MESSAGES_REJECTED = "celery.task_messages_rejected"
+TASK_RATE_LIMIT_RETRIES = "celery.rate_limit_retries"
+
+
+class TaskPayloadTooLarge(ValueError):
+    """Raised instead of publishing a task whose arguments exceed the limit."""
+
+
+class BoundedPayloadTask(Task):
+    """
+    Task base that measures the serialized arguments of every dispatched
+    task and refuses to publish oversized ones. Tasks should pass ids and
+    storage references; bulky data (images) belongs in storage, not in the
+    broker and every worker's memory.
+    """
+
+    def apply_async(self, args=None, kwargs=None, **options):
+        from django.conf import settings
+
+        from palmastro_backend import metrics
+
+        _, _, body = dumps(
+            (list(args or ()), dict(kwargs or {}), {}),
+            serializer=options.get("serializer") or self.serializer or self.app.conf.task_serializer,
+        )
+        size = len(body)
+        limit = int(getattr(settings, "TASK_MESSAGE_MAX_BYTES", 32 * 1024))
+        if limit and size > limit:
+            metrics.incr(TASK_MESSAGES_REJECTED)
+            raise TaskPayloadTooLarge(
+                f"{self.name} arguments are {size} bytes (limit {limit}); "
+                "store large data and pass a reference instead"
+            )
+        metrics.incr(TASK_MESSAGES)
+        metrics.incr(TASK_MESSAGE_BYTES, size)
+        return super().apply_async(args, kwargs, **options)
+
+
+class RescheduleTask(Exception):
+    """
+    Raised by a task body that left its row queued for another attempt after
+    hitting a rate limit; the task re-enqueues itself (`retry_rate_limited`).
+    """
+
+    def __init__(self, cause: BaseException):
+        super().__init__(str(cause))
+        self.cause = cause
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """A 429 (but not an exhausted quota) or a refusal by the model guard."""
+    from openai import RateLimitError
 
+    from palmastro_backend.model_guard import ModelUnavailable
 
+    if isinstance(exc, ModelUnavailable):
+        return True
+    return isinstance(exc, RateLimitError) and "insufficient_quota" not in str(exc).lower()
+
+
+def can_reschedule(task: Task) -> bool:
+    """
+    Whether a rate-limited run of `task` should be re-enqueued rather than
+    waited out or failed. Eager tasks (development, tests) and direct calls
+    cannot be delayed.
+    """
+    from django.conf import settings
+
+    if task.request.is_eager or task.request.called_directly:
+        return False
+    return task.request.retries < int(getattr(settings, "TASK_RATE_LIMIT_MAX_RETRIES", 5))
+
+
+def retry_rate_limited(task: Task, exc: RescheduleTask):
+    """
+    `raise retry_rate_limited(self, exc)`: re-enqueue `task` after the delay
+    the API asked for (or the model guard's Retry-After, or exponential
+    backoff) plus up to 50% jitter so rescheduled tasks spread out.
+    """
+    from django.conf import settings
+
+    from palmastro_backend import metrics
+    from palmastro_backend.model_guard import ModelUnavailable
+    from palmastro_backend.openai_client import _rate_limit_delay
+
+    cause = exc.cause
+    if isinstance(cause, ModelUnavailable):
+        delay = float(cause.wait)
+    else:
+        base = float(getattr(settings, "TASK_RATE_LIMIT_RETRY_BASE_SECONDS", 5))
+        delay = _rate_limit_delay(cause, task.request.retries, base)
+    countdown = delay + random.uniform(0, delay / 2)
+    metrics.incr(TASK_RATE_LIMIT_RETRIES)
+    return task.retry(exc=cause, countdown=countdown, max_retries=None)
+
+
+def get_task_message_stats() -> dict:
+    from palmastro_backend import metrics
+
+    counters = metrics.get_counters(
+        [TASK_MESSAGES, TASK_MESSAGE_BYTES, TASK_MESSAGES_REJECTED, TASK_RATE_LIMIT_RETRIES]
+    )
+    messages = counters[TASK_MESSAGES]
+    return {
+        "messages": messages,
+        "avg_message_bytes": round(counters[TASK_MESSAGE_BYTES] / messages, 1) if messages else 0.0,
+        "rejected": counters[TASK_MESSAGES_REJECTED],
+        "rate_limit_retries": counters[TASK_RATE_LIMIT_RETRIES],
+    }
+
+
+app = Celery("palmastro_backend", task_cls=BoundedPayloadTask)
+app.config_from_object("django.conf:settings", namespace="CELERY")
+app.autodiscover_tasks()
@@ -0,0 +1,316 @@
+"""
+Job status pub/sub and Server-Sent Events streaming.
+
+Status changes of readings, numerology requests and astrology sessions are
+published on a per-job channel (see the `signals` modules of those apps) and
+streamed to the browser by the `.../events/` endpoints, replacing status
+polling.
+
+With EVENTS_REDIS_URL (defaults to CACHE_URL) set, Redis pub/sub fans events
+out across gunicorn, uvicorn and Celery processes. Without it an in-process
+broker is used, which is enough for `runserver` with eager Celery. The last
+event per channel is also kept in the shared cache so a subscriber that
+connects after the job finished still gets the final state.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpRequest, HttpResponse, HttpResponseBase, StreamingHttpResponse
+from rest_framework import permissions, views
+from rest_framework.renderers import BaseRenderer
+from rest_framework.settings import api_settings
+
+from palmastro_backend import metrics
+
+log = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "events:"
+LAST_EVENT_TTL_SECONDS = 15 * 60
+
+PUBLISHED = "events.published"
+STREAMS = "events.streams"
+
+
+def _redis_url() -> str:
+    return getattr(settings, "EVENTS_REDIS_URL", "")
+
+
+def _dumps(event: Dict[str, Any]) -> str:
+    return json.dumps(event, cls=DjangoJSONEncoder)
+
+
+class _LocalBroker:
+    """Thread-safe in-process fan-out used when Redis is not configured."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, List[Callable[[str], None]]] = {}
+
+    def publish(self, channel: str, message: str) -> None:
+        with self._lock:
+            callbacks = list(self._subscribers.get(channel, ()))
+        for callback in callbacks:
+            callback(message)
+
+    def add(self, channel: str, callback: Callable[[str], None]) -> None:
+        with self._lock:
+            self._subscribers.setdefault(channel, []).append(callback)
+
+    def remove(self, channel: str, callback: Callable[[str], None]) -> None:
+        with self._lock:
+            callbacks = self._subscribers.get(channel, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+            if not callbacks:
+                self._subscribers.pop(channel, None)
+
+
+_local_broker = _LocalBroker()
+_redis_client = None
+_redis_lock = threading.Lock()
+
+
+def _redis():
+    global _redis_client
+    if _redis_client is None:
+        with _redis_lock:
+            if _redis_client is None:
+                import redis
+
+                _redis_client = redis.Redis.from_url(_redis_url())
+    return _redis_client
+
+
+def publish(channel: str, event: Dict[str, Any]) -> None:
+    """Publish `event` on `channel`; never raises."""
+    message = _dumps(event)
+    try:
+        cache.set(f"{CHANNEL_PREFIX}last:{channel}", message, LAST_EVENT_TTL_SECONDS)
+        if _redis_url():
+            _redis().publish(CHANNEL_PREFIX + channel, message)
+        else:
+            _local_broker.publish(channel, message)
+        metrics.incr(PUBLISHED)
+    except Exception:  # noqa: BLE001
+        log.warning("Failed to publish event on %s", channel, exc_info=True)
+
+
+def last_event(channel: str) -> Optional[Dict[str, Any]]:
+    message = cache.get(f"{CHANNEL_PREFIX}last:{channel}")
+    return json.loads(message) if message else None
+
+
+class Subscription:
+    """Blocking subscription to one channel (WSGI streams)."""
+
+    def __init__(self, channel: str) -> None:
+        self.channel = channel
+        self._pubsub = None
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        if _redis_url():
+            self._pubsub = _redis().pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(CHANNEL_PREFIX + channel)
+        else:
+            _local_broker.add(channel, self._queue.put)
+
+    def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        if self._pubsub is not None:
+            message = self._pubsub.get_message(timeout=timeout)
+            if message is None:
+                return None
+            return json.loads(message["data"])
+        try:
+            return json.loads(self._queue.get(timeout=timeout))
+        except queue.Empty:
+            return None
+
+    def close(self) -> None:
+        if self._pubsub is not None:
+            self._pubsub.close()
+        else:
+            _local_broker.remove(self.channel, self._queue.put)
+
+
+class AsyncSubscription:
+    """Subscription awaited on the event loop (ASGI streams)."""
+
+    def __init__(self, channel: str) -> None:
+        self.channel = channel
+        self._pubsub = None
+        self._client = None
+        self._queue: "asyncio.Queue[str]" = asyncio.Queue()
+        self._loop = asyncio.get_running_loop()
+
+    def _put_threadsafe(self, message: str) -> None:
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, message)
+
+    async def open(self) -> "AsyncSubscription":
+        if _redis_url():
+            import redis.asyncio as aioredis
+
+            self._client = aioredis.Redis.from_url(_redis_url())
+            self._pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            await self._pubsub.subscribe(CHANNEL_PREFIX + self.channel)
+        else:
+            _local_broker.add(self.channel, self._put_threadsafe)
+        return self
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        if self._pubsub is not None:
+            message = await self._pubsub.get_message(timeout=timeout)
+            if message is None:
+                return None
+            return json.loads(message["data"])
+        try:
+            return json.loads(await asyncio.wait_for(self._queue.get(), timeout))
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+            await self._client.aclose()
+        else:
+            _local_broker.remove(self.channel, self._put_threadsafe)
+
+
+def format_sse(event: Dict[str, Any], name: str = "status") -> str:
+    return f"event: {name}\ndata: {_dumps(event)}\n\n"
+
+
+def _stream_settings() -> tuple:
+    return (
+        float(getattr(settings, "SSE_MAX_SECONDS", 55)),
+        float(getattr(settings, "SSE_KEEPALIVE_SECONDS", 15)),
+    )
+
+
+def stream_events(
+    channel: str,
+    initial: Dict[str, Any],
+    is_terminal: Callable[[Dict[str, Any]], bool],
+) -> Iterator[str]:
+    """
+    Yield SSE frames: `initial` (the state read from the database), then
+    every event published on `channel` until a terminal one. Ends after
+    SSE_MAX_SECONDS; EventSource reconnects on its own.
+
+    The subscription opens after `initial` was read, so a terminal event
+    published in between is recovered from `last_event`.
+    """
+    max_seconds, keepalive = _stream_settings()
+    deadline = time.monotonic() + max_seconds
+    metrics.incr(STREAMS)
+    yield format_sse(initial)
+    if is_terminal(initial):
+        return
+    subscription = Subscription(channel)
+    try:
+        last = last_event(channel)
+        if last is not None and is_terminal(last):
+            yield format_sse(last)
+            return
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            event = subscription.get(timeout=min(keepalive, remaining))
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+            if is_terminal(event):
+                return
+    finally:
+        subscription.close()
+
+
+async def astream_events(
+    channel: str,
+    initial: Dict[str, Any],
+    is_terminal: Callable[[Dict[str, Any]], bool],
+) -> AsyncIterator[str]:
+    """Async counterpart of `stream_events` for ASGI deployments."""
+    max_seconds, keepalive = _stream_settings()
+    deadline = time.monotonic() + max_seconds
+    metrics.incr(STREAMS)
+    yield format_sse(initial)
+    if is_terminal(initial):
+        return
+    subscription = await AsyncSubscription(channel).open()
+    try:
+        last = last_event(channel)
+        if last is not None and is_terminal(last):
+            yield format_sse(last)
+            return
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            event = await subscription.get(timeout=min(keepalive, remaining))
+            if event is None:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+            if is_terminal(event):
+                return
+    finally:
+        await subscription.close()
+
+
+class EventStreamRenderer(BaseRenderer):
+    """
+    Lets DRF content negotiation accept `Accept: text/event-stream`. The SSE
+    body itself is a StreamingHttpResponse; this only renders error payloads.
+    """
+
+    media_type = "text/event-stream"
+    format = "event-stream"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return format_sse(data or {}, name="error").encode(self.charset)
+
+
+def event_stream_response(
+    request: HttpRequest,
+    channel: str,
+    initial: Dict[str, Any],
+    is_terminal: Callable[[Dict[str, Any]], bool],
+) -> HttpResponseBase:
+    """
+    SSE response streaming `channel`, async under ASGI. Under WSGI a stream
+    would hold a worker for up to SSE_MAX_SECONDS, so unless SSE_WSGI_ENABLED
+    the answer is 204, on which EventSource stops and clients poll instead.
+    """
+    django_request = getattr(request, "_request", request)
+    if isinstance(django_request, ASGIRequest):
+        content = astream_events(channel, initial, is_terminal)
+    elif getattr(settings, "SSE_WSGI_ENABLED", False):
+        content = stream_events(channel, initial, is_terminal)
+    else:
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(content, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stop nginx from buffering the stream.
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
+class EventStreamAPIView(views.APIView):
+    """Base for the `.../events/` endpoints; `get` returns `event_stream_response`."""
+
+    permission_classes = [permissions.AllowAny]
+    renderer_classes = [*api_settings.DEFAULT_RENDERER_CLASSES, EventStreamRenderer]
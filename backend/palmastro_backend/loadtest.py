@@ -0,0 +1,408 @@
+"""
+End-to-end load-test harness for a running deployment (`manage.py load_test`).
+
+Virtual users (threads, one `httpx.Client` each) pick weighted scenarios and
+run them against `base_url` over real HTTP, so gunicorn/uvicorn workers,
+Celery, the cache and the database are all in the path:
+
+- ``palm_upload``: presigned upload URL, PUT of the image, submit the
+  storage key, poll the status URL, fetch the result.
+- ``astrology_wizard``: personal info, birth details, preferences,
+  generate reading, poll, result.
+- ``numerology``: create, poll, result.
+- ``dashboard``: dashboard, realtime poll and refresh, plus the reading list
+  when an access token is given.
+
+Every request is recorded per endpoint (path templates such as
+``GET /api/v1/readings/{id}/status/``): throughput, p50/p95/p99 latency,
+errors (5xx, unexpected 4xx, transport failures), throttled responses (429)
+and the database queries reported by `QueryCountMiddleware`. Scenarios are
+recorded as a whole as well. `run_load_test` returns the report as a dict
+that the command writes as JSON; `compare_reports` diffs two of them.
+"""
+
+from __future__ import annotations
+
+import io
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+from PIL import Image
+
+from palmastro_backend.benchmarking import summarize_latencies
+from palmastro_backend.middleware import QUERY_COUNT_HEADER
+
+REPORT_VERSION = 1
+
+FIRST_NAMES = ["Aye", "Min", "Thandar", "Kyaw", "Su", "Zaw", "Nilar", "Htet", "Maria", "James"]
+LAST_NAMES = ["Win", "Aung", "Myint", "Oo", "Lwin", "Smith", "Garcia", "Tun", "Hlaing", "Chen"]
+
+
+class ScenarioFailed(Exception):
+    """A step answered something the scenario cannot continue from."""
+
+
+@dataclass
+class LoadTestConfig:
+    base_url: str
+    scenarios: Dict[str, float]
+    users: int = 10
+    duration_seconds: float = 60.0
+    # Per user; 0 runs scenarios until the duration is over.
+    iterations: int = 0
+    ramp_up_seconds: float = 0.0
+    think_time_seconds: float = 1.0
+    poll_interval_seconds: float = 1.0
+    poll_timeout_seconds: float = 120.0
+    request_timeout_seconds: float = 60.0
+    access_token: str = ""
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        unknown = set(self.scenarios) - set(SCENARIOS)
+        if unknown:
+            raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))} (choose from {', '.join(SCENARIOS)})")
+        if not self.scenarios or sum(self.scenarios.values()) <= 0:
+            raise ValueError("At least one scenario needs a positive weight")
+
+
+@dataclass
+class _EndpointStats:
+    latencies_ms: List[float] = field(default_factory=list)
+    statuses: Counter = field(default_factory=Counter)
+    errors: int = 0
+    throttled: int = 0
+    queries: List[int] = field(default_factory=list)
+
+
+@dataclass
+class _ScenarioStats:
+    durations_ms: List[float] = field(default_factory=list)
+    failed: int = 0
+    failures: Counter = field(default_factory=Counter)
+
+
+class Recorder:
+    """Thread-safe collection of request and scenario samples."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.endpoints: Dict[str, _EndpointStats] = defaultdict(_EndpointStats)
+        self.scenarios: Dict[str, _ScenarioStats] = defaultdict(_ScenarioStats)
+
+    def request(self, endpoint: str, ms: float, response: Optional[httpx.Response], expected: tuple) -> None:
+        with self._lock:
+            stats = self.endpoints[endpoint]
+            stats.latencies_ms.append(ms)
+            if response is None:
+                stats.statuses["error"] += 1
+                stats.errors += 1
+                return
+            stats.statuses[str(response.status_code)] += 1
+            if response.status_code == 429:
+                stats.throttled += 1
+            elif response.status_code not in expected:
+                stats.errors += 1
+            queries = response.headers.get(QUERY_COUNT_HEADER)
+            if queries is not None and queries.isdigit():
+                stats.queries.append(int(queries))
+
+    def scenario(self, name: str, ms: float, failure: Optional[str]) -> None:
+        with self._lock:
+            stats = self.scenarios[name]
+            if failure is None:
+                stats.durations_ms.append(ms)
+            else:
+                stats.failed += 1
+                stats.failures[failure] += 1
+
+    def report(self, wall_seconds: float) -> Dict[str, Any]:
+        wall = max(wall_seconds, 1e-9)
+        endpoints = {}
+        for name, stats in sorted(self.endpoints.items()):
+            count = len(stats.latencies_ms)
+            endpoints[name] = {
+                "requests": count,
+                "throughput_rps": round(count / wall, 2),
+                "errors": stats.errors,
+                "error_rate": round(stats.errors / count, 4) if count else 0.0,
+                "throttled": stats.throttled,
+                "status_codes": dict(sorted(stats.statuses.items())),
+                "latency_ms": summarize_latencies(stats.latencies_ms),
+                "db_queries": {
+                    "mean": round(sum(stats.queries) / len(stats.queries), 1),
+                    "max": max(stats.queries),
+                    "total": sum(stats.queries),
+                }
+                if stats.queries
+                else None,
+            }
+        scenarios = {}
+        for name, stats in sorted(self.scenarios.items()):
+            ok = len(stats.durations_ms)
+            total = ok + stats.failed
+            scenarios[name] = {
+                "iterations": total,
+                "completed": ok,
+                "failed": stats.failed,
+                "failure_rate": round(stats.failed / total, 4) if total else 0.0,
+                "throughput_per_s": round(ok / wall, 3),
+                "latency_ms": summarize_latencies(stats.durations_ms),
+                "failures": dict(stats.failures.most_common(10)),
+            }
+        return {"endpoints": endpoints, "scenarios": scenarios}
+
+
+class VirtualUser:
+    """One simulated client; every request goes through `call` and is recorded."""
+
+    def __init__(self, config: LoadTestConfig, recorder: Recorder, rng: random.Random) -> None:
+        self.config = config
+        self.recorder = recorder
+        self.rng = rng
+        self.http = httpx.Client(
+            base_url=config.base_url.rstrip("/"),
+            timeout=config.request_timeout_seconds,
+            follow_redirects=False,
+        )
+
+    def close(self) -> None:
+        self.http.close()
+
+    def call(self, endpoint: str, expected: tuple = (200,), **kwargs: Any) -> httpx.Response:
+        """
+        Send the request described by `endpoint` ("METHOD /path/template/");
+        `url` defaults to the template. Raises ScenarioFailed on unexpected
+        answers so the scenario stops there.
+        """
+        method, template = endpoint.split(" ", 1)
+        url = kwargs.pop("url", template)
+        started = time.perf_counter()
+        try:
+            response = self.http.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.recorder.request(endpoint, (time.perf_counter() - started) * 1000, None, expected)
+            raise ScenarioFailed(f"{endpoint}: {type(e).__name__}") from e
+        self.recorder.request(endpoint, (time.perf_counter() - started) * 1000, response, expected)
+        if response.status_code not in expected:
+            raise ScenarioFailed(f"{endpoint}: HTTP {response.status_code}")
+        return response
+
+    def poll(self, endpoint: str, url: str, done: Callable[[Dict[str, Any]], bool]) -> Dict[str, Any]:
+        """Poll a status URL until `done(body)`; gives up after poll_timeout_seconds."""
+        deadline = time.monotonic() + self.config.poll_timeout_seconds
+        while True:
+            body = self.call(endpoint, url=url).json()
+            if done(body):
+                return body
+            if time.monotonic() >= deadline:
+                raise ScenarioFailed(f"{endpoint}: still {body.get('status')} after {self.config.poll_timeout_seconds:.0f}s")
+            time.sleep(self.config.poll_interval_seconds)
+
+    def full_name(self) -> str:
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)} {uuid.uuid4().hex[:6]}"
+
+    def birth_date(self) -> date:
+        return date(1960, 1, 1) + timedelta(days=self.rng.randrange(365 * 45))
+
+    def palm_image(self) -> bytes:
+        # A different image each time, so the palm result cache does not
+        # answer every upload after the first.
+        color = tuple(self.rng.randrange(120, 230) for _ in range(3))
+        out = io.BytesIO()
+        Image.new("RGB", (480, 640), color).save(out, format="JPEG", quality=85)
+        return out.getvalue()
+
+
+def _ensure(condition: bool, message: str) -> None:
+    if not condition:
+        raise ScenarioFailed(message)
+
+
+def palm_upload(user: VirtualUser) -> None:
+    grant = user.call(
+        "POST /api/v1/readings/uploads/", expected=(201,), json={"content_type": "image/jpeg"}
+    ).json()
+    upload = grant["upload"]
+    user.call(
+        "PUT /api/v1/readings/uploads/{token}/",
+        url=upload["url"],
+        content=user.palm_image(),
+        headers=upload.get("headers") or {"Content-Type": "image/jpeg"},
+    )
+    job = user.call(
+        "POST /api/v1/readings/", expected=(200, 202), json={"upload_token": grant["upload_token"]}
+    ).json()
+    status = user.poll(
+        "GET /api/v1/readings/{id}/status/",
+        job["status_url"],
+        lambda body: body.get("status") in {"DONE", "FAILED"},
+    )
+    _ensure(status["status"] == "DONE", "palm reading FAILED")
+    user.call("GET /api/v1/readings/{id}/result/", url=job["result_url"])
+
+
+def astrology_wizard(user: VirtualUser) -> None:
+    session = user.call(
+        "POST /api/v1/astrology/personal-info/",
+        expected=(201,),
+        json={"full_name": user.full_name(), "gender": user.rng.choice(["Male", "Female"]), "consent_to_store": True},
+    ).json()
+    session_id = session["session_id"]
+    user.call(
+        "PATCH /api/v1/astrology/birth-details/",
+        json={
+            "session_id": session_id,
+            "birth_date": user.birth_date().isoformat(),
+            "birth_time": f"{user.rng.randrange(24):02d}:{user.rng.randrange(60):02d}",
+            "birth_place": user.rng.choice(["Yangon", "Mandalay", "London", "New York"]),
+        },
+    )
+    user.call(
+        "PATCH /api/v1/astrology/preferences/",
+        json={"session_id": session_id, "preferences": user.rng.sample(["career", "love", "health", "finance"], 2)},
+    )
+    user.call("POST /api/v1/astrology/generate-reading/", expected=(200, 202), json={"session_id": session_id})
+    status = user.poll(
+        "GET /api/v1/astrology/{id}/status/",
+        session["status_url"],
+        lambda body: body.get("status") in {"COMPLETED", "FAILED"},
+    )
+    _ensure(status["status"] == "COMPLETED", "astrology session FAILED")
+    user.call("GET /api/v1/astrology/{id}/result/", url=session["result_url"])
+
+
+def numerology(user: VirtualUser) -> None:
+    job = user.call(
+        "POST /api/v1/numerology/",
+        expected=(202,),
+        json={"full_name": user.full_name(), "birth_date": user.birth_date().isoformat(), "consent_to_store": True},
+    ).json()
+    status = user.poll(
+        "GET /api/v1/numerology/{id}/status/",
+        job["status_url"],
+        lambda body: body.get("status") in {"COMPLETED", "FAILED"},
+    )
+    _ensure(status["status"] == "COMPLETED", "numerology request FAILED")
+    user.call("GET /api/v1/numerology/{id}/result/", url=job["result_url"])
+
+
+def dashboard(user: VirtualUser) -> None:
+    headers = {"Authorization": f"Bearer {user.config.access_token}"} if user.config.access_token else {}
+    user.call("GET /api/v1/auth/dashboard/", headers=headers)
+    if headers:
+        user.call("GET /api/v1/readings/list/", headers=headers, params={"limit": 20})
+    # The dashboard page polls for updates and refreshes.
+    user.call("GET /api/v1/auth/dashboard/realtime/", headers=headers)
+    time.sleep(user.config.think_time_seconds)
+    user.call("GET /api/v1/auth/dashboard/", headers=headers)
+
+
+SCENARIOS: Dict[str, Callable[[VirtualUser], None]] = {
+    "palm_upload": palm_upload,
+    "astrology_wizard": astrology_wizard,
+    "numerology": numerology,
+    "dashboard": dashboard,
+}
+
+
+def login(base_url: str, email: str, password: str) -> str:
+    """Access token for the dashboard scenario (login is throttled, so once per run)."""
+    response = httpx.post(f"{base_url.rstrip('/')}/api/v1/auth/login/", json={"email": email, "password": password})
+    response.raise_for_status()
+    return response.json()["data"]["access_token"]
+
+
+def _run_user(index: int, config: LoadTestConfig, recorder: Recorder, deadline: float) -> None:
+    rng = random.Random(None if config.seed is None else config.seed + index)
+    if config.ramp_up_seconds and config.users > 1:
+        time.sleep(config.ramp_up_seconds * index / (config.users - 1))
+    names = list(config.scenarios)
+    weights = [config.scenarios[name] for name in names]
+    user = VirtualUser(config, recorder, rng)
+    done = 0
+    try:
+        while time.monotonic() < deadline and (not config.iterations or done < config.iterations):
+            name = rng.choices(names, weights)[0]
+            started = time.perf_counter()
+            failure = None
+            try:
+                SCENARIOS[name](user)
+            except ScenarioFailed as e:
+                failure = str(e)
+            except (KeyError, ValueError) as e:
+                # Answers without the fields a scenario reads (or not JSON).
+                failure = f"unexpected answer: {type(e).__name__}: {e}"
+            recorder.scenario(name, (time.perf_counter() - started) * 1000, failure)
+            done += 1
+            if config.think_time_seconds:
+                time.sleep(config.think_time_seconds)
+    finally:
+        user.close()
+
+
+def run_load_test(config: LoadTestConfig) -> Dict[str, Any]:
+    """Run `config.users` virtual users until the duration or iteration count is reached."""
+    recorder = Recorder()
+    started_at = datetime.now(timezone.utc)
+    started = time.monotonic()
+    deadline = started + config.duration_seconds
+    threads = [
+        threading.Thread(target=_run_user, args=(i, config, recorder, deadline), name=f"vu-{i}", daemon=True)
+        for i in range(max(1, config.users))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.monotonic() - started
+
+    report = {
+        "version": REPORT_VERSION,
+        "meta": {
+            "base_url": config.base_url,
+            "started_at": started_at.isoformat(),
+            "wall_seconds": round(wall, 2),
+            "users": config.users,
+            "scenarios": config.scenarios,
+            "duration_seconds": config.duration_seconds,
+            "iterations_per_user": config.iterations,
+            "think_time_seconds": config.think_time_seconds,
+            "poll_interval_seconds": config.poll_interval_seconds,
+            "authenticated": bool(config.access_token),
+        },
+    }
+    report.update(recorder.report(wall))
+    return report
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Per-endpoint p95, error rate and query deltas against a baseline report."""
+    rows = []
+    for name, now in current.get("endpoints", {}).items():
+        before = baseline.get("endpoints", {}).get(name)
+        if not before:
+            continue
+        p95, p95_before = now["latency_ms"]["p95"], before["latency_ms"]["p95"]
+        queries = (now.get("db_queries") or {}).get("mean")
+        queries_before = (before.get("db_queries") or {}).get("mean")
+        rows.append(
+            {
+                "endpoint": name,
+                "p95_ms": p95,
+                "p95_ms_baseline": p95_before,
+                "p95_change": round((p95 - p95_before) / p95_before, 3) if p95_before else None,
+                "error_rate": now["error_rate"],
+                "error_rate_baseline": before["error_rate"],
+                "db_queries_mean": queries,
+                "db_queries_mean_baseline": queries_before,
+            }
+        )
+    return rows
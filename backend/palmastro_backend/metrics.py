@@ -0,0 +1,52 @@
+"""
+Lightweight counters stored in the shared Django cache.
+
+With the Redis cache backend every gunicorn and Celery worker increments the
+same keys, so the numbers exposed by the analytics metrics endpoint cover the
+whole deployment rather than a single process.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Dict, Iterable
+
+from django.core.cache import cache
+
+log = logging.getLogger(__name__)
+
+METRICS_KEY_PREFIX = "metrics:"
+
+
+def _key(name: str) -> str:
+    return f"{METRICS_KEY_PREFIX}{name}"
+
+
+def incr(name: str, amount: int = 1) -> None:
+    """Increment counter `name` by `amount`; never raises."""
+    key = _key(name)
+    try:
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            # Key does not exist yet. `add` is a no-op if another worker won
+            # the race, so fall through to a second incr in that case.
+            if not cache.add(key, amount, timeout=None):
+                cache.incr(key, amount)
+    except Exception:  # noqa: BLE001
+        log.debug("Failed to increment metric %s", name, exc_info=True)
+
+
+def get_counters(names: Iterable[str]) -> Dict[str, int]:
+    """Return current values for `names` (missing counters read as 0)."""
+    names = list(names)
+    try:
+        values = cache.get_many([_key(n) for n in names])
+    except Exception:  # noqa: BLE001
+        log.debug("Failed to read metrics", exc_info=True)
+        values = {}
+    return {n: int(values.get(_key(n)) or 0) for n in names}
+
+
+def reset(names: Iterable[str]) -> None:
+    cache.delete_many([_key(n) for n in names])
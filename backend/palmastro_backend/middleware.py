@@ -0,0 +1,90 @@
+"""
+Per-request database query counts.
+
+With QUERY_COUNT_HEADERS enabled every response carries `X-DB-Query-Count`
+and `X-DB-Query-Time-Ms` for the queries run while the view produced it, so
+the load-test harness (`manage.py load_test`) and the browser network tab
+can attribute database work to endpoints without DEBUG's query log. Queries
+run while a streaming body (SSE) is iterated are not included.
+
+The middleware is sync and async capable, so it does not force the ASGI
+stack (async views, SSE) through a thread per request.
+"""
+
+from __future__ import annotations
+
+import time
+from contextlib import ExitStack
+from typing import Any, Callable
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Query-Time-Ms"
+
+
+class _QueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute: Callable, sql: str, params: Any, many: bool, context: dict) -> Any:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.count += 1
+            self.seconds += time.perf_counter() - started
+
+
+def _count_queries(stack: ExitStack, counter: _QueryCounter) -> None:
+    # Wrappers are per connection, and connections are per thread: under ASGI
+    # this runs in the request's thread-sensitive executor, where the ORM
+    # calls of the view run too.
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(counter))
+
+
+def _add_headers(response: HttpResponse, counter: _QueryCounter) -> None:
+    response[QUERY_COUNT_HEADER] = str(counter.count)
+    response[QUERY_TIME_HEADER] = f"{counter.seconds * 1000:.1f}"
+
+
+class QueryCountMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]) -> None:
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.QUERY_COUNT_HEADERS:
+            return self.get_response(request)
+
+        counter = _QueryCounter()
+        with ExitStack() as stack:
+            _count_queries(stack, counter)
+            response = self.get_response(request)
+        _add_headers(response, counter)
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        if not settings.QUERY_COUNT_HEADERS:
+            return await self.get_response(request)
+
+        counter = _QueryCounter()
+        stack = ExitStack()
+        await sync_to_async(_count_queries)(stack, counter)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        _add_headers(response, counter)
+        return response
@@ -0,0 +1,277 @@
+"""
+Local stand-in for the OpenAI chat completions API.
+
+Load tests and end-to-end benchmarks need the real HTTP path (connection
+pool, SDK retries, the model guard, Celery rescheduling) without spending
+money on real model calls. `MockOpenAIServer` serves `POST
+/v1/chat/completions` (plain and `stream=True` with server-sent events) and
+`GET /v1/models`, and answers with the canned JSON from
+`palmastro_backend.benchmarking`: a palm reading, the palm validation
+answer, an astrology or a numerology reading, picked from the system prompt
+exactly as the task modules send it. Every answer carries a `usage` block.
+
+Latency is drawn from a fixed, uniform or lognormal distribution, and a
+share of the requests can be answered with a 429 (with the "try again in Ns"
+hint and Retry-After header), a 500, or a timeout (the connection is held
+for `timeout_seconds` and then dropped without an answer).
+
+Run it with `python manage.py mock_openai_server` and set
+OPENAI_BASE_URL=http://localhost:8081/v1: every client built by
+`palmastro_backend.openai_client` then talks to it. OPENAI_API_KEY must
+still be set, to any value.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import random
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional
+
+from palmastro_backend.benchmarking import canned_content_for
+from palmastro_backend.model_guard import estimate_prompt_tokens
+
+log = logging.getLogger(__name__)
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+MOCK_MODELS = ("gpt-4o-mini", "gpt-4o")
+
+
+@dataclass
+class MockOpenAIConfig:
+    # Median answer time; "uniform" draws from latency_ms +/- jitter_ms,
+    # "lognormal" uses latency_sigma as the spread of the log.
+    latency_ms: float = 1500.0
+    latency_distribution: str = "fixed"
+    jitter_ms: float = 500.0
+    latency_sigma: float = 0.5
+    # Fraction of requests (0..1) answered with each fault.
+    rate_429: float = 0.0
+    rate_500: float = 0.0
+    rate_timeout: float = 0.0
+    retry_after_seconds: int = 1
+    timeout_seconds: float = 30.0
+    stream_chunks: int = 40
+    seed: Optional[int] = None
+
+    def __post_init__(self) -> None:
+        if self.latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"latency_distribution must be one of {', '.join(LATENCY_DISTRIBUTIONS)}")
+        if self.rate_429 + self.rate_500 + self.rate_timeout > 1:
+            raise ValueError("fault rates must add up to at most 1")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "MockOpenAIServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        log.debug("%s - %s", self.address_string(), format % args)
+
+    def do_GET(self) -> None:
+        if self.path.rstrip("/").endswith("/models"):
+            data = [{"id": model, "object": "model", "created": 0, "owned_by": "mock"} for model in MOCK_MODELS]
+            self._send_json(200, {"object": "list", "data": data})
+        else:
+            self._send_error(404, f"Unknown path {self.path}", "invalid_request_error", "not_found")
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_error(404, f"Unknown path {self.path}", "invalid_request_error", "not_found")
+            return
+        try:
+            body = json.loads(raw or b"{}")
+            messages = body["messages"]
+        except (ValueError, KeyError, TypeError):
+            self._send_error(400, "Request body must be JSON with 'messages'", "invalid_request_error", None)
+            return
+
+        server = self.server
+        fault = server.pick_fault()
+        if fault == "timeout":
+            server.count("timeouts")
+            time.sleep(server.config.timeout_seconds)
+            self.close_connection = True
+            return
+        if fault == "429":
+            server.count("rate_limited")
+            wait = server.config.retry_after_seconds
+            self._send_error(
+                429,
+                f"Rate limit reached for {body.get('model', 'gpt-4o-mini')} (mock). Please try again in {wait}s.",
+                "requests",
+                "rate_limit_exceeded",
+                headers={"Retry-After": str(wait)},
+            )
+            return
+        if fault == "500":
+            server.count("server_errors")
+            self._send_error(500, "The server had an error while processing your request (mock).", "server_error", None)
+            return
+
+        server.count("completions")
+        content = canned_content_for(messages)
+        usage = _usage(messages, content)
+        delay = server.draw_latency()
+        if body.get("stream"):
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            self._send_stream(body, content, usage if include_usage else None, delay)
+        else:
+            time.sleep(delay)
+            self._send_json(200, _completion(body, content, usage))
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(
+        self,
+        status: int,
+        message: str,
+        error_type: str,
+        code: Optional[str],
+        headers: Optional[Dict[str, str]] = None,
+    ) -> None:
+        error = {"message": message, "type": error_type, "param": None, "code": code}
+        self._send_json(status, {"error": error}, headers)
+
+    def _send_stream(self, body: Dict[str, Any], content: str, usage: Optional[Dict[str, int]], delay: float) -> None:
+        # Server-sent events without Content-Length: the end of the body is
+        # the end of the connection.
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        pieces = max(1, self.server.config.stream_chunks)
+        try:
+            for chunk in _stream_chunks(body, content, pieces, usage):
+                if chunk["choices"] and chunk["choices"][0]["delta"].get("content"):
+                    # The latency is spread evenly over the chunks, like token generation.
+                    time.sleep(delay / pieces)
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"data: [DONE]\n\n")
+        except (BrokenPipeError, ConnectionResetError):
+            log.debug("Client went away during a mock stream")
+
+
+def _usage(messages: List[Dict[str, Any]], content: str) -> Dict[str, int]:
+    prompt_tokens = estimate_prompt_tokens(messages)
+    completion_tokens = max(1, len(content) // 4)
+    return {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": completion_tokens,
+        "total_tokens": prompt_tokens + completion_tokens,
+    }
+
+
+def _completion(body: Dict[str, Any], content: str, usage: Dict[str, int]) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-mock-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model") or MOCK_MODELS[0],
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content, "refusal": None},
+                "logprobs": None,
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": usage,
+    }
+
+
+def _stream_chunks(
+    body: Dict[str, Any], content: str, pieces: int, usage: Optional[Dict[str, int]]
+) -> Iterator[Dict[str, Any]]:
+    base = {
+        "id": f"chatcmpl-mock-{uuid.uuid4().hex[:24]}",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": body.get("model") or MOCK_MODELS[0],
+    }
+    extra = {"usage": None} if usage else {}
+
+    def chunk(delta: Dict[str, Any], finish_reason: Optional[str]) -> Dict[str, Any]:
+        return {**base, "choices": [{"index": 0, "delta": delta, "logprobs": None, "finish_reason": finish_reason}], **extra}
+
+    yield chunk({"role": "assistant", "content": ""}, None)
+    size = max(1, -(-len(content) // pieces))
+    for start in range(0, len(content), size):
+        yield chunk({"content": content[start:start + size]}, None)
+    yield chunk({}, "stop")
+    if usage:
+        # Final usage-only chunk, as with stream_options={"include_usage": True}.
+        yield {**base, "choices": [], "usage": usage}
+
+
+class MockOpenAIServer(ThreadingHTTPServer):
+    """Threaded HTTP server answering like the OpenAI chat completions API."""
+
+    daemon_threads = True
+
+    def __init__(self, address: tuple, config: Optional[MockOpenAIConfig] = None) -> None:
+        super().__init__(address, _Handler)
+        self.config = config or MockOpenAIConfig()
+        self._random = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self.stats = {"completions": 0, "rate_limited": 0, "server_errors": 0, "timeouts": 0}
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def pick_fault(self) -> Optional[str]:
+        config = self.config
+        with self._lock:
+            roll = self._random.random()
+        for fault, rate in (("429", config.rate_429), ("500", config.rate_500), ("timeout", config.rate_timeout)):
+            if roll < rate:
+                return fault
+            roll -= rate
+        return None
+
+    def draw_latency(self) -> float:
+        """Seconds to take for one answer."""
+        config = self.config
+        with self._lock:
+            if config.latency_distribution == "uniform":
+                ms = self._random.uniform(config.latency_ms - config.jitter_ms, config.latency_ms + config.jitter_ms)
+            elif config.latency_distribution == "lognormal" and config.latency_ms > 0:
+                ms = self._random.lognormvariate(math.log(config.latency_ms), config.latency_sigma)
+            else:
+                ms = config.latency_ms
+        return max(0.0, ms) / 1000
+
+
+def start_mock_openai_server(
+    config: Optional[MockOpenAIConfig] = None, host: str = "127.0.0.1", port: int = 0
+) -> MockOpenAIServer:
+    """Start a server in a background thread (port 0 picks a free port); stop it with `shutdown()`."""
+    server = MockOpenAIServer((host, port), config)
+    thread = threading.Thread(target=server.serve_forever, args=(0.05,), name="mock-openai", daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,410 @@
+"""
+Deployment-wide rate limiting and circuit breaking for OpenAI calls.
+
+The per-call `retry_on_rate_limit` helpers only react to a 429 after it
+happened, so N workers send in lockstep, get throttled together and back off
+together. Every model call now goes through `guarded_create`, which:
+
+1. Fails fast with `ModelUnavailable` (HTTP 503 + Retry-After) while the
+   circuit breaker is open. The breaker opens after
+   MODEL_BREAKER_FAILURE_THRESHOLD 429/5xx/timeout/connection failures within
+   MODEL_BREAKER_WINDOW_SECONDS and stays open for
+   MODEL_BREAKER_COOLDOWN_SECONDS. After that a single probe call is let
+   through; its success closes the breaker, its failure re-opens it. The
+   state lives in the shared Django cache, so all workers see it.
+2. Takes one request and the estimated tokens of the call from two token
+   buckets (MODEL_RATE_LIMIT_RPM / MODEL_RATE_LIMIT_TPM), waiting with
+   jitter until they refill. With MODEL_LIMITER_REDIS_URL (defaults to
+   CACHE_URL) the buckets are a Lua script in Redis and shared by every
+   gunicorn, uvicorn and Celery process; without it each process has its own.
+   A call that would wait longer than MODEL_RATE_LIMIT_MAX_WAIT_SECONDS is
+   refused with `ModelUnavailable` instead of holding the worker; inside
+   `deferred_rate_limits()` (Celery tasks) any wait is refused and the task
+   re-enqueues itself.
+
+Both fail open: if Redis or the cache is unreachable the call goes ahead.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple, TypeVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from openai import APIConnectionError, APIStatusError, RateLimitError
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from palmastro_backend import metrics
+from palmastro_backend.openai_client import rate_limits_deferred
+
+log = logging.getLogger(__name__)
+
+THROTTLED = "model_guard.throttled"
+THROTTLE_WAIT_MS = "model_guard.throttle_wait_ms"
+REJECTED = "model_guard.rejected"
+FAILURES = "model_guard.failures"
+BREAKER_OPENED = "model_guard.breaker_opened"
+
+# Rough token cost of one high-detail image part, and of the answer when the
+# request does not cap it.
+IMAGE_TOKENS = 765
+DEFAULT_COMPLETION_TOKENS = 1000
+
+_OPEN_KEY = "model_guard:breaker:open_until"
+_FAILURES_KEY = "model_guard:breaker:failures"
+_PROBE_KEY = "model_guard:breaker:probe"
+_BUCKET_KEYS = ("model_guard:bucket:requests", "model_guard:bucket:tokens")
+
+T = TypeVar("T")
+
+
+class ModelUnavailable(APIException):
+    """
+    The model cannot be called right now (breaker open or rate limit wait
+    too long). DRF answers 503 with a Retry-After header of `wait` seconds.
+    """
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_code = "model_unavailable"
+
+    def __init__(self, wait: float):
+        self.wait = max(1, math.ceil(wait))
+        super().__init__(
+            f"The AI service is temporarily unavailable. Please try again in {self.wait} seconds."
+        )
+
+
+def _setting(name: str, default: float) -> float:
+    return float(getattr(settings, name, default))
+
+
+def estimate_prompt_tokens(messages: Iterable[Dict[str, Any]]) -> int:
+    """Rough prompt size of chat `messages`: 4 characters per token plus images."""
+    tokens = 0
+    for message in messages:
+        content = message.get("content") or ""
+        parts = content if isinstance(content, list) else [{"type": "text", "text": content}]
+        for part in parts:
+            if part.get("type") == "image_url":
+                tokens += IMAGE_TOKENS
+            else:
+                tokens += len(part.get("text") or "") // 4
+    return tokens
+
+
+def estimate_tokens(request: Dict[str, Any]) -> int:
+    """Tokens a chat completion request will consume (prompt + answer cap)."""
+    answer = request.get("max_tokens") or request.get("max_completion_tokens") or DEFAULT_COMPLETION_TOKENS
+    return estimate_prompt_tokens(request.get("messages", ())) + int(answer)
+
+
+# ---------------------------------------------------------------------------
+# Token buckets
+# ---------------------------------------------------------------------------
+
+# KEYS: request bucket, token bucket. ARGV: now, then (capacity per minute,
+# amount) per bucket. Takes from both buckets or neither; returns the seconds
+# to wait (as a string, Lua numbers are truncated to integers) or "0".
+_TAKE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local wait = 0
+local levels = {}
+for i = 1, 2 do
+  local capacity = tonumber(ARGV[i * 2])
+  if capacity > 0 then
+    local need = math.min(tonumber(ARGV[i * 2 + 1]), capacity)
+    local state = redis.call('HMGET', KEYS[i], 'level', 'ts')
+    local level = tonumber(state[1]) or capacity
+    local rate = capacity / 60
+    level = math.min(capacity, level + math.max(0, now - (tonumber(state[2]) or now)) * rate)
+    if level < need then
+      wait = math.max(wait, (need - level) / rate)
+    end
+    levels[i] = level - need
+  end
+end
+if wait > 0 then
+  return tostring(wait)
+end
+for i = 1, 2 do
+  if levels[i] then
+    redis.call('HSET', KEYS[i], 'level', tostring(levels[i]), 'ts', ARGV[1])
+    redis.call('EXPIRE', KEYS[i], 120)
+  end
+end
+return '0'
+"""
+
+_lock = threading.Lock()
+_local_buckets: Dict[str, Tuple[float, float]] = {}
+_redis_script = None
+
+
+def _limits() -> Tuple[float, float]:
+    return _setting("MODEL_RATE_LIMIT_RPM", 0), _setting("MODEL_RATE_LIMIT_TPM", 0)
+
+
+def _take_local(now: float, wanted: Tuple[Tuple[float, float], ...]) -> float:
+    """Python twin of _TAKE_SCRIPT for a single process."""
+    wait = 0.0
+    levels = {}
+    with _lock:
+        for key, (capacity, need) in zip(_BUCKET_KEYS, wanted):
+            if capacity <= 0:
+                continue
+            need = min(need, capacity)
+            level, ts = _local_buckets.get(key, (capacity, now))
+            rate = capacity / 60
+            level = min(capacity, level + max(0.0, now - ts) * rate)
+            if level < need:
+                wait = max(wait, (need - level) / rate)
+            levels[key] = level - need
+        if wait <= 0:
+            for key, level in levels.items():
+                _local_buckets[key] = (level, now)
+    return wait
+
+
+def _take_redis(now: float, wanted: Tuple[Tuple[float, float], ...]) -> float:
+    global _redis_script
+    if _redis_script is None:
+        with _lock:
+            if _redis_script is None:
+                import redis
+
+                client = redis.Redis.from_url(settings.MODEL_LIMITER_REDIS_URL)
+                _redis_script = client.register_script(_TAKE_SCRIPT)
+    args = [now]
+    for capacity, need in wanted:
+        args += [capacity, need]
+    return float(_redis_script(keys=list(_BUCKET_KEYS), args=args))
+
+
+def _take(tokens: int) -> float:
+    """Take from the buckets; returns 0 on success or the seconds to wait."""
+    rpm, tpm = _limits()
+    if rpm <= 0 and tpm <= 0:
+        return 0.0
+    wanted = ((rpm, 1), (tpm, tokens))
+    if getattr(settings, "MODEL_LIMITER_REDIS_URL", ""):
+        try:
+            return _take_redis(time.time(), wanted)
+        except Exception:  # noqa: BLE001
+            log.debug("Model rate limiter unavailable; not limiting", exc_info=True)
+            return 0.0
+    return _take_local(time.monotonic(), wanted)
+
+
+def _next_wait(tokens: int, waited: float) -> float:
+    """
+    Seconds to sleep before trying the buckets again (0 once granted).
+    Raises ModelUnavailable if the caller would wait too long in total.
+    """
+    wait = _take(tokens)
+    if wait <= 0:
+        if waited:
+            metrics.incr(THROTTLED)
+            metrics.incr(THROTTLE_WAIT_MS, int(waited * 1000))
+        return 0.0
+    max_wait = 0 if rate_limits_deferred() else _setting("MODEL_RATE_LIMIT_MAX_WAIT_SECONDS", 20)
+    if waited + wait > max_wait:
+        metrics.incr(REJECTED)
+        raise ModelUnavailable(wait)
+    # Jitter so workers released by the same refill do not wake in lockstep.
+    return wait + random.uniform(0, min(1.0, wait / 2))
+
+
+# ---------------------------------------------------------------------------
+# Circuit breaker
+# ---------------------------------------------------------------------------
+
+
+def _is_overload(exc: BaseException) -> bool:
+    """429s, 5xx, timeouts and connection errors count against the breaker."""
+    if isinstance(exc, (RateLimitError, APIConnectionError)):
+        return True
+    return isinstance(exc, APIStatusError) and exc.status_code >= 500
+
+
+def breaker_retry_after() -> Optional[float]:
+    """Seconds until the breaker lets a probe through, or None if closed."""
+    try:
+        open_until = cache.get(_OPEN_KEY)
+    except Exception:  # noqa: BLE001
+        log.debug("Model circuit breaker state unavailable", exc_info=True)
+        return None
+    if open_until is None:
+        return None
+    return max(0.0, open_until - time.time())
+
+
+def ensure_model_available() -> None:
+    """Raise ModelUnavailable while the breaker is open (views call this
+    before accepting work that needs the model)."""
+    remaining = breaker_retry_after()
+    if remaining:
+        metrics.incr(REJECTED)
+        raise ModelUnavailable(remaining)
+
+
+# What a successful call has to clean up after `_admit`.
+_CLEAN = None
+_RECOVERING = "recovering"  # failures were recorded recently
+_PROBE = "probe"  # this call is the half-open probe
+
+
+def _admit() -> Optional[str]:
+    """
+    Raise ModelUnavailable while the breaker is open; otherwise return the
+    breaker state the call was admitted in.
+    """
+    try:
+        values = cache.get_many([_OPEN_KEY, _FAILURES_KEY])
+        open_until = values.get(_OPEN_KEY)
+        if open_until is None:
+            return _RECOVERING if values.get(_FAILURES_KEY) else _CLEAN
+        remaining = open_until - time.time()
+        if remaining <= 0:
+            cooldown = _setting("MODEL_BREAKER_COOLDOWN_SECONDS", 30)
+            if cache.add(_PROBE_KEY, True, timeout=cooldown):
+                log.info("Model circuit breaker half-open; sending a probe call")
+                return _PROBE
+            remaining = cooldown
+    except Exception:  # noqa: BLE001
+        log.debug("Model circuit breaker state unavailable", exc_info=True)
+        return _CLEAN
+    metrics.incr(REJECTED)
+    raise ModelUnavailable(remaining)
+
+
+def _open_breaker() -> None:
+    cooldown = _setting("MODEL_BREAKER_COOLDOWN_SECONDS", 30)
+    cache.set(_OPEN_KEY, time.time() + cooldown, timeout=None)
+    cache.delete_many([_FAILURES_KEY, _PROBE_KEY])
+    metrics.incr(BREAKER_OPENED)
+    log.warning("Model circuit breaker opened for %.0f seconds", cooldown)
+
+
+def _record_failure(admitted: Optional[str]) -> None:
+    metrics.incr(FAILURES)
+    try:
+        if admitted == _PROBE:
+            _open_breaker()
+            return
+        if cache.get(_OPEN_KEY) is not None:
+            # Another worker already opened it.
+            return
+        window = _setting("MODEL_BREAKER_WINDOW_SECONDS", 60)
+        if cache.add(_FAILURES_KEY, 1, timeout=window):
+            failures = 1
+        else:
+            failures = cache.incr(_FAILURES_KEY)
+        if failures >= _setting("MODEL_BREAKER_FAILURE_THRESHOLD", 5):
+            _open_breaker()
+    except Exception:  # noqa: BLE001
+        log.debug("Could not record model failure", exc_info=True)
+
+
+def _record_success() -> None:
+    try:
+        if cache.get(_OPEN_KEY) is not None:
+            log.info("Model circuit breaker closed")
+        cache.delete_many([_OPEN_KEY, _FAILURES_KEY, _PROBE_KEY])
+    except Exception:  # noqa: BLE001
+        log.debug("Could not reset model circuit breaker", exc_info=True)
+
+
+# ---------------------------------------------------------------------------
+# Guarded calls
+# ---------------------------------------------------------------------------
+
+
+def _enabled() -> bool:
+    return getattr(settings, "MODEL_GUARD_ENABLED", True)
+
+
+def guarded_create(create: Callable[..., T], request: Dict[str, Any], **kwargs: Any) -> T:
+    """
+    `create(**request, **kwargs)` (e.g. `client.chat.completions.create`)
+    behind the circuit breaker and the rate limiter.
+    """
+    if not _enabled():
+        return create(**request, **kwargs)
+
+    admitted = _admit()
+    tokens = estimate_tokens(request)
+    waited = 0.0
+    while True:
+        delay = _next_wait(tokens, waited)
+        if not delay:
+            break
+        time.sleep(delay)
+        waited += delay
+
+    try:
+        result = create(**request, **kwargs)
+    except Exception as exc:
+        if _is_overload(exc):
+            _record_failure(admitted)
+        raise
+    if admitted:
+        _record_success()
+    return result
+
+
+async def aguarded_create(
+    create: Callable[..., Awaitable[T]], request: Dict[str, Any], **kwargs: Any
+) -> T:
+    """Async counterpart of `guarded_create`; waits with `asyncio.sleep`."""
+    if not _enabled():
+        return await create(**request, **kwargs)
+
+    admitted = await sync_to_async(_admit)()
+    tokens = estimate_tokens(request)
+    waited = 0.0
+    while True:
+        delay = await sync_to_async(_next_wait)(tokens, waited)
+        if not delay:
+            break
+        await asyncio.sleep(delay)
+        waited += delay
+
+    try:
+        result = await create(**request, **kwargs)
+    except Exception as exc:
+        if _is_overload(exc):
+            await sync_to_async(_record_failure)(admitted)
+        raise
+    if admitted:
+        await sync_to_async(_record_success)()
+    return result
+
+
+def reset_model_guard() -> None:
+    """Close the breaker and refill the local buckets (tests and benchmarks)."""
+    with _lock:
+        _local_buckets.clear()
+    cache.delete_many([_OPEN_KEY, _FAILURES_KEY, _PROBE_KEY])
+
+
+def get_model_guard_stats() -> Dict[str, Any]:
+    counters = metrics.get_counters([THROTTLED, THROTTLE_WAIT_MS, REJECTED, FAILURES, BREAKER_OPENED])
+    throttled = counters[THROTTLED]
+    retry_after = breaker_retry_after()
+    return {
+        "breaker": "closed" if retry_after is None else ("open" if retry_after else "half-open"),
+        "breaker_retry_after": round(retry_after, 1) if retry_after else 0.0,
+        "breaker_opened": counters[BREAKER_OPENED],
+        "overload_failures": counters[FAILURES],
+        "throttled": throttled,
+        "avg_throttle_wait_ms": round(counters[THROTTLE_WAIT_MS] / throttled, 1) if throttled else 0.0,
+        "rejected": counters[REJECTED],
+    }
@@ -0,0 +1,304 @@
+"""
+Process-wide OpenAI client with a persistent keep-alive connection pool.
+
+Every task module used to build a new `OpenAI(...)` per call, which meant a
+fresh TCP connection and TLS handshake for every reading. The client here is
+created lazily on first use and re-created if the process id changes, so a
+client built before gunicorn/Celery prefork forks is never shared across
+workers.
+
+`get_async_openai_client()` is the equivalent for the ASGI views: one
+`AsyncOpenAI` per process and event loop, so a single uvicorn worker can keep
+many model calls in flight over the same pool.
+
+Connection reuse is tracked with httpcore trace events and exposed through
+`get_connection_stats()` on the analytics metrics endpoint.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, TypeVar
+
+import httpx
+from django.conf import settings
+from openai import (
+    AsyncOpenAI,
+    DefaultAsyncHttpxClient,
+    DefaultHttpxClient,
+    OpenAI,
+    RateLimitError,
+)
+
+from palmastro_backend import metrics
+
+log = logging.getLogger(__name__)
+
+REQUESTS = "openai.requests"
+CONNECTIONS_OPENED = "openai.connections_opened"
+TLS_HANDSHAKES = "openai.tls_handshakes"
+
+T = TypeVar("T")
+
+_lock = threading.Lock()
+_client: Optional[OpenAI] = None
+_client_identity: Optional[tuple] = None
+_async_clients: Dict[tuple, AsyncOpenAI] = {}
+_rate_limits_deferred = contextvars.ContextVar("rate_limits_deferred", default=False)
+
+
+def _trace(event_name: str, info: Dict[str, Any]) -> None:
+    if event_name == "connection.connect_tcp.complete":
+        metrics.incr(CONNECTIONS_OPENED)
+    elif event_name == "connection.start_tls.complete":
+        metrics.incr(TLS_HANDSHAKES)
+
+
+async def _atrace(event_name: str, info: Dict[str, Any]) -> None:
+    _trace(event_name, info)
+
+
+def _on_request(request: httpx.Request) -> None:
+    metrics.incr(REQUESTS)
+    request.extensions["trace"] = _trace
+
+
+async def _aon_request(request: httpx.Request) -> None:
+    metrics.incr(REQUESTS)
+    request.extensions["trace"] = _atrace
+
+
+def _fix_ssl_cert_file() -> None:
+    # Some Windows environments set SSL_CERT_FILE to a missing path, which
+    # breaks httpx. Checked once per client instead of once per request.
+    ssl_cert = os.environ.get("SSL_CERT_FILE")
+    if ssl_cert and not os.path.exists(ssl_cert):
+        os.environ.pop("SSL_CERT_FILE", None)
+
+
+def _pool_options() -> Dict[str, Any]:
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.OPENAI_POOL_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_POOL_MAX_KEEPALIVE,
+            keepalive_expiry=settings.OPENAI_POOL_KEEPALIVE_SECONDS,
+        ),
+        "timeout": httpx.Timeout(
+            settings.OPENAI_TIMEOUT_SECONDS,
+            connect=settings.OPENAI_CONNECT_TIMEOUT_SECONDS,
+        ),
+    }
+
+
+def _build_client(api_key: str) -> OpenAI:
+    _fix_ssl_cert_file()
+    http_client = DefaultHttpxClient(
+        event_hooks={"request": [_on_request]},
+        **_pool_options(),
+    )
+    return OpenAI(
+        api_key=api_key,
+        base_url=settings.OPENAI_BASE_URL or None,
+        timeout=settings.OPENAI_TIMEOUT_SECONDS,
+        http_client=http_client,
+    )
+
+
+def get_openai_client() -> OpenAI:
+    """
+    Return the shared client for this process.
+
+    Raises RuntimeError if OPENAI_API_KEY is not set.
+    """
+    global _client, _client_identity
+
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY is not set")
+
+    identity = (os.getpid(), api_key, settings.OPENAI_BASE_URL)
+    client = _client
+    if client is not None and _client_identity == identity:
+        return client
+
+    with _lock:
+        if _client is None or _client_identity != identity:
+            if _client is not None and _client_identity[0] == os.getpid():
+                # Same process, new key/base URL: release the old pool.
+                _client.close()
+            # After a fork the inherited client is dropped without closing:
+            # its sockets belong to the parent process.
+            _client = _build_client(api_key)
+            _client_identity = identity
+            log.debug("Created shared OpenAI client for pid %s", os.getpid())
+        return _client
+
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    Return the shared async client for this process and running event loop.
+
+    Must be called from a coroutine. Raises RuntimeError if OPENAI_API_KEY
+    is not set.
+    """
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY is not set")
+
+    # httpx async pools are bound to the loop they were first used on.
+    loop = asyncio.get_running_loop()
+    identity = (os.getpid(), id(loop), api_key, settings.OPENAI_BASE_URL)
+    client = _async_clients.get(identity)
+    if client is None:
+        with _lock:
+            # Forget clients of other processes/loops; their pools cannot be
+            # used from here.
+            for stale in [k for k in _async_clients if k[:2] != identity[:2]]:
+                del _async_clients[stale]
+            _fix_ssl_cert_file()
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=settings.OPENAI_BASE_URL or None,
+                timeout=settings.OPENAI_TIMEOUT_SECONDS,
+                http_client=DefaultAsyncHttpxClient(
+                    event_hooks={"request": [_aon_request]},
+                    **_pool_options(),
+                ),
+            )
+            _async_clients[identity] = client
+    return client
+
+
+def _rate_limit_delay(exc: Exception, attempt: int, base_delay: float) -> float:
+    """
+    Seconds to wait before retry `attempt` (0-based): the "try again in Ns"
+    hint from the error if present, otherwise exponential backoff.
+    """
+    match = re.search(r"try again in (\d+)s?", str(exc), re.IGNORECASE)
+    if match:
+        return float(match.group(1)) + 1  # Add 1 second buffer
+    return base_delay * (2 ** attempt)
+
+
+@contextmanager
+def deferred_rate_limits() -> Iterator[None]:
+    """
+    Inside this block rate limits are not waited out in the current worker:
+    the retry helpers re-raise the first RateLimitError and the model guard
+    refuses calls that would have to wait. Celery tasks use it and re-enqueue
+    themselves with a countdown instead (see palmastro_backend.celery).
+    """
+    token = _rate_limits_deferred.set(True)
+    try:
+        yield
+    finally:
+        _rate_limits_deferred.reset(token)
+
+
+def rate_limits_deferred() -> bool:
+    return _rate_limits_deferred.get()
+
+
+def retry_on_rate_limit(
+    func: Callable[[], T],
+    max_retries: int = 3,
+    base_delay: float = 2.0,
+) -> T:
+    """
+    Call `func()` retrying on RateLimitError with backoff: the "try again in
+    Ns" hint from the error if present, otherwise `base_delay` doubled per
+    attempt. Within `deferred_rate_limits()` the error is raised at once.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return func()
+        except RateLimitError as e:
+            if rate_limits_deferred():
+                raise
+            if attempt >= max_retries:
+                log.error("Rate limit retries exhausted after %d attempts", max_retries + 1)
+                raise
+            delay = _rate_limit_delay(e, attempt, base_delay)
+            log.warning(
+                "Rate limit hit (attempt %d/%d), retrying in %.1f seconds...",
+                attempt + 1,
+                max_retries + 1,
+                delay,
+            )
+            time.sleep(delay)
+    raise RuntimeError("Unexpected error in retry logic")
+
+
+async def async_retry_on_rate_limit(
+    func: Callable[[], Awaitable[T]],
+    max_retries: int = 3,
+    base_delay: float = 2.0,
+) -> T:
+    """
+    Await `func()` retrying on RateLimitError with backoff. Unlike
+    `retry_on_rate_limit` the wait is `asyncio.sleep`, so other requests keep
+    running on the event loop meanwhile.
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            return await func()
+        except RateLimitError as e:
+            if rate_limits_deferred():
+                raise
+            if attempt >= max_retries:
+                log.error("Rate limit retries exhausted after %d attempts", max_retries + 1)
+                raise
+            delay = _rate_limit_delay(e, attempt, base_delay)
+            log.warning(
+                "Rate limit hit (attempt %d/%d), retrying in %.1f seconds...",
+                attempt + 1,
+                max_retries + 1,
+                delay,
+            )
+            await asyncio.sleep(delay)
+    raise RuntimeError("Unexpected error in retry logic")
+
+
+def reset_openai_client() -> None:
+    """Drop the shared client (tests and benchmarks)."""
+    global _client, _client_identity
+    with _lock:
+        if _client is not None and _client_identity and _client_identity[0] == os.getpid():
+            try:
+                _client.close()
+            except Exception:  # noqa: BLE001
+                log.debug("Failed to close OpenAI client", exc_info=True)
+        _client = None
+        _client_identity = None
+        _async_clients.clear()
+
+
+def openai_model(feature: Optional[str] = None) -> str:
+    """
+    Model for `feature` ("palm", "astrology", "numerology"): the per-feature
+    override (PALM_MODEL, ...) if set, otherwise OPENAI_MODEL.
+    """
+    if feature:
+        override = getattr(settings, f"{feature.upper()}_MODEL", "")
+        if override:
+            return override
+    return settings.OPENAI_MODEL
+
+
+def get_connection_stats() -> Dict[str, Any]:
+    counters = metrics.get_counters([REQUESTS, CONNECTIONS_OPENED, TLS_HANDSHAKES])
+    requests, opened = counters[REQUESTS], counters[CONNECTIONS_OPENED]
+    return {
+        "requests": requests,
+        "connections_opened": opened,
+        "tls_handshakes": counters[TLS_HANDSHAKES],
+        "connections_reused": max(0, requests - opened),
+        "reuse_ratio": round(1 - opened / requests, 4) if requests else 0.0,
+    }
@@ -0,0 +1,149 @@
+"""
+Keyset (cursor) pagination for list endpoints.
+
+A page is read with a WHERE on the ordering key of the last row seen rather
+than an OFFSET, so with an index on the ordering any page costs what the
+first one does, and no COUNT is run. The ordering is a tuple of fields,
+newest/highest first, ending with a unique one (usually `id`) so rows with
+equal timestamps are neither skipped nor repeated. Cursors are opaque to
+clients: URL-safe base64 of the key values and the direction.
+
+Totals are left to the view, which can show a cheap estimate (see
+`estimated_count`) or none. Lists ordered by something other than a queryset
+key build their own pages with `page_limit`, `encode_cursor`,
+`decode_cursor` and `page_link`.
+"""
+
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlencode
+from uuid import UUID
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Model, Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+
+CURSOR_PARAM = "cursor"
+LIMIT_PARAM = "limit"
+
+
+@dataclass
+class Page:
+    items: List[Any]
+    next: Optional[str]  # query string of the next page, e.g. "?limit=20&cursor=..."
+    previous: Optional[str]
+
+    def response_data(self, results: Any, count: Optional[int] = None) -> Dict[str, Any]:
+        return {"count": count, "next": self.next, "previous": self.previous, "results": results}
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()  # full precision, unlike DjangoJSONEncoder
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def page_limit(request: Request, default: int, maximum: int) -> int:
+    """`?limit=` clamped to 1..maximum; `default` when absent or invalid."""
+    try:
+        limit = int(request.query_params.get(LIMIT_PARAM, default))
+    except (TypeError, ValueError):
+        return default
+    return min(max(limit, 1), maximum)
+
+
+def encode_cursor(key: Sequence[Any], backwards: bool = False) -> str:
+    data = {"k": [_dump(value) for value in key], "b": backwards}
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[List[Any], bool]:
+    """Key values and direction of `cursor`; NotFound if it is not one."""
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        key = data["k"]
+        if not isinstance(key, list):
+            raise ValueError(cursor)
+        return key, bool(data.get("b"))
+    except (binascii.Error, TypeError, ValueError, KeyError):
+        raise NotFound("Invalid cursor")
+
+
+def page_link(request: Request, cursor: str) -> str:
+    """Query string of the page at `cursor`, keeping the other parameters."""
+    params = {k: v for k, v in request.query_params.items() if k != CURSOR_PARAM}
+    return "?" + urlencode({**params, CURSOR_PARAM: cursor})
+
+
+class KeysetPaginator:
+    def __init__(self, ordering: Sequence[str] = ("created_at", "id"), default_limit: int = 20, max_limit: int = 100):
+        self.ordering = tuple(ordering)
+        self.default_limit = default_limit
+        self.max_limit = max_limit
+
+    def paginate(self, queryset: QuerySet, request: Request) -> Page:
+        limit = page_limit(request, self.default_limit, self.max_limit)
+        cursor = request.query_params.get(CURSOR_PARAM)
+        position, backwards = self._decode(cursor, queryset.model) if cursor else (None, False)
+
+        queryset = queryset.order_by(*(field if backwards else f"-{field}" for field in self.ordering))
+        if position is not None:
+            queryset = queryset.filter(self._beyond(position, "gt" if backwards else "lt"))
+        items = list(queryset[: limit + 1])
+        more = len(items) > limit
+        del items[limit:]
+        if backwards:
+            items.reverse()
+
+        # Coming from a cursor, there is a page on the side it came from.
+        has_next = position is not None if backwards else more
+        has_previous = more if backwards else position is not None
+        return Page(
+            items=items,
+            next=self._link(request, items[-1], False) if items and has_next else None,
+            previous=self._link(request, items[0], True) if items and has_previous else None,
+        )
+
+    def _beyond(self, position: Sequence[Any], lookup: str) -> Q:
+        # (a, b, c) < (x, y, z): a < x, or a = x and b < y, or a = x, b = y and c < z.
+        condition = Q()
+        for i, field in enumerate(self.ordering):
+            equal = {self.ordering[j]: position[j] for j in range(i)}
+            condition |= Q(**equal, **{f"{field}__{lookup}": position[i]})
+        return condition
+
+    def _link(self, request: Request, item: Any, backwards: bool) -> str:
+        return page_link(request, encode_cursor([getattr(item, field) for field in self.ordering], backwards))
+
+    def _decode(self, cursor: str, model: type[Model]) -> Tuple[List[Any], bool]:
+        key, backwards = decode_cursor(cursor)
+        try:
+            if len(key) != len(self.ordering):
+                raise ValueError(cursor)
+            position = [model._meta.get_field(field).to_python(value) for field, value in zip(self.ordering, key)]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound("Invalid cursor")
+        if any(value is None for value in position):
+            raise NotFound("Invalid cursor")
+        return position, backwards
+
+
+def estimated_count(model: type[Model]) -> Optional[int]:
+    """Planner estimate of the number of rows of `model` on PostgreSQL, None elsewhere."""
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass", [model._meta.db_table])
+        row = cursor.fetchone()
+    # -1: never analyzed
+    return row[0] if row and row[0] >= 0 else None
@@ -0,0 +1,245 @@
+"""
+Replay of recorded model answers through the full task code paths.
+
+Each app keeps a golden corpus of raw model answers in
+`<app>/tests/golden/model_responses.jsonl`: well-formed JSON in the current
+and the legacy palm structure, markdown- or prose-wrapped JSON, malformed and
+truncated output, refusals. Every case records the status, stored result and
+error message its answer must produce. `Replayer` answers the model call with
+the recorded text (see `benchmarking.FakeOpenAI`) and runs the same function
+the Celery task runs, so parsing, normalization and the database writes are
+exercised as in production. The golden replay tests compare the outcome with
+the corpus; `manage.py benchmark_golden_corpus` times it per stage.
+"""
+
+from __future__ import annotations
+
+import functools
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from unittest import mock
+
+from cryptography.fernet import Fernet
+from django.conf import settings
+from django.db import connections
+from django.test import override_settings
+
+from .benchmarking import FakeOpenAI
+from .openai_client import reset_openai_client
+
+PIPELINES = ("palm", "astrology", "numerology")
+
+_APPS = {"palm": "readings", "astrology": "astrology", "numerology": "numerology"}
+
+# Stages reported by StageTimer, in display order.
+STAGES = ("parse", "normalize", "db_read", "db_write")
+
+_WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE")
+
+# The palm pipeline is keyed on the image; the result cache is disabled while
+# replaying, so any bytes will do.
+_PALM_IMAGE = b"golden-replay"
+
+
+def corpus_path(pipeline: str) -> Path:
+    return Path(settings.BASE_DIR) / _APPS[pipeline] / "tests" / "golden" / "model_responses.jsonl"
+
+
+def load_corpus(pipeline: str) -> List[Dict[str, Any]]:
+    with corpus_path(pipeline).open(encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+@dataclass
+class ReplayOutcome:
+    status: str
+    result: Any
+    error: Optional[str]
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class StageTimer:
+    """
+    Wall time per stage. Stages nest (the normalize call inside the palm
+    parse, queries inside a task step); time is charged to the innermost
+    running stage only, so the totals add up.
+
+    Also usable as a `connection.execute_wrapper`: INSERT/UPDATE/DELETE
+    statements count as `db_write`, everything else as `db_read`.
+    """
+
+    def __init__(self) -> None:
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self._frames: List[List[float]] = []  # [started, seconds spent in nested stages]
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        frame = [time.perf_counter(), 0.0]
+        self._frames.append(frame)
+        try:
+            yield
+        finally:
+            self._frames.pop()
+            elapsed = time.perf_counter() - frame[0]
+            self.seconds[name] += elapsed - frame[1]
+            self.calls[name] += 1
+            if self._frames:
+                self._frames[-1][1] += elapsed
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            with self.stage(name):
+                return fn(*args, **kwargs)
+
+        return timed
+
+    def __call__(self, execute: Callable, sql: str, params: Any, many: bool, context: dict) -> Any:
+        name = "db_write" if sql.lstrip()[:6].upper() in _WRITE_STATEMENTS else "db_read"
+        with self.stage(name):
+            return execute(sql, params, many, context)
+
+    def reset(self) -> None:
+        self.seconds.clear()
+        self.calls.clear()
+
+
+class Replayer:
+    """
+    Context manager that answers every model call with the content of the
+    case being replayed and runs cases through the task code paths.
+
+    The model guard and the palm result cache are disabled, and missing
+    OPENAI_API_KEY / ASTROLOGY_ENCRYPTION_KEY values are filled in for the
+    duration. With `streaming` the palm answer is streamed section by
+    section, as for readings with a live event stream. With a `timer`, parse,
+    normalize and database time is recorded on it.
+    """
+
+    def __init__(self, timer: Optional[StageTimer] = None, streaming: bool = False) -> None:
+        self.timer = timer
+        self.streaming = streaming
+        self.fake = FakeOpenAI(latency_ms=0)
+        self._seed = 0
+        self._stack: Optional[ExitStack] = None
+
+    def __enter__(self) -> "Replayer":
+        from astrology import tasks as astrology_tasks
+        from numerology import tasks as numerology_tasks
+        from readings import tasks as palm_tasks
+
+        stack = ExitStack()
+        env = {"OPENAI_API_KEY": "replay", "ASTROLOGY_ENCRYPTION_KEY": Fernet.generate_key().decode()}
+        stack.enter_context(mock.patch.dict(os.environ, {k: v for k, v in env.items() if not os.getenv(k)}))
+        stack.enter_context(
+            override_settings(
+                MODEL_GUARD_ENABLED=False,
+                PALM_RESULT_CACHE_ENABLED=False,
+                PALM_STREAMING_ENABLED=self.streaming,
+            )
+        )
+        stack.enter_context(mock.patch("palmastro_backend.openai_client.OpenAI", self.fake))
+        reset_openai_client()
+        stack.callback(reset_openai_client)
+
+        # Each normalize call gets a fresh generator seeded from the case, so
+        # the compatibility jitter is reproducible, streamed or not.
+        normalize = palm_tasks.normalize_palm_result
+
+        def seeded_normalize(raw: Dict[str, Any], rng: Optional[random.Random] = None) -> Dict[str, Any]:
+            return normalize(raw, rng=rng or random.Random(self._seed))
+
+        patches = {
+            (palm_tasks, "normalize_palm_result"): ("normalize", seeded_normalize),
+            (palm_tasks, "_palm_result_from_content"): ("parse", palm_tasks._palm_result_from_content),
+            (astrology_tasks, "_parse_content"): ("parse", astrology_tasks._parse_content),
+            (numerology_tasks, "_parse_content"): ("parse", numerology_tasks._parse_content),
+        }
+        for (module, attribute), (stage, fn) in patches.items():
+            if self.timer is not None:
+                fn = self.timer.wrap(stage, fn)
+            stack.enter_context(mock.patch.object(module, attribute, fn))
+        if self.timer is not None:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self.timer))
+        self._stack = stack
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        stack, self._stack = self._stack, None
+        stack.__exit__(*exc_info)
+
+    def replay(self, pipeline: str, case: Dict[str, Any]) -> ReplayOutcome:
+        if self._stack is None:
+            raise RuntimeError("Replayer must be entered before replaying cases")
+        self.fake.content = case["content"]
+        self._seed = case.get("seed", 0)
+        return _REPLAY[pipeline](case.get("input") or {})
+
+
+def _replay_palm(_: Dict[str, Any]) -> ReplayOutcome:
+    from readings.imaging import PreparedImage
+    from readings.models import Reading
+    from readings.tasks import run_palm_reading
+
+    reading = Reading.objects.create()
+    image = PreparedImage(data=_PALM_IMAGE, mime="image/jpeg", original_size=len(_PALM_IMAGE))
+    run_palm_reading(str(reading.id), image=image)
+    reading.refresh_from_db()
+    return ReplayOutcome(reading.status, reading.result, reading.error_message)
+
+
+def _replay_astrology(data: Dict[str, Any]) -> ReplayOutcome:
+    from astrology.crypto import encrypt_value
+    from astrology.models import AstrologySession, AstrologyStatus
+    from astrology.tasks import _generate_astrology_reading
+
+    session = AstrologySession.objects.create(
+        full_name=encrypt_value(data.get("full_name", "Ada Lovelace")),
+        gender=encrypt_value(data.get("gender", "female")),
+        birth_date=encrypt_value(data.get("birth_date", "1990-06-15")),
+        birth_time=encrypt_value(data.get("birth_time", "08:30")),
+        birth_place=encrypt_value(data.get("birth_place", "London, UK")),
+        status=AstrologyStatus.PENDING,
+    )
+    _generate_astrology_reading(str(session.session_id), data.get("language", "en"))
+    session.refresh_from_db()
+    return ReplayOutcome(session.status, session.openai_result, None)
+
+
+def _replay_numerology(data: Dict[str, Any]) -> ReplayOutcome:
+    from numerology.models import NumerologyRequest, NumerologyStatus
+    from numerology.tasks import _process_numerology_request
+    from numerology.utils import compute_numerology
+
+    full_name = data.get("full_name", "Ada Lovelace")
+    birth_date = date.fromisoformat(data.get("birth_date", "1990-06-15"))
+    computed = compute_numerology(full_name, birth_date)
+    nreq = NumerologyRequest.objects.create(
+        full_name=full_name,
+        normalized_name=computed["normalized_name"],
+        birth_date=birth_date,
+        computed_numbers=computed,
+        status=NumerologyStatus.PENDING,
+    )
+    _process_numerology_request(str(nreq.id))
+    nreq.refresh_from_db()
+    return ReplayOutcome(nreq.status, nreq.openai_result, nreq.error_message)
+
+
+_REPLAY: Dict[str, Callable[[Dict[str, Any]], ReplayOutcome]] = {
+    "palm": _replay_palm,
+    "astrology": _replay_astrology,
+    "numerology": _replay_numerology,
+}
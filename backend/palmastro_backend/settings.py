@@ -46,6 +46,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "palmastro_backend.middleware.QueryCountMiddleware",
 ]
 
 ROOT_URLCONF = "palmastro_backend.urls"
@@ -94,6 +95,28 @@ else:
         },
     }
 
+# Shared cache
+# - Set CACHE_URL (e.g. redis://localhost:6379/1) so every gunicorn and Celery
+#   worker shares one cache; Redis should run with an LRU maxmemory-policy.
+# - Without it, a per-process LRU in-memory cache is used (development only).
+CACHE_URL = os.getenv("CACHE_URL", "")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+            "KEY_PREFIX": "palmastro",
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "palmastro-default",
+            "OPTIONS": {"MAX_ENTRIES": int(os.getenv("LOCAL_CACHE_MAX_ENTRIES", "1000"))},
+        }
+    }
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -237,11 +260,63 @@ FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("FILE_UPLOAD_MAX_MEMORY_SIZE", 10 *
 # Celery
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", CELERY_BROKER_URL)
-# Enable eager mode in DEBUG (development) or when explicitly set
-# This runs tasks synchronously without requiring Redis
-# Force eager mode to True in development to avoid Redis dependency
-CELERY_TASK_ALWAYS_EAGER = True  # Always use eager mode in development
+# Eager mode runs tasks inline in the web process, without Redis or workers,
+# which is what the single-process deploys (Procfile, Dockerfile) rely on.
+# Set to false only where a broker and one worker pool per queue run (see
+# docker-compose.yml); every web, worker and beat process must agree.
+CELERY_TASK_ALWAYS_EAGER = os.getenv("CELERY_TASK_ALWAYS_EAGER", "true").lower() != "false"
 CELERY_TASK_EAGER_PROPAGATES = True  # Propagate exceptions in eager mode
+# Multi-second vision calls, text generation and periodic maintenance each
+# get a queue and a worker pool, so a burst of palm uploads cannot hold up
+# numerology answers and cleanup never competes with user requests.
+CELERY_TASK_ROUTES = {
+    "readings.tasks.process_palm_reading": {"queue": "vision"},
+    "astrology.tasks.generate_astrology_reading": {"queue": "text"},
+    "numerology.tasks.process_numerology_request": {"queue": "text"},
+    "*.tasks.cleanup_*": {"queue": "maintenance"},
+}
+# Tasks are long model calls: a worker process reserves one message at most,
+# so queued work goes to whichever process is free. Per-pool concurrency and
+# prefetch are set on each worker's command line (docker-compose.yml).
+CELERY_WORKER_PREFETCH_MULTIPLIER = int(os.getenv("CELERY_WORKER_PREFETCH_MULTIPLIER", "1"))
+# Expired images, readings and PII are purged by Celery beat.
+CLEANUP_INTERVAL_SECONDS = int(os.getenv("CLEANUP_INTERVAL_SECONDS", "3600"))
+CELERY_BEAT_SCHEDULE = {
+    name: {"task": f"{app}.tasks.{name}", "schedule": CLEANUP_INTERVAL_SECONDS}
+    for app, name in (
+        ("readings", "cleanup_readings"),
+        ("astrology", "cleanup_astrology"),
+        ("numerology", "cleanup_numerology"),
+    )
+}
+
+# POST /api/v1/readings/: "async" stores the image, queues process_palm_reading
+# and answers 202 with the job URLs; "sync" runs the analysis inside the
+# request (blocks the HTTP worker for the whole vision call). Defaults to
+# "async" only where Celery workers consume the queue (eager mode off).
+READING_UPLOAD_MODE = os.getenv(
+    "READING_UPLOAD_MODE", "sync" if CELERY_TASK_ALWAYS_EAGER else "async"
+).lower()
+# Dispatching a task whose serialized arguments exceed this many bytes raises
+# TaskPayloadTooLarge; tasks take ids and storage references, not file data.
+TASK_MESSAGE_MAX_BYTES = int(os.getenv("TASK_MESSAGE_MAX_BYTES", str(32 * 1024)))
+# Rate-limited palm/astrology/numerology tasks go back to the queue with a
+# countdown (the API's "try again in Ns" hint or exponential backoff from
+# this base, plus jitter) instead of sleeping in the worker, up to this many
+# times; the last attempt waits inline and fails as before.
+TASK_RATE_LIMIT_MAX_RETRIES = int(os.getenv("TASK_RATE_LIMIT_MAX_RETRIES", "5"))
+TASK_RATE_LIMIT_RETRY_BASE_SECONDS = float(os.getenv("TASK_RATE_LIMIT_RETRY_BASE_SECONDS", "5"))
+
+# Palm image storage (readings.storage): "local" keeps uploads under
+# MEDIA_ROOT; "s3" uses an S3-compatible bucket (AWS S3, MinIO) and lets
+# clients PUT images directly with presigned URLs. Requires boto3.
+PALM_STORAGE_BACKEND = os.getenv("PALM_STORAGE_BACKEND", "local").lower()
+S3_BUCKET = os.getenv("S3_BUCKET", "")
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL", "")
+S3_REGION = os.getenv("S3_REGION", "")
+PALM_UPLOAD_URL_TTL_SECONDS = int(os.getenv("PALM_UPLOAD_URL_TTL_SECONDS", "600"))
+# Workers stream objects into a temp file that stays in memory up to this size.
+PALM_STORAGE_SPOOL_MAX_BYTES = int(os.getenv("PALM_STORAGE_SPOOL_MAX_BYTES", str(2 * 1024 * 1024)))
 
 # Reading retention
 READING_RETENTION_DAYS = int(os.getenv("READING_RETENTION_DAYS", "30"))
@@ -259,3 +334,87 @@ ASTROLOGY_NO_CONSENT_TTL_HOURS = int(
     os.getenv("ASTROLOGY_NO_CONSENT_TTL_HOURS", "0")
 )
 
+# Palm analysis result cache (content-addressed by normalized image hash)
+PALM_RESULT_CACHE_ENABLED = os.getenv("PALM_RESULT_CACHE_ENABLED", "true").lower() == "true"
+PALM_RESULT_CACHE_TTL_SECONDS = int(os.getenv("PALM_RESULT_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+# Dashboard payload cache, keyed by a version bumped on every reading write
+# (readings.dashboard_cache); polls with a current ETag get 304. Readings are
+# written by Celery and other web workers, so the versions only work in a
+# shared cache: off by default without CACHE_URL.
+DASHBOARD_CACHE_ENABLED = os.getenv("DASHBOARD_CACHE_ENABLED", str(bool(CACHE_URL))).lower() == "true"
+DASHBOARD_CACHE_TTL_SECONDS = int(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "3600"))
+
+# Single-flight: concurrent identical model calls (same palm image hash or
+# numerology/astrology prompt) wait on one in-flight call via a lock in the
+# shared cache. The lock expires after SINGLE_FLIGHT_LOCK_SECONDS if its holder
+# dies; waiters poll for the result every SINGLE_FLIGHT_POLL_SECONDS.
+SINGLE_FLIGHT_ENABLED = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+SINGLE_FLIGHT_LOCK_SECONDS = float(os.getenv("SINGLE_FLIGHT_LOCK_SECONDS", "60"))
+SINGLE_FLIGHT_POLL_SECONDS = float(os.getenv("SINGLE_FLIGHT_POLL_SECONDS", "0.2"))
+
+# Model call guard (palmastro_backend.model_guard): every OpenAI call takes
+# from shared request/token buckets and is refused fast while the circuit
+# breaker is open. Defaults match OpenAI tier 1 limits for gpt-4o-mini; 0
+# disables a bucket. The buckets live in Redis at MODEL_LIMITER_REDIS_URL, or
+# per process without it.
+MODEL_GUARD_ENABLED = os.getenv("MODEL_GUARD_ENABLED", "true").lower() == "true"
+MODEL_RATE_LIMIT_RPM = int(os.getenv("MODEL_RATE_LIMIT_RPM", "500"))
+MODEL_RATE_LIMIT_TPM = int(os.getenv("MODEL_RATE_LIMIT_TPM", "200000"))
+MODEL_RATE_LIMIT_MAX_WAIT_SECONDS = float(os.getenv("MODEL_RATE_LIMIT_MAX_WAIT_SECONDS", "20"))
+MODEL_LIMITER_REDIS_URL = os.getenv("MODEL_LIMITER_REDIS_URL", CACHE_URL)
+# The breaker opens after this many 429/5xx/timeout failures within the window
+# and answers 503 + Retry-After for the cooldown, then lets one probe through.
+MODEL_BREAKER_FAILURE_THRESHOLD = int(os.getenv("MODEL_BREAKER_FAILURE_THRESHOLD", "5"))
+MODEL_BREAKER_WINDOW_SECONDS = float(os.getenv("MODEL_BREAKER_WINDOW_SECONDS", "60"))
+MODEL_BREAKER_COOLDOWN_SECONDS = float(os.getenv("MODEL_BREAKER_COOLDOWN_SECONDS", "30"))
+
+# Palm image pre-processing before the vision call
+PALM_IMAGE_PREPROCESS_ENABLED = os.getenv("PALM_IMAGE_PREPROCESS_ENABLED", "true").lower() == "true"
+PALM_IMAGE_MAX_EDGE = int(os.getenv("PALM_IMAGE_MAX_EDGE", "1024"))
+PALM_IMAGE_FORMAT = os.getenv("PALM_IMAGE_FORMAT", "JPEG")  # JPEG or WEBP
+PALM_IMAGE_QUALITY = int(os.getenv("PALM_IMAGE_QUALITY", "80"))
+PALM_IMAGE_MAX_ASPECT = float(os.getenv("PALM_IMAGE_MAX_ASPECT", "2.0"))
+
+# Palm validation: the analysis call rejects non-palm images itself. Set to
+# true to also run the separate classifier request (doubles vision calls).
+PALM_STANDALONE_VALIDATION = os.getenv("PALM_STANDALONE_VALIDATION", "false").lower() == "true"
+
+# Stream the palm answer in the Celery task and publish each finished section
+# (lines, personality, predictions, special marks) on the reading's events.
+PALM_STREAMING_ENABLED = os.getenv("PALM_STREAMING_ENABLED", "true").lower() == "true"
+
+# Shared OpenAI client (one keep-alive connection pool per process)
+OPENAI_MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+PALM_MODEL = os.getenv("PALM_MODEL", "")
+ASTROLOGY_MODEL = os.getenv("ASTROLOGY_MODEL", "")
+NUMEROLOGY_MODEL = os.getenv("NUMEROLOGY_MODEL", "")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "")
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "120"))
+OPENAI_CONNECT_TIMEOUT_SECONDS = float(os.getenv("OPENAI_CONNECT_TIMEOUT_SECONDS", "5"))
+# Palm analysis runs inside the web request; keep it under the gunicorn timeout.
+OPENAI_REQUEST_TIMEOUT_SECONDS = float(os.getenv("OPENAI_REQUEST_TIMEOUT_SECONDS", "20"))
+OPENAI_POOL_MAX_CONNECTIONS = int(os.getenv("OPENAI_POOL_MAX_CONNECTIONS", "20"))
+OPENAI_POOL_MAX_KEEPALIVE = int(os.getenv("OPENAI_POOL_MAX_KEEPALIVE", "10"))
+OPENAI_POOL_KEEPALIVE_SECONDS = float(os.getenv("OPENAI_POOL_KEEPALIVE_SECONDS", "60"))
+
+# ASGI deployment: serve the OpenAI-bound endpoints (palm analyze, astrology
+# generate, numerology create) with async views. Enable together with
+# gunicorn -k uvicorn_worker.UvicornWorker palmastro_backend.asgi:application
+OPENAI_ASYNC_VIEWS = os.getenv("OPENAI_ASYNC_VIEWS", "false").lower() == "true"
+
+# Job status events (SSE endpoints .../events/). Redis pub/sub shares events
+# between web and Celery processes; without it an in-process broker is used.
+EVENTS_REDIS_URL = os.getenv("EVENTS_REDIS_URL", CACHE_URL)
+# A stream is closed after SSE_MAX_SECONDS (EventSource reconnects); a comment
+# line is sent every SSE_KEEPALIVE_SECONDS so proxies keep the connection open.
+SSE_MAX_SECONDS = float(os.getenv("SSE_MAX_SECONDS", "55"))
+SSE_KEEPALIVE_SECONDS = float(os.getenv("SSE_KEEPALIVE_SECONDS", "15"))
+# A stream holds a sync (WSGI) worker for its whole duration, so under WSGI
+# the endpoints answer 204 and clients poll instead, except for runserver.
+# Streams are always served on the ASGI app (palmastro_backend.asgi).
+SSE_WSGI_ENABLED = os.getenv("SSE_WSGI_ENABLED", str(DEBUG)).lower() == "true"
+
+# Add X-DB-Query-Count / X-DB-Query-Time-Ms to every response (read by
+# `manage.py load_test`). On by default with DEBUG.
+QUERY_COUNT_HEADERS = os.getenv("QUERY_COUNT_HEADERS", str(DEBUG)).lower() == "true"
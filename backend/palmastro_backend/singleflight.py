@@ -0,0 +1,217 @@
+"""
+Single-flight coalescing of identical model calls across workers.
+
+A double-tapped upload or a frontend retry on a slow response used to start
+two or three identical vision calls in parallel. `single_flight(key, compute)`
+lets one caller per key run `compute`: it takes a short-lived lock in the
+shared Django cache with `cache.add` (atomic on Redis and locmem), runs the
+call and publishes the result under its lock token. Callers arriving while
+the call is in flight poll for that result instead of calling the model
+themselves; callers arriving afterwards start a new flight. If the
+leader fails, it releases the lock, and if it dies, the lock expires. Either
+way one of the waiters takes over.
+
+Only the model call is shared; every caller still creates and completes its
+own Reading / NumerologyRequest / AstrologySession row.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple, TypeVar
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from palmastro_backend import metrics
+
+log = logging.getLogger(__name__)
+
+LEADERS = "singleflight.leaders"
+COALESCED = "singleflight.coalesced"
+KINDS = ("palm", "numerology", "astrology")
+
+T = TypeVar("T")
+
+# Outcomes of one claim attempt.
+_LEAD = "lead"
+_WAIT = "wait"
+_DONE = "done"
+
+
+def _enabled() -> bool:
+    return getattr(settings, "SINGLE_FLIGHT_ENABLED", True)
+
+
+def _lock_seconds() -> float:
+    return float(getattr(settings, "SINGLE_FLIGHT_LOCK_SECONDS", 60))
+
+
+def _poll_seconds() -> float:
+    return float(getattr(settings, "SINGLE_FLIGHT_POLL_SECONDS", 0.2))
+
+
+def _lock_key(key: str) -> str:
+    return f"singleflight:lock:{key}"
+
+
+def _result_key(key: str, token: str) -> str:
+    return f"singleflight:result:{key}:{token}"
+
+
+def request_key(kind: str, request: Dict[str, Any], exclude: Iterable[str] = ()) -> str:
+    """
+    Flight key for an OpenAI request payload.
+
+    Prompts embed the row id (request/session id) for traceability; pass those
+    values in `exclude` so otherwise identical requests share a key.
+    """
+    payload = json.dumps(request, sort_keys=True, default=str)
+    for value in exclude:
+        if value:
+            payload = payload.replace(value, "")
+    return f"{kind}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+def _claim(key: str, token: str, leader: Optional[str]) -> Tuple[str, Any]:
+    """
+    One step of the wait loop. `leader` is the lock token of the flight being
+    waited on (None on the first attempt). Returns (_DONE, result),
+    (_LEAD, token) or (_WAIT, leader_token).
+    """
+    try:
+        if leader is None:
+            current = cache.get(_lock_key(key))
+        else:
+            values = cache.get_many([_result_key(key, leader), _lock_key(key)])
+            if _result_key(key, leader) in values:
+                return _DONE, values[_result_key(key, leader)]
+            current = values.get(_lock_key(key))
+            if current is None:
+                # The leader may have published and released between the two
+                # reads above.
+                result = cache.get(_result_key(key, leader))
+                if result is not None:
+                    return _DONE, result
+        if current is None and cache.add(_lock_key(key), token, timeout=_lock_seconds()):
+            return _LEAD, token
+        return _WAIT, current
+    except Exception:  # noqa: BLE001
+        # Without the shared cache there is nothing to coordinate on; run the
+        # call uncoordinated rather than failing the request.
+        log.debug("Single-flight claim failed for %s", key, exc_info=True)
+        return _LEAD, token
+
+
+def _release(key: str, token: str, result: Any = None) -> None:
+    try:
+        if result is not None:
+            # Kept only long enough for the waiters of this flight to read it;
+            # later callers start a new flight.
+            cache.set(_result_key(key, token), result, timeout=_lock_seconds())
+        if cache.get(_lock_key(key)) == token:
+            cache.delete(_lock_key(key))
+    except Exception:  # noqa: BLE001
+        log.debug("Single-flight release failed for %s", key, exc_info=True)
+
+
+def _record(kind: str, coalesced: bool) -> None:
+    name = COALESCED if coalesced else LEADERS
+    metrics.incr(name)
+    metrics.incr(f"{name}.{kind}")
+
+
+def single_flight(key: str, compute: Callable[[], T], kind: str = "model") -> T:
+    """
+    Run `compute()` once per `key` across all concurrent callers and return
+    its result to each of them. Exceptions are raised to the leader only;
+    waiters then retry the claim and one of them calls `compute` itself.
+    """
+    if not _enabled():
+        return compute()
+
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + _lock_seconds()
+    leader = None
+    while True:
+        outcome, value = _claim(key, token, leader)
+        if outcome == _DONE:
+            _record(kind, coalesced=True)
+            return value
+        if outcome == _LEAD:
+            break
+        leader = value
+        if time.monotonic() >= deadline:
+            log.warning("Gave up waiting for in-flight %s call %s", kind, key[-16:])
+            return compute()
+        time.sleep(_poll_seconds())
+
+    _record(kind, coalesced=False)
+    try:
+        result = compute()
+    except BaseException:
+        _release(key, token)
+        raise
+    _release(key, token, result)
+    return result
+
+
+async def asingle_flight(
+    key: str, compute: Callable[[], Awaitable[T]], kind: str = "model"
+) -> T:
+    """Async counterpart of `single_flight` for the ASGI views."""
+    if not _enabled():
+        return await compute()
+
+    token = uuid.uuid4().hex
+    deadline = time.monotonic() + _lock_seconds()
+    leader = None
+    while True:
+        outcome, value = await sync_to_async(_claim)(key, token, leader)
+        if outcome == _DONE:
+            await sync_to_async(_record)(kind, coalesced=True)
+            return value
+        if outcome == _LEAD:
+            break
+        leader = value
+        if time.monotonic() >= deadline:
+            log.warning("Gave up waiting for in-flight %s call %s", kind, key[-16:])
+            return await compute()
+        await asyncio.sleep(_poll_seconds())
+
+    await sync_to_async(_record)(kind, coalesced=False)
+    try:
+        result = await compute()
+    except BaseException:
+        await sync_to_async(_release)(key, token)
+        raise
+    await sync_to_async(_release)(key, token, result)
+    return result
+
+
+def get_single_flight_stats(kinds: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    kinds = list(kinds or KINDS)
+    names = [LEADERS, COALESCED]
+    for kind in kinds:
+        names += [f"{LEADERS}.{kind}", f"{COALESCED}.{kind}"]
+    counters = metrics.get_counters(names)
+    leaders, coalesced = counters[LEADERS], counters[COALESCED]
+    requests = leaders + coalesced
+    return {
+        "model_calls": leaders,
+        "coalesced": coalesced,
+        "coalesced_ratio": round(coalesced / requests, 4) if requests else 0.0,
+        "by_kind": {
+            kind: {
+                "model_calls": counters[f"{LEADERS}.{kind}"],
+                "coalesced": counters[f"{COALESCED}.{kind}"],
+            }
+            for kind in kinds
+        },
+    }
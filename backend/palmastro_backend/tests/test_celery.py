@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import io
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+import httpx
+from celery.exceptions import Retry
+from django.conf import settings
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from openai import RateLimitError
+from PIL import Image
+
+from astrology.models import AstrologySession, AstrologyStatus
+from astrology.tasks import generate_astrology_reading
+from numerology.models import NumerologyRequest, NumerologyStatus
+from numerology.tasks import cleanup_numerology, process_numerology_request
+from palmastro_backend.celery import TaskPayloadTooLarge, app, get_task_message_stats
+from palmastro_backend.model_guard import ModelUnavailable
+from readings.models import Reading, ReadingStatus
+from readings.storage import get_image_storage, new_upload_key
+from readings.tasks import process_palm_reading
+
+
+def _rate_limit_error(message="Rate limit reached. Please try again in 20s."):
+    request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+    return RateLimitError(message, response=httpx.Response(429, request=request), body=None)
+
+
+def _run_in_worker(task, *args, retries=0):
+    """Run `task` as a worker would (not eager, not called directly)."""
+    task.push_request(called_directly=False, is_eager=False, retries=retries)
+    try:
+        return task.run(*args)
+    finally:
+        task.pop_request()
+
+
+class BoundedPayloadTaskTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    @mock.patch("readings.tasks.run_palm_reading")
+    def test_message_size_is_recorded(self, run):
+        process_palm_reading.delay("reading-id", image_ref="palm_uploads/a/palm.jpg")
+
+        run.assert_called_once_with("reading-id", image_ref="palm_uploads/a/palm.jpg")
+        stats = get_task_message_stats()
+        self.assertEqual(stats["messages"], 1)
+        self.assertGreater(stats["avg_message_bytes"], 0)
+        self.assertLess(stats["avg_message_bytes"], 200)
+
+    @override_settings(TASK_MESSAGE_MAX_BYTES=1024)
+    @mock.patch("readings.tasks.run_palm_reading")
+    def test_oversized_payload_is_rejected(self, run):
+        with self.assertRaises(TaskPayloadTooLarge):
+            process_palm_reading.delay("reading-id", image_ref="x" * 4096)
+
+        run.assert_not_called()
+        self.assertEqual(get_task_message_stats()["rejected"], 1)
+
+
+@override_settings(
+    MODEL_GUARD_ENABLED=False,
+    PALM_RESULT_CACHE_ENABLED=False,
+    PALM_STREAMING_ENABLED=False,
+    TASK_RATE_LIMIT_MAX_RETRIES=5,
+)
+class RateLimitRescheduleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.sleep = self.enterContext(mock.patch("palmastro_backend.openai_client.time.sleep"))
+
+    def _reading(self):
+        image = io.BytesIO()
+        Image.new("RGB", (64, 64), (200, 160, 140)).save(image, format="JPEG")
+        image.seek(0)
+        key = get_image_storage().save(new_upload_key("image/jpeg"), image, "image/jpeg")
+        return Reading.objects.create(storage_key=key)
+
+    def _openai_raising(self, exc):
+        client = mock.Mock()
+        client.with_options.return_value.chat.completions.create.side_effect = exc
+        return mock.patch("readings.tasks.get_openai_client", return_value=client)
+
+    def test_rate_limited_palm_reading_is_requeued(self):
+        reading = self._reading()
+
+        with self._openai_raising(_rate_limit_error()), mock.patch.object(
+            process_palm_reading, "retry", side_effect=Retry()
+        ) as retry:
+            with self.assertRaises(Retry):
+                _run_in_worker(process_palm_reading, str(reading.id))
+
+        # No sleeping in the worker; the "try again in 20s" hint (+1 s) plus
+        # up to 50% jitter becomes the countdown.
+        self.sleep.assert_not_called()
+        countdown = retry.call_args.kwargs["countdown"]
+        self.assertGreaterEqual(countdown, 21)
+        self.assertLessEqual(countdown, 31.5)
+        reading.refresh_from_db()
+        self.assertEqual(reading.status, ReadingStatus.QUEUED)
+        self.assertEqual(reading.retry_count, 1)
+        self.assertIsNotNone(get_image_storage().size(reading.storage_key))
+        self.assertEqual(get_task_message_stats()["rate_limit_retries"], 1)
+
+    @mock.patch("readings.tasks._call_gpt_palm_model", side_effect=ModelUnavailable(12))
+    def test_model_guard_refusal_uses_its_retry_after(self, call_model):
+        reading = self._reading()
+
+        with mock.patch.object(process_palm_reading, "retry", side_effect=Retry()) as retry:
+            with self.assertRaises(Retry):
+                _run_in_worker(process_palm_reading, str(reading.id))
+
+        countdown = retry.call_args.kwargs["countdown"]
+        self.assertGreaterEqual(countdown, 12)
+        self.assertLessEqual(countdown, 18)
+
+    def test_exhausted_quota_is_not_retried(self):
+        reading = self._reading()
+
+        with self._openai_raising(_rate_limit_error("Error code: 429 insufficient_quota")), mock.patch.object(
+            process_palm_reading, "retry"
+        ) as retry:
+            _run_in_worker(process_palm_reading, str(reading.id))
+
+        retry.assert_not_called()
+        reading.refresh_from_db()
+        self.assertEqual(reading.status, ReadingStatus.FAILED)
+
+    def test_last_attempt_waits_inline_and_fails(self):
+        reading = self._reading()
+
+        with self._openai_raising(_rate_limit_error()), mock.patch.object(process_palm_reading, "retry") as retry:
+            _run_in_worker(process_palm_reading, str(reading.id), retries=5)
+
+        retry.assert_not_called()
+        self.assertEqual(self.sleep.call_count, 2)
+        reading.refresh_from_db()
+        self.assertEqual(reading.status, ReadingStatus.FAILED)
+        self.assertEqual(reading.storage_key, "")
+
+    @mock.patch("numerology.tasks._call_openai", side_effect=_rate_limit_error())
+    def test_rate_limited_numerology_request_stays_pending(self, call_openai):
+        nreq = NumerologyRequest.objects.create(
+            full_name="John Doe", normalized_name="JOHNDOE", birth_date=date(1990, 1, 5)
+        )
+
+        with mock.patch.object(process_numerology_request, "retry", side_effect=Retry()) as retry:
+            with self.assertRaises(Retry):
+                _run_in_worker(process_numerology_request, str(nreq.id))
+
+        retry.assert_called_once()
+        nreq.refresh_from_db()
+        self.assertEqual(nreq.status, NumerologyStatus.PENDING)
+
+    @mock.patch("astrology.tasks._build_prompt", return_value="prompt")
+    @mock.patch("astrology.tasks._call_openai", side_effect=_rate_limit_error())
+    def test_rate_limited_astrology_session_is_requeued(self, call_openai, build_prompt):
+        session = AstrologySession.objects.create(full_name="x", gender="x")
+
+        with mock.patch.object(generate_astrology_reading, "retry", side_effect=Retry()) as retry:
+            with self.assertRaises(Retry):
+                _run_in_worker(generate_astrology_reading, str(session.session_id))
+
+        retry.assert_called_once()
+        session.refresh_from_db()
+        self.assertEqual(session.status, AstrologyStatus.PENDING)
+        self.assertEqual(session.retry_count, 1)
+
+
+class TaskRoutingTests(SimpleTestCase):
+    def _queue(self, task_name):
+        return app.amqp.router.route({}, task_name)["queue"].name
+
+    def test_model_tasks_have_their_own_queues(self):
+        self.assertEqual(self._queue(process_palm_reading.name), "vision")
+        self.assertEqual(self._queue(generate_astrology_reading.name), "text")
+        self.assertEqual(self._queue(process_numerology_request.name), "text")
+
+    def test_scheduled_cleanups_run_on_the_maintenance_queue(self):
+        self.assertEqual(len(settings.CELERY_BEAT_SCHEDULE), 3)
+        for entry in settings.CELERY_BEAT_SCHEDULE.values():
+            with self.subTest(task=entry["task"]):
+                self.assertIn(entry["task"], app.tasks)
+                self.assertEqual(self._queue(entry["task"]), "maintenance")
+
+
+class CleanupTaskTests(TestCase):
+    def test_cleanup_task_deletes_expired_rows(self):
+        expired = NumerologyRequest.objects.create(
+            full_name="Ada",
+            normalized_name="ADA",
+            birth_date=date(1990, 1, 1),
+            expires_at=timezone.now() - timedelta(hours=1),
+        )
+        kept = NumerologyRequest.objects.create(
+            full_name="Ada", normalized_name="ADA", birth_date=date(1990, 1, 1)
+        )
+
+        with mock.patch("sys.stdout", new_callable=io.StringIO):
+            cleanup_numerology.delay()
+
+        self.assertFalse(NumerologyRequest.objects.filter(id=expired.id).exists())
+        self.assertTrue(NumerologyRequest.objects.filter(id=kept.id).exists())
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import shutil
+import tempfile
+from unittest import mock
+
+from asgiref.sync import iscoroutinefunction
+from cryptography.fernet import Fernet
+from django.core.cache import cache
+from django.test import LiveServerTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from palmastro_backend.loadtest import LoadTestConfig, compare_reports, run_load_test
+from palmastro_backend.middleware import QUERY_COUNT_HEADER, QUERY_TIME_HEADER, QueryCountMiddleware
+from palmastro_backend.mock_openai import MockOpenAIConfig, start_mock_openai_server
+
+
+@override_settings(QUERY_COUNT_HEADERS=True)
+class QueryCountMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_headers_count_the_queries_of_the_request(self):
+        response = self.client.get(reverse("accounts:dashboard-realtime"))
+
+        # The reading count and the last update (then cached).
+        self.assertEqual(response[QUERY_COUNT_HEADER], "2")
+        self.assertIn(QUERY_TIME_HEADER, response)
+
+    @override_settings(QUERY_COUNT_HEADERS=False)
+    def test_disabled(self):
+        response = self.client.get(reverse("accounts:dashboard-realtime"))
+
+        self.assertNotIn(QUERY_COUNT_HEADER, response)
+
+    async def test_asgi_requests_are_not_adapted_to_sync(self):
+        middleware = QueryCountMiddleware(mock.AsyncMock())
+        self.assertTrue(iscoroutinefunction(middleware))
+
+        response = await self.async_client.get(reverse("accounts:dashboard-realtime"))
+
+        self.assertEqual(response[QUERY_COUNT_HEADER], "2")
+
+
+@override_settings(
+    QUERY_COUNT_HEADERS=True,
+    MODEL_GUARD_ENABLED=False,
+    PALM_STORAGE_BACKEND="local",
+    READING_UPLOAD_MODE="async",
+)
+class LoadTestHarnessTests(LiveServerTestCase):
+    def setUp(self):
+        cache.clear()
+        self.enterContext(
+            mock.patch.dict(
+                "os.environ",
+                {"OPENAI_API_KEY": "test-key", "ASTROLOGY_ENCRYPTION_KEY": Fernet.generate_key().decode()},
+            )
+        )
+        self.allow_request = self.enterContext(
+            mock.patch("rest_framework.throttling.SimpleRateThrottle.allow_request", return_value=True)
+        )
+        server = start_mock_openai_server(MockOpenAIConfig(latency_ms=0))
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(OPENAI_BASE_URL=server.base_url, MEDIA_ROOT=media_root))
+
+    def _run(self, scenario):
+        config = LoadTestConfig(
+            base_url=self.live_server_url,
+            scenarios={scenario: 1},
+            users=1,
+            iterations=1,
+            think_time_seconds=0,
+            poll_interval_seconds=0.05,
+            poll_timeout_seconds=10,
+        )
+        return run_load_test(config)
+
+    def test_palm_upload(self):
+        report = self._run("palm_upload")
+
+        self.assertEqual(report["scenarios"]["palm_upload"]["completed"], 1, report["scenarios"])
+        self.assertEqual(
+            set(report["endpoints"]),
+            {
+                "POST /api/v1/readings/uploads/",
+                "PUT /api/v1/readings/uploads/{token}/",
+                "POST /api/v1/readings/",
+                "GET /api/v1/readings/{id}/status/",
+                "GET /api/v1/readings/{id}/result/",
+            },
+        )
+        submit = report["endpoints"]["POST /api/v1/readings/"]
+        self.assertEqual(submit["errors"], 0)
+        self.assertGreater(submit["db_queries"]["mean"], 0)
+
+    def test_astrology_wizard(self):
+        report = self._run("astrology_wizard")
+
+        self.assertEqual(report["scenarios"]["astrology_wizard"]["completed"], 1, report["scenarios"])
+        self.assertIn("PATCH /api/v1/astrology/preferences/", report["endpoints"])
+
+    def test_numerology(self):
+        report = self._run("numerology")
+
+        self.assertEqual(report["scenarios"]["numerology"]["completed"], 1, report["scenarios"])
+
+    def test_dashboard(self):
+        report = self._run("dashboard")
+
+        self.assertEqual(report["scenarios"]["dashboard"]["completed"], 1, report["scenarios"])
+        self.assertEqual(report["endpoints"]["GET /api/v1/auth/dashboard/"]["requests"], 2)
+
+    def test_failures_are_reported_per_scenario(self):
+        self.allow_request.return_value = False
+        self.enterContext(mock.patch("rest_framework.throttling.SimpleRateThrottle.wait", return_value=60))
+
+        report = self._run("numerology")
+
+        self.assertEqual(report["scenarios"]["numerology"]["failed"], 1)
+        create = report["endpoints"]["POST /api/v1/numerology/"]
+        self.assertEqual(create["throttled"], 1)
+        self.assertEqual(create["errors"], 0)
+
+
+class CompareReportsTests(TestCase):
+    def test_p95_change_against_baseline(self):
+        def report(p95, queries):
+            return {
+                "endpoints": {
+                    "GET /x/": {"latency_ms": {"p95": p95}, "error_rate": 0.0, "db_queries": {"mean": queries}},
+                }
+            }
+
+        (row,) = compare_reports(report(150.0, 12), report(100.0, 4))
+
+        self.assertEqual(row["p95_change"], 0.5)
+        self.assertEqual((row["db_queries_mean"], row["db_queries_mean_baseline"]), (12, 4))
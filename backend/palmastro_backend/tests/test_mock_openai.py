@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import io
+import json
+from unittest import mock
+
+import astrology.tasks
+import numerology.tasks
+import readings.tasks
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from openai import APITimeoutError, InternalServerError, OpenAI, RateLimitError
+from PIL import Image
+
+from palmastro_backend.benchmarking import CANNED_NUMEROLOGY_RESPONSE
+from palmastro_backend.mock_openai import MockOpenAIConfig, start_mock_openai_server
+from palmastro_backend.openai_client import reset_openai_client
+
+
+def _jpeg():
+    out = io.BytesIO()
+    Image.new("RGB", (64, 64), (200, 160, 140)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+class _MockServerMixin:
+    def start(self, **config):
+        server = start_mock_openai_server(MockOpenAIConfig(latency_ms=0, **config))
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return server
+
+    def openai(self, server, **options):
+        # No SDK retries: each injected fault surfaces as one exception.
+        return OpenAI(api_key="test-key", base_url=server.base_url, max_retries=0, **options)
+
+
+@mock.patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"})
+@override_settings(MODEL_GUARD_ENABLED=False)
+class MockOpenAIPipelineTests(_MockServerMixin, SimpleTestCase):
+    """OPENAI_BASE_URL alone sends every pipeline's calls to the stand-in."""
+
+    def setUp(self):
+        cache.clear()
+        server = self.start()
+        reset_openai_client()
+        self.addCleanup(reset_openai_client)
+        self.enterContext(override_settings(OPENAI_BASE_URL=server.base_url))
+        self.server = server
+
+    def test_palm_validation_and_analysis(self):
+        self.assertTrue(readings.tasks.is_palm_image(_jpeg()))
+
+        result = readings.tasks._call_gpt_palm_model(_jpeg())
+
+        self.assertIn("lines", result)
+        self.assertEqual(self.server.stats["completions"], 2)
+
+    def test_streamed_palm_analysis(self):
+        sections = []
+
+        result = readings.tasks._stream_gpt_palm_model(_jpeg(), lambda key, value: sections.append(key))
+
+        self.assertIn("lines", result)
+        self.assertTrue(sections)
+
+    def test_astrology_answer_follows_the_prompt_schema(self):
+        result = astrology.tasks._call_openai("Analyze this birth chart")
+
+        for key in ("overview", "personality", "planetary_positions", "career_path", "spiritual_message"):
+            self.assertIn(key, result)
+
+    def test_numerology_answer_follows_the_prompt_schema(self):
+        result = numerology.tasks._call_openai("Generate a numerology profile")
+
+        self.assertEqual(result, CANNED_NUMEROLOGY_RESPONSE)
+
+
+class MockOpenAIFaultTests(_MockServerMixin, SimpleTestCase):
+    REQUEST = {"model": "gpt-4o-mini", "messages": [{"role": "system", "content": "You are a master numerologist."}]}
+
+    def test_usage_is_reported(self):
+        response = self.openai(self.start()).chat.completions.create(**self.REQUEST)
+
+        self.assertEqual(json.loads(response.choices[0].message.content), CANNED_NUMEROLOGY_RESPONSE)
+        self.assertGreater(response.usage.completion_tokens, 0)
+        self.assertEqual(
+            response.usage.total_tokens, response.usage.prompt_tokens + response.usage.completion_tokens
+        )
+
+    def test_stream_ends_with_usage_chunk(self):
+        stream = self.openai(self.start(stream_chunks=5)).chat.completions.create(
+            **self.REQUEST, stream=True, stream_options={"include_usage": True}
+        )
+        chunks = list(stream)
+
+        text = "".join(c.choices[0].delta.content or "" for c in chunks if c.choices)
+        self.assertEqual(json.loads(text), CANNED_NUMEROLOGY_RESPONSE)
+        self.assertEqual(chunks[-1].choices, [])
+        self.assertGreater(chunks[-1].usage.total_tokens, 0)
+
+    def test_rate_limit_carries_retry_hint(self):
+        server = self.start(rate_429=1.0, retry_after_seconds=3)
+
+        with self.assertRaises(RateLimitError) as ctx:
+            self.openai(server).chat.completions.create(**self.REQUEST)
+
+        self.assertIn("try again in 3s", str(ctx.exception))
+        self.assertEqual(ctx.exception.response.headers["retry-after"], "3")
+        self.assertEqual(server.stats["rate_limited"], 1)
+
+    def test_server_error(self):
+        with self.assertRaises(InternalServerError):
+            self.openai(self.start(rate_500=1.0)).chat.completions.create(**self.REQUEST)
+
+    def test_timeout(self):
+        server = self.start(rate_timeout=1.0, timeout_seconds=2)
+
+        with self.assertRaises(APITimeoutError):
+            self.openai(server, timeout=0.2).chat.completions.create(**self.REQUEST)
+
+    def test_fault_rates_are_shares_of_requests(self):
+        server = self.start(rate_429=0.2, rate_500=0.1, seed=7)
+
+        faults = [server.pick_fault() for _ in range(2000)]
+
+        self.assertAlmostEqual(faults.count("429") / 2000, 0.2, delta=0.03)
+        self.assertAlmostEqual(faults.count("500") / 2000, 0.1, delta=0.03)
+        self.assertEqual(faults.count("timeout"), 0)
+
+    def test_latency_distributions(self):
+        uniform = self.start()
+        uniform.config = MockOpenAIConfig(latency_ms=100, latency_distribution="uniform", jitter_ms=20)
+        draws = [uniform.draw_latency() for _ in range(200)]
+        self.assertTrue(all(0.08 <= d <= 0.12 for d in draws))
+
+        lognormal = self.start()
+        lognormal.config = MockOpenAIConfig(latency_ms=100, latency_distribution="lognormal", latency_sigma=0.5)
+        draws = sorted(lognormal.draw_latency() for _ in range(1001))
+        self.assertAlmostEqual(draws[500], 0.1, delta=0.02)
+
+    def test_rejects_invalid_config(self):
+        with self.assertRaises(ValueError):
+            MockOpenAIConfig(latency_distribution="pareto")
+        with self.assertRaises(ValueError):
+            MockOpenAIConfig(rate_429=0.6, rate_500=0.6)
@@ -0,0 +1,217 @@
+from __future__ import annotations
+
+import asyncio
+import io
+from unittest import mock
+
+import httpx
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from openai import APITimeoutError, BadRequestError, RateLimitError
+from PIL import Image
+
+from palmastro_backend import model_guard
+from palmastro_backend.model_guard import (
+    ModelUnavailable,
+    aguarded_create,
+    estimate_tokens,
+    get_model_guard_stats,
+    guarded_create,
+    reset_model_guard,
+)
+from readings.models import Reading
+
+_REQUEST = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+
+
+def _status_error(cls, code):
+    return cls("error", response=httpx.Response(code, request=_REQUEST), body=None)
+
+
+class _Clock:
+    """Stands in for the `time` module: sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+class _GuardTestMixin:
+    def setUp(self):
+        cache.clear()
+        reset_model_guard()
+        self.addCleanup(reset_model_guard)
+        self.clock = _Clock()
+        self.enterContext(mock.patch.object(model_guard, "time", self.clock))
+
+
+@override_settings(
+    MODEL_GUARD_ENABLED=True,
+    MODEL_LIMITER_REDIS_URL="",
+    MODEL_RATE_LIMIT_RPM=0,
+    MODEL_RATE_LIMIT_TPM=0,
+    MODEL_BREAKER_FAILURE_THRESHOLD=3,
+    MODEL_BREAKER_COOLDOWN_SECONDS=30,
+)
+class ModelGuardTests(_GuardTestMixin, SimpleTestCase):
+    def test_estimate_tokens_counts_text_images_and_answer_cap(self):
+        request = {
+            "messages": [
+                {"role": "system", "content": "x" * 400},
+                {"role": "user", "content": [{"type": "text", "text": "y" * 40}, {"type": "image_url"}]},
+            ],
+            "max_tokens": 2000,
+        }
+
+        self.assertEqual(estimate_tokens(request), 100 + 10 + model_guard.IMAGE_TOKENS + 2000)
+
+    @override_settings(MODEL_RATE_LIMIT_RPM=2, MODEL_RATE_LIMIT_MAX_WAIT_SECONDS=5)
+    def test_request_bucket_refuses_calls_that_would_wait_too_long(self):
+        create = mock.Mock(return_value="ok")
+        guarded_create(create, {})
+        guarded_create(create, {})
+
+        with self.assertRaises(ModelUnavailable) as ctx:
+            guarded_create(create, {})
+
+        self.assertEqual(create.call_count, 2)
+        # Two requests per minute refill one every 30 seconds.
+        self.assertEqual(ctx.exception.wait, 30)
+        self.assertEqual(ctx.exception.status_code, 503)
+
+    @override_settings(MODEL_RATE_LIMIT_TPM=1000)
+    def test_token_bucket_waits_for_refill(self):
+        create = mock.Mock(return_value="ok")
+        request = {"messages": [], "max_tokens": 600}
+
+        guarded_create(create, request)
+        guarded_create(create, request)
+
+        self.assertEqual(create.call_count, 2)
+        self.assertEqual(len(self.clock.slept), 1)
+        # 200 missing tokens at 1000/min take 12 s, plus up to 1 s of jitter.
+        self.assertGreaterEqual(self.clock.slept[0], 12)
+        self.assertLessEqual(self.clock.slept[0], 13)
+        self.assertEqual(get_model_guard_stats()["throttled"], 1)
+
+    def test_breaker_opens_after_sustained_failures(self):
+        create = mock.Mock(side_effect=APITimeoutError(request=_REQUEST))
+        for _ in range(3):
+            with self.assertRaises(APITimeoutError):
+                guarded_create(create, {})
+
+        with self.assertRaises(ModelUnavailable) as ctx:
+            guarded_create(create, {})
+
+        self.assertEqual(create.call_count, 3)
+        self.assertEqual(ctx.exception.wait, 30)
+        stats = get_model_guard_stats()
+        self.assertEqual(stats["breaker"], "open")
+        self.assertEqual(stats["breaker_opened"], 1)
+
+    def test_success_resets_failure_count(self):
+        create = mock.Mock(side_effect=[_status_error(RateLimitError, 429)] * 2 + ["ok"] + [_status_error(RateLimitError, 429)] * 2)
+        for _ in range(5):
+            try:
+                guarded_create(create, {})
+            except RateLimitError:
+                pass
+
+        self.assertEqual(get_model_guard_stats()["breaker"], "closed")
+
+    def test_client_errors_do_not_count(self):
+        create = mock.Mock(side_effect=_status_error(BadRequestError, 400))
+        for _ in range(5):
+            with self.assertRaises(BadRequestError):
+                guarded_create(create, {})
+
+        self.assertEqual(create.call_count, 5)
+        self.assertEqual(get_model_guard_stats()["breaker"], "closed")
+
+    def test_probe_after_cooldown_closes_breaker(self):
+        self._trip()
+        self.clock.now += 31
+        create = mock.Mock(return_value="ok")
+
+        self.assertEqual(guarded_create(create, {}), "ok")
+        self.assertEqual(get_model_guard_stats()["breaker"], "closed")
+
+    def test_only_one_probe_at_a_time(self):
+        self._trip()
+        self.clock.now += 31
+
+        def probe(**kwargs):
+            # A second caller while the probe is in flight is refused.
+            with self.assertRaises(ModelUnavailable):
+                guarded_create(mock.Mock(), {})
+            return "ok"
+
+        self.assertEqual(guarded_create(probe, {}), "ok")
+
+    def test_failed_probe_reopens_breaker(self):
+        self._trip()
+        self.clock.now += 31
+
+        with self.assertRaises(APITimeoutError):
+            guarded_create(mock.Mock(side_effect=APITimeoutError(request=_REQUEST)), {})
+
+        stats = get_model_guard_stats()
+        self.assertEqual(stats["breaker"], "open")
+        self.assertEqual(stats["breaker_opened"], 2)
+
+    def test_async_calls_share_the_breaker(self):
+        async def failing(**kwargs):
+            raise APITimeoutError(request=_REQUEST)
+
+        async def run():
+            for _ in range(3):
+                with self.assertRaises(APITimeoutError):
+                    await aguarded_create(failing, {})
+            await aguarded_create(failing, {})
+
+        with self.assertRaises(ModelUnavailable):
+            asyncio.run(run())
+
+    @override_settings(MODEL_GUARD_ENABLED=False)
+    def test_disabled_guard_calls_through(self):
+        self._trip()
+        create = mock.Mock(return_value="ok")
+
+        self.assertEqual(guarded_create(create, {"model": "m"}), "ok")
+        create.assert_called_once_with(model="m")
+
+    def _trip(self):
+        failing = mock.Mock(side_effect=APITimeoutError(request=_REQUEST))
+        for _ in range(3):
+            with self.assertRaises(APITimeoutError):
+                guarded_create(failing, {})
+
+
+@override_settings(MODEL_BREAKER_FAILURE_THRESHOLD=1, READING_UPLOAD_MODE="async")
+class OpenBreakerViewTests(_GuardTestMixin, TestCase):
+    def test_upload_gets_503_with_retry_after(self):
+        with self.assertRaises(APITimeoutError):
+            guarded_create(mock.Mock(side_effect=APITimeoutError(request=_REQUEST)), {})
+        image = io.BytesIO()
+        Image.new("RGB", (64, 64), (200, 160, 140)).save(image, format="JPEG")
+        upload = SimpleUploadedFile("palm.jpg", image.getvalue(), content_type="image/jpeg")
+
+        with mock.patch("readings.views.process_palm_reading.delay") as delay:
+            response = self.client.post(reverse("readings:reading-upload"), {"image": upload})
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "30")
+        delay.assert_not_called()
+        self.assertFalse(Reading.objects.exists())
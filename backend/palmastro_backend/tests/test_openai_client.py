@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import http.server
+import json
+import threading
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from palmastro_backend import openai_client
+from palmastro_backend.openai_client import (
+    get_connection_stats,
+    get_openai_client,
+    openai_model,
+    reset_openai_client,
+)
+
+COMPLETION = {
+    "id": "chatcmpl-test",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4o-mini",
+    "choices": [
+        {
+            "index": 0,
+            "message": {"role": "assistant", "content": "{}"},
+            "finish_reason": "stop",
+        }
+    ],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}
+
+
+class _CompletionHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        body = json.dumps(COMPLETION).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@mock.patch.dict("os.environ", {"OPENAI_API_KEY": "test-key"})
+class SharedOpenAIClientTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        reset_openai_client()
+        self.addCleanup(reset_openai_client)
+
+    def test_client_is_shared_within_a_process(self):
+        self.assertIs(get_openai_client(), get_openai_client())
+
+    def test_client_is_rebuilt_after_fork(self):
+        parent = get_openai_client()
+        with mock.patch.object(openai_client.os, "getpid", return_value=-1):
+            child = get_openai_client()
+        self.assertIsNot(parent, child)
+
+    def test_missing_api_key_raises(self):
+        with mock.patch.dict("os.environ", {"OPENAI_API_KEY": ""}):
+            with self.assertRaises(RuntimeError):
+                get_openai_client()
+
+    @override_settings(OPENAI_MODEL="gpt-4o-mini", ASTROLOGY_MODEL="gpt-4o")
+    def test_per_feature_model_override(self):
+        self.assertEqual(openai_model("astrology"), "gpt-4o")
+        self.assertEqual(openai_model("palm"), "gpt-4o-mini")
+
+    def test_connections_are_reused_across_requests(self):
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _CompletionHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        base_url = f"http://127.0.0.1:{server.server_port}/v1"
+        with override_settings(OPENAI_BASE_URL=base_url):
+            for _ in range(3):
+                get_openai_client().chat.completions.create(
+                    model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}]
+                )
+
+        stats = get_connection_stats()
+        self.assertEqual(stats["requests"], 3)
+        self.assertEqual(stats["connections_opened"], 1)
+        self.assertEqual(stats["connections_reused"], 2)
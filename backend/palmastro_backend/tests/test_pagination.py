@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from readings.models import EventLog, Reading
+
+
+class KeysetPaginationTests(TestCase):
+    url = reverse("readings:reading-list")
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="ada", email="ada@example.com", password="x")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        created = timezone.now()
+        for i in range(7):
+            Reading.objects.create(user=self.user)
+        # Two readings with the same timestamp: the id breaks the tie.
+        Reading.objects.update(created_at=created)
+        for i, reading in enumerate(Reading.objects.order_by("id")[:5]):
+            Reading.objects.filter(pk=reading.pk).update(created_at=created - timedelta(minutes=i))
+        self.expected = [
+            str(pk) for pk in Reading.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        ]
+
+    def _page(self, query="?limit=3"):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_pages_cover_every_reading_once(self):
+        seen = []
+        query = "?limit=3"
+        while query:
+            page = self._page(query)
+            seen += [r["id"] for r in page["results"]]
+            query = page["next"]
+
+        self.assertEqual(seen, self.expected)
+
+    def test_previous_pages(self):
+        first = self._page()
+        second = self._page(first["next"])
+        third = self._page(second["next"])
+
+        self.assertIsNone(first["previous"])
+        self.assertIsNone(third["next"])
+        self.assertEqual(self._page(third["previous"])["results"], second["results"])
+        self.assertEqual(self._page(second["previous"])["results"], first["results"])
+
+    def test_deep_pages_cost_the_same_as_the_first(self):
+        third = self._page(self._page()["next"])["next"]
+
+        with self.assertNumQueries(2):  # the page and the total
+            self._page(third)
+
+    def test_count_comes_from_the_aggregates(self):
+        self.assertEqual(self._page()["count"], 7)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url + "?cursor=bm9wZQ")
+
+        self.assertEqual(response.status_code, 404)
+
+    def test_event_list(self):
+        admin = get_user_model().objects.create_superuser(username="root", email="root@example.com", password="x")
+        self.client.force_authenticate(admin)
+        for i in range(3):
+            EventLog.objects.create(event_type=f"event-{i}")
+
+        first = self.client.get(reverse("readings:event-list") + "?limit=2").json()
+        second = self.client.get(reverse("readings:event-list") + first["next"]).json()
+
+        types = [e["event_type"] for e in first["results"] + second["results"]]
+        self.assertEqual(sorted(types), ["event-0", "event-1", "event-2"])
+        self.assertIsNone(second["next"])
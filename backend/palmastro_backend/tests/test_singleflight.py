@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+from datetime import date
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, TransactionTestCase, override_settings
+
+from numerology.models import NumerologyRequest, NumerologyStatus
+from numerology.tasks import process_numerology_request
+from numerology.utils import compute_numerology
+from palmastro_backend import singleflight
+from palmastro_backend.singleflight import (
+    asingle_flight,
+    get_single_flight_stats,
+    request_key,
+    single_flight,
+)
+
+
+def _in_thread(target, results, key):
+    def run():
+        try:
+            results[key] = target()
+        except Exception as exc:  # noqa: BLE001
+            results[key] = exc
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def _watch_waiters(test):
+    """Patch the claim step; the returned semaphore is released per wait."""
+    waiting = threading.Semaphore(0)
+    claim = singleflight._claim
+
+    def watched(*args):
+        outcome = claim(*args)
+        if outcome[0] == singleflight._WAIT:
+            waiting.release()
+        return outcome
+
+    test.enterContext(mock.patch.object(singleflight, "_claim", watched))
+    return waiting
+
+
+@override_settings(SINGLE_FLIGHT_POLL_SECONDS=0.01)
+class SingleFlightTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_callers_share_one_call(self):
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return {"score": 71}
+
+        waiting = _watch_waiters(self)
+        results = {}
+        threads = [_in_thread(lambda: single_flight("img", compute, kind="palm"), results, 0)]
+        self.assertTrue(started.wait(5))
+        threads += [
+            _in_thread(lambda: single_flight("img", compute, kind="palm"), results, i)
+            for i in (1, 2)
+        ]
+        self.assertTrue(waiting.acquire(timeout=5) and waiting.acquire(timeout=5))
+        release.set()
+        for thread in threads:
+            thread.join(5)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(list(results.values()), [{"score": 71}] * 3)
+        stats = get_single_flight_stats()
+        self.assertEqual(stats["model_calls"], 1)
+        self.assertEqual(stats["coalesced"], 2)
+        self.assertEqual(stats["by_kind"]["palm"], {"model_calls": 1, "coalesced": 2})
+
+    def test_waiter_takes_over_when_leader_fails(self):
+        started, release = threading.Event(), threading.Event()
+
+        def failing():
+            started.set()
+            release.wait(5)
+            raise ValueError("upstream error")
+
+        waiting = _watch_waiters(self)
+        results = {}
+        leader = _in_thread(lambda: single_flight("img", failing), results, "leader")
+        self.assertTrue(started.wait(5))
+        waiter = _in_thread(lambda: single_flight("img", lambda: "second"), results, "waiter")
+        self.assertTrue(waiting.acquire(timeout=5))
+        release.set()
+        leader.join(5)
+        waiter.join(5)
+
+        self.assertIsInstance(results["leader"], ValueError)
+        self.assertEqual(results["waiter"], "second")
+        self.assertEqual(get_single_flight_stats()["coalesced"], 0)
+
+    @override_settings(SINGLE_FLIGHT_ENABLED=False)
+    def test_disabled_always_calls(self):
+        compute = mock.Mock(return_value="result")
+        single_flight("img", compute)
+        single_flight("img", compute)
+        self.assertEqual(compute.call_count, 2)
+
+    def test_async_callers_share_one_call(self):
+        calls = []
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "result"
+
+        async def run():
+            return await asyncio.gather(
+                *(asingle_flight("prompt", compute, kind="numerology") for _ in range(3))
+            )
+
+        self.assertEqual(asyncio.run(run()), ["result"] * 3)
+        self.assertEqual(len(calls), 1)
+
+    def test_request_key_ignores_row_ids(self):
+        first = {"model": "m", "messages": [{"content": "Request ID: a1 / John"}]}
+        second = {"model": "m", "messages": [{"content": "Request ID: b2 / John"}]}
+        other = {"model": "m", "messages": [{"content": "Request ID: b2 / Jane"}]}
+
+        key = request_key("numerology", first, exclude=["a1"])
+        self.assertEqual(key, request_key("numerology", second, exclude=["b2"]))
+        self.assertNotEqual(key, request_key("numerology", other, exclude=["b2"]))
+
+
+@override_settings(SINGLE_FLIGHT_POLL_SECONDS=0.01)
+class NumerologySingleFlightTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _create(self):
+        numbers = compute_numerology("John Doe", date(1990, 1, 5))
+        return NumerologyRequest.objects.create(
+            full_name="John Doe",
+            normalized_name=numbers["normalized_name"],
+            birth_date=date(1990, 1, 5),
+            computed_numbers=numbers,
+        )
+
+    def test_identical_requests_keep_their_own_rows(self):
+        started, release = threading.Event(), threading.Event()
+
+        def call_openai(prompt):
+            started.set()
+            release.wait(5)
+            return {"summary": "ok"}
+
+        waiting = _watch_waiters(self)
+        first, second = self._create(), self._create()
+        with mock.patch("numerology.tasks._call_openai", side_effect=call_openai) as call:
+            results = {}
+            leader = _in_thread(lambda: process_numerology_request(str(first.id)), results, 0)
+            self.assertTrue(started.wait(5))
+            waiter = _in_thread(lambda: process_numerology_request(str(second.id)), results, 1)
+            self.assertTrue(waiting.acquire(timeout=5))
+            release.set()
+            leader.join(5)
+            waiter.join(5)
+
+        self.assertEqual(call.call_count, 1)
+        for nreq in (first, second):
+            nreq.refresh_from_db()
+            self.assertEqual(nreq.status, NumerologyStatus.COMPLETED)
+            self.assertEqual(nreq.openai_result, {"summary": "ok"})
+        self.assertEqual(get_single_flight_stats()["by_kind"]["numerology"]["coalesced"], 1)
+
+    @mock.patch("numerology.tasks._call_openai", return_value={"summary": "ok"})
+    def test_later_request_starts_a_new_flight(self, call_openai):
+        process_numerology_request(str(self._create().id))
+        process_numerology_request(str(self._create().id))
+
+        self.assertEqual(call_openai.call_count, 2)
@@ -0,0 +1,316 @@
+"""
+Dashboard aggregates maintained on reading writes.
+
+Every reading counts towards the ReadingStats row of its type and the
+ReadingDailyStats row of its creation day, once for all readings and once
+for its user. What a reading contributes (count, accuracy, insights) is a
+function of the row alone, so the post_save receiver takes what the row
+contributed when it was loaded, compares it with what it contributes now and
+applies the difference with F() updates, inside the transaction of the save
+(see Reading.save). Saves that change nothing the aggregates use (status
+moves before completion, image cleanup) cost no queries.
+
+Accuracy and insights come from the Reading score columns, or from the
+result for readings whose columns are not filled yet (accuracy_pct NULL).
+
+Writes that bypass model signals (QuerySet.update, bulk_create, raw SQL) are
+not seen; `manage.py rebuild_reading_stats` recomputes everything from the
+readings table.
+"""
+
+from __future__ import annotations
+
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import TruncDate
+from django.db.models.signals import post_delete, post_init, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Reading, ReadingDailyStats, ReadingStats
+from .scoring import (
+    OverallAccuracy,
+    accuracy_pct,
+    backfill_scores,
+    insights_count,
+    overall_accuracy,
+    reading_type_of,
+)
+
+GLOBAL_SCOPE = "all"
+
+# Reading fields the aggregates depend on, and the attribute that remembers
+# their values (or the resulting Contribution) on each instance.
+TRACKED_FIELDS = ("reading_type", "status", "result", "user_id", "created_at", "accuracy_pct", "insights_count")
+_UPDATE_FIELDS = {
+    "reading_type",
+    "status",
+    "result",
+    "user",
+    "user_id",
+    "created_at",
+    "accuracy_pct",
+    "insights_count",
+}
+_REMEMBERED = "_aggregate_contribution"
+
+
+def user_scope(user_id: Any) -> str:
+    return f"user:{user_id}"
+
+
+class _State(NamedTuple):
+    reading_type: str
+    status: str
+    result: Any
+    user_id: Any
+    created_at: Optional[datetime]
+    accuracy_pct: Optional[int]
+    insights_count: Optional[int]
+
+
+@dataclass(frozen=True)
+class Contribution:
+    scopes: Tuple[str, ...]
+    reading_type: str
+    day: date
+    accuracy: int  # 0: none
+    insights: int
+    overall_accuracy: Optional[int]
+
+
+def contribution(reading: Any) -> Contribution:
+    """What `reading` (a Reading or remembered state) adds to the aggregates."""
+    reading_type = reading_type_of(reading)
+    created = reading.created_at or timezone.now()
+    scopes = (GLOBAL_SCOPE,) if reading.user_id is None else (GLOBAL_SCOPE, user_scope(reading.user_id))
+    accuracy = reading.accuracy_pct
+    if accuracy is None:
+        accuracy, insights = accuracy_pct(reading, reading_type), insights_count(reading, reading_type)
+    else:
+        insights = reading.insights_count
+    return Contribution(
+        scopes=scopes,
+        reading_type=reading_type,
+        day=created.astimezone(dt_timezone.utc).date(),
+        accuracy=accuracy,
+        insights=insights,
+        overall_accuracy=overall_accuracy(reading.result),
+    )
+
+
+def remember_contribution(reading: Reading) -> None:
+    """Record the tracked values as loaded (None if any field is deferred)."""
+    values = reading.__dict__
+    if all(field in values for field in TRACKED_FIELDS):
+        state = _State(*(values[field] for field in TRACKED_FIELDS))
+    else:
+        state = None
+    values[_REMEMBERED] = state
+
+
+def _previous(reading: Reading) -> Optional[Contribution]:
+    state = reading.__dict__.get(_REMEMBERED)
+    if state is None or isinstance(state, Contribution):
+        return state
+    return contribution(state)
+
+
+def _accumulate_stats(c: Contribution, sign: int, stats: Dict) -> None:
+    for scope in c.scopes:
+        row = stats[(scope, c.reading_type)]
+        row["readings"] += sign
+        row["accuracy_sum"] += sign * c.accuracy
+        row["accuracy_count"] += sign * (c.accuracy > 0)
+        row["insights"] += sign * c.insights
+
+
+def _accumulate(c: Contribution, sign: int, stats: Dict, daily: Dict) -> None:
+    _accumulate_stats(c, sign, stats)
+    for scope in c.scopes:
+        day = daily[(scope, c.day)]
+        day["readings"] += sign
+        if c.overall_accuracy is not None:
+            day["accuracy_sum"] += sign * c.overall_accuracy
+            day["accuracy_count"] += sign
+
+
+def _bump(model, lookup: Dict[str, Any], deltas: Counter) -> None:
+    deltas = {field: value for field, value in deltas.items() if value}
+    if not deltas:
+        return
+    updates = {field: F(field) + value for field, value in deltas.items()}
+    if model.objects.filter(**lookup).update(**updates):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, **deltas)
+    except IntegrityError:  # created concurrently
+        model.objects.filter(**lookup).update(**updates)
+
+
+def apply_change(old: Optional[Contribution], new: Optional[Contribution]) -> None:
+    """Move the aggregates from `old` to `new` (either may be None)."""
+    if old == new:
+        return
+    stats: Dict = defaultdict(Counter)
+    daily: Dict = defaultdict(Counter)
+    if old is not None:
+        _accumulate(old, -1, stats, daily)
+    if new is not None:
+        _accumulate(new, 1, stats, daily)
+    with transaction.atomic():
+        for (scope, reading_type), deltas in stats.items():
+            _bump(ReadingStats, {"scope": scope, "reading_type": reading_type}, deltas)
+        for (scope, day), deltas in daily.items():
+            _bump(ReadingDailyStats, {"scope": scope, "day": day}, deltas)
+
+
+def daily_totals() -> Dict[Tuple[str, date], Counter]:
+    """
+    Readings and `accuracy.overall` sum/count per scope and UTC day, from one
+    grouped query over the readings table (no result documents are loaded).
+    """
+    rows = (
+        Reading.objects.annotate(
+            day=TruncDate("created_at", tzinfo=dt_timezone.utc), overall=OverallAccuracy()
+        )
+        .order_by()
+        .values("user_id", "day")
+        .annotate(readings=Count("pk"), accuracy_sum=Sum("overall"), accuracy_count=Count("overall"))
+    )
+    daily: Dict = defaultdict(Counter)
+    for row in rows:
+        scopes = [GLOBAL_SCOPE] if row["user_id"] is None else [GLOBAL_SCOPE, user_scope(row["user_id"])]
+        for scope in scopes:
+            totals = daily[(scope, row["day"])]
+            totals["readings"] += row["readings"]
+            totals["accuracy_sum"] += row["accuracy_sum"] or 0
+            totals["accuracy_count"] += row["accuracy_count"]
+    return daily
+
+
+def stats_totals() -> Dict[Tuple[str, str], Counter]:
+    """
+    Readings, accuracy sum/count and insights per scope and reading type,
+    from one grouped query over the score columns. Expects the columns to be
+    filled (see `backfill_scores`); unfilled readings count no accuracy and
+    no insights.
+    """
+    stats: Dict = defaultdict(Counter)
+    # Readings stored before reading_type existed take their type from the result.
+    for reading in Reading.objects.filter(reading_type="").iterator():
+        _accumulate_stats(contribution(reading), 1, stats)
+    rows = (
+        Reading.objects.exclude(reading_type="")
+        .order_by()
+        .values("user_id", "reading_type")
+        .annotate(
+            readings=Count("pk"),
+            accuracy_sum=Sum("accuracy_pct"),
+            accuracy_count=Count("pk", filter=Q(accuracy_pct__gt=0)),
+            insights=Sum("insights_count"),
+        )
+    )
+    for row in rows:
+        scopes = [GLOBAL_SCOPE] if row["user_id"] is None else [GLOBAL_SCOPE, user_scope(row["user_id"])]
+        for scope in scopes:
+            totals = stats[(scope, row["reading_type"])]
+            totals["readings"] += row["readings"]
+            totals["accuracy_sum"] += row["accuracy_sum"] or 0
+            totals["accuracy_count"] += row["accuracy_count"]
+            totals["insights"] += row["insights"] or 0
+    return stats
+
+
+def rebuild() -> Tuple[int, int]:
+    """
+    Recompute all aggregates from the readings table, after filling missing
+    score columns. Returns the number of ReadingStats and ReadingDailyStats
+    rows written.
+    """
+    backfill_scores()
+    with transaction.atomic():
+        stats = stats_totals()
+        daily = daily_totals()
+        ReadingStats.objects.all().delete()
+        ReadingDailyStats.objects.all().delete()
+        ReadingStats.objects.bulk_create(
+            ReadingStats(scope=scope, reading_type=reading_type, **values)
+            for (scope, reading_type), values in stats.items()
+        )
+        ReadingDailyStats.objects.bulk_create(
+            ReadingDailyStats(scope=scope, day=day, **values) for (scope, day), values in daily.items()
+        )
+    return len(stats), len(daily)
+
+
+def total_readings(scope: str = GLOBAL_SCOPE) -> int:
+    """Number of readings of `scope`, from the type totals."""
+    return ReadingStats.objects.filter(scope=scope).aggregate(total=Sum("readings"))["total"] or 0
+
+
+def dashboard_totals(scope: str = GLOBAL_SCOPE, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """
+    Totals for the dashboard from two indexed reads. Month and week counts
+    cover the last 30 and 7 UTC calendar days, today included; `daily` maps
+    each of the last 30 days to (readings, accuracy_sum, accuracy_count).
+    """
+    today = (now or timezone.now()).astimezone(dt_timezone.utc).date()
+    rows = list(ReadingStats.objects.filter(scope=scope).order_by("-readings", "reading_type"))
+    daily = {
+        row.day: (row.readings, row.accuracy_sum, row.accuracy_count)
+        for row in ReadingDailyStats.objects.filter(scope=scope, day__gt=today - timedelta(days=30))
+    }
+    accuracy_sum = sum(row.accuracy_sum for row in rows)
+    accuracy_count = sum(row.accuracy_count for row in rows)
+    favorite = next((row.reading_type for row in rows if row.readings > 0), None)
+    return {
+        "total_readings": sum(row.readings for row in rows),
+        "readings_this_month": sum(day[0] for day in daily.values()),
+        "readings_this_week": sum(
+            readings for day, (readings, _, _) in daily.items() if day > today - timedelta(days=7)
+        ),
+        "average_accuracy": int(round(accuracy_sum / accuracy_count)) if accuracy_count > 0 else 0,
+        "favorite_reading_type": favorite,
+        "total_insights": sum(row.insights for row in rows),
+        "daily": daily,
+    }
+
+
+@receiver(post_init, sender=Reading, dispatch_uid="readings.aggregates.remember")
+def _remember_on_load(sender, instance: Reading, **kwargs) -> None:
+    remember_contribution(instance)
+
+
+@receiver(pre_save, sender=Reading, dispatch_uid="readings.aggregates.load_deferred")
+def _load_deferred_state(sender, instance: Reading, update_fields=None, **kwargs) -> None:
+    # Instances loaded with deferred fields: read the stored values before
+    # they are overwritten.
+    if instance._state.adding or instance.__dict__.get(_REMEMBERED) is not None:
+        return
+    if update_fields is not None and not _UPDATE_FIELDS.intersection(update_fields):
+        return
+    values = Reading.objects.filter(pk=instance.pk).values_list(*TRACKED_FIELDS).first()
+    if values is not None:
+        instance.__dict__[_REMEMBERED] = _State(*values)
+
+
+@receiver(post_save, sender=Reading, dispatch_uid="readings.aggregates.update")
+def _update_on_save(sender, instance: Reading, created: bool, update_fields=None, **kwargs) -> None:
+    if update_fields is not None and not _UPDATE_FIELDS.intersection(update_fields):
+        return
+    new = contribution(instance)
+    apply_change(None if created else _previous(instance), new)
+    instance.__dict__[_REMEMBERED] = new
+
+
+@receiver(post_delete, sender=Reading, dispatch_uid="readings.aggregates.delete")
+def _update_on_delete(sender, instance: Reading, **kwargs) -> None:
+    apply_change(_previous(instance) or contribution(instance), None)
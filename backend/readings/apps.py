@@ -5,4 +5,5 @@ class ReadingsConfig(AppConfig):
   default_auto_field = "django.db.models.BigAutoField"
   name = "readings"
 
-
+  def ready(self):
+    from . import aggregates, dashboard_cache, signals  # noqa: F401
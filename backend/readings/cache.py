@@ -0,0 +1,116 @@
+"""
+Content-addressed cache for transformed palm analysis results.
+
+Entries are keyed by the SHA-256 of the normalized image bytes plus a version
+fingerprint (prompt template + model + result schema), so a retry with the
+exact same image skips the vision call, while a prompt or model change never
+serves stale results. Entries live in the shared Django cache (Redis in
+production), which provides TTL expiry and LRU eviction across all workers.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from palmastro_backend import metrics
+from palmastro_backend.openai_client import openai_model
+
+log = logging.getLogger(__name__)
+
+# Bump when the shape of the transformed result changes.
+RESULT_SCHEMA_VERSION = "2.0"
+
+HITS = "palm_cache.hits"
+MISSES = "palm_cache.misses"
+MODEL_CALLS = "palm_model.calls"
+MODEL_LATENCY_MS = "palm_model.latency_ms"
+MODEL_TOKENS = "palm_model.tokens"
+
+
+@lru_cache(maxsize=1)
+def _prompt_fingerprint() -> str:
+    template_path = Path(__file__).resolve().parent / "palm_prompt_template.txt"
+    try:
+        data = template_path.read_bytes()
+    except OSError:
+        data = b""
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def _enabled() -> bool:
+    return getattr(settings, "PALM_RESULT_CACHE_ENABLED", True)
+
+
+def palm_result_cache_key(image_bytes: bytes) -> str:
+    image_hash = hashlib.sha256(image_bytes).hexdigest()
+    model = openai_model("palm")
+    return (
+        f"palm:result:{RESULT_SCHEMA_VERSION}:{model}:"
+        f"{_prompt_fingerprint()}:{image_hash}"
+    )
+
+
+def get_cached_palm_result(key: str, record_miss: bool = True) -> Optional[Dict]:
+    """
+    Return the cached transformed result for `key`, counting hits/misses.
+
+    Pass record_miss=False for a pre-check whose miss will be looked up (and
+    counted) again further down the pipeline.
+    """
+    if not _enabled():
+        return None
+    try:
+        result = cache.get(key)
+    except Exception:  # noqa: BLE001
+        log.warning("Palm result cache lookup failed", exc_info=True)
+        result = None
+    if result is not None:
+        metrics.incr(HITS)
+    elif record_miss:
+        metrics.incr(MISSES)
+    return result
+
+
+def set_cached_palm_result(key: str, result: Dict) -> None:
+    if not _enabled() or not result:
+        return
+    try:
+        cache.set(key, result, timeout=settings.PALM_RESULT_CACHE_TTL_SECONDS)
+    except Exception:  # noqa: BLE001
+        log.warning("Failed to store palm result in cache", exc_info=True)
+
+
+def record_model_call(latency_ms: float, tokens: int | None) -> None:
+    """Record one uncached vision call so savings from hits can be estimated."""
+    metrics.incr(MODEL_CALLS)
+    metrics.incr(MODEL_LATENCY_MS, int(latency_ms))
+    if tokens:
+        metrics.incr(MODEL_TOKENS, int(tokens))
+
+
+def get_palm_cache_stats() -> Dict[str, float]:
+    counters = metrics.get_counters(
+        [HITS, MISSES, MODEL_CALLS, MODEL_LATENCY_MS, MODEL_TOKENS]
+    )
+    hits, misses = counters[HITS], counters[MISSES]
+    calls = counters[MODEL_CALLS]
+    avg_latency_ms = counters[MODEL_LATENCY_MS] / calls if calls else 0.0
+    avg_tokens = counters[MODEL_TOKENS] / calls if calls else 0.0
+    lookups = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+        "model_calls": calls,
+        "avg_model_latency_ms": round(avg_latency_ms, 1),
+        "avg_model_tokens": round(avg_tokens, 1),
+        "estimated_latency_saved_ms": int(hits * avg_latency_ms),
+        "estimated_tokens_saved": int(hits * avg_tokens),
+    }
@@ -0,0 +1,161 @@
+"""
+Versioned cache of the dashboard payload.
+
+Each dashboard scope (readings.aggregates: all readings, or one user's) has
+a version counter in the shared cache, and all scopes share a generation
+counter. Payloads are cached under (scope, generation, version, UTC day):
+writing a reading bumps the versions of its scopes once the transaction
+commits, and `invalidate_all` (bulk changes such as rebuild_reading_stats)
+bumps the generation. Nothing is ever deleted, stale entries just stop
+being read and expire.
+
+The same key is the ETag of the response, so a poll whose If-None-Match is
+still current is answered from two cache reads, without the database.
+Counters start from the clock, so a counter lost to eviction never comes
+back with a value it had before.
+
+The counters double as the change sequence of the realtime endpoint:
+`realtime_marker` (reading count, last update) is cached per version too.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from datetime import date
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .aggregates import GLOBAL_SCOPE, total_readings, user_scope
+from .models import Reading
+
+log = logging.getLogger(__name__)
+
+GENERATION_KEY = "dashboard:generation"
+
+
+def _version_key(scope: str) -> str:
+    return f"dashboard:version:{scope}"
+
+
+def _enabled() -> bool:
+    return getattr(settings, "DASHBOARD_CACHE_ENABLED", True)
+
+
+def _bump(key: str) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:  # not set (yet, or evicted)
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def _versions(scope: str) -> Optional[Tuple[int, int]]:
+    """Current (generation, version) of `scope`; None if disabled or unavailable."""
+    if not _enabled():
+        return None
+    keys = [GENERATION_KEY, _version_key(scope)]
+    try:
+        values = cache.get_many(keys)
+        if len(values) < len(keys):
+            for key in keys:
+                if key not in values:
+                    cache.add(key, time.time_ns(), timeout=None)
+            values = cache.get_many(keys)  # another process may have added first
+        return values[GENERATION_KEY], values[_version_key(scope)]
+    except Exception:  # noqa: BLE001
+        log.warning("Dashboard version lookup failed", exc_info=True)
+        return None
+
+
+def dashboard_etag(scope: str, today: date) -> Optional[str]:
+    """Current ETag (and cache key) of the dashboard of `scope`; None if disabled or unavailable."""
+    versions = _versions(scope)
+    if versions is None:
+        return None
+    generation, version = versions
+    return f'"{scope}.{generation}.{version}.{today:%Y%m%d}"'
+
+
+def _payload_key(etag: str) -> str:
+    return "dashboard:payload:" + etag.strip('"')
+
+
+def get_cached_dashboard(etag: Optional[str]) -> Optional[Dict[str, Any]]:
+    if etag is None:
+        return None
+    try:
+        return cache.get(_payload_key(etag))
+    except Exception:  # noqa: BLE001
+        log.warning("Dashboard cache lookup failed", exc_info=True)
+        return None
+
+
+def set_cached_dashboard(etag: Optional[str], payload: Dict[str, Any]) -> None:
+    if etag is None:
+        return
+    try:
+        cache.set(_payload_key(etag), payload, timeout=settings.DASHBOARD_CACHE_TTL_SECONDS)
+    except Exception:  # noqa: BLE001
+        log.warning("Failed to store dashboard payload in cache", exc_info=True)
+
+
+def realtime_marker() -> Dict[str, Any]:
+    """
+    Number of readings and time of the last reading write (None without
+    readings), cached until the next write. Computed from the global type
+    totals and the updated_at index, so misses cost two small queries too.
+    """
+    versions = _versions(GLOBAL_SCOPE)
+    key = None if versions is None else f"dashboard:realtime:{GLOBAL_SCOPE}.{versions[0]}.{versions[1]}"
+    if key is not None:
+        try:
+            marker = cache.get(key)
+        except Exception:  # noqa: BLE001
+            log.warning("Realtime marker lookup failed", exc_info=True)
+            marker = None
+        if marker is not None:
+            return marker
+
+    marker = {
+        "readings_count": total_readings(GLOBAL_SCOPE),
+        "last_update": Reading.objects.aggregate(last=Max("updated_at"))["last"],
+    }
+    if key is not None:
+        try:
+            cache.set(key, marker, timeout=settings.DASHBOARD_CACHE_TTL_SECONDS)
+        except Exception:  # noqa: BLE001
+            log.warning("Failed to store realtime marker in cache", exc_info=True)
+    return marker
+
+
+def bump_versions(scopes: Iterable[str]) -> None:
+    """Invalidate the cached dashboards of `scopes`."""
+    try:
+        for scope in scopes:
+            _bump(_version_key(scope))
+    except Exception:  # noqa: BLE001
+        log.warning("Dashboard version bump failed", exc_info=True)
+
+
+def invalidate_all() -> None:
+    """Invalidate every cached dashboard."""
+    try:
+        _bump(GENERATION_KEY)
+    except Exception:  # noqa: BLE001
+        log.warning("Dashboard generation bump failed", exc_info=True)
+
+
+@receiver(post_save, sender=Reading, dispatch_uid="readings.dashboard_cache.save")
+@receiver(post_delete, sender=Reading, dispatch_uid="readings.dashboard_cache.delete")
+def _bump_on_write(sender, instance: Reading, **kwargs) -> None:
+    # Every save counts: the payload lists recent readings with updated_at.
+    # After commit, so a dashboard built meanwhile from the old rows is not
+    # cached under the new version.
+    scopes = [GLOBAL_SCOPE] if instance.user_id is None else [GLOBAL_SCOPE, user_scope(instance.user_id)]
+    transaction.on_commit(lambda: bump_versions(scopes))
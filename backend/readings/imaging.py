@@ -0,0 +1,200 @@
+"""
+Palm image pre-processing before the vision call.
+
+Phone uploads are often 12 MP JPEGs with EXIF orientation and GPS metadata.
+The model only needs a modest resolution to read palm lines, so images are
+rotated upright, stripped of metadata, cropped to a sane aspect ratio,
+downscaled and re-encoded once. The same encoded bytes are then used by the
+palm validator, the analyzer and the result cache key.
+
+Uploads can be passed as the Django file object itself: Pillow decodes it
+straight from the upload buffer (or spooled temp file), so the original is
+never copied into a separate bytes object unless it has to be passed through.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import time
+from dataclasses import dataclass
+from typing import IO, Union
+
+from django.conf import settings
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from palmastro_backend import metrics
+
+log = logging.getLogger(__name__)
+
+BYTES_IN = "palm_image.bytes_in"
+BYTES_OUT = "palm_image.bytes_out"
+IMAGES = "palm_image.count"
+
+_FORMAT_MIME = {"JPEG": "image/jpeg", "WEBP": "image/webp"}
+
+ImageSource = Union[bytes, IO[bytes]]
+
+
+@dataclass
+class PreparedImage:
+    data: bytes
+    mime: str
+    original_size: int
+    width: int | None = None
+    height: int | None = None
+    processed: bool = False
+    elapsed_ms: float = 0.0
+
+    @property
+    def size(self) -> int:
+        return len(self.data)
+
+
+def detect_image_mime(b: bytes) -> str:
+    """
+    Lightweight magic-number detection so we can build the correct
+    `data:image/<type>;base64,...` URL for OpenAI.
+    """
+    if len(b) >= 3 and b[0:3] == b"\xff\xd8\xff":
+        return "image/jpeg"
+    if len(b) >= 8 and b[0:8] == b"\x89PNG\r\n\x1a\n":
+        return "image/png"
+    # WebP: "RIFF"...."WEBP"
+    if len(b) >= 12 and b[0:4] == b"RIFF" and b[8:12] == b"WEBP":
+        return "image/webp"
+    if len(b) >= 6 and (b[0:6] == b"GIF87a" or b[0:6] == b"GIF89a"):
+        return "image/gif"
+    # HEIC/HEIF: ISO base media file format often starts with:
+    # .... ftyp heic|heix|mif1|msf1 ...
+    if len(b) >= 12 and b[4:8] == b"ftyp":
+        brand = b[8:12]
+        if brand in (b"heic", b"heix"):
+            return "image/heic"
+        if brand in (b"mif1", b"msf1"):
+            return "image/heif"
+    # Fallback: many clients produce JPEGs; keep behavior stable.
+    return "image/jpeg"
+
+
+def _crop_to_aspect(img: Image.Image, max_aspect: float) -> Image.Image:
+    """Center-crop very tall/wide frames so the palm fills the image."""
+    width, height = img.size
+    if not max_aspect or min(width, height) == 0:
+        return img
+    if width / height > max_aspect:
+        new_width = int(height * max_aspect)
+        left = (width - new_width) // 2
+        return img.crop((left, 0, left + new_width, height))
+    if height / width > max_aspect:
+        new_height = int(width * max_aspect)
+        top = (height - new_height) // 2
+        return img.crop((0, top, width, top + new_height))
+    return img
+
+
+def _source_size(source: ImageSource) -> int:
+    if isinstance(source, bytes):
+        return len(source)
+    size = getattr(source, "size", None)
+    if size is None:
+        source.seek(0, io.SEEK_END)
+        size = source.tell()
+    return int(size)
+
+
+def _passthrough(source: ImageSource, original_size: int) -> PreparedImage:
+    if isinstance(source, bytes):
+        data = source
+    else:
+        source.seek(0)
+        data = source.read()
+        source.seek(0)
+    return PreparedImage(
+        data=data,
+        mime=detect_image_mime(data),
+        original_size=original_size,
+    )
+
+
+def prepare_palm_image(source: ImageSource) -> PreparedImage:
+    """
+    Normalize an uploaded palm image for the vision model.
+
+    `source` is the raw bytes or a seekable file object (e.g. an uploaded
+    file), which is decoded in place and left rewound. Images Pillow cannot
+    decode (e.g. HEIC without a plugin) are passed through unchanged so the
+    model can still try them.
+    """
+    started = time.perf_counter()
+    original_size = _source_size(source)
+    if not getattr(settings, "PALM_IMAGE_PREPROCESS_ENABLED", True):
+        return _passthrough(source, original_size)
+
+    max_edge = int(getattr(settings, "PALM_IMAGE_MAX_EDGE", 1024))
+    fmt = str(getattr(settings, "PALM_IMAGE_FORMAT", "JPEG")).upper()
+    if fmt not in _FORMAT_MIME:
+        fmt = "JPEG"
+    quality = int(getattr(settings, "PALM_IMAGE_QUALITY", 80))
+    max_aspect = float(getattr(settings, "PALM_IMAGE_MAX_ASPECT", 2.0))
+
+    if isinstance(source, bytes):
+        stream = io.BytesIO(source)
+    else:
+        source.seek(0)
+        stream = source
+    try:
+        with Image.open(stream) as img:
+            # Let libjpeg decode at reduced scale instead of the full 12 MP.
+            img.draft("RGB", (max_edge, max_edge))
+            img = ImageOps.exif_transpose(img)
+            img = _crop_to_aspect(img, max_aspect)
+            if img.mode != "RGB":
+                img = img.convert("RGB")
+            img.thumbnail((max_edge, max_edge), Image.LANCZOS)
+
+            out = io.BytesIO()
+            # No exif/icc arguments: metadata (GPS, device info) is dropped.
+            img.save(out, format=fmt, quality=quality, optimize=True)
+            width, height = img.size
+    except (UnidentifiedImageError, OSError, ValueError) as exc:
+        log.warning("Could not pre-process palm image (%s); sending original bytes", exc)
+        return _passthrough(source, original_size)
+    finally:
+        if stream is source:
+            source.seek(0)
+
+    prepared = PreparedImage(
+        data=out.getvalue(),
+        mime=_FORMAT_MIME[fmt],
+        original_size=original_size,
+        width=width,
+        height=height,
+        processed=True,
+        elapsed_ms=(time.perf_counter() - started) * 1000,
+    )
+    metrics.incr(IMAGES)
+    metrics.incr(BYTES_IN, original_size)
+    metrics.incr(BYTES_OUT, prepared.size)
+    log.info(
+        "Pre-processed palm image: %d -> %d bytes (%dx%d %s, %.0f ms)",
+        original_size,
+        prepared.size,
+        width,
+        height,
+        fmt,
+        prepared.elapsed_ms,
+    )
+    return prepared
+
+
+def get_preprocessing_stats() -> dict:
+    counters = metrics.get_counters([IMAGES, BYTES_IN, BYTES_OUT])
+    bytes_in, bytes_out = counters[BYTES_IN], counters[BYTES_OUT]
+    return {
+        "images": counters[IMAGES],
+        "bytes_in": bytes_in,
+        "bytes_out": bytes_out,
+        "bytes_saved": bytes_in - bytes_out,
+        "ratio": round(bytes_out / bytes_in, 4) if bytes_in else 0.0,
+    }
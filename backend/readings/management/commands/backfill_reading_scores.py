@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from readings.dashboard_cache import invalidate_all
+from readings.scoring import backfill_scores
+
+
+class Command(BaseCommand):
+    help = (
+        "Fill the score columns (overall_score, accuracy_pct, insights_count, top_prediction_confidence) "
+        "of readings saved before they existed. New and updated readings fill them on save."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=500, help="Readings per query and transaction")
+        parser.add_argument(
+            "--all", action="store_true", help="Recompute every reading, not only those without scores"
+        )
+
+    def handle(self, *args, **options):
+        updated = backfill_scores(
+            chunk_size=max(1, options["chunk_size"]),
+            recompute=options["all"],
+            progress=lambda count: self.stdout.write(f"{count} readings updated..."),
+        )
+        if updated:
+            invalidate_all()
+        self.stdout.write(self.style.SUCCESS(f"Filled the scores of {updated} readings."))
@@ -0,0 +1,142 @@
+"""
+Replay the golden corpora through the palm, astrology and numerology task
+code paths and report throughput with per-stage timings.
+Run: python manage.py benchmark_golden_corpus [--pipeline palm] [--rounds 20]
+     [--streaming] [--output golden.json] [--baseline previous.json]
+     [--max-regression 0.15]
+
+See palmastro_backend.replay. The model answers instantly, so the numbers
+are the cost of our own code: parsing, normalization, database reads and
+writes, and everything else (client, single-flight, orchestration) as
+"other". Rows are written inside a transaction that is rolled back.
+
+A warm-up round checks every outcome against the corpus first; mismatches,
+or a pipeline whose replays/s dropped by more than --max-regression against
+--baseline, fail the command (non-zero exit), so CI can run it as a gate.
+"""
+
+import json
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from palmastro_backend.replay import PIPELINES, STAGES, Replayer, StageTimer, load_corpus
+
+REPORT_VERSION = 1
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = "Benchmark replaying recorded model answers through the task code paths, per stage"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--pipeline",
+            action="append",
+            choices=PIPELINES,
+            help="Pipeline to replay, repeatable (default: all)",
+        )
+        parser.add_argument("--rounds", type=int, default=20, help="Timed passes over each corpus")
+        parser.add_argument("--streaming", action="store_true", help="Stream palm answers section by section")
+        parser.add_argument("--output", help="Write the JSON report here")
+        parser.add_argument("--baseline", help="JSON report of an earlier run to compare with")
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=0.15,
+            help="Allowed drop in replays/s against --baseline (0.15: 15%%)",
+        )
+
+    def handle(self, *args, **options):
+        pipelines = options["pipeline"] or list(PIPELINES)
+        rounds = max(1, options["rounds"])
+
+        mismatches = []
+        results = {}
+        try:
+            with transaction.atomic():
+                for pipeline in pipelines:
+                    results[pipeline] = self._run(pipeline, rounds, options["streaming"], mismatches)
+                raise _Rollback
+        except _Rollback:
+            pass
+        if mismatches:
+            raise CommandError("Outcome differs from the golden corpus: " + ", ".join(mismatches))
+
+        report = {
+            "version": REPORT_VERSION,
+            "meta": {"rounds": rounds, "streaming": options["streaming"]},
+            "pipelines": results,
+        }
+        self._print_report(report)
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2), encoding="utf-8")
+            self.stdout.write(f"Report written to {options['output']}")
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text(encoding="utf-8"))
+            self._check_regressions(report, baseline, options["max_regression"])
+
+    def _run(self, pipeline, rounds, streaming, mismatches):
+        cases = load_corpus(pipeline)
+        timer = StageTimer()
+        with Replayer(timer=timer, streaming=streaming) as replayer:
+            for case in cases:  # warm-up, checked against the corpus
+                if replayer.replay(pipeline, case).as_dict() != case["expected"]:
+                    mismatches.append(f"{pipeline}/{case['name']}")
+            timer.reset()
+
+            started = time.perf_counter()
+            for _ in range(rounds):
+                for case in cases:
+                    replayer.replay(pipeline, case)
+            elapsed = time.perf_counter() - started
+
+        replays = rounds * len(cases)
+        stages = {stage: round(timer.seconds[stage] * 1000 / replays, 3) for stage in STAGES}
+        total_ms = elapsed * 1000 / replays
+        stages["other"] = round(max(0.0, total_ms - sum(stages.values())), 3)
+        return {
+            "cases": len(cases),
+            "replays": replays,
+            "seconds": round(elapsed, 3),
+            "replays_per_s": round(replays / elapsed, 1),
+            "ms_per_replay": round(total_ms, 3),
+            "stage_ms_per_replay": stages,
+        }
+
+    def _print_report(self, report):
+        columns = (*STAGES, "other")
+        self.stdout.write(
+            f"{'pipeline':<12} {'cases':>6} {'replays/s':>10} {'ms/replay':>10} "
+            + " ".join(f"{c:>10}" for c in columns)
+        )
+        for name, row in report["pipelines"].items():
+            stages = row["stage_ms_per_replay"]
+            self.stdout.write(
+                f"{name:<12} {row['cases']:>6} {row['replays_per_s']:>10.1f} {row['ms_per_replay']:>10.3f} "
+                + " ".join(f"{stages[c]:>10.3f}" for c in columns)
+            )
+
+    def _check_regressions(self, report, baseline, max_regression):
+        self.stdout.write(f"\n{'pipeline':<12} {'replays/s':>10} {'before':>10} {'change':>8}")
+        regressed = []
+        for name, row in report["pipelines"].items():
+            before = baseline.get("pipelines", {}).get(name)
+            if not before or not before.get("replays_per_s"):
+                continue
+            change = row["replays_per_s"] / before["replays_per_s"] - 1
+            self.stdout.write(
+                f"{name:<12} {row['replays_per_s']:>10.1f} {before['replays_per_s']:>10.1f} {change:>+8.0%}"
+            )
+            if -change > max_regression:
+                regressed.append(f"{name} ({change:+.0%})")
+        if regressed:
+            raise CommandError(
+                f"Throughput regressed by more than {max_regression:.0%}: " + ", ".join(regressed)
+            )
+        self.stdout.write(self.style.SUCCESS(f"\nNo pipeline regressed by more than {max_regression:.0%}"))
@@ -0,0 +1,129 @@
+"""
+Compare in-flight model calls per worker for the sync and async palm views.
+Run: python manage.py benchmark_openai_concurrency [--requests 100] [--latency-ms 1500]
+
+"sync" drives PalmReadingAnalyzeView from --sync-workers threads, like a
+gunicorn sync worker (one request at a time). "async" drives
+AsyncPalmReadingAnalyzeView with all requests on one event loop, like a
+single uvicorn worker. The OpenAI clients are fakes with a fixed latency.
+"""
+
+import asyncio
+import io
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.test import AsyncRequestFactory, RequestFactory, override_settings
+from PIL import Image
+
+from palmastro_backend.benchmarking import FakeAsyncOpenAI, FakeOpenAI, summarize_latencies
+from palmastro_backend.openai_client import reset_openai_client
+from readings.models import Reading
+from readings.views_palm import AsyncPalmReadingAnalyzeView, PalmReadingAnalyzeView
+
+PATH = "/api/v1/palm-reading/analyze/"
+
+
+def _sample_image(path: str | None) -> bytes:
+    # A small synthetic image by default so the numbers reflect waiting on
+    # the model, not Pillow decoding a 12 MP upload (CPU-bound either way).
+    if path:
+        return Path(path).read_bytes()
+    out = io.BytesIO()
+    Image.new("RGB", (480, 640), (205, 160, 140)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+def _reading_id(response) -> str | None:
+    if hasattr(response, "render"):
+        response.render()
+    return json.loads(response.content).get("reading_id")
+
+
+class Command(BaseCommand):
+    help = "Measure requests in flight per worker for the sync vs async palm analyze view"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=100, help="Requests per mode")
+        parser.add_argument("--latency-ms", type=float, default=1500.0, help="Simulated OpenAI latency per request")
+        parser.add_argument("--image", help="Image file to upload (default: small synthetic JPEG)")
+        parser.add_argument("--sync-workers", type=int, default=1, help="Concurrent requests a sync worker serves")
+
+    def handle(self, *args, **options):
+        total = max(1, options["requests"])
+        latency_ms = options["latency_ms"]
+        image = _sample_image(options["image"])
+        os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+        reading_ids = []
+
+        def upload():
+            return {"image": SimpleUploadedFile("palm.jpg", image, content_type="image/jpeg")}
+
+        # The anonymous rate limit would reject most of the burst.
+        # The model rate limiter would cap the fake API's throughput.
+        with override_settings(
+            MODEL_GUARD_ENABLED=False, PALM_RESULT_CACHE_ENABLED=False, PALM_STANDALONE_VALIDATION=False
+        ), mock.patch.object(PalmReadingAnalyzeView, "throttle_classes", []):
+            # Sync view: each worker thread handles one request at a time.
+            fake = FakeOpenAI(latency_ms=latency_ms)
+            factory = RequestFactory()
+            view = PalmReadingAnalyzeView.as_view()
+
+            def one_sync():
+                started = time.perf_counter()
+                response = view(factory.post(PATH, upload()))
+                reading_ids.append(_reading_id(response))
+                return (time.perf_counter() - started) * 1000, response.status_code
+
+            reset_openai_client()
+            with mock.patch("palmastro_backend.openai_client.OpenAI", fake):
+                started = time.perf_counter()
+                with ThreadPoolExecutor(max_workers=max(1, options["sync_workers"])) as pool:
+                    sync_results = list(pool.map(lambda _: one_sync(), range(total)))
+                sync_wall = time.perf_counter() - started
+            sync_fake = fake
+
+            # Async view: every request is in flight on one event loop.
+            fake = FakeAsyncOpenAI(latency_ms=latency_ms)
+            afactory = AsyncRequestFactory()
+            aview = AsyncPalmReadingAnalyzeView.as_view()
+
+            async def one_async():
+                started = time.perf_counter()
+                response = await aview(afactory.post(PATH, upload()))
+                reading_ids.append(_reading_id(response))
+                return (time.perf_counter() - started) * 1000, response.status_code
+
+            async def run_async():
+                return await asyncio.gather(*(one_async() for _ in range(total)))
+
+            reset_openai_client()
+            with mock.patch("palmastro_backend.openai_client.AsyncOpenAI", fake):
+                started = time.perf_counter()
+                async_results = asyncio.run(run_async())
+                async_wall = time.perf_counter() - started
+            async_fake = fake
+            reset_openai_client()
+
+        Reading.objects.filter(id__in=[r for r in reading_ids if r]).delete()
+
+        self.stdout.write(
+            f"{'mode':<8} {'requests':>8} {'ok':>5} {'max in flight':>14} {'wall s':>8} "
+            f"{'req/s':>7} {'p50 ms':>9} {'p95 ms':>9}"
+        )
+        for label, results, wall, fake in (
+            ("sync", sync_results, sync_wall, sync_fake),
+            ("async", async_results, async_wall, async_fake),
+        ):
+            stats = summarize_latencies([ms for ms, _ in results])
+            ok = sum(1 for _, code in results if code == 200)
+            self.stdout.write(
+                f"{label:<8} {total:>8} {ok:>5} {fake.max_in_flight:>14} {wall:>8.1f} "
+                f"{total / wall:>7.1f} {stats['p50']:>9.1f} {stats['p95']:>9.1f}"
+            )
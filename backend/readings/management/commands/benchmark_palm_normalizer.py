@@ -0,0 +1,51 @@
+"""
+Micro-benchmark of the palm result normalizer on the golden corpus.
+Run: python manage.py benchmark_palm_normalizer [--seconds 3]
+
+Every recorded model response in readings/tests/golden/ is normalized in a
+loop; the output is calls per second and microseconds per call. Logging runs
+at the configured level, so per-call log output is part of the cost.
+"""
+
+import copy
+import json
+import random
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand
+
+from readings.normalizer import normalize_palm_result
+
+CORPUS = Path(__file__).resolve().parents[2] / "tests" / "golden" / "palm_normalizer.jsonl"
+
+
+class Command(BaseCommand):
+    help = "Measure palm result normalizer throughput (calls/s) on the golden corpus"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=3.0, help="Minimum measuring time")
+
+    def handle(self, *args, **options):
+        with CORPUS.open(encoding="utf-8") as f:
+            responses = [json.loads(line)["response"] for line in f if line.strip()]
+        # Fresh copies per call, as each reading parses its own answer.
+        batch = [copy.deepcopy(r) for r in responses]
+        rng = random.Random(0)
+
+        for raw in batch:  # warm-up
+            normalize_palm_result(raw, rng=rng)
+
+        calls = 0
+        started = time.perf_counter()
+        deadline = started + options["seconds"]
+        while time.perf_counter() < deadline:
+            for raw in batch:
+                normalize_palm_result(raw, rng=rng)
+            calls += len(batch)
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{len(responses)} responses, {calls} calls in {elapsed:.2f}s: "
+            f"{calls / elapsed:,.0f} calls/s, {elapsed / calls * 1e6:.1f} us/call"
+        )
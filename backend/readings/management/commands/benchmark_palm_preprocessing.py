@@ -0,0 +1,83 @@
+"""
+Benchmark palm image pre-processing against sample uploads.
+Run: python manage.py benchmark_palm_preprocessing [paths ...]
+"""
+
+import math
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from PIL import Image
+
+from readings.imaging import prepare_palm_image
+
+
+def _vision_tiles(width: int, height: int) -> int:
+    """
+    Number of 512px tiles OpenAI bills for a high-detail image: fit within
+    2048x2048, scale the shortest side down to 768, then count tiles.
+    """
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    return math.ceil(width / 512) * math.ceil(height / 512)
+
+
+class Command(BaseCommand):
+    help = "Measure bytes, dimensions, vision tiles and time before/after palm image pre-processing"
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="*", help="Image files (default: MEDIA_ROOT/palm_uploads)")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per image for timing")
+
+    def handle(self, *args, **options):
+        paths = [Path(p) for p in options["paths"]]
+        if not paths:
+            root = Path(settings.MEDIA_ROOT) / "palm_uploads"
+            paths = sorted(p for p in root.rglob("*") if p.is_file())
+        if not paths:
+            self.stdout.write(self.style.WARNING("No images found."))
+            return
+
+        repeat = max(1, options["repeat"])
+        total_in = total_out = 0
+        tiles_in = tiles_out = 0
+
+        self.stdout.write(
+            f"{'image':<40} {'bytes in':>10} {'bytes out':>10} {'ratio':>6} "
+            f"{'dims in':>11} {'dims out':>11} {'tiles':>7} {'ms':>7}"
+        )
+        for path in paths:
+            raw = path.read_bytes()
+            with Image.open(path) as img:
+                dims_in = img.size
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                prepared = prepare_palm_image(raw)
+            elapsed_ms = (time.perf_counter() - started) * 1000 / repeat
+
+            dims_out = (prepared.width or dims_in[0], prepared.height or dims_in[1])
+            t_in, t_out = _vision_tiles(*dims_in), _vision_tiles(*dims_out)
+            total_in += len(raw)
+            total_out += prepared.size
+            tiles_in += t_in
+            tiles_out += t_out
+
+            self.stdout.write(
+                f"{path.name[:40]:<40} {len(raw):>10} {prepared.size:>10} "
+                f"{prepared.size / len(raw):>6.2f} "
+                f"{'%dx%d' % dims_in:>11} {'%dx%d' % dims_out:>11} "
+                f"{f'{t_in}->{t_out}':>7} {elapsed_ms:>7.1f}"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n{len(paths)} images: {total_in} -> {total_out} bytes "
+                f"({100 * (1 - total_out / total_in):.1f}% smaller), "
+                f"vision tiles {tiles_in} -> {tiles_out}"
+            )
+        )
@@ -0,0 +1,93 @@
+"""
+Compare palm analysis latency with and without the standalone validator call.
+Run: python manage.py benchmark_palm_round_trips [--runs 10] [--latency-ms 1500]
+
+The OpenAI client is replaced by a fake with a fixed per-request latency, so
+the numbers show the cost of each extra vision round trip rather than
+network noise.
+"""
+
+import io
+import os
+import time
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from palmastro_backend.benchmarking import FakeOpenAI, summarize_latencies
+from palmastro_backend.openai_client import reset_openai_client
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _sample_image() -> bytes:
+    root = Path(settings.MEDIA_ROOT) / "palm_uploads"
+    for path in sorted(root.rglob("*")) if root.exists() else []:
+        if path.is_file():
+            return path.read_bytes()
+    out = io.BytesIO()
+    Image.new("RGB", (1200, 1600), (205, 160, 140)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+class Command(BaseCommand):
+    help = "Measure palm analysis latency with the standalone palm validator off vs on"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=10, help="Readings per mode")
+        parser.add_argument("--latency-ms", type=float, default=1500.0, help="Simulated OpenAI latency per request")
+
+    def handle(self, *args, **options):
+        runs = max(1, options["runs"])
+        image = _sample_image()
+        os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+        self.stdout.write(f"{'mode':<22} {'mean ms':>9} {'p50':>9} {'p95':>9} {'calls/reading':>14}")
+        results = {}
+        for label, standalone in (("single round trip", False), ("standalone validator", True)):
+            fake = FakeOpenAI(latency_ms=options["latency_ms"])
+            samples = []
+            reset_openai_client()
+            with mock.patch("palmastro_backend.openai_client.OpenAI", fake), override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+                MODEL_GUARD_ENABLED=False,
+                PALM_RESULT_CACHE_ENABLED=False,
+                PALM_STANDALONE_VALIDATION=standalone,
+            ):
+                try:
+                    with transaction.atomic():
+                        client = Client()
+                        for _ in range(runs):
+                            upload = SimpleUploadedFile("palm.jpg", image, content_type="image/jpeg")
+                            started = time.perf_counter()
+                            response = client.post(reverse("readings:palm-reading-analyze"), {"image": upload})
+                            samples.append((time.perf_counter() - started) * 1000)
+                            if response.status_code != 200:
+                                self.stderr.write(f"{label}: HTTP {response.status_code} {response.content[:200]!r}")
+                        raise _Rollback
+                except _Rollback:
+                    pass
+
+            reset_openai_client()
+            stats = summarize_latencies(samples)
+            results[label] = stats
+            self.stdout.write(
+                f"{label:<22} {stats['mean']:>9.1f} {stats['p50']:>9.1f} {stats['p95']:>9.1f} "
+                f"{fake.calls / runs:>14.1f}"
+            )
+
+        before = results["standalone validator"]["mean"]
+        after = results["single round trip"]["mean"]
+        if before:
+            self.stdout.write(
+                self.style.SUCCESS(f"\nSingle round trip is {100 * (1 - after / before):.1f}% faster on average")
+            )
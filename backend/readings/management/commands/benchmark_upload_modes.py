@@ -0,0 +1,111 @@
+"""
+Compare HTTP worker occupancy of POST /api/v1/readings/ in sync vs async mode.
+Run: python manage.py benchmark_upload_modes [--runs 20] [--latency-ms 1500]
+
+The OpenAI client is replaced by a fake with a fixed per-request latency. In
+async mode `process_palm_reading.delay` only records the job (standing in
+for the broker); the jobs are then run one by one as a Celery worker would,
+so the time each upload holds an HTTP worker is measured separately from
+the background analysis time.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from palmastro_backend.benchmarking import FakeOpenAI, summarize_latencies
+from palmastro_backend.openai_client import reset_openai_client
+from readings.tasks import process_palm_reading
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _sample_image() -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (1200, 1600), (205, 160, 140)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+class Command(BaseCommand):
+    help = "Measure how long an upload holds an HTTP worker in sync vs async upload mode"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=20, help="Uploads per mode")
+        parser.add_argument("--latency-ms", type=float, default=1500.0, help="Simulated OpenAI latency per request")
+
+    def handle(self, *args, **options):
+        runs = max(1, options["runs"])
+        image = _sample_image()
+        os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+
+        self.stdout.write(
+            f"{'mode':<6} {'http mean ms':>13} {'p95':>9} {'uploads/s per worker':>21} {'background ms':>14}"
+        )
+        results = {}
+        media_root = tempfile.mkdtemp()
+        try:
+            for mode in ("sync", "async"):
+                results[mode] = self._run_mode(mode, runs, image, options["latency_ms"], media_root)
+        finally:
+            shutil.rmtree(media_root, ignore_errors=True)
+
+        before, after = results["sync"]["mean"], results["async"]["mean"]
+        if after:
+            self.stdout.write(
+                self.style.SUCCESS(f"\nAsync mode holds an HTTP worker {before / after:.0f}x shorter per upload")
+            )
+
+    def _run_mode(self, mode, runs, image, latency_ms, media_root):
+        fake = FakeOpenAI(latency_ms=latency_ms)
+        queued = []
+        http_ms, background_ms = [], []
+        reset_openai_client()
+        with mock.patch("palmastro_backend.openai_client.OpenAI", fake), mock.patch(
+            "readings.views.process_palm_reading.delay",
+            side_effect=lambda *a, **kw: queued.append((a, kw)),
+        ), override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+            MEDIA_ROOT=media_root,
+            MODEL_GUARD_ENABLED=False,
+            PALM_RESULT_CACHE_ENABLED=False,
+            READING_UPLOAD_MODE=mode,
+        ):
+            try:
+                with transaction.atomic():
+                    client = Client()
+                    for _ in range(runs):
+                        upload = SimpleUploadedFile("palm.jpg", image, content_type="image/jpeg")
+                        started = time.perf_counter()
+                        response = client.post(reverse("readings:reading-upload"), {"image": upload})
+                        http_ms.append((time.perf_counter() - started) * 1000)
+                        if response.status_code not in (200, 202):
+                            self.stderr.write(f"{mode}: HTTP {response.status_code} {response.content[:200]!r}")
+                    for task_args, task_kwargs in queued:
+                        started = time.perf_counter()
+                        process_palm_reading(*task_args, **task_kwargs)
+                        background_ms.append((time.perf_counter() - started) * 1000)
+                    raise _Rollback
+            except _Rollback:
+                pass
+
+        reset_openai_client()
+        stats = summarize_latencies(http_ms)
+        background = summarize_latencies(background_ms)["mean"]
+        self.stdout.write(
+            f"{mode:<6} {stats['mean']:>13.1f} {stats['p95']:>9.1f} "
+            f"{1000 / stats['mean'] if stats['mean'] else 0:>21.1f} {background:>14.1f}"
+        )
+        return stats
@@ -6,6 +6,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 
 from readings.models import Reading
+from readings.storage import get_image_storage
 
 
 class Command(BaseCommand):
@@ -23,11 +24,13 @@ class Command(BaseCommand):
         # Delete expired images
         expired_images = Reading.objects.filter(
             expires_at__lte=now,
-        ).exclude(image="")
+        ).exclude(image="", storage_key="")
 
         for reading in expired_images:
             if reading.image and default_storage.exists(reading.image.name):
                 default_storage.delete(reading.image.name)
+            if reading.storage_key:
+                get_image_storage().delete(reading.storage_key)
             reading.image = None
             reading.storage_key = ""
             reading.save(update_fields=["image", "storage_key"])
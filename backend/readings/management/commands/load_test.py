@@ -0,0 +1,129 @@
+"""
+End-to-end load test against a running server (see palmastro_backend.loadtest).
+Run: python manage.py load_test [--base-url http://localhost:8000] [--users 20]
+     [--duration 120] [--scenario palm_upload=1 --scenario dashboard=3]
+     [--output loadtest.json] [--baseline previous.json]
+
+Locally, start the model stand-in, then the app pointed at it with the
+throttles opened up, for example:
+
+    python manage.py mock_openai_server --latency-distribution lognormal
+    OPENAI_BASE_URL=http://localhost:8081/v1 DRF_THROTTLE_ANON=100000/min \\
+      DRF_THROTTLE_ASTROLOGY=100000/min DRF_THROTTLE_NUMEROLOGY=100000/min \\
+      gunicorn palmastro_backend.wsgi:application -w 4
+    celery -A palmastro_backend worker -Q vision,text,maintenance,celery -l info   # same environment
+
+Per-endpoint DB query counts need QUERY_COUNT_HEADERS=true on the server
+(the default with DJANGO_DEBUG=true).
+"""
+
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from palmastro_backend.loadtest import SCENARIOS, LoadTestConfig, compare_reports, login, run_load_test
+
+
+def _scenario_weights(values):
+    if not values:
+        return {name: 1.0 for name in SCENARIOS}
+    weights = {}
+    for value in values:
+        name, _, weight = value.partition("=")
+        try:
+            weights[name] = float(weight or 1)
+        except ValueError as e:
+            raise CommandError(f"Invalid scenario weight in {value!r}") from e
+    return weights
+
+
+class Command(BaseCommand):
+    help = "Load-test the palm, astrology, numerology and dashboard flows over HTTP and report per endpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://localhost:8000")
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            metavar="NAME[=WEIGHT]",
+            help=f"Scenario to run, repeatable ({', '.join(SCENARIOS)}; default: all, equally weighted)",
+        )
+        parser.add_argument("--users", type=int, default=10, help="Concurrent virtual users")
+        parser.add_argument("--duration", type=float, default=60.0, help="Seconds to start new scenarios for")
+        parser.add_argument("--iterations", type=int, default=0, help="Scenarios per user (0: until --duration)")
+        parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds over which users start")
+        parser.add_argument("--think-time", type=float, default=1.0, help="Pause between steps of a user")
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument("--poll-timeout", type=float, default=120.0)
+        parser.add_argument("--email", help="Log in once and browse the dashboard as this user")
+        parser.add_argument("--password", default="")
+        parser.add_argument("--seed", type=int, default=None)
+        parser.add_argument("--output", help="Write the JSON report here")
+        parser.add_argument("--baseline", help="JSON report of an earlier run to compare with")
+
+    def handle(self, *args, **options):
+        token = login(options["base_url"], options["email"], options["password"]) if options["email"] else ""
+        try:
+            config = LoadTestConfig(
+                base_url=options["base_url"],
+                scenarios=_scenario_weights(options["scenario"]),
+                users=max(1, options["users"]),
+                duration_seconds=options["duration"],
+                iterations=options["iterations"],
+                ramp_up_seconds=options["ramp_up"],
+                think_time_seconds=options["think_time"],
+                poll_interval_seconds=options["poll_interval"],
+                poll_timeout_seconds=options["poll_timeout"],
+                access_token=token,
+                seed=options["seed"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        self.stdout.write(
+            f"{config.users} users, {config.duration_seconds:.0f}s, "
+            f"scenarios {', '.join(f'{k}={v:g}' for k, v in config.scenarios.items())} against {config.base_url}"
+        )
+        report = run_load_test(config)
+        self._print_report(report)
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2), encoding="utf-8")
+            self.stdout.write(f"Report written to {options['output']}")
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text(encoding="utf-8"))
+            self._print_comparison(compare_reports(report, baseline))
+
+    def _print_report(self, report):
+        self.stdout.write(
+            f"\n{'endpoint':<44} {'reqs':>6} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} "
+            f"{'err%':>6} {'429':>5} {'queries':>8}"
+        )
+        for name, row in report["endpoints"].items():
+            latency = row["latency_ms"]
+            queries = row["db_queries"]["mean"] if row["db_queries"] else "-"
+            self.stdout.write(
+                f"{name:<44} {row['requests']:>6} {row['throughput_rps']:>7.2f} {latency['p50']:>8.1f} "
+                f"{latency['p95']:>8.1f} {latency['p99']:>8.1f} {row['error_rate'] * 100:>6.1f} "
+                f"{row['throttled']:>5} {queries:>8}"
+            )
+        self.stdout.write(f"\n{'scenario':<20} {'done':>6} {'failed':>7} {'per s':>7} {'p50':>9} {'p95':>9}")
+        for name, row in report["scenarios"].items():
+            latency = row["latency_ms"]
+            self.stdout.write(
+                f"{name:<20} {row['completed']:>6} {row['failed']:>7} {row['throughput_per_s']:>7.3f} "
+                f"{latency['p50']:>9.1f} {latency['p95']:>9.1f}"
+            )
+            for failure, count in row["failures"].items():
+                self.stdout.write(f"    {count} x {failure}")
+
+    def _print_comparison(self, rows):
+        self.stdout.write(f"\n{'endpoint':<44} {'p95':>8} {'before':>8} {'change':>8} {'queries':>8} {'before':>8}")
+        for row in rows:
+            change = f"{row['p95_change']:+.0%}" if row["p95_change"] is not None else "-"
+            self.stdout.write(
+                f"{row['endpoint']:<44} {row['p95_ms']:>8.1f} {row['p95_ms_baseline']:>8.1f} {change:>8} "
+                f"{row['db_queries_mean'] if row['db_queries_mean'] is not None else '-':>8} "
+                f"{row['db_queries_mean_baseline'] if row['db_queries_mean_baseline'] is not None else '-':>8}"
+            )
@@ -0,0 +1,64 @@
+"""
+Serve the local OpenAI stand-in (see palmastro_backend.mock_openai).
+Run: python manage.py mock_openai_server [--port 8081] [--latency-ms 1500]
+     [--latency-distribution lognormal] [--rate-429 0.05] [--rate-500 0.01]
+     [--rate-timeout 0.01]
+
+Then start the web app and workers with OPENAI_BASE_URL=http://localhost:8081/v1.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from palmastro_backend.mock_openai import LATENCY_DISTRIBUTIONS, MockOpenAIConfig, MockOpenAIServer
+
+
+class Command(BaseCommand):
+    help = "Run an OpenAI-compatible chat completions server with canned answers, latency and fault injection"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8081)
+        parser.add_argument("--latency-ms", type=float, default=1500.0, help="Median answer time")
+        parser.add_argument("--latency-distribution", choices=LATENCY_DISTRIBUTIONS, default="fixed")
+        parser.add_argument("--jitter-ms", type=float, default=500.0, help="Half-width of the uniform distribution")
+        parser.add_argument("--latency-sigma", type=float, default=0.5, help="Spread of the lognormal distribution")
+        parser.add_argument("--rate-429", type=float, default=0.0, help="Share of requests answered with 429")
+        parser.add_argument("--rate-500", type=float, default=0.0, help="Share of requests answered with 500")
+        parser.add_argument("--rate-timeout", type=float, default=0.0, help="Share of requests that never get an answer")
+        parser.add_argument("--retry-after", type=int, default=1, help="Seconds suggested by 429 answers")
+        parser.add_argument("--timeout-seconds", type=float, default=30.0, help="How long timed-out requests are held")
+        parser.add_argument("--stream-chunks", type=int, default=40)
+        parser.add_argument("--seed", type=int, default=None)
+
+    def handle(self, *args, **options):
+        try:
+            config = MockOpenAIConfig(
+                latency_ms=options["latency_ms"],
+                latency_distribution=options["latency_distribution"],
+                jitter_ms=options["jitter_ms"],
+                latency_sigma=options["latency_sigma"],
+                rate_429=options["rate_429"],
+                rate_500=options["rate_500"],
+                rate_timeout=options["rate_timeout"],
+                retry_after_seconds=options["retry_after"],
+                timeout_seconds=options["timeout_seconds"],
+                stream_chunks=options["stream_chunks"],
+                seed=options["seed"],
+            )
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        server = MockOpenAIServer((options["host"], options["port"]), config)
+        self.stdout.write(
+            f"Mock OpenAI listening on {server.base_url} "
+            f"({config.latency_distribution} {config.latency_ms:.0f} ms, "
+            f"429 {config.rate_429:.0%}, 500 {config.rate_500:.0%}, timeout {config.rate_timeout:.0%})"
+        )
+        self.stdout.write(f"Point the app at it with OPENAI_BASE_URL={server.base_url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+            self.stdout.write(f"Stopped. {server.stats}")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from readings.aggregates import rebuild
+from readings.dashboard_cache import invalidate_all
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the dashboard aggregates (ReadingStats, ReadingDailyStats) from the readings table. "
+        "They are kept up to date on every reading write; run this after bulk imports or raw SQL changes."
+    )
+
+    def handle(self, *args, **options):
+        stats, daily = rebuild()
+        invalidate_all()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {stats} type totals and {daily} daily totals."))
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('readings', '0004_alter_reading_palm_reference'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reading',
+            name='retry_count',
+            field=models.PositiveSmallIntegerField(default=0, help_text='Times the analysis was re-queued after hitting the OpenAI rate limit.'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:41
+
+from django.db import migrations, models
+
+# The tables start empty: a backfill here would have to import the live
+# aggregation code. Existing readings are counted by running
+# `python manage.py rebuild_reading_stats` once after migrating.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('readings', '0005_add_retry_count_field'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReadingDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=64)),
+                ('day', models.DateField()),
+                ('readings', models.IntegerField(default=0)),
+                ('accuracy_sum', models.BigIntegerField(default=0)),
+                ('accuracy_count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ReadingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(max_length=64)),
+                ('reading_type', models.CharField(choices=[('palm_analysis', 'Palm Analysis'), ('numerology', 'Numerology'), ('astrology_reading', 'Astrology Reading')], max_length=32)),
+                ('readings', models.IntegerField(default=0)),
+                ('accuracy_sum', models.BigIntegerField(default=0)),
+                ('accuracy_count', models.IntegerField(default=0)),
+                ('insights', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='readingstats',
+            constraint=models.UniqueConstraint(fields=('scope', 'reading_type'), name='readings_stats_scope_type_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='readingdailystats',
+            constraint=models.UniqueConstraint(fields=('scope', 'day'), name='readings_daily_scope_day_uniq'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('readings', '0006_reading_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reading',
+            name='accuracy_pct',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reading',
+            name='insights_count',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reading',
+            name='overall_score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='reading',
+            name='top_prediction_confidence',
+            field=models.FloatField(blank=True, help_text='Highest prediction confidence; NULL without predictions.', null=True),
+        ),
+        migrations.AddIndex(
+            model_name='reading',
+            index=models.Index(fields=['user', 'status', '-top_prediction_confidence'], name='readings_user_top_pred_idx'),
+        ),
+    ]
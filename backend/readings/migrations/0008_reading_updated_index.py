@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('readings', '0007_reading_score_columns'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reading',
+            index=models.Index(fields=['-updated_at'], name='readings_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.2.30 on 2026-10-17 08:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('readings', '0008_reading_updated_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='eventlog',
+            index=models.Index(fields=['-created_at', '-id'], name='readings_event_created_idx'),
+        ),
+    ]
@@ -2,7 +2,7 @@ import uuid
 from datetime import timedelta
 
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 
 
@@ -55,6 +55,10 @@ class Reading(models.Model):
         max_length=16, choices=ReadingStatus.choices, default=ReadingStatus.QUEUED
     )
     error_message = models.TextField(blank=True)
+    retry_count = models.PositiveSmallIntegerField(
+        default=0,
+        help_text="Times the analysis was re-queued after hitting the OpenAI rate limit.",
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     expires_at = models.DateTimeField(
@@ -70,6 +74,15 @@ class Reading(models.Model):
         related_name="derived_readings",
         help_text="Reference to the palm reading that this reading is based on (for numerology/astrology integration)",
     )
+    # Scalar values derived from `result` (readings.scoring.reading_scores),
+    # filled on save so they can be filtered, sorted and aggregated in SQL.
+    # NULL accuracy_pct: not computed yet (see backfill_reading_scores).
+    overall_score = models.FloatField(null=True, blank=True)
+    accuracy_pct = models.PositiveSmallIntegerField(null=True, blank=True)
+    insights_count = models.PositiveIntegerField(null=True, blank=True)
+    top_prediction_confidence = models.FloatField(
+        null=True, blank=True, help_text="Highest prediction confidence; NULL without predictions."
+    )
 
     class Meta:
         ordering = ["-created_at"]
@@ -77,16 +90,85 @@ class Reading(models.Model):
             models.Index(fields=["user", "-created_at"], name="readings_user_created_idx"),
             models.Index(fields=["user", "reading_type", "-created_at"], name="readings_user_type_created_idx"),
             models.Index(fields=["status", "-created_at"], name="readings_status_created_idx"),
+            models.Index(fields=["-updated_at"], name="readings_updated_idx"),
+            models.Index(
+                fields=["user", "status", "-top_prediction_confidence"], name="readings_user_top_pred_idx"
+            ),
         ]
 
     def __str__(self) -> str:
         return f"Reading {self.id} ({self.status})"
 
+    def save(self, *args, **kwargs):
+        from .scoring import SCORE_FIELDS, SCORE_SOURCE_FIELDS, reading_scores
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or set(SCORE_SOURCE_FIELDS).intersection(update_fields):
+            for field, value in reading_scores(self).items():
+                setattr(self, field, value)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, *SCORE_FIELDS}
+        # The post_save receiver updates the dashboard aggregates
+        # (readings.aggregates); one transaction keeps them in step with the row.
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        from .aggregates import remember_contribution
+
+        remember_contribution(self)
+
     @property
     def has_image(self) -> bool:
         return bool(self.image or self.storage_key)
 
 
+class ReadingStats(models.Model):
+    """
+    Running totals per reading type for one scope: all readings ("all") or
+    one user's ("user:<id>"). Maintained by readings.aggregates on every
+    reading write; `manage.py rebuild_reading_stats` recomputes them.
+    """
+
+    scope = models.CharField(max_length=64)
+    reading_type = models.CharField(max_length=32, choices=ReadingType.choices)
+    readings = models.IntegerField(default=0)
+    # Dashboard accuracy (readings.scoring.accuracy_pct) of the readings that have one.
+    accuracy_sum = models.BigIntegerField(default=0)
+    accuracy_count = models.IntegerField(default=0)
+    insights = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "reading_type"], name="readings_stats_scope_type_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.scope} {self.reading_type}: {self.readings}"
+
+
+class ReadingDailyStats(models.Model):
+    """
+    Readings created per UTC day for one scope, with the sum and count of
+    their `accuracy.overall` values (the weekly activity chart).
+    """
+
+    scope = models.CharField(max_length=64)
+    day = models.DateField()
+    readings = models.IntegerField(default=0)
+    accuracy_sum = models.BigIntegerField(default=0)
+    accuracy_count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "day"], name="readings_daily_scope_day_uniq"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.scope} {self.day}: {self.readings}"
+
+
 class EventLog(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     reading = models.ForeignKey(
@@ -101,6 +183,10 @@ class EventLog(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # Keyset pagination of the event list (EventLogListView)
+            models.Index(fields=["-created_at", "-id"], name="readings_event_created_idx"),
+        ]
 
     def __str__(self) -> str:
         return f"{self.event_type} at {self.created_at.isoformat()}"
@@ -0,0 +1,889 @@
+"""
+Normalization of the palm model's JSON answer into PalmAnalysisResult JSON.
+
+`normalize_palm_result(raw)` is a pure function: it does not modify `raw`,
+touches no database or cache, and its only source of variation is the small
+random jitter on compatibility scores (pass `rng` to make it deterministic).
+All fixed texts, mappings and score tables are module-level constants built
+once at import instead of on every call.
+
+Output must stay byte-identical to the golden corpus in
+`readings/tests/golden/`; run `manage.py benchmark_palm_normalizer` to
+measure throughput.
+"""
+
+from __future__ import annotations
+
+import copy
+import logging
+import random
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+MODEL_VERSION = "2.0"
+
+_UNSET_METRIC_VALUES = frozenset({"N/A", "NA", "NONE", "UNKNOWN", ""})
+METRICS_UNAVAILABLE = "Detailed metrics are not available for this line."
+
+# (raw key, output key) pairs, in output order.
+LINE_KEYS: Tuple[Tuple[str, str], ...] = (
+    ("life_line", "lifeLine"),
+    ("heart_line", "heartLine"),
+    ("head_line", "headLine"),
+    ("fate_line", "fateLine"),
+)
+
+# Metrics listed in a line's "details" text: (label, metrics key).
+LINE_METRIC_FIELDS: Dict[str, Tuple[Tuple[str, str], ...]] = {
+    line: fields + (("calculated score", "calculated_score"),)
+    for line, fields in {
+        "life_line": (("Line clarity", "clarity"), ("length", "length"), ("depth", "depth"), ("breaks", "breaks")),
+        "heart_line": (("Line clarity", "clarity"), ("depth", "depth"), ("continuity", "continuity")),
+        "head_line": (("Line clarity", "clarity"), ("depth", "depth"), ("continuity", "continuity"), ("curvature", "curvature")),
+        "fate_line": (("Line clarity", "clarity"), ("depth", "depth")),
+    }.items()
+}
+
+_STRONG_CLARITY = frozenset({"deep", "clear"})
+_MODERATE_CLARITY = frozenset({"moderate", "medium"})
+_FAINT_CLARITY = frozenset({"faint", "unclear"})
+
+# Interpretation for a line without one: LINE_INTERPRETATIONS[line][strength],
+# where any strength other than Strong/Moderate uses "Faint".
+LINE_INTERPRETATIONS: Dict[str, Dict[str, str]] = {
+    "life_line": {
+        "Strong": "A strong, well-defined life line indicates robust vitality, excellent health, and a long life with abundant energy.",
+        "Moderate": "A moderate life line suggests good health and vitality with balanced energy levels throughout life.",
+        "Faint": "A faint life line may indicate developing energy reserves or a need to focus on health and vitality.",
+    },
+    "head_line": {
+        "Strong": "A strong head line suggests sharp intellect, clear thinking, and excellent problem-solving abilities.",
+        "Moderate": "A moderate head line indicates balanced thinking, combining logic with creativity in decision-making.",
+        "Faint": "A faint head line suggests developing mental clarity and the potential for enhanced analytical thinking.",
+    },
+    "heart_line": {
+        "Strong": "A strong heart line indicates deep emotional capacity, strong relationships, and expressive love nature.",
+        "Moderate": "A moderate heart line suggests balanced emotions and healthy relationships with room for emotional growth.",
+        "Faint": "A faint heart line may indicate reserved emotions or developing emotional awareness and expression.",
+    },
+}
+
+ABSENT_FATE_LINE_MEANING = (
+    "The fate line is not clearly visible on this palm, "
+    "suggesting a flexible, self-directed life and career path with less influence from external circumstances."
+)
+ABSENT_FATE_LINE_DETAILS = (
+    "Fate line not detected in this palm scan. "
+    "This indicates a self-directed approach to career and life choices, "
+    "with the ability to adapt and create your own path rather than following predetermined patterns."
+)
+
+# personality_traits key -> display name.
+TRAIT_NAMES: Tuple[Tuple[str, str], ...] = (
+    ("creative", "Creativity"),
+    ("analytical", "Analytical"),
+    ("emotional", "Emotional"),
+    ("leadership", "Leadership"),
+    ("practical", "Practical"),
+    ("intuitive", "Intuition"),
+)
+# Older `personality` key -> display name.
+LEGACY_TRAIT_NAMES: Tuple[Tuple[str, str], ...] = (
+    ("leadership", "Leadership"),
+    ("creativity", "Creativity"),
+    ("intuition", "Intuition"),
+    ("communication", "Communication"),
+    ("determination", "Determination"),
+)
+LEGACY_TRAIT_DESCRIPTION = "Derived from palm analysis based on hand characteristics"
+
+# Output mount key for each raw mount key, in output order.
+MOUNT_KEYS: Tuple[Tuple[str, str], ...] = (
+    ("venus", "venus"),
+    ("jupiter", "jupiter"),
+    ("saturn", "saturn"),
+    ("apollo", "sun"),
+    ("mercury", "mercury"),
+    ("moon", "moon"),
+)
+
+SHAPE_DESCRIPTIONS: Dict[str, str] = {
+    "Square": "practical and methodical nature, with strong organizational skills",
+    "Round": "emotional and intuitive approach, valuing relationships and harmony",
+    "Earth": "grounded and stable personality, seeking security and consistency",
+    "Fire": "dynamic and energetic character, driven by passion and ambition",
+    "Water": "sensitive and empathetic nature, deeply connected to emotions",
+    "Air": "intellectual and communicative, valuing ideas and social connections",
+}
+FINGER_DESCRIPTIONS: Dict[str, str] = {
+    "Long": "analytical and detail-oriented thinking",
+    "Short": "practical and action-oriented approach",
+    "Medium": "balanced between analysis and action",
+    "Balanced": "harmonious blend of analytical and practical qualities",
+}
+
+# Hand description phrases: (line, default strength, {strength: phrase}).
+LINE_INSIGHTS: Tuple[Tuple[str, str, Dict[str, str]], ...] = (
+    ("life_line", "Moderate", {
+        "Strong": "strong vitality and robust health",
+        "Weak": "developing energy and resilience",
+    }),
+    ("head_line", "Moderate", {
+        "Curved": "creative and flexible thinking",
+        "Highly Curved": "creative and flexible thinking",
+        "Straight": "logical and structured thought processes",
+    }),
+    ("heart_line", "Moderate", {
+        "Strong": "deep emotional capacity",
+        "Curved": "expressive and romantic nature",
+        "Weak": "developing emotional awareness",
+    }),
+    ("fate_line", "Absent", {
+        "Present": "clear sense of purpose and direction",
+        "Strong": "clear sense of purpose and direction",
+        "Absent": "flexible and self-directed life path",
+    }),
+)
+# Phrase for each mount that is "High".
+MOUNT_INSIGHTS: Tuple[Tuple[str, str], ...] = (
+    ("jupiter", "natural leadership qualities"),
+    ("moon", "strong intuitive abilities"),
+    ("mercury", "excellent communication skills"),
+    ("saturn", "disciplined and focused approach"),
+)
+
+PREDICTION_AREAS: Tuple[Tuple[str, str], ...] = (
+    ("career", "Career"),
+    ("relationships", "Relationships"),
+    ("health", "Health"),
+    ("finances", "Finances"),
+)
+PREDICTION_TIMEFRAMES: Dict[str, str] = {
+    "career": "Next 6 months",
+    "relationships": "Next 3 months",
+    "health": "Ongoing",
+    "finances": "Next 1 year",
+}
+PREDICTION_ADVICE: Dict[str, str] = {
+    "career": "Focus on clear goal-setting and leveraging your natural strengths. Network actively and seek opportunities that align with your values.",
+    "relationships": "Practice open communication and emotional expression. Invest time in deepening connections with loved ones through shared experiences.",
+    "health": "Maintain a balanced lifestyle with regular exercise, nutritious diet, and adequate rest. Listen to your body's signals and address any concerns promptly.",
+    "finances": "Create a comprehensive budget and build an emergency fund. Make informed financial decisions and avoid impulsive spending.",
+}
+_CAREER_DEFINED = "Your clear fate line indicates defined career direction. Professional opportunities may arise that align with your structured approach and leadership qualities."
+_CAREER_FLEXIBLE = "Your flexible career path suggests adaptability. Focus on setting clear goals to navigate opportunities effectively."
+_RELATIONSHIPS = {
+    "Strong": "Your strong heart line indicates deep emotional capacity. Relationships may deepen with open communication and emotional expression.",
+    "Curved": "Your curved heart line suggests expressive emotions. Emotional connections may flourish with genuine openness and romantic gestures.",
+}
+_RELATIONSHIPS_DEFAULT = "Your heart line suggests developing emotional awareness. Working on expressing feelings more openly will strengthen your relationships."
+_HEALTH_STRONG = "Your strong life line indicates robust vitality and good health. Continue maintaining a balanced lifestyle to preserve your energy."
+_HEALTH_DEFAULT = "Your life line suggests moderate health with potential for improvement. Focus on balanced nutrition, exercise, and stress management."
+_FINANCES_STRONG = "Your strong fate line with prominent Mercury mount suggests financial opportunities through communication and negotiation. Stability is likely with careful planning."
+_FINANCES_DEFAULT = "Your palm suggests financial flexibility. Create a budget and plan for unexpected expenses while remaining open to opportunities."
+
+# Mount development -> score as (High, Medium, other), for prediction
+# confidence estimates.
+_SATURN_SCORES = (80, 60, 40)
+_VENUS_SCORES = (80, 60, 40)
+_MOON_SCORES = (75, 55, 35)
+_MERCURY_SCORES = (85, 65, 45)
+_SUN_SCORES = (80, 60, 40)
+# Mount development -> score for the overall score.
+MOUNT_DEVELOPMENT_SCORES = {"High": 85, "Medium": 65, "Low": 45}
+
+MARK_MEANINGS: Dict[str, str] = {
+    "Star": "A star mark {location} indicates exceptional potential and significant positive events in this area of life.",
+    "Triangle": "A triangle {location} suggests protection and positive energy, enhancing the qualities of this area.",
+    "Cross": "A cross {location} may indicate challenges or important decisions that will shape this aspect of life.",
+    "Chain": "Chain marks {location} suggest periods of change or transitions in this area.",
+    "Island": "An island {location} indicates periods of difficulty or energy drain in this aspect of life.",
+    "Fork": "A fork {location} suggests multiple paths or choices available in this area.",
+    "Grille": "Grille patterns {location} indicate scattered energy or multiple influences affecting this area.",
+    "Break": "A break {location} suggests interruption or change in the flow of energy in this aspect.",
+}
+_SIGNIFICANCE_LEVELS = frozenset({"High", "Medium", "Low"})
+# Overall score adjustment per mark: {mark: {significance: bonus}}, "" = other.
+MARK_BONUSES: Dict[str, Dict[str, int]] = {
+    **dict.fromkeys(("star", "triangle"), {"High": 8, "Medium": 5, "": 2}),
+    **dict.fromkeys(("fork", "chain"), {"High": 3, "": 1}),
+    **dict.fromkeys(("island", "break", "cross"), {"High": -5, "Medium": -3, "": -1}),
+}
+
+COMPATIBILITY_SHAPES = ("Square", "Round", "Earth", "Fire", "Water", "Air")
+COMPATIBILITY: Dict[str, Dict[str, Tuple[int, str]]] = {
+    "square": {
+        "earth": (88, "High compatibility - both value stability and practicality"),
+        "fire": (82, "Good compatibility - complementary energies"),
+        "round": (65, "Moderate compatibility - different approaches to life"),
+        "water": (58, "Moderate compatibility - contrasting natures"),
+        "air": (72, "Fair compatibility - can balance each other"),
+    },
+    "earth": {
+        "square": (88, "High compatibility - shared practical values"),
+        "water": (85, "Strong compatibility - emotional and practical balance"),
+        "fire": (68, "Moderate compatibility - different energy levels"),
+        "round": (75, "Good compatibility - complementary stability"),
+        "air": (62, "Moderate compatibility - different priorities"),
+    },
+    "fire": {
+        "air": (90, "Excellent compatibility - dynamic and creative partnership"),
+        "square": (82, "Good compatibility - fire energizes square's structure"),
+        "earth": (68, "Moderate compatibility - contrasting energies"),
+        "water": (55, "Challenging compatibility - fire and water conflict"),
+        "round": (70, "Fair compatibility - can work with balance"),
+    },
+    "water": {
+        "earth": (85, "Strong compatibility - emotional depth meets stability"),
+        "air": (78, "Good compatibility - intuitive and intellectual blend"),
+        "round": (80, "Good compatibility - both value emotional connection"),
+        "square": (58, "Moderate compatibility - different emotional needs"),
+        "fire": (55, "Challenging compatibility - contrasting natures"),
+    },
+    "air": {
+        "fire": (90, "Excellent compatibility - intellectual and creative synergy"),
+        "water": (78, "Good compatibility - mental and emotional balance"),
+        "round": (72, "Fair compatibility - can complement each other"),
+        "square": (65, "Moderate compatibility - different communication styles"),
+        "earth": (62, "Moderate compatibility - contrasting approaches"),
+    },
+    "round": {
+        "water": (80, "Good compatibility - both value emotional connection"),
+        "earth": (75, "Good compatibility - stability and warmth"),
+        "air": (72, "Fair compatibility - can balance each other"),
+        "fire": (70, "Fair compatibility - different energy expressions"),
+        "square": (65, "Moderate compatibility - contrasting natures"),
+    },
+}
+_DEFAULT_COMPATIBILITY = {
+    shape.lower(): (60, f"Moderate compatibility with {shape} hand type") for shape in COMPATIBILITY_SHAPES
+}
+# Finger length -> shapes whose compatibility it raises, and by how much.
+_FINGER_COMPATIBILITY = {
+    "long": (frozenset({"air", "water"}), 5),
+    "short": (frozenset({"earth", "square"}), 5),
+}
+
+_LEGACY_LINE_ORDER = ("lifeLine", "headLine", "heartLine", "fateLine")
+_ACCURACY_KEYS = ("lineDetection", "patternAnalysis", "interpretation", "overall")
+
+
+@lru_cache(maxsize=1024)
+def _parse_percentage_str(val: str) -> float:
+    try:
+        return float(val.replace("%", "").strip())
+    except ValueError:
+        return 0.0
+
+
+def parse_percentage(val: Any) -> float:
+    """`"82%"`, `"82"`, `82` or `0.82` as a float; 0.0 if unparseable."""
+    if isinstance(val, (int, float)):
+        return float(val)
+    if isinstance(val, str):
+        # Models repeat the same few strings ("82%", "0%"), so cache them.
+        return _parse_percentage_str(val)
+    return 0.0
+
+
+def norm(v):
+    """Scale a 0-1 score to 0-100; larger values are already percentages."""
+    return v * 100 if 0 <= v <= 1 else v
+
+
+def _level(value: Any, scores: Tuple[int, int, int]) -> int:
+    # Compared rather than looked up: the model may send non-string values.
+    high, medium, other = scores
+    if value == "High":
+        return high
+    return medium if value == "Medium" else other
+
+
+def _metric_details(line_key: str, metrics: Dict[str, Any]) -> str:
+    parts: List[str] = []
+    for label, key in LINE_METRIC_FIELDS[line_key]:
+        raw = metrics.get(key)
+        if raw is None:
+            continue
+        value = str(raw).strip()
+        if not value or value.upper() in _UNSET_METRIC_VALUES:
+            continue
+        parts.append(f"{label}: {value}")
+    return ", ".join(parts) if parts else METRICS_UNAVAILABLE
+
+
+def _line_strength(line_data: Dict[str, Any], metrics: Dict[str, Any], quality_score: float) -> str:
+    strength = line_data.get("strength") or line_data.get("type") or ""
+    strength = strength.strip() if strength else ""
+    if strength and strength.lower() != "unknown":
+        return strength
+    clarity = str(metrics.get("clarity", "")).lower()
+    depth = str(metrics.get("depth", "")).lower()
+    if clarity in _STRONG_CLARITY or depth == "deep":
+        return "Strong"
+    if clarity in _MODERATE_CLARITY or depth == "moderate":
+        return "Moderate"
+    if clarity in _FAINT_CLARITY or depth == "shallow":
+        return "Faint"
+    if quality_score >= 70:
+        return "Strong"
+    if quality_score >= 50:
+        return "Moderate"
+    return "Weak"
+
+
+def _normalize_line(line_key: str, line_data: Dict[str, Any]) -> Dict[str, Any]:
+    metrics = line_data.get("metrics", {})
+    quality_score = parse_percentage(line_data.get("quality_score", "0%"))
+    strength = _line_strength(line_data, metrics, quality_score)
+
+    if line_key == "fate_line":
+        present_flag = (metrics.get("present") or "").strip().lower()
+        if present_flag == "no" or strength.lower() in ("absent", "none"):
+            return {
+                "quality": "Absent",
+                "score": 0.0,
+                "meaning": line_data.get("interpretation", ABSENT_FATE_LINE_MEANING),
+                "details": ABSENT_FATE_LINE_DETAILS,
+            }
+        if "interpretation" in line_data:
+            meaning = line_data["interpretation"]
+        else:
+            purpose = (
+                "a clear sense of purpose and direction"
+                if strength in ("Strong", "Present")
+                else "developing career focus"
+            )
+            meaning = f"A {strength.lower()} fate line indicates {purpose} in your life path."
+        return {
+            "quality": strength,
+            "score": norm(quality_score),
+            "meaning": meaning,
+            "details": _metric_details(line_key, metrics),
+        }
+
+    interpretation = line_data.get("interpretation", "")
+    if not interpretation:
+        bucket = strength if strength in ("Strong", "Moderate") else "Faint"
+        interpretation = LINE_INTERPRETATIONS[line_key][bucket]
+
+    details = _metric_details(line_key, metrics)
+    if details == METRICS_UNAVAILABLE:
+        clarity = metrics.get("clarity", "")
+        depth = metrics.get("depth", "")
+        length = metrics.get("length", "")
+        detail_parts = []
+        if clarity:
+            detail_parts.append(f"Line clarity: {clarity}")
+        if depth:
+            detail_parts.append(f"Depth: {depth}")
+        if length:
+            detail_parts.append(f"Length: {length}")
+        if quality_score > 0:
+            detail_parts.append(f"Calculated quality score: {int(norm(quality_score))}%")
+        if detail_parts:
+            details = ", ".join(detail_parts)
+        else:
+            details = (
+                f"Quality analysis based on {strength.lower()} line characteristics "
+                f"with {int(norm(quality_score))}% overall quality score."
+            )
+
+    return {
+        "quality": strength,
+        "score": norm(quality_score),
+        "meaning": interpretation,
+        "details": details,
+    }
+
+
+def _traits(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    traits: List[Dict[str, Any]] = []
+    personality_traits = data.get("personality_traits", {})
+    if personality_traits:
+        for key, name in TRAIT_NAMES:
+            if key in personality_traits:
+                trait = personality_traits[key]
+                traits.append({
+                    "name": name,
+                    "score": norm(parse_percentage(trait.get("percentage", "0%"))),
+                    "description": trait.get("calculation", "") or f"Derived from palm analysis: {key}",
+                })
+    if traits:
+        return traits
+
+    personality = data.get("personality", {})
+    if personality:
+        for key, name in LEGACY_TRAIT_NAMES:
+            if key not in personality:
+                continue
+            trait = personality[key]
+            if isinstance(trait, dict):
+                score = parse_percentage(trait.get("score", trait.get("percentage", "0%")))
+                traits.append({
+                    "name": name,
+                    "score": norm(score),
+                    "description": trait.get("meaning", "") or LEGACY_TRAIT_DESCRIPTION,
+                })
+            elif isinstance(trait, (int, float)):
+                traits.append({"name": name, "score": norm(trait), "description": LEGACY_TRAIT_DESCRIPTION})
+    if traits:
+        return traits
+    return _derived_traits(data)
+
+
+def _describe(score: int, high: int, high_word: str, mid: int) -> str:
+    if score >= high:
+        return high_word
+    return "moderate" if score >= mid else "developing"
+
+
+def _derived_traits(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Estimate the five classic traits from lines, mounts and hand shape."""
+    palm_lines = data.get("palm_lines", {})
+    physical = data.get("physical_characteristics", {})
+    mounts = physical.get("mounts", {})
+    palm_shape = physical.get("palm_shape", "Square")
+    finger_length = physical.get("finger_length", "Medium")
+    moon_mount = mounts.get("moon", "Medium")
+    head_strength = palm_lines.get("head_line", {}).get("strength", "Moderate")
+    heart_strength = palm_lines.get("heart_line", {}).get("strength", "Moderate")
+    fate_strength = palm_lines.get("fate_line", {}).get("strength", "Absent")
+    life_strength = palm_lines.get("life_line", {}).get("strength", "Moderate")
+
+    # Leadership: Jupiter mount, palm shape, finger length.
+    jupiter_mount = mounts.get("jupiter", "Medium")
+    if jupiter_mount == "High":
+        leadership, leadership_factors = 85, ["prominent Jupiter mount"]
+    elif jupiter_mount == "Medium":
+        leadership, leadership_factors = 60, ["moderate Jupiter mount"]
+    else:
+        leadership, leadership_factors = 45, ["low Jupiter mount"]
+    if palm_shape in ("Fire", "Square"):
+        leadership = min(95, leadership + 8)
+        leadership_factors.append("strong palm structure")
+    elif palm_shape == "Water":
+        leadership = max(40, leadership - 5)
+    if finger_length == "Long":
+        leadership = min(95, leadership + 5)
+    elif finger_length == "Short":
+        leadership = max(45, leadership - 3)
+
+    # Creativity: head line, Moon mount, palm shape.
+    if head_strength in ("Curved", "Highly Curved"):
+        creativity, creativity_factors = 75, ["curved head line"]
+    elif head_strength == "Straight":
+        creativity, creativity_factors = 55, ["straight head line"]
+    else:
+        creativity, creativity_factors = 45, ["weak head line"]
+    if moon_mount == "High":
+        creativity = min(95, creativity + 15)
+        creativity_factors.append("prominent Moon mount")
+    elif moon_mount == "Medium":
+        creativity = min(90, creativity + 8)
+    else:
+        creativity = max(40, creativity - 5)
+    if palm_shape in ("Fire", "Air"):
+        creativity = min(95, creativity + 5)
+
+    # Intuition: Moon mount, heart line, palm shape.
+    if moon_mount == "High":
+        intuition, intuition_factors = 80, ["prominent Moon mount"]
+    elif moon_mount == "Medium":
+        intuition, intuition_factors = 60, ["moderate Moon mount"]
+    else:
+        intuition, intuition_factors = 45, ["low Moon mount"]
+    if heart_strength == "Curved":
+        intuition = min(90, intuition + 10)
+        intuition_factors.append("curved heart line")
+    elif heart_strength == "Weak":
+        intuition = max(40, intuition - 10)
+        intuition_factors.append("weak heart line")
+    if palm_shape in ("Water", "Round"):
+        intuition = min(95, intuition + 8)
+
+    # Communication: Mercury mount, heart line, finger length, palm shape.
+    mercury_mount = mounts.get("mercury", "Medium")
+    if mercury_mount == "High":
+        communication, communication_factors = 75, ["prominent Mercury mount"]
+    elif mercury_mount == "Medium":
+        communication, communication_factors = 60, ["moderate Mercury mount"]
+    else:
+        communication, communication_factors = 45, ["low Mercury mount"]
+    if heart_strength == "Strong":
+        communication = min(90, communication + 12)
+        communication_factors.append("strong heart line")
+    elif heart_strength == "Weak":
+        communication = max(40, communication - 8)
+        communication_factors.append("weak heart line")
+    if finger_length == "Long":
+        communication = min(95, communication + 8)
+    elif finger_length == "Short":
+        communication = max(45, communication - 5)
+    if palm_shape == "Air":
+        communication = min(95, communication + 10)
+
+    # Determination: fate line, Saturn mount, life line.
+    if fate_strength in ("Present", "Strong"):
+        determination, determination_factors = 75, ["present fate line"]
+    elif fate_strength == "Weak":
+        determination, determination_factors = 55, ["weak fate line"]
+    else:
+        determination, determination_factors = 40, ["absent fate line"]
+    saturn_mount = mounts.get("saturn", "Medium")
+    if saturn_mount == "High":
+        determination = min(95, determination + 15)
+        determination_factors.append("prominent Saturn mount")
+    elif saturn_mount == "Medium":
+        determination = min(90, determination + 8)
+    else:
+        determination = max(35, determination - 5)
+    if life_strength == "Strong":
+        determination = min(95, determination + 10)
+        determination_factors.append("strong life line")
+    elif life_strength == "Weak":
+        determination = max(35, determination - 10)
+        determination_factors.append("weak life line")
+
+    return [
+        {
+            "name": "Leadership",
+            "score": max(35, min(95, leadership)),
+            "description": f"{', '.join(leadership_factors[:2])} suggest {_describe(leadership, 70, 'strong', 55)} leadership qualities",
+        },
+        {
+            "name": "Creativity",
+            "score": max(35, min(95, creativity)),
+            "description": f"{', '.join(creativity_factors[:2])} indicate {_describe(creativity, 75, 'high', 60)} creative potential",
+        },
+        {
+            "name": "Intuition",
+            "score": max(35, min(95, intuition)),
+            "description": f"{', '.join(intuition_factors[:2])} suggest {_describe(intuition, 70, 'strong', 55)} intuitive abilities",
+        },
+        {
+            "name": "Communication",
+            "score": max(35, min(95, communication)),
+            "description": f"{', '.join(communication_factors[:2])} indicate {_describe(communication, 70, 'strong', 55)} communication skills",
+        },
+        {
+            "name": "Determination",
+            "score": max(35, min(95, determination)),
+            "description": f"{', '.join(determination_factors[:2])} suggest {_describe(determination, 70, 'strong', 55)} determination and focus",
+        },
+    ]
+
+
+def _hand_description(palm_lines: Dict[str, Any], physical: Dict[str, Any]) -> str:
+    palm_shape = physical.get("palm_shape", "Square")
+    finger_length = physical.get("finger_length", "Medium")
+    dominant_hand = physical.get("dominant_hand", "Right")
+    mounts = physical.get("mounts", {})
+
+    line_insights = []
+    for line_key, default, phrases in LINE_INSIGHTS:
+        phrase = phrases.get(palm_lines.get(line_key, {}).get("strength", default))
+        if phrase:
+            line_insights.append(phrase)
+    mount_insights = [phrase for mount, phrase in MOUNT_INSIGHTS if mounts.get(mount) == "High"]
+
+    line_text = f", with {', '.join(line_insights[:3])}" if line_insights else ""
+    mount_text = f" The prominent mounts indicate {', '.join(mount_insights[:2])}." if mount_insights else ""
+    return (
+        f"A {palm_shape} palm with {finger_length.lower()} fingers on your {dominant_hand.lower()} hand "
+        f"reveals {SHAPE_DESCRIPTIONS.get(palm_shape, 'a balanced personality')} and "
+        f"{FINGER_DESCRIPTIONS.get(finger_length, 'balanced qualities')} tendencies{line_text}.{mount_text} "
+        f"This unique combination suggests a distinctive approach to life that balances structure with flexibility, "
+        f"making you adaptable yet grounded in your decision-making process."
+    )
+
+
+def _personality(data: Dict[str, Any], palm_lines: Dict[str, Any]) -> Dict[str, Any]:
+    traits = _traits(data)
+    physical = data.get("physical_characteristics", {})
+    mounts_data = physical.get("mounts", {})
+    mounts = {
+        new_key: {
+            "development": mounts_data[old_key] if isinstance(mounts_data[old_key], str) else "Medium",
+            "meaning": "",
+        }
+        for old_key, new_key in MOUNT_KEYS
+        if old_key in mounts_data
+    }
+
+    description = physical.get("hand_type_summary", physical.get("hand_type_description", ""))
+    if not description:
+        description = _hand_description(palm_lines, physical)
+
+    palm_shape = physical.get("palm_shape", "") or "Square"
+    finger_length = physical.get("finger_length", "") or "Medium"
+    return {
+        "traits": traits,
+        "dominantHand": physical.get("dominant_hand", "") or "Right",
+        "palmShape": palm_shape,
+        "fingerLength": finger_length,
+        "handType": physical.get("hand_type") or f"{palm_shape} hand with {finger_length.lower()} fingers",
+        "mounts": mounts,
+        "handTypeAnalysis": description or data.get("hand_type_analysis", {}).get("summary", ""),
+    }
+
+
+def _estimated_confidence(area: str, palm_lines: Dict[str, Any], mounts: Dict[str, Any]):
+    """Confidence for a prediction the model scored below 30%."""
+    fate_score = parse_percentage(palm_lines.get("fate_line", {}).get("quality_score", "0%"))
+    head_score = parse_percentage(palm_lines.get("head_line", {}).get("quality_score", "0%"))
+    if area == "career":
+        saturn_score = _level(mounts.get("saturn", "Medium"), _SATURN_SCORES)
+        confidence = (fate_score * 0.4) + (saturn_score * 0.3) + (head_score * 0.3)
+        return max(50, min(90, confidence))
+    if area == "relationships":
+        heart_score = parse_percentage(palm_lines.get("heart_line", {}).get("quality_score", "0%"))
+        venus_score = _level(mounts.get("venus", "Medium"), _VENUS_SCORES)
+        moon_score = _level(mounts.get("moon", "Medium"), _MOON_SCORES)
+        confidence = (heart_score * 0.5) + (venus_score * 0.3) + (moon_score * 0.2)
+        return max(50, min(90, confidence))
+    if area == "health":
+        life_score = parse_percentage(palm_lines.get("life_line", {}).get("quality_score", "0%"))
+        overall_vitality = (life_score + fate_score + head_score) / 3
+        confidence = (life_score * 0.6) + (overall_vitality * 0.4)
+        return max(60, min(95, confidence))
+    mercury_score = _level(mounts.get("mercury", "Medium"), _MERCURY_SCORES)
+    sun_score = _level(mounts.get("sun", mounts.get("apollo", "Medium")), _SUN_SCORES)
+    confidence = (fate_score * 0.4) + (mercury_score * 0.4) + (sun_score * 0.2)
+    return max(50, min(90, confidence))
+
+
+def _default_prediction(area: str, palm_lines: Dict[str, Any], mounts: Dict[str, Any]) -> str:
+    if area == "career":
+        fate_strength = palm_lines.get("fate_line", {}).get("strength", "Absent")
+        return _CAREER_DEFINED if fate_strength in ("Present", "Strong") else _CAREER_FLEXIBLE
+    if area == "relationships":
+        heart_strength = palm_lines.get("heart_line", {}).get("strength", "Moderate")
+        return _RELATIONSHIPS.get(heart_strength, _RELATIONSHIPS_DEFAULT)
+    if area == "health":
+        life_strength = palm_lines.get("life_line", {}).get("strength", "Moderate")
+        return _HEALTH_STRONG if life_strength == "Strong" else _HEALTH_DEFAULT
+    fate_strength = palm_lines.get("fate_line", {}).get("strength", "Absent")
+    if fate_strength in ("Present", "Strong") and mounts.get("mercury", "Medium") == "High":
+        return _FINANCES_STRONG
+    return _FINANCES_DEFAULT
+
+
+def _predictions(data: Dict[str, Any], palm_lines: Dict[str, Any]) -> List[Dict[str, Any]]:
+    predictions = data.get("predictions", {})
+    mounts = data.get("physical_characteristics", {}).get("mounts", {})
+    result = []
+    for area, name in PREDICTION_AREAS:
+        if area not in predictions:
+            continue
+        pred = predictions[area]
+        confidence = parse_percentage(pred.get("confidence", pred.get("confidence_score", "0%")))
+        if confidence < 30:
+            confidence = _estimated_confidence(area, palm_lines, mounts)
+        if confidence < 50:
+            confidence = 50
+        result.append({
+            "area": name,
+            "timeframe": pred.get("period", PREDICTION_TIMEFRAMES[area]),
+            "prediction": pred.get("prediction", "") or _default_prediction(area, palm_lines, mounts),
+            "confidence": norm(confidence),
+            "advice": pred.get("advice", "") or PREDICTION_ADVICE[area],
+        })
+    return result
+
+
+def _special_marks(data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    marks = []
+    for mark in data.get("special_marks", []):
+        mark_type = mark.get("type") or mark.get("name", "")
+        if not mark_type:
+            continue
+        location = mark.get("location", "") or "On palm"
+        meaning = mark.get("meaning", "")
+        if not meaning:
+            template = MARK_MEANINGS.get(mark_type)
+            if template is None:
+                meaning = f"This {mark_type.lower()} mark {location.lower()} has significance in palmistry."
+            else:
+                meaning = template.format(location=location.lower())
+        significance = mark.get("impact_level") or mark.get("significance", "Medium")
+        if isinstance(significance, str):
+            significance = significance.capitalize()
+            if significance not in _SIGNIFICANCE_LEVELS:
+                significance = "Medium"
+        else:
+            significance = "Medium"
+        marks.append({"name": mark_type, "location": location, "meaning": meaning, "significance": significance})
+    return marks
+
+
+def _computed_overall_score(transformed: Dict[str, Any]) -> float:
+    """
+    (line average x 0.35) + (trait average x 0.35) + (mount average x 0.15)
+    + (50 + special marks bonus) x 0.15, bounded to 40-95.
+    """
+    lines = transformed["lines"]
+    line_scores = []
+    for key in _LEGACY_LINE_ORDER:
+        if key not in lines:
+            continue
+        line = lines[key]
+        if key == "fateLine" and line.get("quality", "").lower() == "absent":
+            continue
+        score = line.get("score", 0)
+        if score > 0:
+            line_scores.append(score)
+    line_average = sum(line_scores) / len(line_scores) if line_scores else 50
+
+    personality = transformed["personality"]
+    trait_scores = [s for s in (t.get("score", 0) for t in personality["traits"]) if s > 0]
+    trait_average = sum(trait_scores) / len(trait_scores) if trait_scores else 50
+
+    mount_scores = [
+        MOUNT_DEVELOPMENT_SCORES.get(mount.get("development", "Medium"), 65)
+        for mount in personality["mounts"].values()
+        if isinstance(mount, dict)
+    ]
+    mount_average = sum(mount_scores) / len(mount_scores) if mount_scores else 65
+
+    bonus = 0
+    if transformed["specialMarks"]:
+        for mark in transformed["specialMarks"]:
+            bonuses = MARK_BONUSES.get(mark.get("name", "").lower())
+            if bonuses is not None:
+                significance = mark.get("significance", "Medium")
+                bonus += bonuses.get(significance, bonuses[""])
+        bonus = max(-10, min(15, bonus))
+
+    overall = (
+        (line_average * 0.35)
+        + (trait_average * 0.35)
+        + (mount_average * 0.15)
+        + (50 + bonus) * 0.15
+    )
+    return max(40, min(95, overall))
+
+
+def _summary(overall_score: float) -> str:
+    percent = int(norm(overall_score))
+    if overall_score >= 80:
+        return f"Your palm shows exceptional characteristics with an overall score of {percent}%. Strong lines, well-developed mounts, and positive traits indicate a balanced and promising life path."
+    if overall_score >= 70:
+        return f"Your palm analysis reveals strong potential with an overall score of {percent}%. Good line quality and balanced traits suggest positive life experiences ahead."
+    if overall_score >= 60:
+        return f"Your palm shows moderate characteristics with an overall score of {percent}%. There's room for growth and development in various life areas."
+    return f"Your palm analysis indicates developing potential with an overall score of {percent}%. Focus on personal growth and development to enhance your life path."
+
+
+def _compatibility(physical: Dict[str, Any], rng) -> List[Dict[str, Any]]:
+    palm_shape = physical.get("palm_shape", "Square").lower()
+    finger_length = physical.get("finger_length", "Medium").lower()
+    matrix = COMPATIBILITY.get(palm_shape, _DEFAULT_COMPATIBILITY)
+    boosted, boost = _FINGER_COMPATIBILITY.get(finger_length, (frozenset(), 0))
+    result = []
+    for shape in COMPATIBILITY_SHAPES:
+        key = shape.lower()
+        if key == palm_shape:
+            continue
+        base_score, description = matrix.get(key) or _DEFAULT_COMPATIBILITY[key]
+        if key in boosted:
+            variation = boost
+        elif finger_length == "medium":
+            variation = 2
+        else:
+            variation = 0
+        # Small jitter so readings of similar hands differ.
+        score = max(45, min(95, base_score + variation + rng.randrange(-3, 4)))
+        result.append({"type": shape, "match": score, "description": description})
+    result.sort(key=lambda x: x["match"], reverse=True)
+    return result
+
+
+def _normalize_legacy(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Answers in the older `lines`/`personality.traits` structure: rescale only."""
+    data = copy.deepcopy(data)
+    lines = data.get("lines", {})
+    traits = data.get("personality", {}).get("traits", [])
+    overall = data.get("overallScore", 0)
+    if overall == 0 or overall is None:
+        line_scores = [norm(s) for s in (lines[k].get("score", 0) for k in _LEGACY_LINE_ORDER if k in lines) if s > 0]
+        trait_scores = [norm(s) for s in (t.get("score", 0) for t in traits) if s > 0]
+        if line_scores or trait_scores:
+            line_avg = sum(line_scores) / len(line_scores) if line_scores else 50
+            trait_avg = sum(trait_scores) / len(trait_scores) if trait_scores else 50
+            overall = max(40, min(95, (line_avg * 0.5) + (trait_avg * 0.5)))
+
+    data["overallScore"] = norm(overall)
+    for key in _LEGACY_LINE_ORDER:
+        if key in lines:
+            lines[key]["score"] = norm(lines[key].get("score", 0))
+    for trait in traits:
+        trait["score"] = norm(trait.get("score", 0))
+    for pred in data.get("predictions", []):
+        pred["confidence"] = norm(pred.get("confidence", 0))
+    for comp in data.get("compatibility", []):
+        comp["match"] = norm(comp.get("match", 0))
+    if "accuracy" in data:
+        accuracy = data["accuracy"]
+        for key in _ACCURACY_KEYS:
+            accuracy[key] = norm(accuracy.get(key, 0))
+    return data
+
+
+def normalize_palm_result(raw: Dict[str, Any], rng: Optional[random.Random] = None) -> Dict[str, Any]:
+    """
+    Normalize a parsed model answer into PalmAnalysisResult JSON.
+
+    `rng` drives the compatibility jitter (default: the `random` module).
+    `raw` is not modified.
+    """
+    if "palm_lines" not in raw:
+        return _normalize_legacy(raw)
+
+    palm_lines = raw.get("palm_lines", {})
+    physical = raw.get("physical_characteristics", {})
+    transformed: Dict[str, Any] = {
+        "lines": {
+            new_key: _normalize_line(old_key, palm_lines[old_key])
+            for old_key, new_key in LINE_KEYS
+            if old_key in palm_lines
+        },
+    }
+    transformed["personality"] = _personality(raw, palm_lines)
+    transformed["predictions"] = _predictions(raw, palm_lines)
+    transformed["specialMarks"] = _special_marks(raw)
+
+    hand_analysis = raw.get("hand_type_analysis", {})
+    overall_score = parse_percentage(hand_analysis.get("overall_score", "0%"))
+    if not overall_score > 0:
+        overall_score = _computed_overall_score(transformed)
+    transformed["overallScore"] = norm(overall_score)
+
+    summary = hand_analysis.get("summary", "") or _summary(overall_score)
+    transformed["summary"] = summary
+    if not transformed["personality"].get("handTypeAnalysis"):
+        transformed["personality"]["handTypeAnalysis"] = summary
+
+    transformed["compatibility"] = _compatibility(physical, rng or random)
+
+    line_scores = [line["score"] for line in transformed["lines"].values()]
+    average = sum(line_scores) / len(line_scores) if line_scores else 0
+    transformed["accuracy"] = {
+        "lineDetection": int(average),
+        "patternAnalysis": int(average * 0.9),
+        "interpretation": int(average * 0.85),
+        "overall": int(average * 0.92),
+    }
+    transformed["modelVersion"] = MODEL_VERSION
+
+    log.debug(
+        "Normalized palm result: overall=%s lines=%d traits=%d predictions=%d marks=%d",
+        transformed["overallScore"],
+        len(transformed["lines"]),
+        len(transformed["personality"]["traits"]),
+        len(transformed["predictions"]),
+        len(transformed["specialMarks"]),
+    )
+    return transformed
@@ -0,0 +1,295 @@
+"""
+Per-reading values shown on the dashboard, derived from `Reading.result`:
+type, accuracy, insight count and prediction summaries. Used by the
+dashboard view for its recent readings and by `readings.aggregates` for the
+running totals, so both count the same way.
+
+`reading_scores` gives the values stored in the Reading score columns
+(filled by Reading.save), so lists, sorts and aggregates can use SQL instead
+of loading result documents; `backfill_scores` fills them for older rows.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, List, Optional
+
+from django.db import NotSupportedError, transaction
+from django.db.models import Func, IntegerField
+
+from .models import Reading, ReadingStatus, ReadingType
+
+LINE_KEYS = ("lifeLine", "headLine", "heartLine", "fateLine")
+
+# Reading columns holding the values of `reading_scores`, and the fields
+# they are derived from.
+SCORE_FIELDS = ("overall_score", "accuracy_pct", "insights_count", "top_prediction_confidence")
+SCORE_SOURCE_FIELDS = ("reading_type", "status", "result")
+
+# Confidence of predictions that carry none.
+DEFAULT_CONFIDENCE = {
+    ReadingType.PALM_ANALYSIS: 80,
+    ReadingType.ASTROLOGY_READING: 85,
+}
+
+# Accuracy shown for completed readings whose result carries no score.
+DEFAULT_ACCURACY = {
+    ReadingType.NUMEROLOGY: 95,  # Numerology calculations are deterministic
+    ReadingType.ASTROLOGY_READING: 91,
+}
+DEFAULT_PALM_ACCURACY = 90
+
+
+def _result(reading: Reading) -> Dict[str, Any]:
+    return reading.result if isinstance(reading.result, dict) else {}
+
+
+def _pct(value: float) -> int:
+    # Scores come as 0-1 or 0-100.
+    return int(round(value * 100)) if value <= 1 else int(round(value))
+
+
+def reading_type_of(reading: Reading) -> str:
+    if reading.reading_type:
+        return reading.reading_type
+    # Old readings without the reading_type field.
+    result = _result(reading)
+    return result.get("type") or result.get("reading_type") or result.get("readingType") or "palm_analysis"
+
+
+def overall_accuracy(result: Any) -> Optional[int]:
+    """
+    `accuracy.overall` as a percentage, or None (the weekly activity chart).
+    Rounds half up (truncating x + 0.5) exactly like OverallAccuracy in SQL.
+    """
+    if not isinstance(result, dict):
+        return None
+    block = result.get("accuracy")
+    if isinstance(block, dict):
+        overall = block.get("overall")
+        if isinstance(overall, (int, float)) and not isinstance(overall, bool):
+            return int((overall * 100 if overall <= 1 else overall) + 0.5)
+    return None
+
+
+class OverallAccuracy(Func):
+    """
+    SQL twin of `overall_accuracy` over a JSON column (default
+    `Reading.result`): NULL unless `accuracy.overall` is a JSON number, so
+    Count/Sum/Avg can aggregate it without loading the documents.
+    """
+
+    output_field = IntegerField()
+
+    def __init__(self, expression: str = "result", **extra: Any) -> None:
+        super().__init__(expression, **extra)
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(f"OverallAccuracy is not implemented for {connection.vendor}")
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        column, params = compiler.compile(self.source_expressions[0])
+        value = f"JSON_EXTRACT({column}, '$.accuracy.overall')"
+        sql = (
+            f"CASE WHEN JSON_TYPE({column}, '$.accuracy.overall') IN ('integer', 'real') "
+            f"THEN CAST((CASE WHEN {value} <= 1 THEN {value} * 100 ELSE {value} END) + 0.5 AS INTEGER) END"
+        )
+        return sql, (*params, *params, *params, *params)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        column, params = compiler.compile(self.source_expressions[0])
+        value = f"(({column}) -> 'accuracy' ->> 'overall')::double precision"
+        sql = (
+            f"CASE WHEN jsonb_typeof(({column}) -> 'accuracy' -> 'overall') = 'number' "
+            f"THEN TRUNC((CASE WHEN {value} <= 1 THEN {value} * 100 ELSE {value} END) + 0.5)::integer END"
+        )
+        return sql, (*params, *params, *params, *params)
+
+
+def accuracy_pct(reading: Reading, reading_type: Optional[str] = None) -> int:
+    """Accuracy percentage of a reading; 0 when there is none."""
+    reading_type = reading_type or reading_type_of(reading)
+    result = _result(reading)
+    accuracy = 0
+
+    block = result.get("accuracy")
+    if isinstance(block, dict):
+        overall = block.get("overall")
+        if isinstance(overall, (int, float)) and overall > 0:
+            accuracy = _pct(overall)
+
+    # Direct accuracy field (numerology/astrology format)
+    if accuracy == 0 and isinstance(block, (int, float)) and block > 0:
+        accuracy = int(round(block))
+
+    if accuracy == 0 and reading_type == ReadingType.PALM_ANALYSIS:
+        overall_score = result.get("overallScore")
+        if isinstance(overall_score, (int, float)) and overall_score > 0:
+            accuracy = _pct(overall_score)
+
+        # Average of the line scores, skipping an absent fate line
+        lines = result.get("lines")
+        if accuracy == 0 and isinstance(lines, dict):
+            scores = []
+            for key in LINE_KEYS:
+                line = lines.get(key)
+                if not isinstance(line, dict):
+                    continue
+                if key == "fateLine" and str(line.get("quality", "")).lower() == "absent":
+                    continue
+                score = line.get("score", 0)
+                if isinstance(score, (int, float)) and score > 0:
+                    scores.append(score)
+            if scores:
+                accuracy = int(round(sum(scores) / len(scores)))
+
+    if accuracy == 0 and reading.status == ReadingStatus.DONE:
+        accuracy = DEFAULT_ACCURACY.get(reading_type, DEFAULT_PALM_ACCURACY)
+    return accuracy
+
+
+def reading_predictions(reading: Reading, reading_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Prediction summaries (area, timeframe, prediction, confidence)."""
+    reading_type = reading_type or reading_type_of(reading)
+    result = _result(reading)
+    predictions = []
+
+    if reading_type == ReadingType.PALM_ANALYSIS:
+        items = result.get("predictions")
+        for p in items if isinstance(items, list) else []:
+            if not isinstance(p, dict):
+                continue
+            confidence = p.get("confidence")
+            predictions.append(
+                {
+                    "area": str(p.get("area") or p.get("type") or "General"),
+                    "timeframe": str(p.get("timeframe") or p.get("window") or ""),
+                    "prediction": str(p.get("prediction") or p.get("summary") or ""),
+                    "confidence": int(round(confidence)) if isinstance(confidence, (int, float)) else 80,
+                }
+            )
+    elif reading_type == ReadingType.ASTROLOGY_READING:
+        items = result.get("lifePredictions")
+        for p in items if isinstance(items, list) else []:
+            if not isinstance(p, dict):
+                continue
+            text = p.get("prediction") or p.get("description") or ""
+            if text:
+                predictions.append(
+                    {
+                        "area": str(p.get("area") or "General"),
+                        "timeframe": p.get("timeframe", "Upcoming"),
+                        "prediction": str(text),
+                        "confidence": p.get("confidence", 85),
+                    }
+                )
+    return predictions
+
+
+def prediction_items(reading: Reading, reading_type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """The raw prediction objects of a palm or astrology result."""
+    reading_type = reading_type or reading_type_of(reading)
+    key = {ReadingType.PALM_ANALYSIS: "predictions", ReadingType.ASTROLOGY_READING: "lifePredictions"}.get(
+        reading_type
+    )
+    items = _result(reading).get(key) if key else None
+    return [p for p in items if isinstance(p, dict)] if isinstance(items, list) else []
+
+
+def _number(value: Any) -> Optional[float]:
+    return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+def confidence_key(value: Any) -> float:
+    """Sort key of a prediction confidence; values that are not numbers sort last."""
+    number = _number(value)
+    return 0.0 if number is None else number
+
+
+def _list_len(value: Any) -> int:
+    return len(value) if isinstance(value, list) else 0
+
+
+def insights_count(reading: Reading, reading_type: Optional[str] = None) -> int:
+    """Number of insights a reading generated (each prediction is one)."""
+    reading_type = reading_type or reading_type_of(reading)
+    result = _result(reading)
+    insights = 0
+
+    if reading_type == ReadingType.PALM_ANALYSIS:
+        lines = result.get("lines")
+        if isinstance(lines, dict):
+            for key in LINE_KEYS:
+                line = lines.get(key)
+                if isinstance(line, dict) and str(line.get("quality", "")).lower() != "absent":
+                    insights += 1
+        personality = result.get("personality")
+        if isinstance(personality, dict):
+            insights += _list_len(personality.get("traits"))
+            for key in ("dominantHand", "palmShape", "fingerLength", "handType"):
+                if personality.get(key):
+                    insights += 1
+        insights += len(reading_predictions(reading, reading_type))
+        insights += _list_len(result.get("specialMarks")) + _list_len(result.get("special_marks"))
+        insights += _list_len(result.get("compatibility"))
+        if result.get("overallScore") is not None:
+            insights += 1
+
+    elif reading_type == ReadingType.NUMEROLOGY:
+        for key in ("lifePathNumber", "destinyNumber", "soulNumber", "personalityNumber", "interpretation"):
+            if result.get(key):
+                insights += 1
+        insights += _list_len(result.get("compatibility")) + _list_len(result.get("luckyNumbers"))
+
+    elif reading_type == ReadingType.ASTROLOGY_READING:
+        if result.get("sunSign") or result.get("moonSign") or result.get("risingSign"):
+            insights += 3
+        insights += _list_len(result.get("personalityTraits"))
+        insights += len(reading_predictions(reading, reading_type))
+        insights += _list_len(result.get("strengths")) + _list_len(result.get("challenges"))
+
+    return insights
+
+
+def reading_scores(reading: Reading) -> Dict[str, Any]:
+    """Values of the Reading score columns (SCORE_FIELDS)."""
+    reading_type = reading_type_of(reading)
+    result = _result(reading)
+    overall = result.get("overallScore")
+    default = DEFAULT_CONFIDENCE.get(reading_type, 0)
+    confidences = [confidence_key(p.get("confidence", default)) for p in prediction_items(reading, reading_type)]
+    return {
+        "overall_score": _number(result.get("overall_score") if overall is None else overall),
+        "accuracy_pct": accuracy_pct(reading, reading_type),
+        "insights_count": insights_count(reading, reading_type),
+        "top_prediction_confidence": max(confidences, default=None),
+    }
+
+
+def backfill_scores(
+    chunk_size: int = 500, recompute: bool = False, progress: Optional[Callable[[int], None]] = None
+) -> int:
+    """
+    Fill the score columns of readings saved before they existed (all
+    readings with `recompute`), `chunk_size` rows per query and transaction
+    in primary key order. Returns the number of readings updated.
+    """
+    readings = Reading.objects.order_by("pk").only("pk", *SCORE_SOURCE_FIELDS)
+    if not recompute:
+        readings = readings.filter(accuracy_pct__isnull=True)
+    updated = 0
+    last_pk = None
+    while True:
+        chunk = list((readings if last_pk is None else readings.filter(pk__gt=last_pk))[:chunk_size])
+        if not chunk:
+            return updated
+        for reading in chunk:
+            for field, value in reading_scores(reading).items():
+                setattr(reading, field, value)
+        # bulk_update sends no signals; the aggregates are unaffected, as
+        # they read the result for readings whose columns are still NULL.
+        with transaction.atomic():
+            Reading.objects.bulk_update(chunk, SCORE_FIELDS)
+        updated += len(chunk)
+        last_pk = chunk[-1].pk
+        if progress is not None:
+            progress(updated)
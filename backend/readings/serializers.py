@@ -1,21 +1,34 @@
+from django.core import signing
 from rest_framework import serializers
 from .models import Reading, EventLog, ReadingStatus, ReadingType
+from .storage import unsign_upload_key
 
 
 class ReadingUploadSerializer(serializers.Serializer):
     image = serializers.ImageField(required=False, allow_null=True)
     image_base64 = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+    upload_token = serializers.CharField(required=False, allow_null=True, allow_blank=True, max_length=512)
+
+    def validate_upload_token(self, value):
+        # Only keys granted by PalmUploadURLView are accepted, never a raw key.
+        if not value:
+            return value
+        try:
+            return unsign_upload_key(value)
+        except signing.BadSignature:
+            raise serializers.ValidationError("Invalid upload token.")
 
     def validate(self, data):
-        if not data.get("image") and not data.get("image_base64"):
-            raise serializers.ValidationError("Either 'image' or 'image_base64' must be provided.")
+        if not data.get("image") and not data.get("image_base64") and not data.get("upload_token"):
+            raise serializers.ValidationError("One of 'image', 'image_base64' or 'upload_token' must be provided.")
+        data["storage_key"] = data.pop("upload_token", None)
         return data
 
 
 class ReadingStatusSerializer(serializers.ModelSerializer):
     class Meta:
         model = Reading
-        fields = ["id", "status", "error_message", "created_at", "updated_at"]
+        fields = ["id", "status", "error_message", "retry_count", "created_at", "updated_at"]
 
 
 class ReadingResultSerializer(serializers.ModelSerializer):
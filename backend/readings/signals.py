@@ -0,0 +1,42 @@
+"""
+Publish reading status changes for the SSE endpoint (`ReadingEventsView`).
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict
+
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from palmastro_backend import events
+
+from .models import Reading, ReadingStatus
+from .serializers import ReadingStatusSerializer
+
+TERMINAL_STATUSES = {ReadingStatus.DONE, ReadingStatus.FAILED}
+
+
+def reading_channel(reading_id: Any) -> str:
+    return f"reading:{reading_id}"
+
+
+def reading_event(reading: Reading) -> Dict[str, Any]:
+    """Status payload; carries the result once the reading is done."""
+    data = dict(ReadingStatusSerializer(reading).data)
+    if reading.status == ReadingStatus.DONE:
+        data["result"] = reading.result
+    return data
+
+
+def is_terminal(event: Dict[str, Any]) -> bool:
+    return event.get("status") in TERMINAL_STATUSES
+
+
+@receiver(post_save, sender=Reading, dispatch_uid="readings.publish_status")
+def publish_reading_status(sender, instance: Reading, created: bool, update_fields=None, **kwargs) -> None:
+    if update_fields is not None and "status" not in update_fields and "result" not in update_fields:
+        return
+    event = reading_event(instance)
+    transaction.on_commit(lambda: events.publish(reading_channel(instance.pk), event))
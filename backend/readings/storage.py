@@ -0,0 +1,178 @@
+"""
+Storage for uploaded palm images, addressed by key.
+
+`get_image_storage()` returns the backend selected by PALM_STORAGE_BACKEND:
+
+- "local": Django's default storage (MEDIA_ROOT). Presigned uploads are
+  signed URLs to `readings:palm-upload-put`, so the direct-upload flow works
+  in development without an object store.
+- "s3": any S3-compatible object store (AWS S3, MinIO, R2, ...) through
+  boto3, which is imported only when this backend is used. Clients PUT
+  images straight to the bucket with presigned URLs.
+
+Either way the web tier only handles keys: upload views store the image (or
+hand out a presigned PUT) and queue the key; the worker streams the object
+into pre-processing and deletes it afterwards.
+"""
+
+from __future__ import annotations
+
+import shutil
+import tempfile
+import uuid
+from functools import lru_cache
+from typing import IO, Dict, Optional
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.urls import reverse
+
+UPLOAD_PREFIX = "palm_uploads/"
+UPLOAD_SIGNING_SALT = "readings.palm-upload"
+UPLOAD_KEY_SALT = "readings.palm-upload-key"
+MAX_UPLOAD_BYTES = 10 * 1024 * 1024
+
+_EXTENSIONS = {"image/jpeg": "jpg", "image/png": "png", "image/webp": "webp", "image/heic": "heic", "image/heif": "heif"}
+
+
+def new_upload_key(content_type: str) -> str:
+    extension = _EXTENSIONS.get(content_type, "jpg")
+    return f"{UPLOAD_PREFIX}{uuid.uuid4()}/palm.{extension}"
+
+
+def sign_upload_key(key: str) -> str:
+    """The upload token a client submits to create a reading from `key`."""
+    return signing.dumps(key, salt=UPLOAD_KEY_SALT)
+
+
+def unsign_upload_key(token: str) -> str:
+    """The key granted by `sign_upload_key`; raises signing.BadSignature."""
+    return signing.loads(token, salt=UPLOAD_KEY_SALT)
+
+
+def upload_url_ttl() -> int:
+    return int(getattr(settings, "PALM_UPLOAD_URL_TTL_SECONDS", 600))
+
+
+class LocalImageStorage:
+    """Images under MEDIA_ROOT via Django's default storage."""
+
+    def __init__(self, storage=None):
+        self.storage = storage or default_storage
+
+    def save(self, key: str, content: IO[bytes], content_type: str = "") -> str:
+        return self.storage.save(key, File(content))
+
+    def open(self, key: str) -> IO[bytes]:
+        return self.storage.open(key, "rb")
+
+    def size(self, key: str) -> Optional[int]:
+        if not self.storage.exists(key):
+            return None
+        return self.storage.size(key)
+
+    def delete(self, key: str) -> None:
+        self.storage.delete(key)
+
+    def presigned_put(self, key: str, content_type: str) -> Dict:
+        token = signing.dumps({"key": key, "content_type": content_type}, salt=UPLOAD_SIGNING_SALT)
+        return {
+            "url": reverse("readings:palm-upload-put", kwargs={"token": token}),
+            "method": "PUT",
+            "headers": {"Content-Type": content_type},
+        }
+
+
+class S3ImageStorage:
+    """Images in an S3-compatible bucket (AWS S3, MinIO, ...)."""
+
+    def __init__(self, bucket: str, endpoint_url: str = "", region: str = ""):
+        if not bucket:
+            raise ImproperlyConfigured("PALM_STORAGE_BACKEND=s3 requires S3_BUCKET")
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url or None
+        self.region = region or None
+        self._client = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            try:
+                import boto3
+                from botocore.config import Config
+            except ImportError as exc:
+                raise ImproperlyConfigured(
+                    "PALM_STORAGE_BACKEND=s3 requires boto3 (pip install boto3)"
+                ) from exc
+            self._client = boto3.client(
+                "s3",
+                endpoint_url=self.endpoint_url,
+                region_name=self.region,
+                config=Config(signature_version="s3v4"),
+            )
+        return self._client
+
+    def save(self, key: str, content: IO[bytes], content_type: str = "") -> str:
+        extra = {"ContentType": content_type} if content_type else None
+        self.client.upload_fileobj(content, self.bucket, key, ExtraArgs=extra)
+        return key
+
+    def open(self, key: str) -> IO[bytes]:
+        """
+        Stream the object into a spooled temp file: small images stay in
+        memory, large ones go to disk, and Pillow gets a seekable file.
+        """
+        body = self.client.get_object(Bucket=self.bucket, Key=key)["Body"]
+        spool = tempfile.SpooledTemporaryFile(
+            max_size=int(getattr(settings, "PALM_STORAGE_SPOOL_MAX_BYTES", 2 * 1024 * 1024))
+        )
+        try:
+            shutil.copyfileobj(body, spool, 64 * 1024)
+        finally:
+            body.close()
+        spool.seek(0)
+        return spool
+
+    def size(self, key: str) -> Optional[int]:
+        from botocore.exceptions import ClientError
+
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError as exc:
+            if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+        return int(head["ContentLength"])
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def presigned_put(self, key: str, content_type: str) -> Dict:
+        url = self.client.generate_presigned_url(
+            "put_object",
+            Params={"Bucket": self.bucket, "Key": key, "ContentType": content_type},
+            ExpiresIn=upload_url_ttl(),
+        )
+        return {"url": url, "method": "PUT", "headers": {"Content-Type": content_type}}
+
+
+@lru_cache(maxsize=1)
+def _build_storage(backend: str, bucket: str, endpoint_url: str, region: str):
+    if backend == "s3":
+        return S3ImageStorage(bucket, endpoint_url=endpoint_url, region=region)
+    if backend == "local":
+        return LocalImageStorage()
+    raise ImproperlyConfigured(f"Unknown PALM_STORAGE_BACKEND {backend!r}")
+
+
+def get_image_storage():
+    """The configured image storage (one instance per configuration)."""
+    return _build_storage(
+        getattr(settings, "PALM_STORAGE_BACKEND", "local"),
+        getattr(settings, "S3_BUCKET", ""),
+        getattr(settings, "S3_ENDPOINT_URL", ""),
+        getattr(settings, "S3_REGION", ""),
+    )
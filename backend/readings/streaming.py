@@ -0,0 +1,81 @@
+"""
+Incremental parsing of a streamed JSON object.
+
+The palm model answers with one JSON object whose top-level members
+(`palm_lines`, `personality`, `predictions`, `special_marks`, ...) arrive
+one after another. `TopLevelJsonParser` is fed the streamed text and returns
+each top-level member as soon as it is complete, so sections can be shown
+before the whole answer has been generated.
+"""
+
+from __future__ import annotations
+
+import json
+from typing import Any, List, Tuple
+
+
+class TopLevelJsonParser:
+    """
+    Feed text chunks with `feed()`; it returns the `(key, value)` pairs of
+    the top-level members completed by that chunk. Text before the opening
+    brace (e.g. a markdown fence) is ignored. Members that fail to parse are
+    skipped; the caller still parses the full text at the end.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._member_start = -1
+        self.finished = False
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        if self.finished or not chunk:
+            return []
+        self._buffer += chunk
+        members: List[Tuple[str, Any]] = []
+        buffer = self._buffer
+        for i in range(self._pos, len(buffer)):
+            char = buffer[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"':
+                if self._depth > 0:
+                    self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 1:
+                    if char != "{":
+                        # Not an object; nothing to stream.
+                        self.finished = True
+                        break
+                    self._member_start = i + 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit(buffer[self._member_start:i], members)
+                    self.finished = True
+                    break
+            elif char == "," and self._depth == 1:
+                self._emit(buffer[self._member_start:i], members)
+                self._member_start = i + 1
+        self._pos = len(buffer)
+        return members
+
+    @staticmethod
+    def _emit(text: str, members: List[Tuple[str, Any]]) -> None:
+        if not text.strip():
+            return
+        try:
+            member = json.loads("{" + text + "}")
+        except json.JSONDecodeError:
+            return
+        members.extend(member.items())
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+import io
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from readings.aggregates import GLOBAL_SCOPE, daily_totals, dashboard_totals, user_scope
+from readings.models import Reading, ReadingDailyStats, ReadingStats, ReadingStatus, ReadingType
+from readings.scoring import OverallAccuracy, overall_accuracy
+
+PALM_RESULT = {
+    "lines": {
+        "lifeLine": {"quality": "Strong", "score": 80},
+        "heartLine": {"quality": "Moderate", "score": 70},
+        "fateLine": {"quality": "Absent", "score": 0},
+    },
+    "personality": {"traits": [{"name": "Leadership", "score": 80}], "palmShape": "Earth"},
+    "predictions": [{"area": "Career", "timeframe": "6 months", "prediction": "Growth", "confidence": 77}],
+    "accuracy": {"overall": 0.82},
+    "overallScore": 75,
+}
+
+
+# accuracy.overall edge cases: fractions, percentages, halves, non-numbers.
+ACCURACY_RESULTS = [
+    {"accuracy": {"overall": value}}
+    for value in (0.82, 0.825, 1, 1.0, 0, 82.5, 99.4, -0.3, "0.9", True, None, [1])
+] + [None, {}, {"accuracy": 0.9}, {"accuracy": {}}, [1, 2]]
+
+
+def _snapshot():
+    return (
+        sorted(ReadingStats.objects.values_list("scope", "reading_type", "readings", "accuracy_sum", "accuracy_count", "insights")),
+        sorted(ReadingDailyStats.objects.values_list("scope", "day", "readings", "accuracy_sum", "accuracy_count")),
+    )
+
+
+class ReadingAggregatesTests(TestCase):
+    def _complete(self, reading, result=PALM_RESULT):
+        reading.result = result
+        reading.status = ReadingStatus.DONE
+        reading.save()
+
+    def test_created_and_completed_readings_are_counted(self):
+        reading = Reading.objects.create()
+
+        totals = dashboard_totals()
+        self.assertEqual((totals["total_readings"], totals["average_accuracy"]), (1, 0))
+
+        self._complete(reading)
+
+        stats = ReadingStats.objects.get(scope=GLOBAL_SCOPE, reading_type=ReadingType.PALM_ANALYSIS)
+        self.assertEqual((stats.readings, stats.accuracy_sum, stats.accuracy_count), (1, 82, 1))
+        # 2 present lines, 1 trait, palm shape, 1 prediction, overall score
+        self.assertEqual(stats.insights, 6)
+        day = ReadingDailyStats.objects.get(scope=GLOBAL_SCOPE)
+        self.assertEqual((day.readings, day.accuracy_sum, day.accuracy_count), (1, 82, 1))
+
+    def test_saves_that_change_nothing_tracked_do_not_touch_the_aggregates(self):
+        reading = Reading.objects.create()
+
+        with mock.patch("readings.aggregates._bump") as bump:
+            reading.status = ReadingStatus.PROCESSING
+            reading.save(update_fields=["status", "updated_at"])
+            reading.storage_key = "palm_uploads/x.jpg"
+            reading.save()
+
+        bump.assert_not_called()
+
+    def test_reloaded_reading_is_not_counted_twice(self):
+        reading = Reading.objects.create()
+        self._complete(Reading.objects.get(pk=reading.pk))
+
+        reading.refresh_from_db()
+        reading.save()
+        Reading.objects.get(pk=reading.pk).save()
+
+        self.assertEqual(dashboard_totals()["total_readings"], 1)
+        self.assertEqual(ReadingStats.objects.get(scope=GLOBAL_SCOPE).accuracy_count, 1)
+
+    def test_deleted_readings_are_subtracted(self):
+        self._complete(Reading.objects.create())
+        Reading.objects.create(reading_type=ReadingType.NUMEROLOGY)
+
+        Reading.objects.all().delete()
+
+        totals = dashboard_totals()
+        self.assertEqual((totals["total_readings"], totals["total_insights"]), (0, 0))
+        self.assertEqual(ReadingDailyStats.objects.get(scope=GLOBAL_SCOPE).readings, 0)
+
+    def test_user_readings_are_counted_for_the_user_too(self):
+        user = get_user_model().objects.create_user(username="ada", email="ada@example.com", password="x")
+
+        Reading.objects.create(user=user, reading_type=ReadingType.NUMEROLOGY)
+        Reading.objects.create()
+
+        self.assertEqual(dashboard_totals(user_scope(user.pk))["total_readings"], 1)
+        self.assertEqual(dashboard_totals()["total_readings"], 2)
+
+    def test_rebuild_matches_incremental_updates(self):
+        self._complete(Reading.objects.create())
+        Reading.objects.create(reading_type=ReadingType.ASTROLOGY_READING, status=ReadingStatus.DONE)
+        Reading.objects.create(status=ReadingStatus.FAILED)
+        incremental = _snapshot()
+        ReadingStats.objects.update(readings=99)
+
+        call_command("rebuild_reading_stats", stdout=io.StringIO())
+
+        self.assertEqual(_snapshot(), incremental)
+
+
+class OverallAccuracyTests(TestCase):
+    def test_sql_matches_python(self):
+        for result in ACCURACY_RESULTS:
+            Reading.objects.create(result=result)
+
+        for reading in Reading.objects.annotate(overall=OverallAccuracy()):
+            with self.subTest(result=reading.result):
+                self.assertEqual(reading.overall, overall_accuracy(reading.result))
+
+    def test_daily_totals_match_incremental_updates(self):
+        user = get_user_model().objects.create_user(username="ada", email="ada@example.com", password="x")
+        for i, result in enumerate(ACCURACY_RESULTS):
+            Reading.objects.create(result=result, user=user if i % 3 == 0 else None)
+
+        with self.assertNumQueries(1):
+            daily = daily_totals()
+
+        self.assertEqual(
+            sorted((scope, day, dict(values)) for (scope, day), values in daily.items()),
+            sorted(
+                (row["scope"], row["day"], {k: row[k] for k in ("readings", "accuracy_sum", "accuracy_count") if row[k]})
+                for row in ReadingDailyStats.objects.values()
+            ),
+        )
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_dashboard_reads_the_aggregates(self):
+        reading = Reading.objects.create()
+        reading.result = PALM_RESULT
+        reading.status = ReadingStatus.DONE
+        reading.save()
+        Reading.objects.create(reading_type=ReadingType.NUMEROLOGY, status=ReadingStatus.DONE)
+
+        response = self.client.get(reverse("accounts:dashboard"))
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        stats = data["user_stats"]
+        self.assertEqual((stats["total_readings"], stats["readings_this_week"]), (2, 2))
+        # Palm 82, numerology without a score 95
+        self.assertEqual(stats["average_accuracy"], 88)
+        self.assertEqual(stats["total_insights_generated"], 6)
+        self.assertEqual(data["weekly_activity"][-1], {"day": data["weekly_activity"][-1]["day"], "readings": 2, "accuracy": 82})
+        self.assertEqual([r["insights"] for r in data["recent_readings"]], [1, 6])
+        self.assertEqual(data["upcoming_predictions"][0]["confidence"], 77)
+
+    @override_settings(DASHBOARD_CACHE_ENABLED=False)
+    def test_query_count_does_not_grow_with_readings(self):
+        url = reverse("accounts:dashboard")
+        # Type totals, daily totals, recent readings
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+        for i in range(30):
+            Reading.objects.create(
+                reading_type=ReadingType.NUMEROLOGY if i % 2 else ReadingType.PALM_ANALYSIS,
+                result=PALM_RESULT,
+                status=ReadingStatus.DONE,
+            )
+
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+        self.assertEqual(response.json()["user_stats"]["total_readings"], 30)
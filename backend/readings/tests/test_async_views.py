@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import AsyncRequestFactory, TestCase, override_settings
+
+from readings.models import Reading, ReadingStatus
+from readings.views_palm import AsyncPalmReadingAnalyzeView
+
+FAKE_JPEG = b"\xff\xd8\xff\xe0" + b"palm" * 64
+FAKE_RESULT = {"overallScore": 77, "lines": {}, "modelVersion": "2.0"}
+
+
+@override_settings(PALM_RESULT_CACHE_ENABLED=False)
+class AsyncPalmAnalyzeViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.view = AsyncPalmReadingAnalyzeView.as_view()
+        self.factory = AsyncRequestFactory()
+
+    def _request(self, data=None):
+        if data is None:
+            data = {"image": SimpleUploadedFile("palm.jpg", FAKE_JPEG, content_type="image/jpeg")}
+        return self.factory.post("/api/v1/palm-reading/analyze/", data)
+
+    @mock.patch("readings.views_palm._call_gpt_palm_model")
+    @mock.patch("readings.views_palm._acall_gpt_palm_model", return_value=FAKE_RESULT)
+    async def test_model_call_is_awaited(self, acall_model, call_model):
+        response = await self.view(self._request())
+
+        self.assertEqual(response.status_code, 200)
+        acall_model.assert_awaited_once()
+        call_model.assert_not_called()
+        reading = await Reading.objects.aget(id=response.data["reading_id"])
+        self.assertEqual(reading.status, ReadingStatus.DONE)
+        self.assertEqual(reading.result, FAKE_RESULT)
+
+    @mock.patch("readings.views_palm._acall_gpt_palm_model", side_effect=ValueError("Not a palm"))
+    async def test_model_errors_are_reported_like_the_sync_view(self, acall_model):
+        response = await self.view(self._request())
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data["error"], "Not a palm")
+        reading = await Reading.objects.aget()
+        self.assertEqual(reading.status, ReadingStatus.FAILED)
+
+    @mock.patch("readings.views_palm._acall_gpt_palm_model")
+    async def test_validation_errors_skip_the_model(self, acall_model):
+        response = await self.view(self._request(data={}))
+
+        self.assertEqual(response.status_code, 400)
+        acall_model.assert_not_called()
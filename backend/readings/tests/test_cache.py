@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from readings.cache import get_palm_cache_stats, palm_result_cache_key
+from readings.imaging import prepare_palm_image
+from readings.models import Reading, ReadingStatus
+from readings.tasks import analyze_palm_image
+
+FAKE_JPEG = b"\xff\xd8\xff\xe0" + b"palm" * 64
+FAKE_RESULT = {"overallScore": 77, "lines": {}, "modelVersion": "2.0"}
+
+
+class PalmResultCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_cache_key_depends_on_image_and_model(self):
+        key = palm_result_cache_key(FAKE_JPEG)
+        self.assertEqual(key, palm_result_cache_key(FAKE_JPEG))
+        self.assertNotEqual(key, palm_result_cache_key(FAKE_JPEG + b"x"))
+        with override_settings(OPENAI_MODEL="gpt-4o"):
+            self.assertNotEqual(key, palm_result_cache_key(FAKE_JPEG))
+
+    @mock.patch("readings.tasks._call_gpt_palm_model", return_value=FAKE_RESULT)
+    def test_repeat_analysis_is_served_from_cache(self, call_model):
+        image = prepare_palm_image(FAKE_JPEG)
+        self.assertEqual(analyze_palm_image(image), FAKE_RESULT)
+        self.assertEqual(analyze_palm_image(image), FAKE_RESULT)
+        self.assertEqual(call_model.call_count, 1)
+
+        stats = get_palm_cache_stats()
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_ratio"], 0.5)
+
+    @override_settings(PALM_RESULT_CACHE_ENABLED=False)
+    @mock.patch("readings.tasks._call_gpt_palm_model", return_value=FAKE_RESULT)
+    def test_disabled_cache_always_calls_model(self, call_model):
+        image = prepare_palm_image(FAKE_JPEG)
+        analyze_palm_image(image)
+        analyze_palm_image(image)
+        self.assertEqual(call_model.call_count, 2)
+
+    @mock.patch("readings.views_palm.is_palm_image")
+    @mock.patch("readings.views_palm._call_gpt_palm_model")
+    def test_analyze_view_writes_cached_result_into_new_reading(self, call_model, is_palm):
+        cache.set(palm_result_cache_key(FAKE_JPEG), FAKE_RESULT)
+        upload = SimpleUploadedFile("palm.jpg", FAKE_JPEG, content_type="image/jpeg")
+
+        response = self.client.post(
+            reverse("readings:palm-reading-analyze"), {"image": upload}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        call_model.assert_not_called()
+        is_palm.assert_not_called()
+        reading = Reading.objects.get(id=response.json()["reading_id"])
+        self.assertEqual(reading.status, ReadingStatus.DONE)
+        self.assertEqual(reading.result, FAKE_RESULT)
+        self.assertFalse(reading.image)
@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+import io
+from datetime import timedelta
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from readings import dashboard_cache
+from readings.models import Reading, ReadingStatus
+
+from .test_aggregates import PALM_RESULT
+
+
+@override_settings(DASHBOARD_CACHE_ENABLED=True)
+class DashboardCacheTests(TestCase):
+    url = reverse("accounts:dashboard")
+
+    def setUp(self):
+        cache.clear()
+
+    def _get(self, **headers):
+        return self.client.get(self.url, headers=headers)
+
+    def test_cached_until_a_reading_is_written(self):
+        first = self._get()
+        with self.assertNumQueries(0):
+            second = self._get()
+        self.assertEqual(second.json(), first.json())
+        self.assertEqual(second["ETag"], first["ETag"])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Reading.objects.create(result=PALM_RESULT, status=ReadingStatus.DONE)
+
+        third = self._get()
+        self.assertNotEqual(third["ETag"], first["ETag"])
+        self.assertEqual(third.json()["user_stats"]["total_readings"], 1)
+
+    def test_current_etag_gets_304_without_queries(self):
+        etag = self._get()["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self._get(if_none_match=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_authenticated_revalidation_does_not_load_the_user(self):
+        user = get_user_model().objects.create_user(username="ada", email="ada@example.com", password="x")
+        auth = {"authorization": f"Bearer {AccessToken.for_user(user)}"}
+        etag = self._get(**auth)["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self._get(if_none_match=etag, **auth)
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_stale_etag_gets_the_payload(self):
+        etag = self._get()["ETag"]
+        reading = Reading.objects.create()
+        with self.captureOnCommitCallbacks(execute=True):
+            reading.status = ReadingStatus.FAILED
+            reading.save()
+
+        response = self._get(if_none_match=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["recent_readings"][0]["status"], "failed")
+
+    def test_bump_from_another_process_invalidates_the_payload(self):
+        first = self._get()
+        # A Celery worker writing a reading: its own client of the shared store.
+        worker_cache = LocMemCache(settings.CACHES["default"]["LOCATION"], {})
+        with mock.patch.object(dashboard_cache, "cache", worker_cache):
+            with self.captureOnCommitCallbacks(execute=True):
+                Reading.objects.create(result=PALM_RESULT, status=ReadingStatus.DONE)
+
+        response = self._get(if_none_match=first["ETag"])
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["user_stats"]["total_readings"], 1)
+
+    def test_disabled_without_a_shared_cache(self):
+        with override_settings(DASHBOARD_CACHE_ENABLED=False):
+            response = self._get()
+            self.assertNotIn("ETag", response)
+            with self.assertNumQueries(3):
+                self._get()
+
+    def test_rebuild_invalidates_the_cache(self):
+        etag = self._get()["ETag"]
+
+        call_command("rebuild_reading_stats", stdout=io.StringIO())
+
+        self.assertEqual(self._get(if_none_match=etag).status_code, 200)
+
+    def test_lost_versions_do_not_revive_old_etags(self):
+        etag = self._get()["ETag"]
+        cache.delete_many(["dashboard:generation", "dashboard:version:all"])
+
+        self.assertNotEqual(self._get()["ETag"], etag)
+
+
+@override_settings(DASHBOARD_CACHE_ENABLED=True)
+class DashboardRealtimeTests(TestCase):
+    url = reverse("accounts:dashboard-realtime")
+
+    def setUp(self):
+        cache.clear()
+
+    def test_polls_are_answered_from_the_cache(self):
+        Reading.objects.create()
+        self.assertEqual(self.client.get(self.url).json()["readings_count"], 1)
+
+        for _ in range(20):
+            Reading.objects.create()
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+
+        # Not bumped: the test transaction never commits.
+        self.assertEqual(response.json()["readings_count"], 1)
+
+    def test_reading_writes_update_the_marker(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Reading.objects.create()
+        self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reading = Reading.objects.create()
+
+        data = self.client.get(self.url).json()
+        self.assertEqual((data["readings_count"], data["has_updates"]), (2, True))
+        reading.refresh_from_db()
+        self.assertEqual(data["last_update"], reading.updated_at.isoformat())
+
+    def test_if_none_match(self):
+        Reading.objects.create()
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(self.url, headers={"if_none_match": '"0.0"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_deletes_change_the_etag(self):
+        # The cleanup task deletes expired readings: the count drops while
+        # the latest updated_at stays the same.
+        with self.captureOnCommitCallbacks(execute=True):
+            Reading.objects.create()
+            old = Reading.objects.create()
+            Reading.objects.filter(pk=old.pk).update(updated_at=old.updated_at - timedelta(days=2))
+        etag = self.client.get(self.url)["ETag"]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            old.delete()
+
+        response = self.client.get(self.url, headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["readings_count"], 1)
+
+    @override_settings(DASHBOARD_CACHE_ENABLED=False)
+    def test_revalidation_without_the_cache(self):
+        Reading.objects.create()
+        etag = self.client.get(self.url)["ETag"]
+
+        self.assertEqual(self.client.get(self.url, headers={"if_none_match": etag}).status_code, 304)
+        Reading.objects.create()
+        self.assertEqual(self.client.get(self.url, headers={"if_none_match": etag}).status_code, 200)
+
+    def test_without_readings(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.json()["readings_count"], response.json()["has_updates"]), (0, False))
+        self.assertNotIn("ETag", response)
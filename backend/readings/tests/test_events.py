@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import json
+import threading
+
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from palmastro_backend import events
+from readings.models import Reading, ReadingStatus
+from readings.signals import reading_channel
+
+
+def _frames(response):
+    body = b"".join(response.streaming_content).decode()
+    return [
+        json.loads(line[len("data: "):])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+@override_settings(EVENTS_REDIS_URL="", SSE_MAX_SECONDS=5, SSE_KEEPALIVE_SECONDS=1, SSE_WSGI_ENABLED=True)
+class ReadingEventsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_saving_status_publishes_event(self):
+        reading = Reading.objects.create()
+        with self.captureOnCommitCallbacks(execute=True):
+            reading.status = ReadingStatus.DONE
+            reading.result = {"overallScore": 80}
+            reading.save(update_fields=["status", "result", "updated_at"])
+
+        event = events.last_event(reading_channel(reading.pk))
+        self.assertEqual(event["status"], ReadingStatus.DONE)
+        self.assertEqual(event["result"], {"overallScore": 80})
+
+    def test_finished_reading_streams_one_event_with_one_query(self):
+        reading = Reading.objects.create(status=ReadingStatus.DONE, result={"overallScore": 80})
+        url = reverse("readings:reading-events", kwargs={"pk": reading.pk})
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_ACCEPT="text/event-stream")
+            frames = _frames(response)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(len(frames), 1)
+        self.assertEqual(frames[0]["result"], {"overallScore": 80})
+
+    @override_settings(SSE_WSGI_ENABLED=False)
+    def test_wsgi_streams_are_refused_when_disabled(self):
+        reading = Reading.objects.create()
+        url = reverse("readings:reading-events", kwargs={"pk": reading.pk})
+
+        response = self.client.get(url, HTTP_ACCEPT="text/event-stream")
+
+        # EventSource gives up on 204; the client polls the status instead.
+        self.assertEqual(response.status_code, 204)
+        self.assertFalse(response.streaming)
+
+    def test_unknown_reading_is_404(self):
+        url = reverse("readings:reading-events", kwargs={"pk": "00000000-0000-0000-0000-000000000000"})
+        response = self.client.get(url, HTTP_ACCEPT="text/event-stream")
+        self.assertEqual(response.status_code, 404)
+
+
+@override_settings(EVENTS_REDIS_URL="", SSE_MAX_SECONDS=5, SSE_KEEPALIVE_SECONDS=1, SSE_WSGI_ENABLED=True)
+class ReadingEventsStreamTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_stream_receives_status_changes_until_terminal(self):
+        reading = Reading.objects.create(status=ReadingStatus.PROCESSING)
+        url = reverse("readings:reading-events", kwargs={"pk": reading.pk})
+        response = self.client.get(url)
+        stream = iter(response.streaming_content)
+        first = next(stream)  # initial state; subscribes on the next step
+
+        def finish():
+            reading.status = ReadingStatus.DONE
+            reading.result = {"overallScore": 91}
+            reading.save(update_fields=["status", "result", "updated_at"])
+
+        timer = threading.Timer(0.2, finish)
+        timer.start()
+        rest = b"".join(stream).decode()
+        timer.join()
+
+        self.assertIn(b'"PROCESSING"', first)
+        frames = [json.loads(line[6:]) for line in rest.splitlines() if line.startswith("data: ")]
+        self.assertEqual(frames[-1]["status"], ReadingStatus.DONE)
+        self.assertEqual(frames[-1]["result"], {"overallScore": 91})
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import io
+import json
+import tempfile
+from pathlib import Path
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from palmastro_backend.replay import Replayer, StageTimer, load_corpus
+from readings.models import EventLog, ReadingStatus
+
+
+class PalmGoldenReplayTests(TestCase):
+    """Recorded model answers replayed through `run_palm_reading`."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.cases = load_corpus("palm")
+
+    def _assert_matches_corpus(self, streaming):
+        self.assertTrue(self.cases)
+        with self.assertLogs("readings.tasks", level="WARNING"), Replayer(streaming=streaming) as replayer:
+            for case in self.cases:
+                with self.subTest(case=case["name"]):
+                    self.assertEqual(replayer.replay("palm", case).as_dict(), case["expected"])
+
+    def test_outcomes_match_golden_corpus(self):
+        self._assert_matches_corpus(streaming=False)
+
+    def test_streamed_outcomes_match_golden_corpus(self):
+        self._assert_matches_corpus(streaming=True)
+
+    def test_corpus_covers_successes_and_failures(self):
+        statuses = {case["expected"]["status"] for case in self.cases}
+
+        self.assertEqual(statuses, {ReadingStatus.DONE, ReadingStatus.FAILED})
+
+    def test_completed_replays_are_logged(self):
+        (case,) = [case for case in self.cases if case["name"] == "canned"]
+
+        with Replayer() as replayer:
+            replayer.replay("palm", case)
+
+        self.assertTrue(EventLog.objects.filter(event_type="reading.completed").exists())
+
+    def test_stage_timer_splits_parse_normalize_and_db(self):
+        (case,) = [case for case in self.cases if case["name"] == "markdown_json_fence"]
+        timer = StageTimer()
+
+        with Replayer(timer=timer) as replayer:
+            replayer.replay("palm", case)
+
+        self.assertEqual(timer.calls["parse"], 1)
+        self.assertEqual(timer.calls["normalize"], 1)
+        # Reading create (and its first type and day totals, update then
+        # insert), PROCESSING, DONE (and both totals), the event log row
+        # and the cleared image reference.
+        self.assertEqual(timer.calls["db_write"], 11)
+        self.assertGreater(timer.calls["db_read"], 0)
+
+
+class BenchmarkGoldenCorpusCommandTests(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = Path(tmp.name)
+
+    def _benchmark(self, *args):
+        out = io.StringIO()
+        with self.assertLogs("numerology.tasks", level="WARNING"):
+            call_command("benchmark_golden_corpus", "--pipeline", "numerology", "--rounds", "1", *args, stdout=out)
+        return out.getvalue()
+
+    def test_report(self):
+        output = self.tmp / "golden.json"
+
+        self._benchmark("--output", str(output))
+
+        row = json.loads(output.read_text(encoding="utf-8"))["pipelines"]["numerology"]
+        self.assertEqual(row["cases"], len(load_corpus("numerology")))
+        self.assertGreater(row["replays_per_s"], 0)
+        self.assertEqual(set(row["stage_ms_per_replay"]), {"parse", "normalize", "db_read", "db_write", "other"})
+
+    def test_throughput_regression_fails(self):
+        baseline = self.tmp / "baseline.json"
+        baseline.write_text(json.dumps({"pipelines": {"numerology": {"replays_per_s": 1e9}}}), encoding="utf-8")
+
+        with self.assertRaisesMessage(CommandError, "numerology"):
+            self._benchmark("--baseline", str(baseline))
+
+    def test_within_threshold_passes(self):
+        baseline = self.tmp / "baseline.json"
+        baseline.write_text(json.dumps({"pipelines": {"numerology": {"replays_per_s": 1e-3}}}), encoding="utf-8")
+
+        self.assertIn("No pipeline regressed", self._benchmark("--baseline", str(baseline)))
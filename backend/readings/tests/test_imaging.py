@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import io
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+
+from readings.imaging import detect_image_mime, prepare_palm_image
+
+
+def _jpeg_bytes(size, orientation=None):
+    img = Image.new("RGB", size, (200, 150, 120))
+    exif = Image.Exif()
+    exif[0x010F] = "PhoneMaker"  # Make
+    if orientation:
+        exif[0x0112] = orientation
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=95, exif=exif)
+    return out.getvalue()
+
+
+class PalmImagePreprocessingTests(SimpleTestCase):
+    def test_downscales_to_max_edge_and_strips_metadata(self):
+        raw = _jpeg_bytes((3000, 2000))
+        prepared = prepare_palm_image(raw)
+
+        self.assertTrue(prepared.processed)
+        self.assertEqual(max(prepared.width, prepared.height), 1024)
+        self.assertLess(prepared.size, prepared.original_size)
+        self.assertEqual(prepared.mime, "image/jpeg")
+        with Image.open(io.BytesIO(prepared.data)) as img:
+            self.assertEqual(len(img.getexif()), 0)
+
+    def test_applies_exif_orientation(self):
+        # Orientation 6 = rotate 90 degrees: a landscape sensor frame is a portrait photo.
+        prepared = prepare_palm_image(_jpeg_bytes((1600, 1200), orientation=6))
+        self.assertLess(prepared.width, prepared.height)
+
+    def test_crops_extreme_aspect_ratio(self):
+        prepared = prepare_palm_image(_jpeg_bytes((3000, 600)))
+        self.assertLessEqual(prepared.width / prepared.height, 2.0)
+
+    @override_settings(PALM_IMAGE_FORMAT="WEBP")
+    def test_webp_output(self):
+        prepared = prepare_palm_image(_jpeg_bytes((800, 600)))
+        self.assertEqual(prepared.mime, "image/webp")
+        self.assertEqual(detect_image_mime(prepared.data), "image/webp")
+
+    def test_undecodable_bytes_pass_through(self):
+        raw = b"\x00\x00\x00\x18ftypheic" + b"\x00" * 64
+        prepared = prepare_palm_image(raw)
+        self.assertFalse(prepared.processed)
+        self.assertEqual(prepared.data, raw)
+        self.assertEqual(prepared.mime, "image/heic")
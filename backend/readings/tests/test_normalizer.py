@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import copy
+import json
+import random
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+from readings.normalizer import normalize_palm_result
+from readings.tasks import _palm_result_from_content
+
+GOLDEN = Path(__file__).resolve().parent / "golden" / "palm_normalizer.jsonl"
+
+
+def _load_cases():
+    with GOLDEN.open(encoding="utf-8") as fh:
+        return [json.loads(line) for line in fh if line.strip()]
+
+
+class NormalizePalmResultGoldenTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.cases = _load_cases()
+
+    def test_output_matches_golden_corpus(self):
+        self.assertTrue(self.cases)
+        for case in self.cases:
+            with self.subTest(case=case["name"]):
+                result = normalize_palm_result(
+                    copy.deepcopy(case["response"]), rng=random.Random(case["seed"])
+                )
+                self.assertEqual(json.dumps(result), json.dumps(case["result"]))
+
+    def test_input_is_not_modified(self):
+        for case in self.cases:
+            with self.subTest(case=case["name"]):
+                response = copy.deepcopy(case["response"])
+                normalize_palm_result(response, rng=random.Random(case["seed"]))
+                self.assertEqual(response, case["response"])
+
+    def test_model_content_is_normalized(self):
+        case = self.cases[0]
+        content = "```json\n" + json.dumps(case["response"]) + "\n```"
+
+        random.seed(case["seed"])
+        result = _palm_result_from_content(content)
+
+        self.assertEqual(json.dumps(result), json.dumps(case["result"]))
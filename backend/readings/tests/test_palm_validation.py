@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from readings.models import Reading
+
+FAKE_JPEG = b"\xff\xd8\xff\xe0" + b"palm" * 64
+FAKE_RESULT = {"overallScore": 77, "lines": {}, "modelVersion": "2.0"}
+
+
+@override_settings(PALM_RESULT_CACHE_ENABLED=False)
+class PalmValidationRoundTripTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def _post(self):
+        upload = SimpleUploadedFile("palm.jpg", FAKE_JPEG, content_type="image/jpeg")
+        return self.client.post(reverse("readings:palm-reading-analyze"), {"image": upload})
+
+    @mock.patch("readings.views_palm.is_palm_image")
+    @mock.patch("readings.views_palm._call_gpt_palm_model", return_value=FAKE_RESULT)
+    def test_analysis_is_a_single_round_trip_by_default(self, call_model, is_palm):
+        response = self._post()
+
+        self.assertEqual(response.status_code, 200)
+        is_palm.assert_not_called()
+        call_model.assert_called_once()
+
+    @override_settings(PALM_STANDALONE_VALIDATION=True)
+    @mock.patch("readings.views_palm.is_palm_image", return_value=False)
+    @mock.patch("readings.views_palm._call_gpt_palm_model")
+    def test_enabled_validator_rejects_non_palm_images(self, call_model, is_palm):
+        response = self._post()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.json()["success"])
+        is_palm.assert_called_once()
+        call_model.assert_not_called()
+        self.assertFalse(Reading.objects.exists())
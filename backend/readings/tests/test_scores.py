@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from readings.models import Reading, ReadingStats, ReadingStatus, ReadingType
+from readings.scoring import SCORE_FIELDS, reading_scores
+
+from .test_aggregates import PALM_RESULT, _snapshot
+
+
+def _scores(reading):
+    return {field: getattr(reading, field) for field in SCORE_FIELDS}
+
+
+class ScoreColumnTests(TestCase):
+    def test_scores_are_filled_on_save(self):
+        reading = Reading.objects.create(result=PALM_RESULT, status=ReadingStatus.DONE)
+
+        reading.refresh_from_db()
+        self.assertEqual(
+            _scores(reading),
+            {"overall_score": 75.0, "accuracy_pct": 82, "insights_count": 6, "top_prediction_confidence": 77.0},
+        )
+
+    def test_update_fields_include_the_scores(self):
+        reading = Reading.objects.create()
+
+        reading.result = PALM_RESULT
+        reading.status = ReadingStatus.DONE
+        reading.save(update_fields=["status", "result", "updated_at"])
+
+        self.assertEqual(Reading.objects.get(pk=reading.pk).accuracy_pct, 82)
+
+    def test_prediction_confidence_defaults(self):
+        reading = Reading(
+            reading_type=ReadingType.ASTROLOGY_READING,
+            result={"lifePredictions": [{"prediction": "Travel"}, {"confidence": "high"}]},
+        )
+
+        self.assertEqual(reading_scores(reading)["top_prediction_confidence"], 85.0)
+        self.assertIsNone(reading_scores(Reading(result={"predictions": []}))["top_prediction_confidence"])
+
+    def test_backfill_fills_missing_scores_in_chunks(self):
+        for _ in range(3):
+            Reading.objects.create(result=PALM_RESULT, status=ReadingStatus.DONE)
+        Reading.objects.update(**dict.fromkeys(SCORE_FIELDS))
+        out = io.StringIO()
+
+        call_command("backfill_reading_scores", "--chunk-size", "2", stdout=out)
+
+        self.assertIn("Filled the scores of 3 readings", out.getvalue())
+        self.assertEqual(set(Reading.objects.values_list("accuracy_pct", "top_prediction_confidence")), {(82, 77.0)})
+
+    def test_readings_without_scores_are_not_counted_twice(self):
+        reading = Reading.objects.create(result=PALM_RESULT, status=ReadingStatus.DONE)
+        incremental = _snapshot()
+        Reading.objects.update(**dict.fromkeys(SCORE_FIELDS))
+
+        Reading.objects.get(pk=reading.pk).save()
+
+        self.assertEqual(_snapshot(), incremental)
+
+    def test_rebuild_fills_missing_scores(self):
+        Reading.objects.create(result=PALM_RESULT, status=ReadingStatus.DONE)
+        Reading.objects.create(reading_type=ReadingType.NUMEROLOGY, status=ReadingStatus.DONE)
+        incremental = _snapshot()
+        Reading.objects.update(**dict.fromkeys(SCORE_FIELDS))
+        ReadingStats.objects.all().delete()
+
+        call_command("rebuild_reading_stats", stdout=io.StringIO())
+
+        self.assertEqual(_snapshot(), incremental)
+        self.assertFalse(Reading.objects.filter(accuracy_pct__isnull=True).exists())
+
+
+class PredictionsViewTests(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="ada", email="ada@example.com", password="x")
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _reading(self, *confidences, reading_type=ReadingType.PALM_ANALYSIS):
+        key = "predictions" if reading_type == ReadingType.PALM_ANALYSIS else "lifePredictions"
+        result = {key: [{"prediction": f"p{c}", "confidence": c} for c in confidences]}
+        return Reading.objects.create(
+            user=self.user, reading_type=reading_type, status=ReadingStatus.DONE, result=result
+        )
+
+    def _confidences(self, query=""):
+        response = self.client.get(reverse("readings:predictions-get") + query)
+        self.assertEqual(response.status_code, 200)
+        return [p["confidence"] for p in response.json()["results"]]
+
+    def test_most_confident_predictions_first(self):
+        self._reading(60, 90)
+        self._reading(75, reading_type=ReadingType.ASTROLOGY_READING)
+        self._reading(95)
+        Reading.objects.create(user=self.user, status=ReadingStatus.FAILED, result={"predictions": [{"confidence": 99}]})
+
+        self.assertEqual(self._confidences(), [95, 90, 75, 60])
+
+    def test_top_predictions_across_many_readings(self):
+        for i in range(30):
+            self._reading(50 + i, 10)
+
+        self.assertEqual(self._confidences(), list(range(79, 59, -1)))
+
+    def test_readings_without_scores_are_considered(self):
+        self._reading(*range(70, 90))
+        old = self._reading(99)
+        Reading.objects.filter(pk=old.pk).update(**dict.fromkeys(SCORE_FIELDS))
+
+        self.assertEqual(self._confidences()[:2], [99, 89])
+
+    def test_next_pages_continue_in_confidence_order(self):
+        for i in range(30):
+            self._reading(50 + i, 10)
+        url = reverse("readings:predictions-get")
+
+        seen = []
+        query = "?limit=25"
+        while query:
+            page = self.client.get(url + query).json()
+            seen += [p["confidence"] for p in page["results"]]
+            query = page["next"]
+
+        self.assertEqual(seen, list(range(79, 49, -1)) + [10] * 30)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse("readings:predictions-get") + "?cursor=bm9wZQ")
+
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import uuid
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
+
+from django.core import signing
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from readings.models import Reading, ReadingStatus
+from readings.storage import UPLOAD_SIGNING_SALT, get_image_storage, new_upload_key, sign_upload_key
+
+try:
+    import boto3  # noqa: F401
+except ImportError:  # pragma: no cover - optional dependency
+    boto3 = None
+
+FAKE_RESULT = {"overallScore": 77, "lines": {}, "modelVersion": "2.0"}
+
+
+def _jpeg():
+    out = io.BytesIO()
+    Image.new("RGB", (64, 64), (200, 160, 140)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+@override_settings(
+    PALM_STORAGE_BACKEND="local",
+    PALM_RESULT_CACHE_ENABLED=False,
+    PALM_STREAMING_ENABLED=False,
+    READING_UPLOAD_MODE="async",
+)
+class PresignedUploadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+    def _presign(self, content_type="image/jpeg"):
+        response = self.client.post(
+            reverse("readings:palm-upload-url"), {"content_type": content_type}, content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def _put(self, upload, data, content_type="image/jpeg"):
+        return self.client.generic("PUT", urlparse(upload["url"]).path, data, content_type=content_type)
+
+    def _submit(self, upload_token):
+        return self.client.post(
+            reverse("readings:reading-upload"), {"upload_token": upload_token}, content_type="application/json"
+        )
+
+    @mock.patch("readings.tasks._call_gpt_palm_model", return_value=FAKE_RESULT)
+    def test_direct_upload_then_submit_token(self, call_model):
+        grant = self._presign()
+        self.assertEqual(grant["upload"]["method"], "PUT")
+        self.assertEqual(self._put(grant["upload"], _jpeg()).status_code, 200)
+
+        response = self._submit(grant["upload_token"])
+
+        self.assertEqual(response.status_code, 202)
+        reading = Reading.objects.get(id=response.json()["job_id"])
+        self.assertEqual(reading.status, ReadingStatus.DONE)
+        self.assertEqual(reading.result, FAKE_RESULT)
+        call_model.assert_called_once()
+        # The worker deletes the object once it has been analyzed.
+        self.assertIsNone(get_image_storage().size(grant["storage_key"]))
+        self.assertEqual(reading.storage_key, "")
+
+    @mock.patch("readings.views.process_palm_reading.delay")
+    def test_only_the_key_is_queued(self, delay):
+        grant = self._presign()
+        self._put(grant["upload"], _jpeg())
+
+        response = self._submit(grant["upload_token"])
+
+        delay.assert_called_once_with(response.json()["job_id"], image_ref=grant["storage_key"])
+
+    @mock.patch("readings.views.process_palm_reading.delay")
+    def test_a_token_creates_one_reading(self, delay):
+        grant = self._presign()
+        self._put(grant["upload"], _jpeg())
+        self.assertEqual(self._submit(grant["upload_token"]).status_code, 202)
+
+        response = self._submit(grant["upload_token"])
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Reading.objects.count(), 1)
+        delay.assert_called_once()
+
+    def test_rejects_key_that_was_never_uploaded(self):
+        response = self._submit(sign_upload_key(new_upload_key("image/jpeg")))
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Reading.objects.exists())
+
+    def test_rejects_keys_that_were_not_granted(self):
+        # e.g. a legacy palm_uploads/<reading_id>/... object
+        key = get_image_storage().save(new_upload_key("image/jpeg"), io.BytesIO(_jpeg()))
+
+        for upload_token in (key, signing.dumps(key, salt="other")):
+            with self.subTest(upload_token=upload_token):
+                response = self._submit(upload_token)
+
+                self.assertEqual(response.status_code, 400)
+        self.assertFalse(Reading.objects.exists())
+        self.assertIsNotNone(get_image_storage().size(key))
+
+    def test_rejects_non_image_content_type(self):
+        response = self.client.post(
+            reverse("readings:palm-upload-url"), {"content_type": "text/html"}, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 400)
+
+    def test_put_requires_matching_content_type(self):
+        grant = self._presign("image/png")
+
+        response = self._put(grant["upload"], _jpeg(), content_type="image/jpeg")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIsNone(get_image_storage().size(grant["storage_key"]))
+
+    def test_put_url_writes_the_key_once(self):
+        grant = self._presign()
+        self.assertEqual(self._put(grant["upload"], _jpeg()).status_code, 200)
+
+        response = self._put(grant["upload"], b"\xff\xd8\xff" + b"other" * 64)
+
+        self.assertEqual(response.status_code, 409)
+        with get_image_storage().open(grant["storage_key"]) as f:
+            self.assertEqual(f.read(), _jpeg())
+        directory = os.path.dirname(grant["storage_key"])
+        self.assertEqual(get_image_storage().storage.listdir(directory)[1], ["palm.jpg"])
+
+    def test_put_rejects_tampered_token(self):
+        token = signing.dumps({"key": "palm_uploads/x/palm.jpg", "content_type": "image/jpeg"}, salt="other")
+
+        response = self.client.generic(
+            "PUT", reverse("readings:palm-upload-put", kwargs={"token": token}), _jpeg(), content_type="image/jpeg"
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+    @override_settings(PALM_UPLOAD_URL_TTL_SECONDS=-1)
+    def test_put_rejects_expired_token(self):
+        token = signing.dumps({"key": new_upload_key("image/jpeg"), "content_type": "image/jpeg"}, salt=UPLOAD_SIGNING_SALT)
+
+        response = self.client.generic(
+            "PUT", reverse("readings:palm-upload-put", kwargs={"token": token}), _jpeg(), content_type="image/jpeg"
+        )
+
+        self.assertEqual(response.status_code, 403)
+
+
+@unittest.skipIf(boto3 is None, "boto3 is not installed")
+@override_settings(PALM_STORAGE_BACKEND="s3", S3_BUCKET="palm-uploads", S3_ENDPOINT_URL="http://minio:9000", S3_REGION="us-east-1")
+class S3PresignTests(TestCase):
+    @mock.patch.dict(os.environ, {"AWS_ACCESS_KEY_ID": "test", "AWS_SECRET_ACCESS_KEY": "test"})
+    def test_presigned_put_targets_the_bucket(self):
+        response = self.client.post(
+            reverse("readings:palm-upload-url"), {"content_type": "image/png"}, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        body = response.json()
+        url = urlparse(body["upload"]["url"])
+        self.assertEqual(url.netloc, "minio:9000")
+        self.assertEqual(url.path, f"/palm-uploads/{body['storage_key']}")
+        self.assertIn("X-Amz-Signature", parse_qs(url.query))
+        self.assertEqual(body["upload"]["headers"], {"Content-Type": "image/png"})
+
+
+# Integration with a real S3-compatible store, e.g.
+#   docker compose --profile minio up -d minio
+#   S3_TEST_ENDPOINT_URL=http://localhost:9000 S3_TEST_BUCKET=palm-uploads \
+#   AWS_ACCESS_KEY_ID=minioadmin AWS_SECRET_ACCESS_KEY=minioadmin python manage.py test readings
+@unittest.skipUnless(boto3 is not None and os.getenv("S3_TEST_ENDPOINT_URL"), "set S3_TEST_ENDPOINT_URL to run")
+class S3StorageIntegrationTests(TestCase):
+    def setUp(self):
+        self.enterContext(
+            override_settings(
+                PALM_STORAGE_BACKEND="s3",
+                S3_BUCKET=os.getenv("S3_TEST_BUCKET", "palm-uploads"),
+                S3_ENDPOINT_URL=os.environ["S3_TEST_ENDPOINT_URL"],
+                S3_REGION=os.getenv("S3_TEST_REGION", "us-east-1"),
+            )
+        )
+        self.storage = get_image_storage()
+        try:
+            self.storage.client.create_bucket(Bucket=self.storage.bucket)
+        except self.storage.client.exceptions.BucketAlreadyOwnedByYou:
+            pass
+
+    def test_presigned_put_round_trip(self):
+        import urllib.request
+
+        key = f"palm_uploads/{uuid.uuid4()}/palm.jpg"
+        upload = self.storage.presigned_put(key, "image/jpeg")
+        request = urllib.request.Request(upload["url"], data=_jpeg(), method="PUT", headers=upload["headers"])
+        with urllib.request.urlopen(request) as response:
+            self.assertEqual(response.status, 200)
+
+        self.assertEqual(self.storage.size(key), len(_jpeg()))
+        with self.storage.open(key) as f:
+            self.assertEqual(f.read(), _jpeg())
+        self.storage.delete(key)
+        self.assertIsNone(self.storage.size(key))
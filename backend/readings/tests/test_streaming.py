@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import io
+import json
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from PIL import Image
+
+from palmastro_backend import events
+from palmastro_backend.benchmarking import CANNED_PALM_RESPONSE, FakeOpenAI
+from palmastro_backend.openai_client import reset_openai_client
+from readings.models import EventLog, Reading, ReadingStatus
+from readings.signals import reading_channel
+from readings.streaming import TopLevelJsonParser
+from readings.tasks import process_palm_reading
+
+
+class TopLevelJsonParserTests(SimpleTestCase):
+    def test_members_are_returned_as_soon_as_they_close(self):
+        document = {
+            "overall_score": 71,
+            "note": 'braces } and commas , and "quotes" in a string',
+            "palm_lines": {"life_line": {"strength": "Strong"}},
+            "special_marks": [{"type": "Star"}, {"type": "Cross"}],
+        }
+        text = "```json\n" + json.dumps(document, indent=2) + "\n```"
+        parser = TopLevelJsonParser()
+
+        members = []
+        for char in text:
+            members.extend(parser.feed(char))
+
+        self.assertEqual(members, list(document.items()))
+        self.assertTrue(parser.finished)
+
+    def test_incomplete_member_is_not_returned(self):
+        parser = TopLevelJsonParser()
+
+        self.assertEqual(parser.feed('{"a": 1, "b": {"c": '), [("a", 1)])
+        self.assertEqual(parser.feed('2}}'), [("b", {"c": 2})])
+
+
+def _jpeg() -> bytes:
+    out = io.BytesIO()
+    Image.new("RGB", (64, 64), (200, 160, 140)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+@override_settings(PALM_RESULT_CACHE_ENABLED=False, EVENTS_REDIS_URL="")
+class StreamingPalmTaskTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.enterContext(mock.patch.dict("os.environ", {"OPENAI_API_KEY": "test"}))
+        self.fake = FakeOpenAI(latency_ms=0)
+        self.enterContext(mock.patch("palmastro_backend.openai_client.OpenAI", self.fake))
+        reset_openai_client()
+        self.addCleanup(reset_openai_client)
+
+        self.reading = Reading.objects.create()
+        self.reading.image = SimpleUploadedFile("palm.jpg", _jpeg(), content_type="image/jpeg")
+        self.reading.save()
+
+    def _run(self):
+        subscription = events.Subscription(reading_channel(self.reading.id))
+        try:
+            process_palm_reading(str(self.reading.id))
+            published = []
+            while (event := subscription.get(timeout=0)) is not None:
+                published.append(event)
+        finally:
+            subscription.close()
+        return published
+
+    def test_sections_are_published_before_the_result(self):
+        published = self._run()
+
+        sections = [e for e in published if "section" in e]
+        self.assertEqual(
+            [e["section"] for e in sections],
+            ["lines", "personality", "predictions", "specialMarks"],
+        )
+        self.reading.refresh_from_db()
+        self.assertEqual(self.reading.status, ReadingStatus.DONE)
+        self.assertEqual(sections[0]["data"], self.reading.result["lines"])
+        self.assertEqual(sections[-1]["data"], self.reading.result["specialMarks"])
+        self.assertEqual(self.fake.calls, 1)
+
+    def test_time_to_first_section_is_recorded(self):
+        self._run()
+
+        log = EventLog.objects.get(reading=self.reading, event_type="reading.completed")
+        self.assertIsNotNone(log.metadata["time_to_first_section_ms"])
+        self.assertLessEqual(log.metadata["time_to_first_section_ms"], log.metadata["total_ms"])
+
+    @override_settings(PALM_STREAMING_ENABLED=False)
+    def test_streaming_can_be_disabled(self):
+        published = self._run()
+
+        self.assertFalse([e for e in published if "section" in e])
+        log = EventLog.objects.get(reading=self.reading, event_type="reading.completed")
+        self.assertIsNone(log.metadata["time_to_first_section_ms"])
+        self.reading.refresh_from_db()
+        self.assertEqual(
+            self.reading.result["specialMarks"][0]["name"],
+            CANNED_PALM_RESPONSE["special_marks"][0]["type"],
+        )
@@ -0,0 +1,87 @@
+from __future__ import annotations
+
+import io
+import os
+import random
+import shutil
+import tempfile
+import tracemalloc
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from rest_framework.test import APIRequestFactory
+
+from readings.models import Reading, ReadingStatus
+from readings.tasks import _build_palm_request
+from readings.views_palm import PalmReadingAnalyzeView
+
+FAKE_RESULT = {"overallScore": 77, "lines": {}, "modelVersion": "2.0"}
+
+
+def _phone_jpeg() -> bytes:
+    # Upscaled noise compresses about as badly as a 7 MP phone photo (~3 MB).
+    pixels = random.Random(0).randbytes(600 * 450 * 3)
+    img = Image.frombytes("RGB", (600, 450), pixels).resize((3000, 2250), Image.BICUBIC)
+    out = io.BytesIO()
+    img.save(out, format="JPEG", quality=92)
+    return out.getvalue()
+
+
+def _encode_and_return(image_bytes):
+    _build_palm_request(image_bytes)
+    return FAKE_RESULT
+
+
+@override_settings(PALM_RESULT_CACHE_ENABLED=False, PALM_STREAMING_ENABLED=False)
+class ZeroCopyUploadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=self.media_root))
+        self.image = _phone_jpeg()
+
+    def _media_files(self):
+        return [name for _, _, files in os.walk(self.media_root) for name in files]
+
+    # Keep the whole upload in memory (the default spools it to a temp file
+    # above 2.5 MB), which is the worst case for peak memory.
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=10 * 1024 * 1024)
+    @mock.patch("readings.views_palm._call_gpt_palm_model", side_effect=_encode_and_return)
+    def test_analyze_peak_memory_stays_under_twice_the_image(self, call_model):
+        upload = SimpleUploadedFile("palm.jpg", self.image, content_type="image/jpeg")
+        request = APIRequestFactory().post(
+            "/api/palm-reading/analyze/", {"image": upload}, format="multipart"
+        )
+        view = PalmReadingAnalyzeView.as_view()
+
+        tracemalloc.start()
+        try:
+            response = view(request)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.assertEqual(response.status_code, 200)
+        call_model.assert_called_once()
+        self.assertLess(peak, 2 * len(self.image))
+        self.assertEqual(self._media_files(), [])
+
+    @override_settings(READING_UPLOAD_MODE="sync")
+    @mock.patch("readings.tasks._call_gpt_palm_model", return_value=FAKE_RESULT)
+    def test_sync_upload_is_analyzed_without_touching_disk(self, call_model):
+        upload = SimpleUploadedFile("palm.jpg", self.image, content_type="image/jpeg")
+
+        with mock.patch("builtins.open", side_effect=AssertionError("disk read")):
+            response = self.client.post(reverse("readings:reading-upload"), {"image": upload})
+
+        self.assertEqual(response.status_code, 200)
+        reading = Reading.objects.get(id=response.json()["job_id"])
+        self.assertEqual(reading.status, ReadingStatus.DONE)
+        self.assertEqual(reading.result, FAKE_RESULT)
+        self.assertFalse(reading.image)
+        self.assertEqual(self._media_files(), [])
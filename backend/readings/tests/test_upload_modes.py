@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import base64
+import io
+import shutil
+import tempfile
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from readings.models import Reading, ReadingStatus
+from readings.storage import get_image_storage
+
+FAKE_RESULT = {"overallScore": 77, "lines": {}, "modelVersion": "2.0"}
+
+
+def _jpeg():
+    out = io.BytesIO()
+    Image.new("RGB", (64, 64), (200, 160, 140)).save(out, format="JPEG")
+    return out.getvalue()
+
+
+def _upload():
+    return SimpleUploadedFile("palm.jpg", _jpeg(), content_type="image/jpeg")
+
+
+@override_settings(PALM_RESULT_CACHE_ENABLED=False, PALM_STREAMING_ENABLED=False)
+class ReadingUploadModeTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.url = reverse("readings:reading-upload")
+
+    @override_settings(READING_UPLOAD_MODE="async")
+    @mock.patch("readings.tasks._call_gpt_palm_model")
+    @mock.patch("readings.views.process_palm_reading.delay")
+    def test_async_mode_enqueues_and_returns_202(self, delay, call_model):
+        response = self.client.post(self.url, {"image": _upload()})
+
+        self.assertEqual(response.status_code, 202)
+        body = response.json()
+        self.assertEqual(body["status"], ReadingStatus.QUEUED)
+        self.assertTrue(body["status_url"].endswith(f"/readings/{body['job_id']}/status/"))
+        self.assertTrue(body["events_url"].endswith(f"/readings/{body['job_id']}/events/"))
+        reading = Reading.objects.get(id=body["job_id"])
+        delay.assert_called_once_with(body["job_id"], image_ref=reading.storage_key)
+        call_model.assert_not_called()
+        self.assertIsNotNone(get_image_storage().size(reading.storage_key))
+
+    @override_settings(READING_UPLOAD_MODE="async")
+    @mock.patch("readings.views.process_palm_reading.delay")
+    def test_base64_upload_is_stored_before_enqueueing(self, delay):
+        payload = "data:image/jpeg;base64," + base64.b64encode(_jpeg()).decode()
+
+        response = self.client.post(
+            self.url, {"image_base64": payload}, content_type="application/json"
+        )
+
+        self.assertEqual(response.status_code, 202)
+        reading = Reading.objects.get(id=response.json()["job_id"])
+        self.assertTrue(reading.storage_key.endswith(".jpg"))
+        with get_image_storage().open(reading.storage_key) as f:
+            self.assertEqual(f.read(), _jpeg())
+        # Only the storage reference goes through the broker.
+        delay.assert_called_once_with(str(reading.id), image_ref=reading.storage_key)
+
+    @override_settings(READING_UPLOAD_MODE="async")
+    @mock.patch("readings.tasks._call_gpt_palm_model", return_value=FAKE_RESULT)
+    def test_queued_task_analyzes_the_stored_image(self, call_model):
+        # Eager Celery runs the queued task inline, like a worker would.
+        response = self.client.post(self.url, {"image": _upload()})
+
+        self.assertEqual(response.status_code, 202)
+        reading = Reading.objects.get(id=response.json()["job_id"])
+        self.assertEqual(reading.status, ReadingStatus.DONE)
+        self.assertEqual(reading.result, FAKE_RESULT)
+        self.assertFalse(reading.has_image)
+        call_model.assert_called_once()
+
+    @override_settings(READING_UPLOAD_MODE="async", PALM_STANDALONE_VALIDATION=True)
+    @mock.patch("readings.tasks._call_gpt_palm_model")
+    @mock.patch("readings.tasks.is_palm_image", return_value=False)
+    def test_queued_task_runs_standalone_validation(self, is_palm, call_model):
+        response = self.client.post(self.url, {"image": _upload()})
+
+        reading = Reading.objects.get(id=response.json()["job_id"])
+        self.assertEqual(reading.status, ReadingStatus.FAILED)
+        is_palm.assert_called_once()
+        call_model.assert_not_called()
+
+    @override_settings(READING_UPLOAD_MODE="sync")
+    @mock.patch("readings.tasks._call_gpt_palm_model", return_value=FAKE_RESULT)
+    @mock.patch("readings.views.process_palm_reading.delay")
+    def test_sync_mode_analyzes_inside_the_request(self, delay, call_model):
+        response = self.client.post(self.url, {"image": _upload()})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], ReadingStatus.DONE)
+        delay.assert_not_called()
+        call_model.assert_called_once()
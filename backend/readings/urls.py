@@ -1,32 +1,42 @@
+from django.conf import settings
 from django.urls import path
 
 from .views import (
     EventLogListView,
     HealthView,
+    PalmUploadPutView,
+    PalmUploadURLView,
     PredictionsView,
     ReadingCallbackView,
+    ReadingEventsView,
     ReadingListView,
     ReadingResultView,
     ReadingStatusView,
     ReadingUploadView,
     UnifiedReadingSaveView,
 )
-from .views_palm import PalmReadingAnalyzeView
+from .views_palm import AsyncPalmReadingAnalyzeView, PalmReadingAnalyzeView
 
 app_name = "readings"
 
+# Under ASGI the OpenAI-bound endpoint awaits the model call on the event loop.
+PalmAnalyzeView = AsyncPalmReadingAnalyzeView if settings.OPENAI_ASYNC_VIEWS else PalmReadingAnalyzeView
+
 urlpatterns = [
     path("health/", HealthView.as_view(), name="health"),
     path("readings/", ReadingUploadView.as_view(), name="reading-upload"),  # POST for create
+    path("readings/uploads/", PalmUploadURLView.as_view(), name="palm-upload-url"),
+    path("readings/uploads/<str:token>/", PalmUploadPutView.as_view(), name="palm-upload-put"),
     path("readings/list/", ReadingListView.as_view(), name="reading-list"),  # GET for list
     path("readings/save/", UnifiedReadingSaveView.as_view(), name="reading-save-unified"),
     path("readings/<uuid:pk>/status/", ReadingStatusView.as_view(), name="reading-status"),
     path("readings/<uuid:pk>/result/", ReadingResultView.as_view(), name="reading-result"),
+    path("readings/<uuid:pk>/events/", ReadingEventsView.as_view(), name="reading-events"),
     path("readings/callback/", ReadingCallbackView.as_view(), name="reading-callback"),
     path("events/", EventLogListView.as_view(), name="event-list"),
     path("predictions/get/", PredictionsView.as_view(), name="predictions-get"),
     # New palm reading endpoint
-    path("palm-reading/analyze/", PalmReadingAnalyzeView.as_view(), name="palm-reading-analyze"),
+    path("palm-reading/analyze/", PalmAnalyzeView.as_view(), name="palm-reading-analyze"),
 ]
 
 
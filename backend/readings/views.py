@@ -3,14 +3,33 @@ from __future__ import annotations
 from typing import Any
 
 import base64
+import io
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import F, Q
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework import permissions, status, views
+from rest_framework.exceptions import NotFound
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from palmastro_backend.events import EventStreamAPIView, event_stream_response
+from palmastro_backend.model_guard import ensure_model_available
+from palmastro_backend.pagination import (
+    CURSOR_PARAM,
+    KeysetPaginator,
+    Page,
+    decode_cursor,
+    encode_cursor,
+    estimated_count,
+    page_limit,
+    page_link,
+)
+
 from .models import EventLog, Reading
 from .serializers import (
     CallbackSerializer,
@@ -20,8 +39,30 @@ from .serializers import (
     ReadingUploadSerializer,
     UnifiedReadingSaveSerializer,
 )
+from .aggregates import total_readings, user_scope
+from .cache import get_cached_palm_result, palm_result_cache_key
+from .imaging import detect_image_mime, prepare_palm_image
 from .models import ReadingStatus, ReadingType
-from .tasks import is_palm_image, process_palm_reading
+from .scoring import confidence_key, prediction_items
+from .signals import is_terminal, reading_channel, reading_event
+from .storage import (
+    MAX_UPLOAD_BYTES,
+    UPLOAD_SIGNING_SALT,
+    get_image_storage,
+    new_upload_key,
+    sign_upload_key,
+    upload_url_ttl,
+)
+from .tasks import (
+    NOT_A_PALM_MESSAGE,
+    is_palm_image,
+    process_palm_reading,
+    run_palm_reading,
+    standalone_palm_validation_enabled,
+)
+
+PREDICTIONS_LIMIT = 20
+PREDICTIONS_MAX_LIMIT = 100
 
 
 class HealthView(views.APIView):
@@ -37,11 +78,28 @@ class HealthView(views.APIView):
         return Response({"status": "ok"}, status=status.HTTP_200_OK)
 
 
+def _decode_base64_image(image_b64: str) -> bytes:
+    if ";base64," in image_b64:
+        _, b64data = image_b64.split(";base64,", 1)
+    else:
+        b64data = image_b64
+    return base64.b64decode(b64data)
+
+
 class ReadingUploadView(views.APIView):
     """
     POST /api/v1/readings/
 
-    Accepts multipart/form-data image upload or base64 JSON body and enqueues async processing.
+    Accepts multipart/form-data image upload, base64 JSON body, or the
+    `upload_token` of an image already uploaded with a presigned PUT (see
+    PalmUploadURLView). Each upload token creates one reading.
+
+    With READING_UPLOAD_MODE=async (the default when Celery workers run)
+    the image is stored, the analysis is queued on Celery and 202 is
+    returned with the job URLs right away; the worker does pre-processing,
+    caching and validation. With READING_UPLOAD_MODE=sync (the default in
+    eager mode) the analysis runs inside the request and the reading is DONE
+    (or FAILED) when the response is sent.
 
     Authentication:
     - Requires a logged-in user; readings are always bound to the authenticated account.
@@ -55,60 +113,192 @@ class ReadingUploadView(views.APIView):
 
         image = serializer.validated_data.get("image")
         image_b64 = serializer.validated_data.get("image_base64")
+        storage_key = serializer.validated_data.get("storage_key")
+
+        storage = get_image_storage()
+        if storage_key:
+            if Reading.objects.filter(storage_key=storage_key).exists():
+                return Response(
+                    {"detail": "This upload has already been submitted."},
+                    status=status.HTTP_409_CONFLICT,
+                )
+            size = storage.size(storage_key)
+            if size is None:
+                return Response(
+                    {"detail": "No uploaded image found for this upload_token."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if size > MAX_UPLOAD_BYTES:
+                storage.delete(storage_key)
+                return Response(
+                    {"detail": "Image file too large. Maximum size is 10MB."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
-        # Validate that the uploaded image is actually a human hand/palm
-        raw_bytes: bytes | None = None
+        if getattr(settings, "READING_UPLOAD_MODE", "sync") != "sync":
+            # While the model circuit breaker is open, answer 503 + Retry-After
+            # instead of queueing work that would fail. A presigned upload
+            # stays in storage, so the client can resubmit the same token.
+            ensure_model_available()
+            # Write the bytes to storage first (presigned uploads already are);
+            # only the storage key travels through the broker.
+            if image:
+                storage_key = storage.save(
+                    new_upload_key(image.content_type), image, image.content_type
+                )
+            elif not storage_key:
+                data = _decode_base64_image(image_b64)
+                mime = detect_image_mime(data)
+                storage_key = storage.save(new_upload_key(mime), io.BytesIO(data), mime)
+            reading = Reading.objects.create(user=None, storage_key=storage_key)
+            process_palm_reading.delay(str(reading.id), image_ref=storage_key)
+            return Response(
+                self._job_handle(request, reading), status=status.HTTP_202_ACCEPTED
+            )
+
+        # Pre-process once, decoding uploads straight from the upload buffer.
         if image:
-            raw_bytes = image.read()
-            image.seek(0)
-        elif image_b64:
-            if ";base64," in image_b64:
-                _, b64data = image_b64.split(";base64,", 1)
-            else:
-                b64data = image_b64
-            raw_bytes = base64.b64decode(b64data)
-
-        if raw_bytes and not is_palm_image(raw_bytes):
-            # Avoid false negatives from the lightweight image classifier.
-            # Let the main analysis step decide if it can extract palm reading data.
-            pass
+            prepared = prepare_palm_image(image)
+        elif storage_key:
+            with storage.open(storage_key) as f:
+                prepared = prepare_palm_image(f)
+            storage.delete(storage_key)
+        else:
+            prepared = prepare_palm_image(_decode_base64_image(image_b64))
+
+        # Serve exact re-uploads from the shared result cache. A miss is
+        # counted by the analysis task, which repeats the lookup.
+        cached_result = (
+            get_cached_palm_result(palm_result_cache_key(prepared.data), record_miss=False)
+            if prepared
+            else None
+        )
+        if cached_result is not None:
+            reading = Reading.objects.create(
+                user=None,
+                status=ReadingStatus.DONE,
+                result=cached_result,
+                model_version=cached_result.get("modelVersion", "unknown"),
+            )
+            return Response(self._job_handle(request, reading), status=status.HTTP_200_OK)
 
-        # Authentication removed - create reading without user
-        reading = Reading.objects.create(user=None)
+        ensure_model_available()
 
-        if image:
-            reading.image = image
-            reading.save(update_fields=["image"])
+        # Palm/non-palm is decided by the analysis call itself unless the
+        # standalone classifier round trip is explicitly enabled.
+        if (
+            prepared
+            and standalone_palm_validation_enabled()
+            and not is_palm_image(prepared.data)
+        ):
+            return Response(
+                {"detail": NOT_A_PALM_MESSAGE},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-        # For local/dev: run analysis synchronously to avoid needing Redis/Celery workers
-        process_palm_reading(str(reading.id), image_base64=image_b64)
+        # Authentication removed - create reading without user
+        reading = Reading.objects.create(user=None)
 
-        status_url = request.build_absolute_uri(
-            reverse("readings:reading-status", kwargs={"pk": reading.id})
-        )
-        result_url = request.build_absolute_uri(
-            reverse("readings:reading-result", kwargs={"pk": reading.id})
-        )
+        # Sync fallback (READING_UPLOAD_MODE=sync): analyze inside the request.
+        # The pre-processed image is analyzed in memory, never saved.
+        run_palm_reading(str(reading.id), image=prepared)
+        reading.refresh_from_db(fields=["status"])
 
+        handle = self._job_handle(request, reading)
         EventLog.objects.create(
             reading=reading,
             user=reading.user,
             event_type="reading.completed_sync",
-            metadata={"status_url": status_url},
+            metadata={"status_url": handle["status_url"]},
         )
 
-        # Return immediate DONE status and result URLs
+        # Return the final status and result URLs
+        return Response(handle, status=status.HTTP_200_OK)
+
+    @staticmethod
+    def _job_handle(request: Request, reading: Reading) -> dict:
+        return {
+            "job_id": str(reading.id),
+            "status": reading.status,
+            "status_url": request.build_absolute_uri(
+                reverse("readings:reading-status", kwargs={"pk": reading.id})
+            ),
+            "result_url": request.build_absolute_uri(
+                reverse("readings:reading-result", kwargs={"pk": reading.id})
+            ),
+            "events_url": request.build_absolute_uri(
+                reverse("readings:reading-events", kwargs={"pk": reading.id})
+            ),
+        }
+
+
+class PalmUploadURLView(views.APIView):
+    """
+    POST /api/v1/readings/uploads/   {"content_type": "image/jpeg"}
+
+    Returns a presigned PUT for uploading a palm image straight to storage,
+    plus the `upload_token` to submit to POST /api/v1/readings/ afterwards.
+    The token is signed, so readings can only be created from granted keys.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+        content_type = str(request.data.get("content_type") or "image/jpeg")
+        if not content_type.startswith("image/"):
+            return Response(
+                {"detail": "Invalid file type. Please upload an image file."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        key = new_upload_key(content_type)
+        upload = get_image_storage().presigned_put(key, content_type)
+        upload["url"] = request.build_absolute_uri(upload["url"])
         return Response(
             {
-                "job_id": str(reading.id),
-                "status": reading.status,
-                "status_url": status_url,
-                "result_url": result_url,
+                "storage_key": key,
+                "upload_token": sign_upload_key(key),
+                "upload": upload,
+                "expires_in": upload_url_ttl(),
+                "max_bytes": MAX_UPLOAD_BYTES,
             },
-            status=status.HTTP_200_OK,
+            status=status.HTTP_201_CREATED,
         )
 
 
+class PalmUploadPutView(views.APIView):
+    """
+    PUT /api/v1/readings/uploads/<token>/
+
+    Receiving end of presigned uploads for PALM_STORAGE_BACKEND=local, so the
+    direct-upload flow works without an object store. The signed token names
+    the key and content type; the body is streamed into storage. A key is
+    written once: reusing the URL within its TTL is refused.
+    """
+
+    permission_classes = [permissions.AllowAny]
+
+    def put(self, request: Request, token: str, *args: Any, **kwargs: Any) -> Response:
+        try:
+            grant = signing.loads(token, salt=UPLOAD_SIGNING_SALT, max_age=upload_url_ttl())
+        except signing.BadSignature:
+            return Response({"detail": "Upload URL is invalid or has expired."}, status=status.HTTP_403_FORBIDDEN)
+        if request.content_type != grant["content_type"]:
+            return Response({"detail": "Content-Type does not match the upload URL."}, status=status.HTTP_400_BAD_REQUEST)
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+        if not 0 < length <= MAX_UPLOAD_BYTES:
+            return Response(
+                {"detail": "Image file too large. Maximum size is 10MB."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        storage = get_image_storage()
+        if storage.size(grant["key"]) is not None:
+            return Response({"detail": "This upload URL has already been used."}, status=status.HTTP_409_CONFLICT)
+        storage.save(grant["key"], request.stream, grant["content_type"])
+        return Response(status=status.HTTP_200_OK)
+
+
 class ReadingStatusView(views.APIView):
     """
     GET /api/v1/readings/{job_id}/status/
@@ -140,6 +330,19 @@ class ReadingResultView(views.APIView):
         return Response(data)
 
 
+class ReadingEventsView(EventStreamAPIView):
+    """
+    GET /api/v1/readings/{job_id}/events/
+
+    Server-Sent Events: the current status, then each status change until
+    the reading is DONE (the event carries the result) or FAILED.
+    """
+
+    def get(self, request: Request, pk: str, *args: Any, **kwargs: Any):
+        reading = get_object_or_404(Reading, pk=pk)
+        return event_stream_response(request, reading_channel(reading.pk), reading_event(reading), is_terminal)
+
+
 @method_decorator(csrf_exempt, name="dispatch")
 class ReadingCallbackView(views.APIView):
     """
@@ -261,107 +464,129 @@ class UnifiedReadingSaveView(views.APIView):
 
 
 class EventLogListView(views.APIView):
+    """
+    GET /api/v1/events/
+
+    Event log, newest first, in keyset pages (?limit=, ?cursor=); `count`
+    is an estimate, or null where none is cheap.
+    """
+
     permission_classes = [permissions.IsAdminUser]
+    paginator = KeysetPaginator(default_limit=100, max_limit=500)
 
     def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
-        events = EventLog.objects.all()[:500]
-        data = EventLogSerializer(events, many=True).data
-        return Response(data)
+        page = self.paginator.paginate(EventLog.objects.all(), request)
+        data = EventLogSerializer(page.items, many=True).data
+        return Response(page.response_data(data, count=estimated_count(EventLog)))
 
 
 class ReadingListView(views.APIView):
     """
     GET /api/v1/readings/list/
     
-    Returns a list of all readings for the authenticated user.
-    Supports pagination via ?limit= and ?offset= query parameters.
+    Returns a list of all readings for the authenticated user, newest first.
+    Paginated by cursor: ?limit= and the opaque ?cursor= of the `next` and
+    `previous` links. `count` comes from the dashboard aggregates.
     """
     permission_classes = [permissions.IsAuthenticated]
+    # Keyset on (created_at, id): uses readings_user_created_idx
+    paginator = KeysetPaginator()
     
     def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
-        limit = int(request.query_params.get("limit", 20))
-        offset = int(request.query_params.get("offset", 0))
-        
-        # Optimized query using index - uses readings_reading_user_created_idx
-        readings_qs = Reading.objects.filter(user=request.user).order_by("-created_at").select_related("palm_reference")
-        total = readings_qs.count()
-        
-        readings = readings_qs[offset:offset + limit]
-        data = ReadingResultSerializer(readings, many=True).data
-        
-        return Response({
-            "count": total,
-            "next": f"?limit={limit}&offset={offset + limit}" if offset + limit < total else None,
-            "previous": f"?limit={limit}&offset={max(0, offset - limit)}" if offset > 0 else None,
-            "results": data,
-        })
+        readings_qs = Reading.objects.filter(user=request.user).select_related("palm_reference")
+        page = self.paginator.paginate(readings_qs, request)
+        data = ReadingResultSerializer(page.items, many=True).data
+        return Response(page.response_data(data, count=total_readings(user_scope(request.user.pk))))
 
 
 class PredictionsView(views.APIView):
     """
     GET /api/v1/predictions/get/
     
-    Returns all predictions extracted from user's readings.
-    Predictions are aggregated from all reading results.
+    Returns the most confident predictions (?limit=, default PREDICTIONS_LIMIT)
+    extracted from the user's completed palm and astrology readings, with a
+    `next` link to the following ones (?cursor=).
     """
     permission_classes = [permissions.IsAuthenticated]
     
     def get(self, request: Request, *args: Any, **kwargs: Any) -> Response:
-        from readings.models import ReadingStatus
-        
-        # Optimized query using index
-        readings_qs = Reading.objects.filter(
-            user=request.user,
-            status=ReadingStatus.DONE
-        ).order_by("-created_at").select_related("palm_reference")
-        
-        predictions = []
-        for reading in readings_qs:
-            result = reading.result or {}
-            if not isinstance(result, dict):
-                continue
-            
+        limit = page_limit(request, PREDICTIONS_LIMIT, PREDICTIONS_MAX_LIMIT)
+        cursor = request.query_params.get(CURSOR_PARAM)
+        after = _prediction_cursor_key(cursor) if cursor else None
+
+        # Readings by their best prediction confidence (indexed), those whose
+        # scores are not backfilled yet first. Once one prediction more than
+        # the page holds is collected, a reading whose best confidence is
+        # below the last of them cannot contribute, and neither can the rest.
+        readings_qs = (
+            Reading.objects.filter(user=request.user, status=ReadingStatus.DONE)
+            .filter(Q(top_prediction_confidence__isnull=False) | Q(accuracy_pct__isnull=True))
+            .order_by(F("top_prediction_confidence").desc(nulls_first=True), "-created_at")
+        )
+
+        # (sort key, prediction): confidence, then newest reading first, then
+        # the reading id and the order within the reading.
+        ranked: list[tuple[tuple, dict]] = []
+        for reading in readings_qs.iterator(chunk_size=limit + 1):
+            top = reading.top_prediction_confidence
+            if top is not None and len(ranked) > limit and top < -ranked[-1][0][0]:
+                break
+
             reading_type = reading.reading_type
-            
-            # Extract predictions from palm analysis
-            if reading_type == "palm_analysis":
-                preds = result.get("predictions", [])
-                if isinstance(preds, list):
-                    for p in preds:
-                        if isinstance(p, dict):
-                            predictions.append({
-                                "id": str(reading.id),
-                                "reading_type": reading_type,
-                                "reading_date": reading.created_at.isoformat(),
-                                "area": p.get("area") or p.get("type") or "General",
-                                "timeframe": p.get("timeframe") or p.get("window") or "",
-                                "prediction": p.get("prediction") or p.get("summary") or "",
-                                "confidence": p.get("confidence", 80),
-                            })
-            
-            # Extract predictions from astrology readings
-            elif reading_type == "astrology_reading":
-                life_preds = result.get("lifePredictions", [])
-                if isinstance(life_preds, list):
-                    for pred in life_preds:
-                        if isinstance(pred, dict):
-                            predictions.append({
-                                "id": str(reading.id),
-                                "reading_type": reading_type,
-                                "reading_date": reading.created_at.isoformat(),
-                                "area": pred.get("area") or "General",
-                                "timeframe": pred.get("timeframe", "Upcoming"),
-                                "prediction": pred.get("prediction") or pred.get("description") or "",
-                                "confidence": pred.get("confidence", 85),
-                            })
-        
-        # Sort by confidence and limit to top 20
-        predictions.sort(key=lambda p: p.get("confidence", 0), reverse=True)
-        predictions = predictions[:20]
-        
-        return Response({
-            "count": len(predictions),
-            "results": predictions,
-        })
+            for index, p in enumerate(prediction_items(reading, reading_type)):
+                if reading_type == ReadingType.PALM_ANALYSIS:
+                    prediction = {
+                        "area": p.get("area") or p.get("type") or "General",
+                        "timeframe": p.get("timeframe") or p.get("window") or "",
+                        "prediction": p.get("prediction") or p.get("summary") or "",
+                        "confidence": p.get("confidence", 80),
+                    }
+                else:
+                    prediction = {
+                        "area": p.get("area") or "General",
+                        "timeframe": p.get("timeframe", "Upcoming"),
+                        "prediction": p.get("prediction") or p.get("description") or "",
+                        "confidence": p.get("confidence", 85),
+                    }
+                key = (
+                    -confidence_key(prediction["confidence"]),
+                    -reading.created_at.timestamp(),
+                    str(reading.id),
+                    index,
+                )
+                if after is not None and key <= after:
+                    continue  # on an earlier page
+                ranked.append(
+                    (
+                        key,
+                        {
+                            "id": str(reading.id),
+                            "reading_type": reading_type,
+                            "reading_date": reading.created_at.isoformat(),
+                            **prediction,
+                        },
+                    )
+                )
+            ranked.sort(key=lambda item: item[0])
+            del ranked[limit + 1 :]
+
+        page = Page(
+            items=[prediction for _, prediction in ranked[:limit]],
+            next=page_link(request, encode_cursor(ranked[limit - 1][0])) if len(ranked) > limit else None,
+            previous=None,
+        )
+        return Response(page.response_data(page.items, count=len(page.items)))
+
+
+def _prediction_cursor_key(cursor: str) -> tuple:
+    key, _ = decode_cursor(cursor)
+    if (
+        len(key) != 4
+        or not all(isinstance(value, (int, float)) and not isinstance(value, bool) for value in key[:2])
+        or not isinstance(key[2], str)
+        or not isinstance(key[3], int)
+    ):
+        raise NotFound("Invalid cursor")
+    return tuple(key)
 
 
@@ -15,11 +15,23 @@ log = logging.getLogger(__name__)
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from palmastro_backend.async_views import AsyncAPIView, ModelCallMixin
+from palmastro_backend.model_guard import ModelUnavailable, ensure_model_available
+from palmastro_backend.singleflight import asingle_flight, single_flight
+
+from .cache import get_cached_palm_result, palm_result_cache_key, set_cached_palm_result
+from .imaging import prepare_palm_image
 from .models import Reading, ReadingStatus, ReadingType
-from .tasks import _run_gpt_palm_model, is_palm_image
+from .tasks import (
+    NOT_A_PALM_MESSAGE,
+    _acall_gpt_palm_model,
+    _call_gpt_palm_model,
+    is_palm_image,
+    standalone_palm_validation_enabled,
+)
 
 
-class PalmReadingAnalyzeView(views.APIView):
+class PalmReadingAnalyzeView(ModelCallMixin, views.APIView):
     """
     POST /api/palm-reading/analyze
     
@@ -32,7 +44,7 @@ class PalmReadingAnalyzeView(views.APIView):
 
     permission_classes = [permissions.AllowAny]
 
-    def post(self, request: Request, *args: Any, **kwargs: Any) -> Response:
+    def begin_post(self, request: Request, *args: Any, **kwargs: Any) -> Response | tuple:
         # Validate image upload
         if "image" not in request.FILES:
             return Response(
@@ -56,19 +68,48 @@ class PalmReadingAnalyzeView(views.APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        # Read image bytes for validation
-        image_file.seek(0)
-        raw_bytes = image_file.read()
-        image_file.seek(0)
+        # Downscale/re-encode once, decoding straight from the upload buffer;
+        # the validator, the analyzer and the cache key all use these bytes.
+        # The original is never copied or written to MEDIA_ROOT.
+        prepared = prepare_palm_image(image_file)
+
+        # Exact re-uploads (e.g. retries after a slow response) are answered
+        # from the shared result cache without another vision call.
+        cache_key = palm_result_cache_key(prepared.data)
+        cached_result = get_cached_palm_result(cache_key)
+        if cached_result is not None:
+            reading = Reading.objects.create(
+                user=None,
+                reading_type=ReadingType.PALM_ANALYSIS,
+                status=ReadingStatus.DONE,
+                result=cached_result,
+                model_version=cached_result.get("modelVersion", "unknown"),
+            )
+            return Response(
+                {
+                    "success": True,
+                    "reading_id": str(reading.id),
+                    "result": cached_result,
+                },
+                status=status.HTTP_200_OK,
+            )
+
+        # Cache hits are still served while the model circuit breaker is
+        # open; everything else gets 503 + Retry-After straight away.
+        ensure_model_available()
 
-        # Validate that it's actually a palm image
-        # NOTE: We intentionally do NOT hard-block on the lightweight palm
-        # classifier to avoid false negatives (some valid palms may be judged
-        # incorrectly). The main palm analysis step will still reject images
-        # that are clearly not a palm.
-        if raw_bytes and not is_palm_image(raw_bytes):
-            # Continue processing; validator is only a heuristic.
-            pass
+        # The main analysis prompt rejects non-palm images itself (it answers
+        # {"error": ...}), so by default a reading costs a single vision round
+        # trip. The separate classifier call only runs when explicitly enabled.
+        if standalone_palm_validation_enabled() and not is_palm_image(prepared.data):
+            return Response(
+                {
+                    "success": False,
+                    "error": NOT_A_PALM_MESSAGE,
+                    "message": "Please ensure you're uploading a clear, well-lit image of a human palm with fingers spread.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
         # Create a Reading record (authentication removed - no user required)
         reading = Reading.objects.create(
@@ -77,13 +118,29 @@ class PalmReadingAnalyzeView(views.APIView):
             status=ReadingStatus.PROCESSING,
         )
 
-        # Save image temporarily
-        reading.image = image_file
-        reading.save(update_fields=["image", "status"])
+        return reading, prepared, cache_key
+
+    def call_model(self, state: tuple) -> Any:
+        # Run OpenAI analysis on the pre-processed bytes already in memory.
+        # Concurrent uploads of the same image share one vision call.
+        _, prepared, cache_key = state
+        return single_flight(
+            cache_key, lambda: _call_gpt_palm_model(prepared.data), kind="palm"
+        )
+
+    async def acall_model(self, state: tuple) -> Any:
+        _, prepared, cache_key = state
+        return await asingle_flight(
+            cache_key, lambda: _acall_gpt_palm_model(prepared.data), kind="palm"
+        )
 
+    def finish_post(self, state: tuple, outcome: Any) -> Response:
+        reading, _, cache_key = state
         try:
-            # Run OpenAI analysis
-            result = _run_gpt_palm_model(reading.image.path)
+            if isinstance(outcome, Exception):
+                raise outcome
+            result = outcome
+            set_cached_palm_result(cache_key, result)
 
             # Save result to reading (always creates new record, never overwrites)
             # Each palm scan creates a new Reading record with unique UUID
@@ -91,13 +148,6 @@ class PalmReadingAnalyzeView(views.APIView):
             reading.status = ReadingStatus.DONE
             reading.save(update_fields=["result", "status", "updated_at"])
 
-            # Auto-delete image after processing (as per requirements)
-            if reading.image:
-                try:
-                    reading.image.delete(save=False)
-                except Exception:
-                    pass  # Ignore deletion errors
-
             # Return analysis result
             # Note: Frontend will call saveReading() separately to sync to Dashboard
             # This ensures the reading is properly linked and appears in Dashboard
@@ -110,6 +160,16 @@ class PalmReadingAnalyzeView(views.APIView):
                 status=status.HTTP_200_OK,
             )
 
+        except ModelUnavailable as e:
+            # Circuit breaker opened or rate limit wait too long: fail fast.
+            reading.status = ReadingStatus.FAILED
+            reading.error_message = str(e.detail)
+            reading.save(update_fields=["status", "error_message", "updated_at"])
+            return Response(
+                {"success": False, "error": str(e.detail)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": str(e.wait)},
+            )
         except ValueError as e:
             # Handle user-facing errors (invalid image, parsing errors, etc.)
             error_msg = str(e)
@@ -117,13 +177,6 @@ class PalmReadingAnalyzeView(views.APIView):
             reading.error_message = error_msg[:2000]
             reading.save(update_fields=["status", "error_message", "updated_at"])
 
-            # Auto-delete image on error too
-            if reading.image:
-                try:
-                    reading.image.delete(save=False)
-                except Exception:
-                    pass
-
             # Return 400 Bad Request for user errors (invalid image, etc.)
             return Response(
                 {
@@ -140,13 +193,6 @@ class PalmReadingAnalyzeView(views.APIView):
             reading.error_message = error_msg[:2000]
             reading.save(update_fields=["status", "error_message", "updated_at"])
 
-            # Auto-delete image on error too
-            if reading.image:
-                try:
-                    reading.image.delete(save=False)
-                except Exception:
-                    pass
-
             log.exception("Unexpected error in palm reading analysis")
             return Response(
                 {
@@ -157,3 +203,11 @@ class PalmReadingAnalyzeView(views.APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
+
+class AsyncPalmReadingAnalyzeView(AsyncAPIView):
+    """
+    ASGI variant of PalmReadingAnalyzeView: the vision call is awaited with
+    the async OpenAI client instead of blocking a worker.
+    """
+
+    api_view_class = PalmReadingAnalyzeView
@@ -906,18 +906,39 @@ class PalmAstroAPIService {
     }
 
     try {
-      const formData = new FormData();
-      formData.append("image", file);
-
       const token = localStorage.getItem(STORAGE_KEYS.AUTH_TOKEN);
-      const headers: HeadersInit = {};
+      const headers: HeadersInit = { "Content-Type": "application/json" };
       if (token) {
         headers["Authorization"] = `Bearer ${token}`;
       }
 
+      // Upload the image straight to storage with a presigned PUT, then
+      // submit only the signed token for its storage key.
+      const grantResponse = await fetch(`${this.baseURL}/readings/uploads/`, {
+        method: "POST",
+        body: JSON.stringify({ content_type: file.type || "image/jpeg" }),
+        headers,
+        credentials: "include",
+      });
+      const grant = await grantResponse.json().catch(() => null);
+      if (!grantResponse.ok) {
+        throw new Error(
+          grant?.detail || `Upload failed: ${grantResponse.status} ${grantResponse.statusText}`,
+        );
+      }
+
+      const putResponse = await fetch(grant.upload.url, {
+        method: grant.upload.method,
+        body: file,
+        headers: grant.upload.headers,
+      });
+      if (!putResponse.ok) {
+        throw new Error(`Upload failed: ${putResponse.status} ${putResponse.statusText}`);
+      }
+
       const response = await fetch(`${this.baseURL}/readings/`, {
         method: "POST",
-        body: formData,
+        body: JSON.stringify({ upload_token: grant.upload_token }),
         headers,
         credentials: "include",
       });
@@ -1009,7 +1030,45 @@ class PalmAstroAPIService {
     }
   }
 
-  async analyzePalm(uploadId: string): Promise<PalmReading> {
+  // Resolves with the final DONE/FAILED event of a reading, or null when
+  // EventSource is not supported or the stream fails before finishing.
+  // Partial sections of the result are passed to onSection as they arrive.
+  private waitForReadingEvent(
+    uploadId: string,
+    onSection?: (section: string, data: any) => void
+  ): Promise<any | null> {
+    if (typeof EventSource === "undefined") {
+      return Promise.resolve(null);
+    }
+    return new Promise((resolve) => {
+      const source = new EventSource(
+        `${this.baseURL}/readings/${uploadId}/events/`
+      );
+      source.addEventListener("status", (event) => {
+        const data = JSON.parse((event as MessageEvent).data);
+        if (data.section) {
+          onSection?.(data.section, data.data);
+          return;
+        }
+        if (data.status === "DONE" || data.status === "FAILED") {
+          source.close();
+          resolve(data);
+        }
+      });
+      source.onerror = () => {
+        // The server ends each stream after a while and EventSource
+        // reconnects by itself; only give up once it stops retrying.
+        if (source.readyState === EventSource.CLOSED) {
+          resolve(null);
+        }
+      };
+    });
+  }
+
+  async analyzePalm(
+    uploadId: string,
+    onSection?: (section: string, data: any) => void
+  ): Promise<PalmReading> {
     if (this.shouldUseMockAPI()) {
       console.log("🎭 Using Mock API: analyzePalm");
       return this.mockAnalyzePalm(uploadId);
@@ -1019,9 +1078,16 @@ class PalmAstroAPIService {
       const statusUrl = `${this.baseURL}/readings/${uploadId}/status/`;
       const resultUrl = `${this.baseURL}/readings/${uploadId}/result/`;
 
-      // Poll status until DONE or FAILED
+      // Wait for the final status over Server-Sent Events; the DONE event
+      // carries the result, so no further requests are needed.
+      let data: any = await this.waitForReadingEvent(uploadId, onSection);
+      if (data?.status === "FAILED") {
+        throw new Error(data.error_message || "Analysis failed");
+      }
+
+      // Fall back to polling if EventSource is unavailable or the stream dropped
       let attempts = 0;
-      const maxAttempts = this.retryAttempts;
+      const maxAttempts = data ? 0 : this.retryAttempts;
 
       while (attempts < maxAttempts) {
         const statusResponse = await fetch(statusUrl);
@@ -1042,11 +1108,13 @@ class PalmAstroAPIService {
         await this.delay(1500);
       }
 
-      const resultResponse = await fetch(resultUrl);
-      if (!resultResponse.ok) {
-        throw new Error(`Result fetch failed: ${resultResponse.statusText}`);
+      if (!data) {
+        const resultResponse = await fetch(resultUrl);
+        if (!resultResponse.ok) {
+          throw new Error(`Result fetch failed: ${resultResponse.statusText}`);
+        }
+        data = await resultResponse.json();
       }
-      const data = await resultResponse.json();
 
       const result: PalmAnalysisResult | undefined = data.result;
 
@@ -1106,7 +1174,11 @@ class PalmAstroAPIService {
     }
   }
 
-  async getReadings(limit: number = 20, offset: number = 0): Promise<{
+  /**
+   * List the user's readings, newest first. Pass the `next`/`previous`
+   * cursor of an earlier page to move through the list.
+   */
+  async getReadings(limit: number = 20, cursor: string | null = null): Promise<{
     count: number;
     next: string | null;
     previous: string | null;
@@ -1121,8 +1193,12 @@ class PalmAstroAPIService {
           headers["Authorization"] = `Bearer ${accessToken}`;
         }
 
+        const params = new URLSearchParams({ limit: String(limit) });
+        if (cursor) {
+          params.set("cursor", cursor);
+        }
         return fetch(
-          `${this.baseURL}${API_ENDPOINTS.READINGS.LIST}?limit=${limit}&offset=${offset}`,
+          `${this.baseURL}${API_ENDPOINTS.READINGS.LIST}?${params}`,
           {
             method: "GET",
             headers,
@@ -1149,10 +1225,13 @@ class PalmAstroAPIService {
       }
 
       const data = await response.json();
+      // Links are query strings ("?limit=20&cursor=..."); return their cursors
+      const cursorOf = (link: string | null) =>
+        link ? new URLSearchParams(link.split("?")[1] ?? "").get("cursor") : null;
       return {
         count: data.count || 0,
-        next: data.next || null,
-        previous: data.previous || null,
+        next: cursorOf(data.next),
+        previous: cursorOf(data.previous),
         results: data.results || [],
       };
     } catch (error) {
@@ -1170,7 +1249,7 @@ class PalmAstroAPIService {
    */
   async getLatestPalmReadingId(): Promise<string | null> {
     try {
-      const readings = await this.getReadings(1, 0);
+      const readings = await this.getReadings(1);
       const palmReading = readings.results.find(
         (r) => r.type === "palm_analysis" && r.status === "completed"
       );